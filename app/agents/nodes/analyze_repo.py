@@ -34,6 +34,75 @@ logger = logging.getLogger(__name__)
 # Retrieve more chunks than needed, then filter with token budget
 INITIAL_TOP_K = 15
 
+# Query for repository overview (constant, so its embedding is cached per model)
+REPO_OVERVIEW_QUERY = (
+    "What is this project about? What technologies, frameworks, and patterns does it use? "
+    "What is the overall architecture and structure?"
+)
+
+
+def _retrieve_ranked_chunks(project_id: str) -> list[dict]:
+    """
+    Retrieve the repository-overview chunks of a project in Qdrant rank order.
+
+    Args:
+        project_id: Project ID
+
+    Returns:
+        Chunk dicts (content and metadata from Supabase, score from Qdrant),
+        most similar first
+    """
+    # Step 1a: Embedding of the overview query (computed once per embedding model)
+    query_embedding = get_embedding_service().embed_query_cached(REPO_OVERVIEW_QUERY)
+
+    # Step 1b: Search Qdrant for similar chunks (retrieve more than needed)
+    search_results = get_qdrant_service().search(
+        project_id=project_id,
+        query_embedding=query_embedding,
+        limit=INITIAL_TOP_K,  # Retrieve more chunks initially
+    )
+
+    if not search_results:
+        raise ValueError(f"No chunks found for project {project_id}")
+
+    logger.info(f"   Retrieved {len(search_results)} chunks from Qdrant (initial)")
+
+    # Step 1c: Get chunk content from Supabase in one batched query
+    chunk_ids = [str(result.id) for result in search_results]
+    chunk_scores = {str(result.id): result.score for result in search_results}
+
+    supabase = get_supabase_client()
+    chunks_response = (
+        supabase.table("project_chunks")
+        .select("id, file_path, chunk_index, language, content, token_count")
+        .in_("id", chunk_ids)
+        .execute()
+    )
+
+    if not chunks_response.data:
+        raise ValueError("Chunks not found in Supabase")
+
+    # Step 1d: Build chunk list with all metadata, in Qdrant order (by similarity)
+    chunks_by_id = {str(chunk["id"]): chunk for chunk in chunks_response.data}
+    raw_chunks = []
+    for chunk_id in chunk_ids:
+        chunk_data = chunks_by_id.get(chunk_id)
+        if chunk_data is None:
+            logger.warning(f"⚠️  Chunk {chunk_id} found in Qdrant but not in Supabase")
+            continue
+        raw_chunks.append(
+            {
+                "id": chunk_id,
+                "file_path": chunk_data["file_path"],
+                "chunk_index": chunk_data["chunk_index"],
+                "language": chunk_data["language"],
+                "content": chunk_data["content"],
+                "token_count": chunk_data["token_count"],
+                "score": chunk_scores.get(chunk_id, 0.0),
+            }
+        )
+    return raw_chunks
+
 
 async def analyze_repository(state: RoadmapAgentState) -> RoadmapAgentState:
     """
@@ -62,66 +131,9 @@ async def analyze_repository(state: RoadmapAgentState) -> RoadmapAgentState:
     logger.info("📚 Retrieving repository context with token budgeting...")
     logger.debug(f"   Token budget: {ANALYZE_REPO_TOKEN_BUDGET}, Max per chunk: {MAX_CHUNK_TOKENS}")
 
-    # Query for repository overview
-    rag_query = (
-        "What is this project about? What technologies, frameworks, and patterns does it use? "
-        "What is the overall architecture and structure?"
-    )
-
     try:
-        # Step 1a: Generate embedding for query
-        embedding_service = get_embedding_service()
-        query_embeddings = embedding_service.embed_texts([rag_query])
-
-        if not query_embeddings or len(query_embeddings) == 0:
-            raise ValueError("Failed to generate embedding for query")
-
-        query_embedding = query_embeddings[0]
-
-        # Step 1b: Search Qdrant for similar chunks (retrieve more than needed)
-        qdrant_service = get_qdrant_service()
-        search_results = qdrant_service.search(
-            project_id=project_id,
-            query_embedding=query_embedding,
-            limit=INITIAL_TOP_K,  # Retrieve more chunks initially
-        )
-
-        if not search_results:
-            raise ValueError(f"No chunks found for project {project_id}")
-
-        logger.info(f"   Retrieved {len(search_results)} chunks from Qdrant (initial)")
-
-        # Step 1c: Get chunk content from Supabase
-        chunk_ids = [str(result.id) for result in search_results]
-        chunk_scores = {str(result.id): result.score for result in search_results}
-
-        supabase = get_supabase_client()
-        chunks_response = (
-            supabase.table("project_chunks")
-            .select("id, file_path, chunk_index, language, content, token_count")
-            .in_("id", chunk_ids)
-            .execute()
-        )
-
-        if not chunks_response.data:
-            raise ValueError("Chunks not found in Supabase")
-
-        # Step 1d: Build chunk list with all metadata
-        raw_chunks = []
-        for chunk_id in chunk_ids:  # Maintain order from Qdrant (by similarity)
-            chunk_data = next((c for c in chunks_response.data if str(c["id"]) == chunk_id), None)
-            if chunk_data:
-                raw_chunks.append(
-                    {
-                        "id": chunk_id,
-                        "file_path": chunk_data["file_path"],
-                        "chunk_index": chunk_data["chunk_index"],
-                        "language": chunk_data["language"],
-                        "content": chunk_data["content"],
-                        "token_count": chunk_data["token_count"],
-                        "score": chunk_scores.get(chunk_id, 0.0),
-                    }
-                )
+        # Step 1a-1d: One ranked, batched fetch shared by both analysis stages
+        raw_chunks = _retrieve_ranked_chunks(project_id)
 
         # Step 1e: Apply token budgeting - select and truncate chunks
         selected_chunks = select_chunks_by_budget(
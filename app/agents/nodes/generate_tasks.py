@@ -7,9 +7,13 @@ Uses Gemini API for intelligent task and test file generation.
 import logging
 from typing import Any
 
-from app.agents.prompts.task_generation import TASK_GENERATION_PROMPT
+from app.agents.prompts.task_generation import (
+    TASK_GENERATION_PROMPT,
+    TASK_GENERATION_REPO_CONTEXT,
+)
 from app.agents.pydantic_models import TasksBundleModel
 from app.agents.state import RoadmapAgentState
+from app.agents.utils.context_cache import ContextPrefix
 from app.agents.utils.memory_context import (
     build_structured_memory_context,
     format_memory_context_for_prompt,
@@ -288,6 +292,7 @@ async def generate_tasks(state: RoadmapAgentState) -> RoadmapAgentState:
     # Generate tasks with retry
     async def _generate():
         return await _llm_generate_tasks(
+            project_id=project_id,
             concept_id=concept_id,
             concept_metadata=concept_metadata,
             skill_level=skill_level,
@@ -325,6 +330,7 @@ async def generate_tasks(state: RoadmapAgentState) -> RoadmapAgentState:
 
 
 async def _llm_generate_tasks(
+    project_id: str,
     concept_id: str,
     concept_metadata: dict[str, Any],
     skill_level: str,
@@ -336,6 +342,7 @@ async def _llm_generate_tasks(
     Call LLM to generate tasks with test files.
 
     Args:
+        project_id: Project ID (keys the cached notebook repo context prefix)
         concept_id: Concept ID
         concept_metadata: Concept metadata from curriculum
         skill_level: User's skill level
@@ -353,14 +360,21 @@ async def _llm_generate_tasks(
     concept_title = concept_metadata.get("title", concept_id)
     concept_objective = concept_metadata.get("objective", "")
 
-    # Format prompt with notebook repo context and detected language
+    # Notebook repo context is the same for every concept: send it as a cacheable prefix
+    repo_prefix = ContextPrefix(
+        key=f"{project_id}:tasks",
+        text=TASK_GENERATION_REPO_CONTEXT.format(
+            notebook_repo_structure=notebook_repo_context.get("repo_structure", ""),
+            notebook_repo_code_context=notebook_repo_context.get("repo_code_context", ""),
+        ),
+    )
+
+    # Format prompt with detected language and concept context
     prompt = TASK_GENERATION_PROMPT.format(
         concept_title=concept_title,
         concept_objective=concept_objective,
         skill_level=skill_level,
         project_language=project_language,
-        notebook_repo_structure=notebook_repo_context.get("repo_structure", ""),
-        notebook_repo_code_context=notebook_repo_context.get("repo_code_context", ""),
         memory_context=memory_context_str or "No previous learning context.",
     )
 
@@ -371,6 +385,7 @@ async def _llm_generate_tasks(
         user_prompt=prompt,
         system_prompt="You are an expert technical educator.",
         output_type=TasksBundleModel,
+        context_prefix=repo_prefix,
     )
     return bundle.model_dump()
 
@@ -25,6 +25,7 @@ from app.agents.state import (
     DayTheme,
     RoadmapAgentState,
 )
+from app.agents.utils.context_cache import get_context_cache
 from app.agents.utils.pydantic_ai_client import run_gemini_structured
 
 logger = logging.getLogger(__name__)
@@ -143,6 +144,11 @@ async def plan_and_save_curriculum(state: RoadmapAgentState) -> RoadmapAgentStat
         except Exception as e:
             logger.warning(f"⚠️  Failed to save curriculum_structure to DB: {e}")
 
+        # A new curriculum invalidates prompt prefixes cached for the project
+        context_cache = get_context_cache()
+        if context_cache is not None:
+            await context_cache.invalidate_project(project_id)
+
         # Update state
         state["curriculum"] = curriculum
         state["concept_status_map"] = concept_status_map
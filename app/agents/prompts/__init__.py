@@ -27,7 +27,10 @@ from app.agents.prompts.repo_analysis import (
     REPO_ANALYSIS_STAGE1_PROMPT,
     REPO_ANALYSIS_STAGE2_PROMPT,
 )
-from app.agents.prompts.task_generation import TASK_GENERATION_PROMPT
+from app.agents.prompts.task_generation import (
+    TASK_GENERATION_PROMPT,
+    TASK_GENERATION_REPO_CONTEXT,
+)
 from app.agents.prompts.tasks import TASKS_GENERATION_PROMPT  # DEPRECATED
 
 # Re-export all prompts
@@ -38,6 +41,7 @@ __all__ = [
     "CURRICULUM_PLANNING_PROMPT",
     "CONCEPT_GENERATION_PROMPT",
     "TASK_GENERATION_PROMPT",
+    "TASK_GENERATION_REPO_CONTEXT",
     "PATTERN_EXTRACTION_PROMPT",
     # Deprecated prompts (kept for backward compatibility)
     "REPO_ANALYSIS_PROMPT",
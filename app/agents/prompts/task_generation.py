@@ -3,6 +3,19 @@ Task generation prompt template.
 Generates task descriptions only (no tests).
 
 Uses NOTEBOOK REPO (user_repo_url) context, not textbook repo.
+
+The notebook repository context is identical for every concept of a project, so it
+is a separate prefix (TASK_GENERATION_REPO_CONTEXT) that can be served from Gemini
+context caching; TASK_GENERATION_PROMPT holds the per-concept remainder.
+"""
+
+TASK_GENERATION_REPO_CONTEXT = """**Notebook Repository Context** (the student's project, where tasks are implemented)
+
+**Notebook Repository Structure:**
+{notebook_repo_structure}
+
+**Notebook Repository Code Context:**
+{notebook_repo_code_context}
 """
 
 TASK_GENERATION_PROMPT = """You are a technical educator creating coding tasks.
@@ -12,8 +25,7 @@ TASK_GENERATION_PROMPT = """You are a technical educator creating coding tasks.
 - Concept Objective: {concept_objective}
 - Skill Level: {skill_level}
 - Project Language: {project_language}
-- Notebook Repository Structure: {notebook_repo_structure}
-- Notebook Repository Code Context: {notebook_repo_code_context}
+- Notebook Repository: see the notebook repository context above
 
 **Previous Learning Context:**
 {memory_context}
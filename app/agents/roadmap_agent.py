@@ -37,6 +37,7 @@ from app.agents.state import MemoryLedger, RoadmapAgentState
 from app.agents.utils import calculate_recursion_limit, validate_inputs
 from app.agents.utils.concept_order import SLIDING_WINDOW_AHEAD
 from app.core.supabase_client import get_supabase_client
+from app.services.llm_telemetry import instrument_node
 
 logger = logging.getLogger(__name__)
 
@@ -190,18 +191,23 @@ def build_roadmap_graph() -> StateGraph:
 
     # ===== INITIALIZATION PHASE =====
     workflow.add_node("fetch_context", fetch_project_context)
-    workflow.add_node("analyze_repo", analyze_repository)
+    workflow.add_node("analyze_repo", instrument_node("analyze_repo", analyze_repository))
 
     # ===== PLANNING PHASE =====
-    workflow.add_node("plan_curriculum", plan_and_save_curriculum)
+    workflow.add_node(
+        "plan_curriculum", instrument_node("plan_curriculum", plan_and_save_curriculum)
+    )
     workflow.add_node("insert_all_days", insert_all_days_to_db)
     workflow.add_node("save_all_concepts", save_all_concepts_to_db)
 
     # ===== CONTENT GENERATION LOOP =====
     # Note: Day 0 is handled separately via API endpoint (initialize-day0)
     workflow.add_node("build_memory_context", build_memory_context)
-    workflow.add_node("generate_concept_content", generate_concept_content)
-    workflow.add_node("generate_tasks", generate_tasks)
+    workflow.add_node(
+        "generate_concept_content",
+        instrument_node("generate_concept_content", generate_concept_content),
+    )
+    workflow.add_node("generate_tasks", instrument_node("generate_tasks", generate_tasks))
     workflow.add_node("mark_concept_complete", mark_concept_complete)
 
     # ===== EDGES =====
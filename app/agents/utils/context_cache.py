@@ -0,0 +1,281 @@
+"""
+Gemini context caching for per-project prompt prefixes.
+
+Task generation resends the same large block for every concept of a project: the
+notebook repository structure and code. That block, together with the system
+prompt, is stored once as a Vertex AI / Gemini API cached-content resource, and
+later calls reference the handle. Only the per-concept remainder of the prompt is
+sent and billed at the full input rate.
+
+Handles are tracked per (project, purpose) with a fingerprint of model, system
+prompt and prefix text. A changed prefix (new repo head, re-planned curriculum)
+replaces the cached content. Entries are kept alive while in use by extending
+their TTL, and are deleted on invalidation. Prefixes below the provider's minimum
+cache size are never cached; callers then inline the prefix in the prompt.
+
+`LocalContextCacheBackend` is an in-memory stand-in for tests and environments
+without Gemini credentials.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Protocol
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Minimum prefix size worth caching (~2,048 tokens, the Vertex AI minimum)
+CONTEXT_CACHE_MIN_CHARS = 8192
+# Fingerprints whose cache creation failed are retried after this many seconds
+CONTEXT_CACHE_FAILURE_BACKOFF_SECONDS = 600
+
+
+@dataclass
+class ContextPrefix:
+    """A prompt prefix shared by many calls of one project."""
+
+    # Stable identity of the prefix, e.g. "<project_id>:tasks"
+    key: str
+    text: str
+
+    def inline(self, user_prompt: str) -> str:
+        """The uncached prompt: prefix followed by the per-call remainder."""
+        return f"{self.text}\n\n{user_prompt}"
+
+
+@dataclass
+class CachedContentHandle:
+    name: str
+    expires_at: float
+
+
+class ContextCacheBackend(Protocol):
+    async def create(
+        self, model: str, system_prompt: str, text: str, ttl_seconds: int, display_name: str
+    ) -> CachedContentHandle: ...
+
+    async def extend(self, name: str, ttl_seconds: int) -> CachedContentHandle: ...
+
+    async def delete(self, name: str) -> None: ...
+
+
+class GeminiContextCacheBackend:
+    """Cached contents through the Google GenAI client of the shared provider."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from app.agents.utils.pydantic_ai_client import _google_provider
+
+            self._client = _google_provider().client
+        return self._client
+
+    async def create(
+        self, model: str, system_prompt: str, text: str, ttl_seconds: int, display_name: str
+    ) -> CachedContentHandle:
+        from google.genai import types
+
+        cached = await self.client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system_prompt or None,
+                contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+                ttl=f"{ttl_seconds}s",
+                display_name=display_name[:128],
+            ),
+        )
+        return CachedContentHandle(name=cached.name, expires_at=time.time() + ttl_seconds)
+
+    async def extend(self, name: str, ttl_seconds: int) -> CachedContentHandle:
+        from google.genai import types
+
+        await self.client.aio.caches.update(
+            name=name, config=types.UpdateCachedContentConfig(ttl=f"{ttl_seconds}s")
+        )
+        return CachedContentHandle(name=name, expires_at=time.time() + ttl_seconds)
+
+    async def delete(self, name: str) -> None:
+        await self.client.aio.caches.delete(name=name)
+
+
+class LocalContextCacheBackend:
+    """In-memory stand-in that mimics cached-content lifecycles (tests, local dev)."""
+
+    def __init__(self):
+        self.contents: dict[str, dict] = {}
+        self.created = 0
+        self.deleted = 0
+
+    async def create(
+        self, model: str, system_prompt: str, text: str, ttl_seconds: int, display_name: str
+    ) -> CachedContentHandle:
+        self.created += 1
+        name = f"cachedContents/local-{self.created}"
+        self.contents[name] = {
+            "model": model,
+            "system_prompt": system_prompt,
+            "text": text,
+            "display_name": display_name,
+        }
+        return CachedContentHandle(name=name, expires_at=time.time() + ttl_seconds)
+
+    async def extend(self, name: str, ttl_seconds: int) -> CachedContentHandle:
+        if name not in self.contents:
+            raise KeyError(name)
+        return CachedContentHandle(name=name, expires_at=time.time() + ttl_seconds)
+
+    async def delete(self, name: str) -> None:
+        if self.contents.pop(name, None) is not None:
+            self.deleted += 1
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    handle: CachedContentHandle
+
+
+class ContextCache:
+    """Per-project cached-content handles with TTL management and invalidation."""
+
+    def __init__(
+        self,
+        backend: ContextCacheBackend,
+        ttl_seconds: int = 3600,
+        min_chars: int = CONTEXT_CACHE_MIN_CHARS,
+    ):
+        """
+        Args:
+            backend: Cached-content backend (Gemini or the local stand-in)
+            ttl_seconds: TTL of created cached contents, extended while in use
+            min_chars: Prefixes shorter than this are sent inline
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_chars = min_chars
+        self._entries: dict[str, _Entry] = {}
+        self._failed: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def _fingerprint(model: str, system_prompt: str, prefix: ContextPrefix) -> str:
+        digest = hashlib.sha256()
+        for part in (model, system_prompt, prefix.text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    async def get_or_create(
+        self, model: str, system_prompt: str, prefix: ContextPrefix
+    ) -> str | None:
+        """
+        Get the cached-content name for this prefix, creating or refreshing it.
+
+        Args:
+            model: Gemini model name the cache is created for
+            system_prompt: System prompt stored with the cache
+            prefix: Project prefix
+
+        Returns:
+            Cached content name, or None when the prefix should be sent inline
+        """
+        if len(prefix.text) < self.min_chars:
+            return None
+        fingerprint = self._fingerprint(model, system_prompt, prefix)
+        if time.time() < self._failed.get(fingerprint, 0):
+            return None
+
+        async with self._locks.setdefault(prefix.key, asyncio.Lock()):
+            now = time.time()
+            entry = self._entries.get(prefix.key)
+            if entry is not None and entry.fingerprint != fingerprint:
+                # Prefix changed (new repo head, re-planned curriculum, other model)
+                await self._delete(prefix.key)
+                entry = None
+            if entry is not None and entry.handle.expires_at <= now:
+                self._entries.pop(prefix.key, None)
+                entry = None
+
+            if entry is not None:
+                if entry.handle.expires_at - now < self.ttl_seconds / 2:
+                    try:
+                        entry.handle = await self.backend.extend(
+                            entry.handle.name, self.ttl_seconds
+                        )
+                    except Exception as e:
+                        logger.warning(f"⚠️ Failed to extend cached content for {prefix.key}: {e}")
+                        self._entries.pop(prefix.key, None)
+                        entry = None
+                if entry is not None:
+                    return entry.handle.name
+
+            try:
+                handle = await self.backend.create(
+                    model, system_prompt, prefix.text, self.ttl_seconds, display_name=prefix.key
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to create cached content for {prefix.key}: {e}")
+                self._failed[fingerprint] = now + CONTEXT_CACHE_FAILURE_BACKOFF_SECONDS
+                return None
+
+            self._entries[prefix.key] = _Entry(fingerprint=fingerprint, handle=handle)
+            logger.info(f"🗄️ Cached {len(prefix.text)} chars of prompt context for {prefix.key}")
+            return handle.name
+
+    async def _delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        try:
+            await self.backend.delete(entry.handle.name)
+        except Exception as e:
+            # Expires server-side at its TTL anyway
+            logger.debug(f"Failed to delete cached content {entry.handle.name}: {e}")
+
+    async def invalidate(self, key: str, *, backoff: bool = False) -> None:
+        """
+        Drop the cached content of one prefix.
+
+        Args:
+            key: Prefix key
+            backoff: The server rejected the content; send this prefix inline for
+                CONTEXT_CACHE_FAILURE_BACKOFF_SECONDS instead of recreating it
+        """
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            entry = self._entries.get(key)
+            if backoff and entry is not None:
+                self._failed[entry.fingerprint] = (
+                    time.time() + CONTEXT_CACHE_FAILURE_BACKOFF_SECONDS
+                )
+            await self._delete(key)
+
+    async def invalidate_project(self, project_id: str) -> None:
+        """Drop all cached prefixes of a project (its curriculum or repo changed)."""
+        for key in [k for k in self._entries if k.split(":", 1)[0] == project_id]:
+            await self.invalidate(key)
+
+
+# Singleton instance
+_context_cache: ContextCache | None = None
+
+
+def get_context_cache() -> ContextCache | None:
+    """Get the process-wide context cache, or None when caching is disabled."""
+    global _context_cache
+    if not settings.gemini_context_cache_enabled:
+        return None
+    if _context_cache is None:
+        _context_cache = ContextCache(
+            backend=GeminiContextCacheBackend(),
+            ttl_seconds=settings.gemini_context_cache_ttl_seconds,
+        )
+    return _context_cache
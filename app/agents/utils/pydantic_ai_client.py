@@ -3,59 +3,64 @@ PydanticAI helper wrappers for structured LLM outputs.
 
 Goal: centralize model/provider configuration and ensure nodes can request
 validated structured outputs (Pydantic models) from the LLM.
+
+Agents are built lazily and kept in a registry keyed by (model, system prompt
+hash, output type, model settings), so repeated calls with the same prompt reuse
+one Agent (and its compiled output schema). Providers and models are created once
+per process, so every agent on a provider shares its HTTP connection pool.
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from functools import lru_cache
 from typing import Any
 
-from pydantic_ai import Agent
+from pydantic_ai import Agent, NativeOutput
 from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.models import Model
 from pydantic_ai.models.google import GoogleModel
 from pydantic_ai.models.groq import GroqModel
 from pydantic_ai.providers.google import GoogleProvider
 from pydantic_ai.providers.groq import GroqProvider
 
+from app.agents.utils.context_cache import ContextPrefix, get_context_cache
 from app.config import settings
+from app.services.llm_telemetry import track_llm_call
 from app.services.rate_limiter import get_rate_limiter
 
+logger = logging.getLogger(__name__)
 
-@lru_cache
-def _google_vertex_model() -> GoogleModel:
-    """
-    Gemini via Vertex AI using ADC/service account credentials.
-    """
-    if not settings.gcp_project_id:
-        raise ValueError("GCP_PROJECT_ID is required for Vertex AI Gemini structured outputs")
-    provider = GoogleProvider(
-        vertexai=True, project=settings.gcp_project_id, location=settings.gcp_location
-    )
-    return GoogleModel(settings.gemini_model, provider=provider)
+# Stable model used when the experimental Gemini model's quota is exhausted
+GEMINI_FALLBACK_MODEL = "gemini-2.5-flash"
+# Maximum number of distinct agents kept (LRU); prompts are mostly static templates
+AGENT_REGISTRY_MAX_ENTRIES = 128
 
 
 @lru_cache
-def _google_gla_model() -> GoogleModel:
-    """
-    Gemini via Generative Language API (API key).
-    Used when Vertex AI (project/ADC) isn't configured.
-    """
-    if not settings.gemini_api_key:
-        raise ValueError(
-            "Neither Vertex AI (GCP_PROJECT_ID/ADC) nor GEMINI_API_KEY is configured for structured outputs"
-        )
-    provider = GoogleProvider(api_key=settings.gemini_api_key)
-    return GoogleModel(settings.gemini_model, provider=provider)
-
-
 def _google_provider() -> GoogleProvider:
     """
     Return the configured Google provider for Gemini (Vertex AI preferred).
+
+    Cached so the primary and fallback models share one client and connection pool.
+    Falls back to GEMINI_API_KEY when the Vertex AI provider can't be built
+    (e.g. no ADC credentials available).
     """
     if settings.gcp_project_id:
-        return GoogleProvider(
-            vertexai=True, project=settings.gcp_project_id, location=settings.gcp_location
-        )
+        try:
+            return GoogleProvider(
+                vertexai=True, project=settings.gcp_project_id, location=settings.gcp_location
+            )
+        except Exception as e:
+            if not settings.gemini_api_key:
+                raise
+            logger.warning(f"⚠️ Vertex AI provider unavailable, using GEMINI_API_KEY: {e}")
     if settings.gemini_api_key:
         return GoogleProvider(api_key=settings.gemini_api_key)
     raise ValueError(
@@ -63,54 +68,281 @@ def _google_provider() -> GoogleProvider:
     )
 
 
+@lru_cache
+def _google_model(model_name: str) -> GoogleModel:
+    """
+    Gemini model on the shared provider: Vertex AI (ADC/service account) when
+    GCP_PROJECT_ID is configured, else the Generative Language API (API key).
+    """
+    return GoogleModel(model_name, provider=_google_provider())
+
+
 @lru_cache
 def _groq_model() -> GroqModel:
     provider = GroqProvider(api_key=settings.groq_api_key)
     return GroqModel(settings.groq_model, provider=provider)
 
 
+@dataclass
+class AgentStats:
+    """Latency and token usage of one registered agent."""
+
+    model: str
+    output_type: str
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "output_type": self.output_type,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_seconds": round(self.total_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_seconds": round(self.max_seconds, 3),
+            "requests": self.requests,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+# Registry of built agents and their stats, keyed by _agent_key()
+_agents: OrderedDict[tuple, Agent] = OrderedDict()
+_agent_stats: dict[tuple, AgentStats] = {}
+_registry_lock = threading.Lock()
+
+
+def _model_name(model: Model) -> str:
+    return f"{model.system}:{model.model_name}"
+
+
+def _settings_key(model_settings: dict[str, Any] | None) -> str:
+    return json.dumps(model_settings or {}, sort_keys=True, default=repr)
+
+
+def _output_key(output_type: Any) -> Any:
+    # Output markers like NativeOutput are unhashable; key them by their wrapped type
+    if isinstance(output_type, NativeOutput):
+        return ("native", output_type.outputs)
+    return output_type
+
+
+def _output_name(output_type: Any) -> str:
+    if isinstance(output_type, NativeOutput):
+        return f"Native[{_output_name(output_type.outputs)}]"
+    return getattr(output_type, "__name__", repr(output_type))
+
+
+def _agent_key(
+    model: Model,
+    system_prompt: str,
+    output_type: Any,
+    model_settings: dict[str, Any] | None,
+) -> tuple:
+    prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    return (
+        _model_name(model),
+        prompt_hash,
+        _output_key(output_type),
+        _settings_key(model_settings),
+    )
+
+
+def get_agent(
+    model: Model,
+    *,
+    system_prompt: str,
+    output_type: Any,
+    model_settings: dict[str, Any] | None = None,
+) -> tuple[tuple, Agent]:
+    """
+    Get the registered agent for this configuration, building it on first use.
+
+    Args:
+        model: PydanticAI model (shared per provider)
+        system_prompt: System prompt of the agent
+        output_type: Structured output type
+        model_settings: Model settings (temperature, max_tokens, ...)
+
+    Returns:
+        (registry key, Agent)
+    """
+    key = _agent_key(model, system_prompt, output_type, model_settings)
+    with _registry_lock:
+        agent = _agents.get(key)
+        if agent is not None:
+            _agents.move_to_end(key)
+            return key, agent
+
+        agent = Agent(
+            model,
+            system_prompt=system_prompt,
+            output_type=output_type,
+            model_settings=model_settings or {},
+        )
+        _agents[key] = agent
+        if key not in _agent_stats:
+            _agent_stats[key] = AgentStats(model=key[0], output_type=_output_name(output_type))
+        while len(_agents) > AGENT_REGISTRY_MAX_ENTRIES:
+            evicted, _ = _agents.popitem(last=False)
+            _agent_stats.pop(evicted, None)
+        return key, agent
+
+
+async def _run_agent[T](
+    model: Model,
+    *,
+    user_prompt: str,
+    system_prompt: str,
+    output_type: type[T],
+    model_settings: dict[str, Any] | None,
+    queue_wait_ms: float = 0.0,
+) -> T:
+    key, agent = get_agent(
+        model,
+        system_prompt=system_prompt,
+        output_type=output_type,
+        model_settings=model_settings,
+    )
+    start = time.perf_counter()
+    usage = None
+    with track_llm_call(model.system, model.model_name) as call:
+        call.record.queue_wait_ms = queue_wait_ms
+        try:
+            result = await agent.run(user_prompt)
+            # RunUsage is a method on pydantic-ai 1.x and a property on 2.x
+            usage = result.usage() if callable(result.usage) else result.usage
+            call.add_usage(usage.input_tokens, usage.output_tokens)
+            return result.output
+        finally:
+            elapsed = time.perf_counter() - start
+            with _registry_lock:
+                stats = _agent_stats.get(key)
+                if stats is not None:
+                    stats.calls += 1
+                    stats.total_seconds += elapsed
+                    stats.max_seconds = max(stats.max_seconds, elapsed)
+                    if usage is None:
+                        stats.errors += 1
+                    else:
+                        stats.requests += usage.requests
+                        stats.input_tokens += usage.input_tokens or 0
+                        stats.output_tokens += usage.output_tokens or 0
+
+
+def get_agent_stats() -> list[dict[str, Any]]:
+    """Per-agent call counts, latency and token usage since startup."""
+    with _registry_lock:
+        return [stats.to_dict() for stats in _agent_stats.values()]
+
+
+def clear_agent_registry() -> None:
+    """Drop all registered agents and their stats (e.g. after changing settings in tests)."""
+    with _registry_lock:
+        _agents.clear()
+        _agent_stats.clear()
+
+
+async def _run_gemini[T](
+    model: GoogleModel,
+    *,
+    user_prompt: str,
+    system_prompt: str,
+    output_type: type[T],
+    model_settings: dict[str, Any] | None,
+    context_prefix: ContextPrefix | None,
+    queue_wait_ms: float = 0.0,
+) -> T:
+    cache = get_context_cache() if context_prefix is not None else None
+    cached_content = None
+    if cache is not None:
+        cached_content = await cache.get_or_create(model.model_name, system_prompt, context_prefix)
+
+    if cached_content is None:
+        return await _run_agent(
+            model,
+            user_prompt=context_prefix.inline(user_prompt) if context_prefix else user_prompt,
+            system_prompt=system_prompt,
+            output_type=output_type,
+            model_settings=model_settings,
+            queue_wait_ms=queue_wait_ms,
+        )
+
+    try:
+        # The cached content owns the system instruction, and tools are stripped from
+        # requests that use it, so the output schema goes through native JSON output.
+        return await _run_agent(
+            model,
+            user_prompt=user_prompt,
+            system_prompt="",
+            output_type=NativeOutput(output_type),
+            model_settings={**(model_settings or {}), "google_cached_content": cached_content},
+            queue_wait_ms=queue_wait_ms,
+        )
+    except ModelHTTPError as exc:
+        if exc.status_code not in (400, 403, 404):
+            raise
+        # Cached content expired or was deleted server-side: drop it and send inline
+        logger.warning(f"⚠️ Cached content for {context_prefix.key} rejected ({exc.status_code})")
+        await cache.invalidate(context_prefix.key, backoff=True)
+        return await _run_agent(
+            model,
+            user_prompt=context_prefix.inline(user_prompt),
+            system_prompt=system_prompt,
+            output_type=output_type,
+            model_settings=model_settings,
+            queue_wait_ms=queue_wait_ms,
+        )
+
+
 async def run_gemini_structured[T](
     *,
     user_prompt: str,
     system_prompt: str,
     output_type: type[T],
     model_settings: dict[str, Any] | None = None,
+    context_prefix: ContextPrefix | None = None,
 ) -> T:
     """
     Run Gemini (Vertex AI) and force structured output validated against `output_type`.
+
+    `context_prefix` is a large per-project block sent before `user_prompt`. It is
+    stored with the system prompt as Gemini cached content and referenced by later
+    calls (see context_cache.py), or inlined when caching isn't possible.
     """
     # Reuse the existing rate limiter used by the rest of the Gemini pipeline.
+    queue_start = time.perf_counter()
     await get_rate_limiter().acquire()
+    queue_wait_ms = (time.perf_counter() - queue_start) * 1000
 
-    # Prefer Vertex AI (ADC/service account) when configured, else fall back to API key.
-    try:
-        model = _google_vertex_model()
-    except Exception:
-        model = _google_gla_model()
-
-    agent = Agent(
-        model,
-        system_prompt=system_prompt,
-        output_type=output_type,
-        model_settings=model_settings or {},
-    )
     try:
-        result = await agent.run(user_prompt)
-        return result.output
+        return await _run_gemini(
+            _google_model(settings.gemini_model),
+            user_prompt=user_prompt,
+            system_prompt=system_prompt,
+            output_type=output_type,
+            model_settings=model_settings,
+            context_prefix=context_prefix,
+            queue_wait_ms=queue_wait_ms,
+        )
     except ModelHTTPError as exc:
         # If experimental model quota is exhausted, retry once with a stable model.
         model_name = getattr(exc, "model_name", "") or ""
         if exc.status_code == 429 and "exp" in model_name:
-            fallback_model = "gemini-2.5-flash"
-            fallback = GoogleModel(fallback_model, provider=_google_provider())
-            fallback_agent = Agent(
-                fallback,
+            logger.warning(f"⚠️ {model_name} quota exhausted, retrying with {GEMINI_FALLBACK_MODEL}")
+            return await _run_gemini(
+                _google_model(GEMINI_FALLBACK_MODEL),
+                user_prompt=user_prompt,
                 system_prompt=system_prompt,
                 output_type=output_type,
-                model_settings=model_settings or {},
+                model_settings=model_settings,
+                context_prefix=context_prefix,
             )
-            result = await fallback_agent.run(user_prompt)
-            return result.output
         raise
 
 
@@ -124,11 +356,10 @@ async def run_groq_structured[T](
     """
     Run Groq and force structured output validated against `output_type`.
     """
-    agent = Agent(
+    return await _run_agent(
         _groq_model(),
+        user_prompt=user_prompt,
         system_prompt=system_prompt,
         output_type=output_type,
-        model_settings=model_settings or {},
+        model_settings=model_settings,
     )
-    result = await agent.run(user_prompt)
-    return result.output
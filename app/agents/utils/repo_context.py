@@ -1,10 +1,23 @@
 """
 Repository context utilities for task generation.
 Builds context from NOTEBOOK REPO (user_repo_url), not textbook repo.
+
+Contexts are cached per (repository, head commit): task generation runs once per
+concept, and every concept of a day reads the same repository. Within
+HEAD_CHECK_TTL_SECONDS a cached context is served without GitHub calls; after that
+a single request checks whether the branch head moved, and the tree and key files
+are fetched again only if it did.
 """
 
+import asyncio
 import base64
+import copy
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any
 
 import httpx
@@ -13,6 +26,57 @@ from app.services.github_service import extract_repo_info
 
 logger = logging.getLogger(__name__)
 
+GITHUB_API_URL = "https://api.github.com"
+# Files whose contents are included in the context (limited to avoid token bloat)
+KEY_FILES = (
+    "package.json",
+    "requirements.txt",
+    "pyproject.toml",
+    "pytest.ini",
+    "jest.config.js",
+    "README.md",
+)
+# Seconds a resolved branch head is trusted before asking GitHub whether it moved
+HEAD_CHECK_TTL_SECONDS = 60.0
+# Maximum cached contexts (one per repository and head commit)
+REPO_CONTEXT_CACHE_MAX_ENTRIES = 64
+
+
+@dataclass
+class _BranchHead:
+    branch: str
+    sha: str
+    # time.monotonic() of the last check against GitHub
+    checked_at: float
+
+
+# (repo, token fingerprint) -> resolved default-branch head
+_head_cache: dict[tuple[str, str], _BranchHead] = {}
+# (repo, head sha) -> repo context
+_context_cache: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def clear_repo_context_cache() -> None:
+    """Drop all cached branch heads and repo contexts."""
+    with _cache_lock:
+        _head_cache.clear()
+        _context_cache.clear()
+
+
+def _empty_repo_context() -> dict[str, Any]:
+    return {
+        "repo_structure": "Repository is new/empty",
+        "repo_code_context": "No existing code",
+        "existing_test_structure": {
+            "framework": "none",
+            "test_directories": [],
+            "config_files": [],
+            "test_command": None,
+            "has_test_setup": False,
+        },
+    }
+
 
 def _detect_test_structure(repo_files: list[dict[str, Any]]) -> dict[str, Any]:
     """
@@ -135,6 +199,136 @@ def _detect_test_structure(repo_files: list[dict[str, Any]]) -> dict[str, Any]:
     return test_structure
 
 
+async def _resolve_branch_head(
+    client: httpx.AsyncClient, owner: str, repo: str, headers: dict[str, str]
+) -> _BranchHead | None:
+    """
+    Resolve the default branch and its head commit, reusing a recent answer.
+
+    The head cache is keyed by credentials too, so a cached context is only served
+    to callers that proved access to the repository.
+
+    Returns:
+        _BranchHead, or None if the repository or its default branch is empty/missing
+    """
+    token = headers.get("Authorization", "")
+    key = (f"{owner}/{repo}".lower(), hashlib.sha256(token.encode()).hexdigest()[:16])
+    with _cache_lock:
+        cached = _head_cache.get(key)
+    if cached and time.monotonic() - cached.checked_at < HEAD_CHECK_TTL_SECONDS:
+        return cached
+
+    branch = cached.branch if cached else None
+    if branch is None:
+        repo_resp = await client.get(f"{GITHUB_API_URL}/repos/{owner}/{repo}", headers=headers)
+        if repo_resp.status_code == 404:
+            logger.warning(f"Notebook repo not found or empty: {owner}/{repo}")
+            return None
+        repo_resp.raise_for_status()
+        branch = repo_resp.json().get("default_branch", "main")
+
+    # Only the commit SHA: a cheap request compared to the recursive tree
+    head_resp = await client.get(
+        f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits/{branch}",
+        headers={**headers, "Accept": "application/vnd.github.sha"},
+    )
+    # 404: branch missing (or renamed), 409: empty repository, 422: no commit
+    if head_resp.status_code in (404, 409, 422):
+        logger.warning(f"Branch {branch} not found in notebook repo {owner}/{repo}")
+        with _cache_lock:
+            _head_cache.pop(key, None)
+        return None
+    head_resp.raise_for_status()
+
+    head = _BranchHead(branch=branch, sha=head_resp.text.strip(), checked_at=time.monotonic())
+    with _cache_lock:
+        _head_cache[key] = head
+    return head
+
+
+async def _fetch_repo_context(
+    client: httpx.AsyncClient, owner: str, repo: str, sha: str, headers: dict[str, str]
+) -> dict[str, Any] | None:
+    """Fetch the tree and key files at a commit (blobs concurrently) and build the context."""
+    tree_resp = await client.get(
+        f"{GITHUB_API_URL}/repos/{owner}/{repo}/git/trees/{sha}?recursive=1",
+        headers=headers,
+    )
+    if tree_resp.status_code == 404:
+        return None
+    tree_resp.raise_for_status()
+    tree_data = tree_resp.json()
+
+    # Build file structure tree
+    repo_structure_parts = []
+    files_by_path = {}
+
+    for item in tree_data.get("tree", []):
+        file_path = item.get("path", "")
+        item_type = item.get("type", "")
+
+        if item_type == "tree":
+            repo_structure_parts.append(f"{file_path}/")
+        elif item_type == "blob":
+            repo_structure_parts.append(file_path)
+            files_by_path[file_path] = item
+
+    repo_structure = "\n".join(sorted(repo_structure_parts))
+
+    async def fetch_blob(blob_sha: str) -> dict[str, Any]:
+        blob_resp = await client.get(
+            f"{GITHUB_API_URL}/repos/{owner}/{repo}/git/blobs/{blob_sha}",
+            headers=headers,
+        )
+        blob_resp.raise_for_status()
+        return blob_resp.json()
+
+    key_files = [
+        path for path in KEY_FILES if path in files_by_path and files_by_path[path].get("sha")
+    ]
+    blobs = await asyncio.gather(*(fetch_blob(files_by_path[path]["sha"]) for path in key_files))
+
+    repo_code_context_parts = []
+    repo_files_for_test_detection = []
+
+    for file_path, blob_data in zip(key_files, blobs, strict=True):
+        if blob_data.get("encoding") == "base64":
+            content = base64.b64decode(blob_data.get("content", "")).decode("utf-8")
+            repo_code_context_parts.append(f"=== {file_path} ===\n{content}\n")
+            repo_files_for_test_detection.append(
+                {
+                    "path": file_path,
+                    "content": content,
+                }
+            )
+
+    repo_code_context = (
+        "\n".join(repo_code_context_parts)
+        if repo_code_context_parts
+        else "No key configuration files found"
+    )
+
+    # Detect test structure
+    all_repo_files = [
+        {"path": path, "content": ""}
+        for path in repo_structure_parts
+        if "/" not in path or path.endswith("/")
+    ]
+    all_repo_files.extend(repo_files_for_test_detection)
+    existing_test_structure = _detect_test_structure(all_repo_files)
+
+    logger.info(
+        f"Notebook repo context built: {len(repo_structure_parts)} items, "
+        f"test framework: {existing_test_structure['framework']}"
+    )
+
+    return {
+        "repo_structure": repo_structure,
+        "repo_code_context": repo_code_context,
+        "existing_test_structure": existing_test_structure,
+    }
+
+
 async def build_notebook_repo_context_for_task_generation(
     project_id: str,
     concept_metadata: dict[str, Any],
@@ -147,6 +341,8 @@ async def build_notebook_repo_context_for_task_generation(
     This is the repository where the user is building their project,
     NOT the textbook repo used for curriculum planning.
 
+    Served from the cache while the default branch head is unchanged.
+
     Args:
         project_id: Project ID
         concept_metadata: Concept metadata (includes repo_anchors from textbook repo - informational only)
@@ -170,129 +366,30 @@ async def build_notebook_repo_context_for_task_generation(
             headers["Authorization"] = f"token {github_token}"
 
         async with httpx.AsyncClient(timeout=30.0) as client:
-            # Get default branch
-            repo_resp = await client.get(
-                f"https://api.github.com/repos/{owner}/{repo}",
-                headers=headers,
-            )
-
-            if repo_resp.status_code == 404:
-                logger.warning(f"Notebook repo not found or empty: {user_repo_url}")
-                return {
-                    "repo_structure": "Repository is new/empty",
-                    "repo_code_context": "No existing code",
-                    "existing_test_structure": {
-                        "framework": "none",
-                        "test_directories": [],
-                        "config_files": [],
-                        "test_command": None,
-                        "has_test_setup": False,
-                    },
-                }
-
-            repo_resp.raise_for_status()
-            repo_data = repo_resp.json()
-            default_branch = repo_data.get("default_branch", "main")
-
-            # Fetch repository tree
-            tree_resp = await client.get(
-                f"https://api.github.com/repos/{owner}/{repo}/git/trees/{default_branch}?recursive=1",
-                headers=headers,
-            )
-
-            if tree_resp.status_code == 404:
-                logger.warning(f"Branch {default_branch} not found in notebook repo")
-                return {
-                    "repo_structure": "Repository is new/empty",
-                    "repo_code_context": "No existing code",
-                    "existing_test_structure": {
-                        "framework": "none",
-                        "test_directories": [],
-                        "config_files": [],
-                        "test_command": None,
-                        "has_test_setup": False,
-                    },
-                }
-
-            tree_resp.raise_for_status()
-            tree_data = tree_resp.json()
-
-            # Build file structure tree
-            repo_structure_parts = []
-            files_by_path = {}
-
-            for item in tree_data.get("tree", []):
-                file_path = item.get("path", "")
-                item_type = item.get("type", "")
-
-                if item_type == "tree":
-                    repo_structure_parts.append(f"{file_path}/")
-                elif item_type == "blob":
-                    repo_structure_parts.append(file_path)
-                    files_by_path[file_path] = item
-
-            repo_structure = "\n".join(sorted(repo_structure_parts))
-
-            # Get file contents for key files (limit to avoid token bloat)
-            key_files = [
-                "package.json",
-                "requirements.txt",
-                "pyproject.toml",
-                "pytest.ini",
-                "jest.config.js",
-                "README.md",
-            ]
-
-            repo_code_context_parts = []
-            repo_files_for_test_detection = []
-
-            for file_path in key_files:
-                if file_path in files_by_path:
-                    item = files_by_path[file_path]
-                    blob_sha = item.get("sha")
-                    if blob_sha:
-                        blob_resp = await client.get(
-                            f"https://api.github.com/repos/{owner}/{repo}/git/blobs/{blob_sha}",
-                            headers=headers,
-                        )
-                        blob_resp.raise_for_status()
-                        blob_data = blob_resp.json()
-
-                        if blob_data.get("encoding") == "base64":
-                            content = base64.b64decode(blob_data.get("content", "")).decode("utf-8")
-                            repo_code_context_parts.append(f"=== {file_path} ===\n{content}\n")
-                            repo_files_for_test_detection.append(
-                                {
-                                    "path": file_path,
-                                    "content": content,
-                                }
-                            )
-
-            repo_code_context = (
-                "\n".join(repo_code_context_parts)
-                if repo_code_context_parts
-                else "No key configuration files found"
-            )
-
-            # Detect test structure
-            all_repo_files = [
-                {"path": path, "content": ""}
-                for path in repo_structure_parts
-                if "/" not in path or path.endswith("/")
-            ]
-            all_repo_files.extend(repo_files_for_test_detection)
-            existing_test_structure = _detect_test_structure(all_repo_files)
-
-            logger.info(
-                f"Notebook repo context built: {len(repo_structure_parts)} items, "
-                f"test framework: {existing_test_structure['framework']}"
-            )
-
-            return {
-                "repo_structure": repo_structure,
-                "repo_code_context": repo_code_context,
-                "existing_test_structure": existing_test_structure,
-            }
+            head = await _resolve_branch_head(client, owner, repo, headers)
+            if head is None:
+                return _empty_repo_context()
+
+            key = (f"{owner}/{repo}".lower(), head.sha)
+            with _cache_lock:
+                cached = _context_cache.get(key)
+                if cached is not None:
+                    _context_cache.move_to_end(key)
+            if cached is not None:
+                logger.info(f"Notebook repo context cache hit: {owner}/{repo}@{head.sha[:12]}")
+                return copy.deepcopy(cached)
+
+            context = await _fetch_repo_context(client, owner, repo, head.sha, headers)
+            if context is None:
+                logger.warning(f"Commit {head.sha[:12]} not found in notebook repo")
+                return _empty_repo_context()
+
+            with _cache_lock:
+                _context_cache[key] = context
+                _context_cache.move_to_end(key)
+                while len(_context_cache) > REPO_CONTEXT_CACHE_MAX_ENTRIES:
+                    _context_cache.popitem(last=False)
+            return copy.deepcopy(context)
 
     except Exception as e:
         logger.error(f"Failed to build notebook repo context: {e}", exc_info=True)
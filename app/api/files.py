@@ -3,15 +3,29 @@ File System API Router
 REST endpoints for file operations inside workspace containers.
 """
 
+import json
 import logging
+import mimetypes
+from collections.abc import Iterator
+from email.utils import formatdate
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from supabase import Client
 
 from app.core.supabase_client import get_supabase_client
-from app.services.file_system import FileSystemService, get_file_system_service
+from app.services.file_system import (
+    DEFAULT_TREE_IGNORE,
+    DEFAULT_TREE_MAX_ENTRIES,
+    FILE_CHUNK_SIZE,
+    FileSystemService,
+    FileTree,
+    get_file_system_service,
+)
 from app.services.workspace_manager import WorkspaceManager, get_workspace_manager
+from app.services.workspace_reaper import get_workspace_reaper
 from app.utils.clerk_auth import verify_clerk_token
 from app.utils.db_helpers import get_user_id_from_clerk
 
@@ -28,6 +42,7 @@ class FileItem(BaseModel):
     is_directory: bool
     size: int
     permissions: str
+    mtime: float | None = None
 
 
 class ListFilesResponse(BaseModel):
@@ -74,6 +89,9 @@ def get_container_id(workspace_id: str, user_id: str, workspace_manager: Workspa
     if workspace.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this workspace")
 
+    # File operations keep the workspace from being hibernated
+    get_workspace_reaper().record_activity(workspace_id)
+
     container_id = workspace.container_id
     if not container_id:
         raise HTTPException(status_code=400, detail="Workspace has no container")
@@ -95,6 +113,78 @@ def get_container_id(workspace_id: str, user_id: str, workspace_manager: Workspa
     return workspace.container_id
 
 
+def _etag_matches(header: str | None, etag: str | None) -> bool:
+    """Check an If-Match / If-None-Match header against a strong ETag."""
+    if not header or etag is None:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _parse_range_header(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single `Range: bytes=...` header.
+
+    Returns:
+        (start, length), or None to serve the whole file (multi-range,
+        non-byte and invalid ranges such as `bytes=500-100` are ignored, as
+        RFC 9110 allows)
+
+    Raises:
+        HTTPException: 416 if the range cannot be satisfied
+    """
+    if not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_str, sep, end_str = range_header[len("bytes=") :].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if start_str:
+            start = int(start_str)
+            end = int(end_str) if end_str else size - 1
+            if end_str and end < start:
+                return None
+            end = min(end, size - 1)
+        else:
+            # Suffix range: the last N bytes
+            start = max(size - int(end_str), 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end - start + 1
+
+
+def _tree_ndjson(tree: FileTree) -> Iterator[str]:
+    """
+    Serialize a FileTree as NDJSON: one line per entry, then one per changed
+    directory's children and per pruned directory, and a final cursor line.
+    """
+    for entry in tree.entries:
+        yield json.dumps({"type": "entry", **entry.to_dict()}) + "\n"
+    for directory, names in tree.children.items():
+        yield json.dumps({"type": "children", "path": directory, "names": names}) + "\n"
+    for directory in tree.pruned:
+        yield json.dumps({"type": "pruned", "path": directory}) + "\n"
+    yield (
+        json.dumps(
+            {
+                "type": "cursor",
+                "root": tree.root,
+                "cursor": tree.cursor,
+                "truncated": tree.truncated,
+            }
+        )
+        + "\n"
+    )
+
+
 # Endpoints
 
 
@@ -124,6 +214,48 @@ def list_files(
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}") from e
 
 
+@router.get("/{workspace_id}/files/tree")
+def list_tree(
+    workspace_id: str,
+    path: str = Query(default="/workspace", description="Root directory to walk"),
+    since: float | None = Query(
+        default=None, description="Cursor from a previous listing; returns only changes"
+    ),
+    ignore: list[str] | None = Query(
+        default=None,
+        description=f"Directory names not to descend into (default: {', '.join(DEFAULT_TREE_IGNORE)})",
+    ),
+    max_entries: int = Query(default=DEFAULT_TREE_MAX_ENTRIES, ge=1, le=100000),
+    user_info: dict = Depends(verify_clerk_token),
+    supabase: Client = Depends(get_supabase_client),
+    workspace_manager: WorkspaceManager = Depends(get_workspace_manager),
+    file_system: FileSystemService = Depends(get_file_system_service),
+):
+    """
+    Recursively list a directory as NDJSON.
+
+    Lines are {"type": "entry", ...file fields}, {"type": "children", "path", "names"}
+    (incremental only: current contents of directories changed since the cursor),
+    {"type": "pruned", "path"} and a final {"type": "cursor", "cursor", "truncated"}.
+    """
+    try:
+        user_id = get_user_id_from_clerk(supabase, user_info["clerk_user_id"])
+        container_id = get_container_id(workspace_id, user_id, workspace_manager)
+
+        tree = file_system.list_tree(
+            container_id, path, ignore=ignore, since=since, max_entries=max_entries
+        )
+        if tree is None:
+            raise HTTPException(status_code=404, detail=f"Directory not found: {path}")
+
+        return StreamingResponse(_tree_ndjson(tree), media_type="application/x-ndjson")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Error listing tree at {path}: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}") from e
+
+
 @router.get("/{workspace_id}/files/content", response_model=ReadFileResponse)
 def read_file(
     workspace_id: str,
@@ -180,6 +312,140 @@ def write_file(
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}") from e
 
 
+@router.get("/{workspace_id}/files/raw")
+def download_file(
+    workspace_id: str,
+    path: str = Query(..., description="File path to read"),
+    range_header: str | None = Header(default=None, alias="Range"),
+    if_range: str | None = Header(default=None),
+    if_none_match: str | None = Header(default=None),
+    user_info: dict = Depends(verify_clerk_token),
+    supabase: Client = Depends(get_supabase_client),
+    workspace_manager: WorkspaceManager = Depends(get_workspace_manager),
+    file_system: FileSystemService = Depends(get_file_system_service),
+):
+    """
+    Stream raw file bytes, FILE_CHUNK_SIZE at a time.
+    Supports single byte ranges (206), If-Range and If-None-Match (304).
+    """
+    try:
+        user_id = get_user_id_from_clerk(supabase, user_info["clerk_user_id"])
+        container_id = get_container_id(workspace_id, user_id, workspace_manager)
+
+        stat = file_system.stat_file(container_id, path)
+        if stat is None:
+            raise HTTPException(status_code=404, detail=f"File not found or not readable: {path}")
+
+        headers = {
+            "ETag": stat.etag,
+            "Accept-Ranges": "bytes",
+            "Last-Modified": formatdate(stat.mtime, usegmt=True),
+        }
+        if _etag_matches(if_none_match, stat.etag):
+            return Response(status_code=304, headers=headers)
+
+        byte_range = None
+        if range_header and (if_range is None or if_range.strip() == stat.etag):
+            byte_range = _parse_range_header(range_header, stat.size)
+
+        if byte_range:
+            start, length = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{start + length - 1}/{stat.size}"
+        else:
+            start, length = 0, stat.size
+            status_code = 200
+        headers["Content-Length"] = str(length)
+
+        return StreamingResponse(
+            file_system.iter_file_range(container_id, stat.path, start, length),
+            status_code=status_code,
+            media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+            headers=headers,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Error downloading file {path}: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}") from e
+
+
+@router.put("/{workspace_id}/files/raw")
+async def upload_file(
+    workspace_id: str,
+    request: Request,
+    path: str = Query(..., description="File path to write"),
+    offset: int = Query(default=0, ge=0, description="Byte position of the first body byte"),
+    truncate: bool = Query(
+        default=True,
+        description="Cut the file at `offset` before writing (false overwrites bytes in place)",
+    ),
+    if_match: str | None = Header(default=None),
+    user_info: dict = Depends(verify_clerk_token),
+    supabase: Client = Depends(get_supabase_client),
+    workspace_manager: WorkspaceManager = Depends(get_workspace_manager),
+    file_system: FileSystemService = Depends(get_file_system_service),
+):
+    """
+    Write the raw request body to a file, FILE_CHUNK_SIZE at a time.
+    Large uploads can be split into sequential requests with increasing `offset`;
+    If-Match guards against overwriting a file changed since it was read.
+    """
+    try:
+        user_id = await run_in_threadpool(
+            get_user_id_from_clerk, supabase, user_info["clerk_user_id"]
+        )
+        container_id = await run_in_threadpool(
+            get_container_id, workspace_id, user_id, workspace_manager
+        )
+
+        if if_match:
+            current = await run_in_threadpool(file_system.stat_file, container_id, path)
+            if not _etag_matches(if_match, current.etag if current else None):
+                raise HTTPException(status_code=412, detail="File changed since it was read")
+
+        written = 0
+        stat = None
+        buffer = bytearray()
+
+        async def flush(data: bytes) -> None:
+            nonlocal written, stat
+            stat = await run_in_threadpool(
+                file_system.write_file_range,
+                container_id,
+                path,
+                data,
+                offset + written,
+                truncate and written == 0,
+            )
+            if stat is None:
+                raise HTTPException(status_code=500, detail=f"Failed to write file: {path}")
+            written += len(data)
+
+        async for chunk in request.stream():
+            buffer.extend(chunk)
+            while len(buffer) >= FILE_CHUNK_SIZE:
+                data = bytes(buffer[:FILE_CHUNK_SIZE])
+                del buffer[:FILE_CHUNK_SIZE]
+                await flush(data)
+        if buffer or written == 0:
+            await flush(bytes(buffer))
+
+        logger.info(f"Wrote {written} bytes to {path} at offset {offset}")
+        return {
+            "success": True,
+            "path": path,
+            "bytes_written": written,
+            "size": stat.size,
+            "etag": stat.etag,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception(f"Error uploading file {path}: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}") from e
+
+
 @router.post("/{workspace_id}/files")
 def create_file(
     workspace_id: str,
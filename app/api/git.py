@@ -15,6 +15,7 @@ from app.core.supabase_client import get_supabase_client
 from app.services.external_commit_service import ExternalCommitService
 from app.services.git_service import GitService
 from app.services.workspace_manager import WorkspaceManager, get_workspace_manager
+from app.services.workspace_reaper import get_workspace_reaper
 from app.utils.clerk_auth import verify_clerk_token
 from app.utils.db_helpers import get_user_id_from_clerk
 
@@ -112,6 +113,9 @@ def _get_container_id(
     if workspace.user_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this workspace")
 
+    # Git operations keep the workspace from being hibernated
+    get_workspace_reaper().record_activity(workspace_id)
+
     if not workspace.container_id:
         raise HTTPException(status_code=400, detail="Workspace has no container")
 
@@ -236,6 +240,51 @@ def get_status(
     return result
 
 
+@router.get("/{workspace_id}/snapshot")
+def get_snapshot(
+    workspace_id: str,
+    max_count: int = Query(default=50, ge=1, le=200),
+    show_all: bool = Query(
+        default=False, description="Show all branches including remote, or only HEAD history"
+    ),
+    include_remote: bool = Query(default=False),
+    user_info: dict = Depends(verify_clerk_token),
+    supabase: Client = Depends(get_supabase_client),
+    workspace_manager: WorkspaceManager = Depends(get_workspace_manager),
+):
+    """
+    Get status, conflicts, branches, commits and commit graph in one call.
+    Each section has the same shape as the corresponding single-purpose endpoint.
+    """
+    user_id = get_user_id_from_clerk(supabase, user_info["clerk_user_id"])
+    container_id = _get_container_id(workspace_id, user_id, workspace_manager)
+    git_service = GitService()
+
+    snapshot_kwargs = {
+        "max_count": max_count,
+        "show_all": show_all,
+        "include_remote": include_remote,
+    }
+    result = git_service.git_snapshot(container_id, **snapshot_kwargs)
+    if not result.get("success"):
+        _maybe_auto_clone_repo(
+            workspace_id=workspace_id,
+            user_id=user_id,
+            user_info=user_info,
+            workspace_manager=workspace_manager,
+            git_service=git_service,
+            container_id=container_id,
+            git_error=str(result.get("error") or ""),
+        )
+        result = git_service.git_snapshot(container_id, **snapshot_kwargs)
+    if not result.get("success"):
+        raise HTTPException(
+            status_code=500, detail=result.get("error", "Failed to get git snapshot")
+        )
+
+    return result
+
+
 @router.get("/{workspace_id}/diff")
 def get_diff(
     workspace_id: str,
@@ -0,0 +1,40 @@
+"""
+LLM telemetry endpoints: Prometheus metrics and the recent-call ring buffer.
+"""
+
+import logging
+
+from fastapi import APIRouter, Query
+from fastapi.responses import PlainTextResponse
+
+from app.agents.utils.pydantic_ai_client import get_agent_stats
+from app.services.llm_telemetry import get_llm_telemetry
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def llm_metrics():
+    """LLM call counts, tokens, wall time and queue wait in Prometheus text format."""
+    return PlainTextResponse(
+        get_llm_telemetry().render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.get("/calls")
+def recent_llm_calls(
+    limit: int = Query(100, ge=1, le=500),
+    node: str | None = None,
+    provider: str | None = None,
+):
+    """Most recent LLM calls (newest first), optionally filtered by node or provider."""
+    calls = get_llm_telemetry().recent_calls(limit=limit, node=node, provider=provider)
+    return {"calls": calls, "count": len(calls)}
+
+
+@router.get("/agents")
+def llm_agent_stats():
+    """Per-agent latency and token usage of the PydanticAI structured-output agents."""
+    return {"agents": get_agent_stats()}
@@ -7,14 +7,17 @@ Locally, they can use direct port access (localhost:30001-30010).
 """
 
 import logging
+from urllib.parse import urlencode
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
 from supabase import Client
 
 from app.core.supabase_client import get_supabase_client
 from app.services.preview_proxy import get_preview_proxy
 from app.services.workspace_manager import get_workspace_manager
-from app.utils.clerk_auth import verify_clerk_token
+from app.services.workspace_reaper import get_workspace_reaper
+from app.utils.clerk_auth import verify_clerk_token, verify_clerk_token_from_string
 from app.utils.db_helpers import get_user_id_from_clerk
 
 router = APIRouter()
@@ -36,6 +39,9 @@ async def proxy_preview(
     """
     Proxy requests to development servers running in workspace containers.
 
+    Request and response bodies are streamed, so large bundles and server-sent events
+    are relayed at upstream speed with constant memory.
+
     Example:
         GET /api/preview/{workspace_id}/3000/api/data
         → Proxies to container's port 3000 at /api/data
@@ -44,24 +50,34 @@ async def proxy_preview(
         clerk_user_id = user_info["clerk_user_id"]
         user_id = get_user_id_from_clerk(supabase, clerk_user_id)
 
-        # Verify workspace ownership
-        manager = get_workspace_manager()
-        workspace = manager.get_workspace(workspace_id)
+        # Verify workspace ownership against the cached route
+        proxy = get_preview_proxy()
+        route = await proxy.resolve_route(workspace_id)
 
-        if not workspace:
-            raise HTTPException(status_code=404, detail="Workspace not found")
+        if route is None:
+            # Slow path only to report why the workspace isn't routable
+            manager = get_workspace_manager()
+            workspace = manager.get_workspace(workspace_id)
 
-        if workspace.user_id != user_id:
-            raise HTTPException(status_code=403, detail="Access denied")
+            if not workspace:
+                raise HTTPException(status_code=404, detail="Workspace not found")
+
+            if workspace.user_id != user_id:
+                raise HTTPException(status_code=403, detail="Access denied")
 
-        if workspace.container_status != "running":
             raise HTTPException(
                 status_code=400,
                 detail=f"Container not running (status: {workspace.container_status})",
             )
 
-        # Get request body if present
-        body = await request.body() if request.method in ["POST", "PUT", "PATCH"] else None
+        if route.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        # Preview traffic keeps the workspace from being hibernated
+        get_workspace_reaper().record_activity(workspace_id)
+
+        # Stream the request body through if present
+        body = request.stream() if request.method in ["POST", "PUT", "PATCH"] else None
 
         # Convert headers to dict
         headers = dict(request.headers)
@@ -74,7 +90,6 @@ async def proxy_preview(
             proxy_path += f"?{request.query_params}"
 
         # Proxy the request
-        proxy = get_preview_proxy()
         status_code, response_headers, response_body = await proxy.proxy_request(
             workspace_id=workspace_id,
             container_port=port,
@@ -84,8 +99,8 @@ async def proxy_preview(
             body=body,
         )
 
-        return Response(
-            content=response_body,
+        return StreamingResponse(
+            response_body,
             status_code=status_code,
             headers=response_headers,
         )
@@ -97,6 +112,54 @@ async def proxy_preview(
         raise HTTPException(status_code=500, detail=f"Proxy error: {str(e)}") from e
 
 
+@router.websocket("/{workspace_id}/{port:int}/{path:path}")
+async def proxy_preview_websocket(
+    websocket: WebSocket,
+    workspace_id: str,
+    port: int,
+    path: str,
+    token: str = Query(...),
+):
+    """
+    Proxy WebSocket connections (e.g. Vite/Next.js HMR) to workspace dev servers.
+
+    Query params:
+        token: Clerk JWT token for authentication (not forwarded to the container)
+
+    Example:
+        WS /api/preview/{workspace_id}/5173/?token=...
+        → Relayed to ws://<container>:5173/
+    """
+    supabase = get_supabase_client()
+
+    # Authenticate before accepting; rejected handshakes never reach the container
+    try:
+        user_info = await verify_clerk_token_from_string(token)
+        user_id = get_user_id_from_clerk(supabase, user_info["clerk_user_id"])
+    except Exception as e:
+        logger.warning(f"Preview WebSocket auth failed: {e}")
+        await websocket.close(code=4001, reason="Authentication failed")
+        return
+
+    proxy = get_preview_proxy()
+    route = await proxy.resolve_route(workspace_id)
+    if route is None:
+        await websocket.close(code=4004, reason="Workspace not reachable")
+        return
+    if route.user_id != user_id:
+        await websocket.close(code=4003, reason="Access denied")
+        return
+
+    get_workspace_reaper().record_activity(workspace_id)
+
+    proxy_path = f"/{path}" if not path.startswith("/") else path
+    query = urlencode([(k, v) for k, v in websocket.query_params.multi_items() if k != "token"])
+    if query:
+        proxy_path += f"?{query}"
+
+    await proxy.proxy_websocket(websocket, route, port, proxy_path)
+
+
 @router.get("/{workspace_id}/info")
 async def get_preview_info(
     workspace_id: str,
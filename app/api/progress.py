@@ -19,9 +19,19 @@ from app.services.roadmap_client import call_roadmap_service_incremental_sync
 from app.services.task_validation import validate_task_completion
 from app.utils.clerk_auth import verify_clerk_token
 
+# Import postgrest exception if available
+try:
+    from postgrest.exceptions import APIError as PostgrestAPIError
+except ImportError:
+    PostgrestAPIError = Exception
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Errors meaning a rollup function is not installed (PostgREST schema cache miss,
+# Postgres undefined_function); anything else is a real failure
+ROLLUP_FUNCTION_MISSING_CODES = {"PGRST202", "42883"}
+
 
 class UpdateProgressRequest(BaseModel):
     progress_status: str
@@ -517,6 +527,23 @@ async def complete_concept(
 
         user_id = user_response.data[0]["id"]
 
+        # Mark concept done and roll completion up to the day in one transaction
+        rollup = _record_completion_rollup(
+            supabase,
+            "record_concept_completion",
+            {"p_user_id": user_id, "p_concept_id": concept_id, "p_project_id": project_id},
+        )
+
+        # Trigger incremental concept generation via roadmap service (event-based)
+        logger.info(f"🔄 Triggering incremental generation after concept {concept_id} completion")
+        background_tasks.add_task(call_roadmap_service_incremental_sync, project_id)
+
+        if rollup is not None:
+            if rollup.get("day_completed"):
+                logger.info(f"✅ All concepts completed for day {rollup.get('day_id')}")
+            return {"success": True}
+
+        # Fallback: rollup function not installed, cascade through the tables
         now = datetime.now(UTC).isoformat()
 
         # Upsert progress with completed_at timestamp
@@ -536,10 +563,6 @@ async def complete_concept(
             "project_id", project_id
         ).execute()
 
-        # Trigger incremental concept generation via roadmap service (event-based)
-        logger.info(f"🔄 Triggering incremental generation after concept {concept_id} completion")
-        background_tasks.add_task(call_roadmap_service_incremental_sync, project_id)
-
         # Check if all concepts for the day are done
         concept_response = (
             supabase.table("concepts").select("day_id").eq("concept_id", concept_id).execute()
@@ -859,38 +882,47 @@ async def complete_task(
             if not is_valid:
                 raise HTTPException(status_code=400, detail=error_message or "Invalid commit")
 
-        now = datetime.now(UTC).isoformat()
-
-        # Check if progress record exists
-        existing_response = (
-            supabase.table("user_task_progress")
-            .select("id, started_at")
-            .eq("user_id", user_id)
-            .eq("task_id", task_id)
-            .execute()
+        # Mark task done and update concept/day rollup counters in one transaction
+        rollup = _record_completion_rollup(
+            supabase,
+            "record_task_completion",
+            {"p_user_id": user_id, "p_task_id": task_id, "p_project_id": project_id},
         )
 
-        if existing_response.data and len(existing_response.data) > 0:
-            # Update existing record
-            supabase.table("user_task_progress").update(
-                {
-                    "progress_status": "done",
-                    "completed_at": now,
-                    "updated_at": now,
-                }
-            ).eq("user_id", user_id).eq("task_id", task_id).execute()
-        else:
-            # Insert new record
-            supabase.table("user_task_progress").insert(
-                {
-                    "user_id": user_id,
-                    "task_id": task_id,
-                    "progress_status": "done",
-                    "started_at": now,
-                    "completed_at": now,
-                    "updated_at": now,
-                }
-            ).execute()
+        if rollup is None:
+            # Fallback: rollup function not installed, write progress directly
+            now = datetime.now(UTC).isoformat()
+
+            # Check if progress record exists
+            existing_response = (
+                supabase.table("user_task_progress")
+                .select("id, started_at")
+                .eq("user_id", user_id)
+                .eq("task_id", task_id)
+                .execute()
+            )
+
+            if existing_response.data and len(existing_response.data) > 0:
+                # Update existing record
+                supabase.table("user_task_progress").update(
+                    {
+                        "progress_status": "done",
+                        "completed_at": now,
+                        "updated_at": now,
+                    }
+                ).eq("user_id", user_id).eq("task_id", task_id).execute()
+            else:
+                # Insert new record
+                supabase.table("user_task_progress").insert(
+                    {
+                        "user_id": user_id,
+                        "task_id": task_id,
+                        "progress_status": "done",
+                        "started_at": now,
+                        "completed_at": now,
+                        "updated_at": now,
+                    }
+                ).execute()
 
         # Store project-specific data for Day 0 tasks
         project_updates = {}
@@ -916,10 +948,19 @@ async def complete_task(
                 "user_id", user_id
             ).execute()
 
-        # Check if all tasks for this concept are done, then auto-complete concept
-        await _check_and_complete_concept_if_ready(
-            supabase, user_id, task["concept_id"], project_id
-        )
+        if rollup is None:
+            # Check if all tasks for this concept are done, then auto-complete concept
+            await _check_and_complete_concept_if_ready(
+                supabase, user_id, task["concept_id"], project_id
+            )
+        elif rollup.get("concept_completed"):
+            logger.info(
+                f"✅ All tasks completed and content read for concept {task['concept_id']}, "
+                "auto-completed"
+            )
+            if rollup.get("day_completed"):
+                logger.info(f"✅ All concepts completed for day {rollup.get('day_id')}")
+            _trigger_incremental_generation(project_id, task["concept_id"])
 
         return {"success": True}
 
@@ -993,6 +1034,60 @@ async def start_task(
         raise HTTPException(status_code=500, detail=f"Failed to start task: {str(e)}") from e
 
 
+def _record_completion_rollup(supabase: Client, function_name: str, params: dict) -> dict | None:
+    """
+    Call a progress rollup Postgres function (see migrations/add_progress_rollup_counters.sql).
+
+    The function writes the progress row and updates the per-concept/per-day done
+    counters in the same transaction, so completion costs a single round trip.
+
+    Returns:
+        The rollup result dict, or None if the function is not installed and the caller
+        should fall back to the table-by-table cascade.
+
+    Raises:
+        Any other RPC error (timeouts, permissions, errors inside the function)
+    """
+    try:
+        response = supabase.rpc(function_name, params).execute()
+    except PostgrestAPIError as e:
+        if getattr(e, "code", None) not in ROLLUP_FUNCTION_MISSING_CODES:
+            raise
+        logger.warning(f"⚠️  Progress rollup {function_name} not installed, falling back: {e}")
+        return None
+
+    return response.data if isinstance(response.data, dict) else {}
+
+
+def _trigger_incremental_generation(project_id: str, concept_id: str) -> None:
+    """Fire-and-forget incremental concept generation after a concept auto-completes."""
+    # Trigger incremental concept generation via roadmap service (event-based)
+    logger.info(
+        f"🔄 Triggering incremental generation after auto-completion of concept {concept_id}"
+    )
+    # Use asyncio.create_task for fire-and-forget HTTP call
+    import asyncio
+
+    from app.services.roadmap_client import call_roadmap_service_incremental
+
+    async def trigger_incremental_safely():
+        """Wrapper to safely trigger incremental generation with error handling."""
+        try:
+            await call_roadmap_service_incremental(project_id)
+            logger.info(
+                f"✅ Incremental generation triggered successfully for project {project_id}"
+            )
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to trigger incremental generation: {e}", exc_info=True)
+            # Don't raise - this is fire-and-forget, we don't want to fail concept completion
+
+    try:
+        # Create background task (fire and forget) - calls roadmap service via HTTP
+        asyncio.create_task(trigger_incremental_safely())
+    except Exception as e:
+        logger.warning(f"⚠️  Failed to create incremental generation task: {e}", exc_info=True)
+
+
 async def _check_and_complete_concept_if_ready(
     supabase: Client, user_id: str, concept_id: str, project_id: str
 ):
@@ -1069,36 +1164,7 @@ async def _check_and_complete_concept_if_ready(
                 "project_id", project_id
             ).execute()
 
-            # Trigger incremental concept generation via roadmap service (event-based)
-            logger.info(
-                f"🔄 Triggering incremental generation after auto-completion of concept {concept_id}"
-            )
-            # Use asyncio.create_task for fire-and-forget HTTP call
-            # This is safe because the parent function is awaited, so the task will complete
-            import asyncio
-
-            from app.services.roadmap_client import call_roadmap_service_incremental
-
-            async def trigger_incremental_safely():
-                """Wrapper to safely trigger incremental generation with error handling."""
-                try:
-                    await call_roadmap_service_incremental(project_id)
-                    logger.info(
-                        f"✅ Incremental generation triggered successfully for project {project_id}"
-                    )
-                except Exception as e:
-                    logger.warning(
-                        f"⚠️  Failed to trigger incremental generation: {e}", exc_info=True
-                    )
-                    # Don't raise - this is fire-and-forget, we don't want to fail concept completion
-
-            try:
-                # Create background task (fire and forget) - calls roadmap service via HTTP
-                asyncio.create_task(trigger_incremental_safely())
-            except Exception as e:
-                logger.warning(
-                    f"⚠️  Failed to create incremental generation task: {e}", exc_info=True
-                )
+            _trigger_incremental_generation(project_id, concept_id)
 
             # Check if all concepts for the day are done
             concept_response = (
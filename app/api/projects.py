@@ -4,6 +4,7 @@ from typing import Literal
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from pydantic import BaseModel, Field, field_validator
+from starlette.concurrency import run_in_threadpool
 from supabase import Client
 
 from app.agents.day0 import get_day_0_content
@@ -711,7 +712,10 @@ async def delete_project(
         qdrant_deleted_count = 0
         try:
             qdrant_service = get_qdrant_service()  # Use singleton for better performance
-            qdrant_deleted_count = qdrant_service.delete_points_by_project_id(project_id)
+            # Off the event loop: the delete waits while a collection migration pauses writes
+            qdrant_deleted_count = await run_in_threadpool(
+                qdrant_service.delete_points_by_project_id, project_id
+            )
             logger.info(f"✅ Deleted {qdrant_deleted_count} embeddings from Qdrant")
         except Exception as e:
             logger.warning(
@@ -12,6 +12,7 @@ from supabase import Client
 
 from app.core.supabase_client import get_supabase_client
 from app.services.groq_service import get_groq_service
+from app.services.llm_telemetry import llm_node
 from app.services.task_chatbot_context import build_task_context
 from app.utils.clerk_auth import verify_clerk_token
 from app.utils.db_helpers import get_user_id_from_clerk
@@ -291,13 +292,14 @@ async def chat_task(
         groq_service = get_groq_service()
         logger.info(f"   Generating response with Groq (message length: {len(request.message)})")
 
-        response = await groq_service.generate_response_async(
-            user_query=request.message,
-            system_prompt=TEACHING_SYSTEM_PROMPT,
-            context=context,
-            conversation_history=conversation_history,
-            temperature=0.7,
-        )
+        with llm_node("task_chatbot"):
+            response = await groq_service.generate_response_async(
+                user_query=request.message,
+                system_prompt=TEACHING_SYSTEM_PROMPT,
+                context=context,
+                conversation_history=conversation_history,
+                temperature=0.7,
+            )
 
         logger.info(f"✅ Generated response ({len(response)} chars)")
 
@@ -15,6 +15,7 @@ from app.config import settings
 from app.core.supabase_client import get_supabase_client
 from app.services.git_service import GitService
 from app.services.github_service import extract_repo_info
+from app.services.llm_telemetry import llm_node
 from app.services.verification_agent import VerificationAgent
 from app.services.workspace_manager import WorkspaceManager
 from app.utils.clerk_auth import verify_clerk_token
@@ -449,24 +450,25 @@ async def verify_task(
         )
 
         agent = VerificationAgent()
-        verification_result = await agent.verify_task(
-            task_description=task_description,
-            base_commit=base_commit,
-            head_commit=head_commit,
-            repo_url=repo_url,
-            github_token=github_token,  # App's token from .env (not user's PAT)
-            additional_context={
-                "task_title": task.get("title", ""),
-                "task_type": task.get("task_type", ""),
-                "day_number": day_number,
-                "day_theme": day_theme,
-                "day_description": day_description,
-                "concept_title": concept.get("title", ""),
-                "concept_description": concept.get("description", ""),
-                "previous_concept_summaries": previous_concept_summaries,
-                "previous_task_descriptions": previous_task_descriptions,
-            },
-        )
+        with llm_node("verification"):
+            verification_result = await agent.verify_task(
+                task_description=task_description,
+                base_commit=base_commit,
+                head_commit=head_commit,
+                repo_url=repo_url,
+                github_token=github_token,  # App's token from .env (not user's PAT)
+                additional_context={
+                    "task_title": task.get("title", ""),
+                    "task_type": task.get("task_type", ""),
+                    "day_number": day_number,
+                    "day_theme": day_theme,
+                    "day_description": day_description,
+                    "concept_title": concept.get("title", ""),
+                    "concept_description": concept.get("description", ""),
+                    "previous_concept_summaries": previous_concept_summaries,
+                    "previous_task_descriptions": previous_task_descriptions,
+                },
+            )
 
         # Extract results (already normalized by agent)
         passed = verification_result.get("passed", False)
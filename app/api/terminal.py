@@ -4,6 +4,7 @@ Real-time terminal connections for Docker containers.
 """
 
 import asyncio
+import codecs
 import json
 import logging
 
@@ -13,6 +14,8 @@ from supabase import Client
 
 import docker
 from app.core.supabase_client import get_supabase_client
+from app.services.docker_client import get_docker_client
+from app.services.terminal_output_hub import TerminalOutputSubscriber
 from app.services.terminal_service import TerminalSession, get_terminal_service
 from app.services.workspace_manager import get_workspace_manager
 from app.utils.clerk_auth import verify_clerk_token, verify_clerk_token_from_string
@@ -194,6 +197,7 @@ async def terminal_websocket(
     workspace_id: str,
     token: str = Query(...),
     session_id: str | None = Query(None),
+    offset: int | None = Query(None, ge=0),
 ):
     """
     WebSocket endpoint for terminal connections.
@@ -201,6 +205,8 @@ async def terminal_websocket(
     Query params:
         token: Clerk JWT token for authentication
         session_id: Optional existing session ID to reconnect to
+        offset: Last output offset received before disconnecting; the gap is replayed
+            from scrollback (omit to replay all retained scrollback)
 
     Message protocol:
         Client -> Server:
@@ -208,9 +214,10 @@ async def terminal_websocket(
             {"type": "resize", "cols": 80, "rows": 24}  - Terminal resize
 
         Server -> Client:
-            {"type": "output", "data": "..."}  - Terminal output
+            {"type": "output", "data": "...", "offset": 123}  - Terminal output; "reset": true
+                means output was skipped and the client should clear its screen
             {"type": "error", "message": "..."}  - Error message
-            {"type": "connected", "session_id": "..."}  - Connection established
+            {"type": "connected", "session_id": "...", "offset": 0}  - Connection established
     """
     logger.info(
         f"[WS_CONNECT] New WebSocket connection for workspace: {workspace_id}, session: {session_id}"
@@ -255,8 +262,10 @@ async def terminal_websocket(
     # Check actual Docker container status (not just database)
     logger.info(f"[TERMINAL_WS] Checking container status for {workspace.container_id[:12]}")
     try:
-        docker_client = docker.from_env()
-        container = docker_client.containers.get(workspace.container_id)
+        docker_client = get_docker_client()
+        container = docker_client.get_container_info(workspace.container_id)
+        if container is None:
+            raise docker.errors.NotFound(f"No such container: {workspace.container_id}")
         actual_status = container.status
         logger.info(
             f"[TERMINAL_WS] Container {workspace.container_id[:12]} status: {actual_status}"
@@ -278,11 +287,11 @@ async def terminal_websocket(
                 )
                 await websocket.close(code=4005, reason="Failed to start container")
                 return
-            # Wait a moment for container to start, then verify
-            await asyncio.sleep(0.5)  # Use async sleep instead of blocking sleep
-            container.reload()
-            logger.info(f"[TERMINAL_WS] Container status after start: {container.status}")
-            if container.status != "running":
+            # Docker reports the container running as soon as start returns
+            container = docker_client.get_container_info(workspace.container_id, refresh=True)
+            status_after_start = container.status if container else "not_found"
+            logger.info(f"[TERMINAL_WS] Container status after start: {status_after_start}")
+            if status_after_start != "running":
                 await websocket.send_json({"type": "error", "message": "Container failed to start"})
                 await websocket.close(code=4005, reason="Container failed to start")
                 return
@@ -312,6 +321,7 @@ async def terminal_websocket(
 
     terminal_service = get_terminal_service()
     session: TerminalSession | None = None
+    subscriber: TerminalOutputSubscriber | None = None
 
     try:
         # Get or create session
@@ -326,43 +336,24 @@ async def terminal_websocket(
                 container_id=workspace.container_id,
             )
 
-        # Output callback
-        async def send_output(data: bytes):
-            try:
+        # Reattach to a running stream (reconnect, extra tab) or start a new one
+        subscriber = terminal_service.attach(session.session_id, offset)
+        if subscriber is None:
+            socket = await terminal_service.start_stream(
+                session_id=session.session_id,
+                container_id=workspace.container_id,
+            )
+
+            if not socket:
                 await websocket.send_json(
                     {
-                        "type": "output",
-                        "data": data.decode("utf-8", errors="replace"),
+                        "type": "error",
+                        "message": "Failed to start terminal stream",
                     }
                 )
-            except Exception as e:
-                logger.debug(f"Failed to send output: {e}")
-
-        # Wrap callback for async
-        output_queue: asyncio.Queue = asyncio.Queue()
-
-        def output_callback(data: bytes):
-            try:
-                output_queue.put_nowait(data)
-            except Exception:
-                pass
-
-        # Start the terminal stream
-        socket = await terminal_service.start_stream(
-            session_id=session.session_id,
-            container_id=workspace.container_id,
-            on_output=output_callback,
-        )
-
-        if not socket:
-            await websocket.send_json(
-                {
-                    "type": "error",
-                    "message": "Failed to start terminal stream",
-                }
-            )
-            await websocket.close(code=4500, reason="Stream failed")
-            return
+                await websocket.close(code=4500, reason="Stream failed")
+                return
+            subscriber = terminal_service.attach(session.session_id)
 
         # Send connected message
         logger.info(f"[WS_CONNECT] Sending connected message for session: {session.session_id}")
@@ -370,22 +361,30 @@ async def terminal_websocket(
             {
                 "type": "connected",
                 "session_id": session.session_id,
+                "offset": subscriber.position,
             }
         )
 
-        # Task to forward output from queue to websocket
+        # Task to forward output from the session's scrollback to the websocket. Sends
+        # are awaited, so a slow client falls behind the ring buffer and is resynced
+        # with a snapshot instead of queueing output in memory.
         async def forward_output():
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
             while True:
                 try:
-                    data = await asyncio.wait_for(output_queue.get(), timeout=0.1)
-                    await websocket.send_json(
-                        {
-                            "type": "output",
-                            "data": data.decode("utf-8", errors="replace"),
-                        }
-                    )
-                except TimeoutError:
-                    continue
+                    chunk = await subscriber.read()
+                    if chunk is None:
+                        break
+                    if chunk.reset:
+                        decoder.reset()
+                    message = {
+                        "type": "output",
+                        "data": decoder.decode(chunk.data),
+                        "offset": chunk.offset,
+                    }
+                    if chunk.reset:
+                        message["reset"] = True
+                    await websocket.send_json(message)
                 except Exception as e:
                     logger.debug(f"Forward output error: {e}")
                     break
@@ -410,7 +409,7 @@ async def terminal_websocket(
                             logger.debug(
                                 f"[WS_INPUT] Input for session {session.session_id}: {len(data)} chars"
                             )
-                            terminal_service.write_input(
+                            await terminal_service.write_input(
                                 session.session_id,
                                 data.encode("utf-8"),
                             )
@@ -457,6 +456,8 @@ async def terminal_websocket(
         except Exception:
             pass
     finally:
-        # Close session on disconnect
-        if session:
+        # Keep the session alive briefly so a reconnect can reattach to it
+        if subscriber:
+            terminal_service.detach(session.session_id, subscriber)
+        elif session:
             terminal_service.close_session(session.session_id)
@@ -11,9 +11,17 @@ from supabase import Client
 
 from app.core.supabase_client import get_supabase_client
 from app.services.docker_client import get_docker_client
+from app.services.docker_executor import (
+    EXEC,
+    LIFECYCLE,
+    QUERY,
+    DockerOperationTimeout,
+    get_docker_executor,
+)
 from app.services.external_commit_service import ExternalCommitService
-from app.services.preview_proxy import PORT_MAPPING, get_preview_proxy
+from app.services.preview_proxy import get_preview_proxy
 from app.services.workspace_manager import Workspace, get_workspace_manager
+from app.services.workspace_reaper import get_workspace_reaper
 from app.utils.clerk_auth import verify_clerk_token
 from app.utils.db_helpers import get_user_id_from_clerk
 
@@ -73,11 +81,16 @@ async def create_workspace(
         logger.info(f"Creating workspace for user={user_id}, project={request.project_id}")
 
         manager = get_workspace_manager()
-        workspace = manager.get_or_create_workspace(user_id, request.project_id)
+        docker = get_docker_executor()
+        workspace = await docker.run(
+            LIFECYCLE, manager.get_or_create_workspace, user_id, request.project_id
+        )
 
         git_result = None
         try:
-            git_result = manager.initialize_git_repo(
+            git_result = await docker.run(
+                EXEC,
+                manager.initialize_git_repo,
                 workspace.workspace_id,
                 user_id,
                 author_name=user_info.get("name") or "GitGuide",
@@ -90,9 +103,16 @@ async def create_workspace(
         if git_result and git_result.get("success"):
             try:
                 external_service = ExternalCommitService(supabase=supabase)
-                external = external_service.check_external_commits(workspace.workspace_id, user_id)
+                external = await docker.run(
+                    EXEC,
+                    external_service.check_external_commits,
+                    workspace.workspace_id,
+                    user_id,
+                )
                 if external.get("success") and external.get("has_external_commits"):
-                    external_service.reset_to_platform_commit(
+                    await docker.run(
+                        EXEC,
+                        external_service.reset_to_platform_commit,
                         workspace.workspace_id,
                         user_id,
                         confirmed=True,
@@ -106,6 +126,8 @@ async def create_workspace(
             "git": git_result,
         }
 
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except ValueError as e:
         logger.error(f"Validation error creating workspace: {e}")
         raise HTTPException(status_code=400, detail=str(e)) from e
@@ -230,7 +252,9 @@ async def destroy_workspace(
         if workspace.user_id != user_id:
             raise HTTPException(status_code=403, detail="Access denied")
 
-        success = manager.destroy_workspace(workspace_id)
+        success = await get_docker_executor().run(
+            LIFECYCLE, manager.destroy_workspace, workspace_id
+        )
 
         if not success:
             raise HTTPException(status_code=500, detail="Failed to destroy workspace")
@@ -243,6 +267,8 @@ async def destroy_workspace(
 
     except HTTPException:
         raise
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error destroying workspace: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to destroy workspace: {str(e)}") from e
@@ -275,7 +301,8 @@ async def start_workspace(
             raise HTTPException(status_code=403, detail="Access denied")
 
         logger.debug(f"[API_START] Current status: {workspace.container_status}")
-        success = manager.start_workspace(workspace_id)
+        docker = get_docker_executor()
+        success = await docker.run(LIFECYCLE, manager.start_workspace, workspace_id)
 
         if not success:
             logger.error(f"[API_START] Failed to start workspace: {workspace_id}")
@@ -284,7 +311,9 @@ async def start_workspace(
         # Attempt to initialize git repo if ready
         git_result = None
         try:
-            git_result = manager.initialize_git_repo(
+            git_result = await docker.run(
+                EXEC,
+                manager.initialize_git_repo,
                 workspace_id,
                 user_id,
                 author_name=user_info.get("name") or "GitGuide",
@@ -297,10 +326,16 @@ async def start_workspace(
         external_result = None
         try:
             external_service = ExternalCommitService(supabase=supabase)
-            external_result = external_service.check_external_commits(workspace_id, user_id)
+            external_result = await docker.run(
+                EXEC, external_service.check_external_commits, workspace_id, user_id
+            )
             if external_result.get("has_external_commits"):
-                reset_result = external_service.reset_to_platform_commit(
-                    workspace_id, user_id, confirmed=True
+                reset_result = await docker.run(
+                    EXEC,
+                    external_service.reset_to_platform_commit,
+                    workspace_id,
+                    user_id,
+                    confirmed=True,
                 )
                 external_result["auto_reset"] = reset_result
         except Exception as e:
@@ -318,6 +353,8 @@ async def start_workspace(
 
     except HTTPException:
         raise
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error starting workspace: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to start workspace: {str(e)}") from e
@@ -350,7 +387,7 @@ async def stop_workspace(
             raise HTTPException(status_code=403, detail="Access denied")
 
         logger.debug(f"[API_STOP] Current status: {workspace.container_status}")
-        success = manager.stop_workspace(workspace_id)
+        success = await get_docker_executor().run(LIFECYCLE, manager.stop_workspace, workspace_id)
 
         if not success:
             logger.error(f"[API_STOP] Failed to stop workspace: {workspace_id}")
@@ -366,6 +403,8 @@ async def stop_workspace(
 
     except HTTPException:
         raise
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error stopping workspace: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to stop workspace: {str(e)}") from e
@@ -385,7 +424,9 @@ async def clone_repo(
         user_id = get_user_id_from_clerk(supabase, clerk_user_id)
 
         manager = get_workspace_manager()
-        result = manager.initialize_git_repo(
+        result = await get_docker_executor().run(
+            EXEC,
+            manager.initialize_git_repo,
             workspace_id,
             user_id,
             author_name=user_info.get("name") or "GitGuide",
@@ -403,6 +444,8 @@ async def clone_repo(
         )
     except HTTPException:
         raise
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error cloning repo: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to clone repo: {str(e)}") from e
@@ -432,21 +475,24 @@ async def recreate_workspace(
         if workspace.user_id != user_id:
             raise HTTPException(status_code=403, detail="Access denied")
 
+        docker = get_docker_executor()
+
         # Stop container if running
         if workspace.container_status == "running":
-            manager.stop_workspace(workspace_id)
+            await docker.run(LIFECYCLE, manager.stop_workspace, workspace_id)
 
         # Remove old container
         if workspace.container_id:
-            manager.docker.remove_container(workspace.container_id)
+            await docker.run(LIFECYCLE, manager.docker.remove_container, workspace.container_id)
 
         # Recreate container with port mappings (files preserved via volume)
-        updated_workspace = manager._recreate_container(workspace)
+        updated_workspace = await docker.run(LIFECYCLE, manager._recreate_container, workspace)
 
-        # Build port info from centralized PORT_MAPPING
+        # Build port info from the workspace's leased host ports
+        bindings = manager.port_leases.port_bindings(workspace_id)
         ports = {
-            f"{container_port}/tcp": f"http://localhost:{host_port}"
-            for container_port, host_port in PORT_MAPPING.items()
+            port_key: f"http://localhost:{host_port}"
+            for port_key, (_host_ip, host_port) in bindings.items()
         }
 
         return {
@@ -460,6 +506,8 @@ async def recreate_workspace(
 
     except HTTPException:
         raise
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error recreating workspace: {e}", exc_info=True)
         raise HTTPException(
@@ -490,7 +538,7 @@ async def get_workspace_status(
         if workspace.user_id != user_id:
             raise HTTPException(status_code=403, detail="Access denied")
 
-        status = manager.get_workspace_status(workspace_id)
+        status = await get_docker_executor().run(QUERY, manager.get_workspace_status, workspace_id)
 
         # Get preview info using preview proxy service
         preview_proxy = get_preview_proxy()
@@ -509,11 +557,58 @@ async def get_workspace_status(
 
     except HTTPException:
         raise
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error fetching workspace status: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch status: {str(e)}") from e
 
 
+@router.get("/{workspace_id}/usage")
+async def get_workspace_usage(
+    workspace_id: str,
+    user_info: dict = Depends(verify_clerk_token),
+    supabase: Client = Depends(get_supabase_client),
+):
+    """
+    Get memory/CPU usage of a workspace's container from the Docker stats API.
+
+    `cpu_cores` is null until two samples have been taken.
+    """
+    try:
+        clerk_user_id = user_info["clerk_user_id"]
+        user_id = get_user_id_from_clerk(supabase, clerk_user_id)
+
+        manager = get_workspace_manager()
+        workspace = manager.get_workspace(workspace_id)
+
+        if not workspace:
+            raise HTTPException(status_code=404, detail="Workspace not found")
+
+        # Verify ownership
+        if workspace.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+
+        usage = await get_docker_executor().run(
+            QUERY, get_workspace_reaper().sample_workspace, workspace
+        )
+
+        return {
+            "success": True,
+            "workspace_id": workspace_id,
+            "running": usage is not None,
+            "usage": usage.to_dict() if usage else None,
+        }
+
+    except HTTPException:
+        raise
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+    except Exception as e:
+        logger.error(f"Error fetching workspace usage: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch usage: {str(e)}") from e
+
+
 @router.get("/{workspace_id}/ports/check")
 async def check_port_connectivity(
     workspace_id: str,
@@ -542,7 +637,9 @@ async def check_port_connectivity(
         # Get actual port mappings from container
         port_mappings = {}
         if workspace.container_id:
-            port_mappings = docker_client.get_container_ports(workspace.container_id)
+            port_mappings = await get_docker_executor().run(
+                QUERY, docker_client.get_container_ports, workspace.container_id
+            )
 
         # Check if port mappings exist
         has_port_mappings = bool(port_mappings)
@@ -589,6 +686,8 @@ async def check_port_connectivity(
 
     except HTTPException:
         raise
+    except DockerOperationTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
     except Exception as e:
         logger.error(f"Error checking ports: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to check ports: {str(e)}") from e
@@ -66,6 +66,10 @@ class Settings(BaseSettings):
     # Vector Database Settings - Qdrant connection
     qdrant_url: str | None = None
     qdrant_api_key: str | None = None
+    # Storage layout of the chunk collection: "default" (float32 in RAM), "scalar" (int8,
+    # ~4x less RAM) or "binary" (~32x less RAM); existing collections are converted with
+    # scripts/migrate_qdrant_collection.py
+    qdrant_collection_profile: str = "default"
 
     # Embedding Settings
     embedding_provider: str = "vertex_ai"  # Options: "vertex_ai", "openai", "huggingface", "local"
@@ -84,6 +88,41 @@ class Settings(BaseSettings):
 
     # Workspace/Preview base URL for terminal previews (e.g., https://api.gitguide.com)
     workspace_public_base_url: str | None = None
+    # Route workspace file/git operations through a persistent exec channel per container
+    workspace_exec_channel_enabled: bool = True
+    # Pre-started containers kept ready for new workspaces (0 disables the warm pool)
+    workspace_pool_size: int = 2
+    # Seconds without workspace creations after which unclaimed pool containers are removed
+    workspace_pool_idle_seconds: int = 1800
+    # Clone workspace repos against shared host-side mirrors (public repos only)
+    workspace_git_mirror_enabled: bool = True
+    # Default clone options for workspace repos: opt-in partial-clone filter (e.g.
+    # "blob:none", used when no mirror is available) and history depth (None = full history)
+    workspace_clone_filter: str | None = None
+    workspace_clone_depth: int | None = None
+    # Seconds without activity after which a workspace is hibernated (0 disables)
+    workspace_idle_hibernate_seconds: int = 3600
+    # Host budgets for running workspace containers; LRU workspaces are hibernated
+    # when usage exceeds them (0 disables a budget)
+    workspace_memory_budget_mb: int = 0
+    workspace_cpu_budget_cores: float = 0.0
+    # Seconds between idle/budget checks
+    workspace_reaper_interval_seconds: int = 60
+    # Host ports leased to workspaces in blocks of 16 (see port_lease_registry.py); the
+    # default range 20000-29599 stays below the legacy 30001-30010 mapping and the
+    # kernel's ephemeral range used for pooled containers' dynamic ports
+    workspace_port_range_start: int = 20000
+    workspace_port_blocks: int = 600
+    # Concurrent Docker operations per class against the Docker host, from async handlers:
+    # container lifecycle (create/start/stop/remove), in-container commands, and
+    # metadata queries. Further calls queue without blocking the event loop.
+    docker_lifecycle_concurrency: int = 4
+    docker_exec_concurrency: int = 16
+    docker_query_concurrency: int = 8
+    # Seconds an async handler waits for a queued+running Docker operation per class
+    docker_lifecycle_timeout_seconds: float = 180.0
+    docker_exec_timeout_seconds: float = 660.0
+    docker_query_timeout_seconds: float = 30.0
 
     # LLM API Keys - Azure OpenAI (Production)
     azure_openai_key: str | None = None  # Maps to AZURE_OPENAI_KEY
@@ -121,6 +160,10 @@ class Settings(BaseSettings):
         "global"  # Maps to GCP_LOCATION (default: global - required for Gemini models)
     )
     gemini_model: str = "gemini-2.0-flash-exp"  # Maps to GEMINI_MODEL (Vertex AI: gemini-2.0-flash-exp, gemini-2.5-flash, gemini-2.5-pro)
+    # Cache large per-project prompt prefixes (notebook repo context) as Gemini cached
+    # contents; TTL is extended while a project keeps generating
+    gemini_context_cache_enabled: bool = True
+    gemini_context_cache_ttl_seconds: int = 3600
 
     # GitHub API
     git_access_token: str | None = None  # Maps to GIT_ACCESS_TOKEN
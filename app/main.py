@@ -5,6 +5,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.github_consent import router as github_consent_router
+from app.api.llm_telemetry import router as llm_telemetry_router
 from app.api.progress import router as progress_router
 from app.api.project_chunks_embeddings import router as project_chunks_embeddings_router
 from app.api.projects import router as projects_router
@@ -144,5 +145,6 @@ app.include_router(github_consent_router, prefix="/api/github", tags=["github"])
 # Task sessions router moved to workspace_service.py (requires Docker access)
 app.include_router(task_verification_router, prefix="/api/tasks", tags=["task-verification"])
 app.include_router(task_chatbot_router, prefix="/api/chatbot", tags=["task-chatbot"])
+app.include_router(llm_telemetry_router, prefix="/api/llm", tags=["llm-telemetry"])
 # Workspace routes (workspaces, files, terminal, git, preview) are only available
 # on the VM service at http://35.222.130.245:8080
@@ -16,6 +16,7 @@ from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+from app.api.llm_telemetry import router as llm_telemetry_router
 from app.config import settings
 from app.services.roadmap_generation import (
     router as roadmap_gen_router,
@@ -63,6 +64,8 @@ app.add_middleware(
 
 # Include roadmap generation router (public endpoint for initial generation)
 app.include_router(roadmap_gen_router, prefix="/api/roadmap", tags=["roadmap-generation"])
+# LLM call telemetry (Prometheus metrics + recent calls) for the generation pipeline
+app.include_router(llm_telemetry_router, prefix="/api/llm", tags=["llm-telemetry"])
 
 
 # Internal auth dependency for service-to-service calls
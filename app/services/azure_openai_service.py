@@ -18,6 +18,7 @@ from tenacity import (
 )
 
 from app.config import settings
+from app.services.llm_telemetry import record_llm_usage, track_llm_call
 from app.services.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
@@ -101,21 +102,23 @@ class AzureOpenAIService:
         Returns:
             Generated response string
         """
-        # Acquire rate limit permission
-        await self.rate_limiter.acquire()
-
-        # Additional delay for better rate limit compliance
-        await asyncio.sleep(0.5)
-
-        # Retry logic with exponential backoff
-        return await self._generate_with_retry(
-            user_query=user_query,
-            system_prompt=system_prompt,
-            context=context,
-            conversation_history=conversation_history,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        with track_llm_call("azure_openai", self.deployment) as call:
+            # Acquire rate limit permission
+            with call.queued():
+                await self.rate_limiter.acquire()
+
+                # Additional delay for better rate limit compliance
+                await asyncio.sleep(0.5)
+
+            # Retry logic with exponential backoff
+            return await self._generate_with_retry(
+                user_query=user_query,
+                system_prompt=system_prompt,
+                context=context,
+                conversation_history=conversation_history,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
 
     @retry(
         stop=stop_after_attempt(3),
@@ -191,6 +194,8 @@ class AzureOpenAIService:
 
             result = response.json()
             generated_text = result["choices"][0]["message"]["content"]
+            usage = result.get("usage") or {}
+            record_llm_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
 
             duration = time.time() - start_time
             logger.debug(f"✅ Azure OpenAI response generated in {duration:.2f}s")
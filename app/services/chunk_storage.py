@@ -8,9 +8,13 @@ from app.core.supabase_client import get_supabase_client
 logger = logging.getLogger(__name__)
 
 
-def store_chunks(project_id: str, chunks: list[dict]) -> list[str]:
+def store_chunks(
+    project_id: str, chunks: list[dict], index_version: int | None = None
+) -> list[str]:
     """
     Bulk insert chunks into Supabase and return chunk IDs.
+
+    Rows are tagged with `index_version` when given (see index_versions.py).
     """
     logger.info(f"💾 Storing {len(chunks)} chunks in Supabase for project_id={project_id}")
 
@@ -41,16 +45,17 @@ def store_chunks(project_id: str, chunks: list[dict]) -> list[str]:
         total_content_size += content_size
         files_represented.add(chunk["file_path"])
 
-        rows.append(
-            {
-                "project_id": project_id,
-                "file_path": chunk["file_path"],
-                "chunk_index": chunk["chunk_index"],
-                "language": chunk["language"],
-                "content": content,  # Use sanitized content
-                "token_count": chunk["token_count"],
-            }
-        )
+        row = {
+            "project_id": project_id,
+            "file_path": chunk["file_path"],
+            "chunk_index": chunk["chunk_index"],
+            "language": chunk["language"],
+            "content": content,  # Use sanitized content
+            "token_count": chunk["token_count"],
+        }
+        if index_version is not None:
+            row["index_version"] = index_version
+        rows.append(row)
 
     if null_bytes_removed > 0:
         logger.warning(f"⚠️  Removed {null_bytes_removed} null bytes from chunks before storage")
@@ -0,0 +1,248 @@
+"""
+Container Pool Service
+Keeps pre-created, pre-started workspace containers ready to be claimed.
+
+Creating and starting a container takes seconds; claiming a warm one takes a rename.
+Each pooled container is created for a pre-allocated workspace ID, with that
+workspace's volume already mounted, so a claimed container needs no re-mount: the
+new workspace simply adopts the ID. Pooled containers publish their dev-server ports
+on Docker-assigned host ports, so any number can run next to existing workspaces.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from app.services.docker_client import DockerClient
+
+logger = logging.getLogger(__name__)
+
+# Name prefix of unclaimed containers; followed by the pre-allocated workspace ID
+POOL_CONTAINER_PREFIX = "gitguide-pool-"
+# Seconds between background checks for refill and idle eviction
+POOL_MAINTENANCE_INTERVAL = 30.0
+
+
+@dataclass
+class PooledContainer:
+    """A running container waiting to be claimed by a new workspace."""
+
+    workspace_id: str
+    container_id: str
+    volume_name: str
+    # time.monotonic() when the container joined the pool
+    ready_at: float
+
+
+class ContainerPool:
+    """
+    Pool of warm workspace containers, refilled and evicted by a background thread.
+
+    The pool refills to `size` while workspaces are being created. After
+    `idle_seconds` without a claim, unclaimed containers are removed so an unused
+    server doesn't hold their memory; the next claim starts refilling again.
+    """
+
+    def __init__(
+        self,
+        docker_client: DockerClient,
+        container_name_for: Callable[[str], str],
+        volume_name_for: Callable[[str], str],
+        container_ports: list[int],
+        size: int,
+        idle_seconds: float,
+        read_only_volumes: dict[str, str] | None = None,
+    ):
+        """
+        Args:
+            docker_client: Docker client used to create and remove containers
+            container_name_for: Maps a workspace ID to its container name
+            volume_name_for: Maps a workspace ID to its volume name
+            container_ports: Container ports to publish (on Docker-assigned host ports)
+            size: Number of warm containers to keep
+            idle_seconds: Seconds without claims before unclaimed containers are removed
+            read_only_volumes: Shared volumes mounted read-only, {volume_name: path}
+        """
+        self._docker = docker_client
+        self._container_name_for = container_name_for
+        self._volume_name_for = volume_name_for
+        self._ports = {f"{port}/tcp": ("0.0.0.0", None) for port in container_ports}
+        self._read_only_volumes = read_only_volumes
+        self.size = size
+        self.idle_seconds = idle_seconds
+
+        self._ready: deque[PooledContainer] = deque()
+        self._discarded: list[PooledContainer] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_claim_at = time.monotonic()
+
+    @property
+    def ready_count(self) -> int:
+        return len(self._ready)
+
+    def start(self) -> None:
+        """Adopt containers left from a previous run and start background maintenance."""
+        if self.size <= 0 or self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="workspace-container-pool", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Workspace container pool started (size: {self.size})")
+
+    def stop(self) -> None:
+        """Stop background maintenance; warm containers are kept for the next start."""
+        self._stopped.set()
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def claim(self) -> PooledContainer | None:
+        """
+        Take a warm container for a new workspace.
+
+        The container is renamed to the workspace's container name; its volume is
+        already named for the workspace. Triggers a background refill.
+
+        Returns:
+            PooledContainer, or None if the pool is empty (create a container instead)
+        """
+        self._last_claim_at = time.monotonic()
+        self._wake.set()
+        if self.size <= 0:
+            return None
+
+        while True:
+            with self._lock:
+                if not self._ready:
+                    logger.info("Workspace container pool empty, creating container on demand")
+                    return None
+                entry = self._ready.popleft()
+
+            # Served from the events-driven cache: no Docker API call if nothing changed
+            status = self._docker.get_container_status(entry.container_id)
+            name = self._container_name_for(entry.workspace_id)
+            if status == "running" and self._docker.rename_container(entry.container_id, name):
+                logger.info(
+                    f"Claimed warm container {entry.container_id[:12]} for workspace "
+                    f"{entry.workspace_id}"
+                )
+                return entry
+
+            logger.warning(
+                f"⚠️ Pooled container {entry.container_id[:12]} unusable (status: {status}), "
+                "discarding"
+            )
+            with self._lock:
+                self._discarded.append(entry)
+
+    def _run(self) -> None:
+        """Background loop: adopt leftovers, then refill, evict and clean up."""
+        try:
+            self._adopt_existing()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to adopt existing pool containers: {e}")
+
+        while not self._stopped.is_set():
+            try:
+                self._remove_discarded()
+                if time.monotonic() - self._last_claim_at > self.idle_seconds:
+                    self._evict_idle()
+                else:
+                    self._refill()
+            except Exception as e:
+                logger.warning(f"⚠️ Workspace container pool maintenance failed: {e}")
+
+            self._wake.wait(POOL_MAINTENANCE_INTERVAL)
+            self._wake.clear()
+
+    def _adopt_existing(self) -> None:
+        """Re-add running pool containers from a previous run; remove the rest."""
+        for container_id in self._docker.list_container_ids(POOL_CONTAINER_PREFIX):
+            info = self._docker.get_container_info(container_id)
+            if info is None:
+                continue
+            workspace_id = info.name[len(POOL_CONTAINER_PREFIX) :]
+            entry = PooledContainer(
+                workspace_id=workspace_id,
+                container_id=info.id,
+                volume_name=self._volume_name_for(workspace_id),
+                ready_at=time.monotonic(),
+            )
+            with self._lock:
+                adopt = info.status == "running" and len(self._ready) < self.size
+                if adopt:
+                    self._ready.append(entry)
+                else:
+                    self._discarded.append(entry)
+            if adopt:
+                logger.info(f"Adopted warm container {info.id[:12]} into the pool")
+
+    def _refill(self) -> None:
+        """Create containers until the pool holds `size` (one at a time, stoppable)."""
+        while not self._stopped.is_set() and len(self._ready) < self.size:
+            entry = self._create_entry()
+            if entry is None:
+                return
+            with self._lock:
+                self._ready.append(entry)
+            logger.info(f"Warm container {entry.container_id[:12]} added to pool")
+
+    def _create_entry(self) -> PooledContainer | None:
+        """Create and start a container for a fresh workspace ID."""
+        workspace_id = str(uuid.uuid4())
+        volume_name = self._volume_name_for(workspace_id)
+        try:
+            container_id, _ = self._docker.create_container(
+                name=f"{POOL_CONTAINER_PREFIX}{workspace_id}",
+                volume_name=volume_name,
+                ports=self._ports,
+                read_only_volumes=self._read_only_volumes,
+            )
+        except (RuntimeError, ValueError) as e:
+            logger.error(f"❌ Failed to create pooled container: {e}")
+            return None
+
+        entry = PooledContainer(
+            workspace_id=workspace_id,
+            container_id=container_id,
+            volume_name=volume_name,
+            ready_at=time.monotonic(),
+        )
+        success, _ = self._docker.start_container(container_id)
+        if not success:
+            logger.error(f"❌ Pooled container {container_id[:12]} failed to start")
+            self._remove(entry)
+            return None
+        return entry
+
+    def _evict_idle(self) -> None:
+        """Remove unclaimed containers that have been idle longer than `idle_seconds`."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [e for e in self._ready if now - e.ready_at > self.idle_seconds]
+            for entry in expired:
+                self._ready.remove(entry)
+        for entry in expired:
+            logger.info(f"Evicting idle pooled container {entry.container_id[:12]}")
+            self._remove(entry)
+
+    def _remove_discarded(self) -> None:
+        with self._lock:
+            discarded, self._discarded = self._discarded, []
+        for entry in discarded:
+            self._remove(entry)
+
+    def _remove(self, entry: PooledContainer) -> None:
+        """Remove a pooled container and its (still empty) volume."""
+        self._docker.remove_container(entry.container_id, force=True)
+        self._docker.remove_volume(entry.volume_name, force=True)
@@ -4,12 +4,15 @@ Wrapper around the Docker SDK for container operations.
 """
 
 import logging
-import socket
 import threading
+import time
+from dataclasses import dataclass, field
 
 from docker.errors import APIError, ImageNotFound, NotFound
 
 import docker
+from app.config import settings
+from app.services.exec_channel import ExecChannel, ExecChannelError
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +21,68 @@ DEFAULT_MEMORY_LIMIT = "512m"
 DEFAULT_CPU_PERIOD = 100000
 DEFAULT_CPU_QUOTA = 50000  # 0.5 CPU cores
 DEFAULT_IMAGE = "gitguide-workspace:latest"
+# Seconds a single command may run inside the exec channel before it is killed
+DEFAULT_EXEC_TIMEOUT = 600
+# Seconds to wait before retrying a container whose exec channel failed to start
+CHANNEL_RETRY_BACKOFF = 30.0
+# HTTP connections kept open to the Docker daemon by the shared client
+DOCKER_MAX_POOL_SIZE = 32
+# Container events that can change cached metadata (exec_* events are not subscribed)
+CONTAINER_CACHE_EVENTS = (
+    "create",
+    "start",
+    "restart",
+    "die",
+    "pause",
+    "unpause",
+    "rename",
+    "update",
+    "destroy",
+)
+# Seconds to wait before re-subscribing after the Docker events stream drops
+EVENTS_RETRY_BACKOFF = 5.0
+
+
+@dataclass
+class ContainerInfo:
+    """Container metadata served from the events-driven cache."""
+
+    id: str
+    name: str
+    status: str  # "running", "exited", "created", "paused", ...
+    ip_address: str | None = None
+    # e.g. {'3000/tcp': [{'HostIp': '0.0.0.0', 'HostPort': '30001'}]}
+    ports: dict[str, list[dict[str, str]]] = field(default_factory=dict)
+
+    @classmethod
+    def from_attrs(cls, attrs: dict) -> "ContainerInfo":
+        """Build from a `docker inspect` result."""
+        network = attrs.get("NetworkSettings") or {}
+        bridge = (network.get("Networks") or {}).get("bridge") or {}
+        return cls(
+            id=attrs["Id"],
+            name=(attrs.get("Name") or "").lstrip("/"),
+            status=(attrs.get("State") or {}).get("Status", "unknown"),
+            ip_address=bridge.get("IPAddress") or None,
+            ports=network.get("Ports") or {},
+        )
 
 
 class DockerClient:
     """
     Thread-safe wrapper for Docker SDK operations on workspace containers.
 
-    Creates a fresh Docker client for each operation to avoid connection issues
-    in multi-threaded environments like FastAPI.
+    All operations share one Docker client whose HTTP connection pool is safe to use
+    from FastAPI's worker threads.
+
+    Container status, IP and port bindings are served from a metadata cache that a
+    background thread keeps current from the Docker events stream, so lookups on hot
+    paths (exec, preview, terminal) don't call the Docker API. While the events stream
+    is down every lookup falls back to `docker inspect`.
+
+    Commands and file operations for running containers go through a persistent
+    per-container exec channel (see exec_channel.py) when available, falling back
+    to a one-shot `exec_run` otherwise.
     """
 
     _lock = threading.Lock()
@@ -33,12 +90,26 @@ class DockerClient:
     def __init__(self):
         """Initialize Docker client - connection check is deferred until first use."""
         self._docker_available: bool | None = None
+        # Long-lived pooled client shared by every operation
+        self._shared_client: docker.DockerClient | None = None
+        self._channels: dict[str, ExecChannel] = {}
+        self._channel_retry_at: dict[str, float] = {}
+        self._channel_lock = threading.Lock()
+        self._containers: dict[str, object] = {}
+        # Metadata cache: full container ID -> info, and lookup key (ID/name) -> full ID
+        self._container_info: dict[str, ContainerInfo] = {}
+        self._container_keys: dict[str, str] = {}
+        self._info_lock = threading.Lock()
+        self._events_thread: threading.Thread | None = None
+        self._events_stream = None
+        self._events_live = False
+        self._closed = False
         logger.debug("Docker client initialized (lazy connection check)")
 
-    def _get_client(self) -> docker.DockerClient:
-        """Get a fresh Docker client for thread-safe operations."""
+    def _connect(self) -> docker.DockerClient:
+        """Open a Docker client with a connection pool and verify the daemon on first use."""
         try:
-            client = docker.from_env()
+            client = docker.from_env(max_pool_size=DOCKER_MAX_POOL_SIZE)
             # Verify connection on first use
             if self._docker_available is None:
                 client.ping()
@@ -50,6 +121,223 @@ class DockerClient:
             logger.error(f"Failed to connect to Docker: {e}")
             raise RuntimeError(f"Docker is not available: {e}") from e
 
+    def _get_client(self) -> docker.DockerClient:
+        """Get the shared, connection-pooled Docker client."""
+        if self._shared_client is None:
+            with self._lock:
+                if self._shared_client is None:
+                    self._shared_client = self._connect()
+        return self._shared_client
+
+    @property
+    def api(self) -> docker.APIClient:
+        """Low-level API client (exec create/inspect/resize) on the shared connection pool."""
+        return self._get_client().api
+
+    def _get_container(self, container_id: str):
+        """Get a cached container handle (raises NotFound if the container is gone)."""
+        container = self._containers.get(container_id)
+        if container is None:
+            container = self._get_client().containers.get(container_id)
+            self._containers[container_id] = container
+        return container
+
+    def get_container_info(self, container_id: str, refresh: bool = False) -> ContainerInfo | None:
+        """
+        Get container metadata from the events-driven cache.
+
+        Args:
+            container_id: Container ID or name
+            refresh: Inspect the container even if it is cached
+
+        Returns:
+            ContainerInfo, or None if the container does not exist
+        """
+        self._ensure_event_watcher()
+        if not refresh and self._events_live:
+            with self._info_lock:
+                info = self._container_info.get(self._container_keys.get(container_id, ""))
+            if info is not None:
+                return info
+        return self._inspect_container(container_id)
+
+    def _inspect_container(self, container_id: str) -> ContainerInfo | None:
+        """Inspect a container and store the result in the metadata cache."""
+        try:
+            attrs = self._get_client().api.inspect_container(container_id)
+        except NotFound:
+            self._drop_container_info(container_id)
+            return None
+        info = ContainerInfo.from_attrs(attrs)
+        with self._info_lock:
+            self._container_info[info.id] = info
+            self._container_keys[info.id] = info.id
+            self._container_keys[container_id] = info.id
+        return info
+
+    def _drop_container_info(self, container_id: str) -> None:
+        """Remove a container (by ID or any cached alias) from the metadata cache."""
+        with self._info_lock:
+            full_id = self._container_keys.get(container_id, container_id)
+            self._container_info.pop(full_id, None)
+            for key in [k for k, v in self._container_keys.items() if v == full_id]:
+                del self._container_keys[key]
+            self._container_keys.pop(container_id, None)
+
+    def _ensure_event_watcher(self) -> None:
+        """Start the background thread that follows the Docker events stream."""
+        if self._events_thread is not None or self._closed:
+            return
+        with self._info_lock:
+            if self._events_thread is None:
+                self._events_thread = threading.Thread(
+                    target=self._watch_events, name="docker-events", daemon=True
+                )
+                self._events_thread.start()
+
+    def _watch_events(self) -> None:
+        """Apply container events to the metadata cache, re-subscribing if the stream drops."""
+        while not self._closed:
+            try:
+                self._events_stream = self._get_client().events(
+                    decode=True,
+                    filters={"type": "container", "event": list(CONTAINER_CACHE_EVENTS)},
+                )
+            except Exception as e:
+                logger.debug(f"Docker events subscription failed: {e}")
+                time.sleep(EVENTS_RETRY_BACKOFF)
+                continue
+
+            # Events may have been missed while unsubscribed: start from an empty cache
+            with self._info_lock:
+                self._container_info.clear()
+                self._container_keys.clear()
+            self._events_live = True
+            logger.debug("Subscribed to Docker container events")
+
+            try:
+                for event in self._events_stream:
+                    self._apply_event(event)
+            except Exception as e:
+                if not self._closed:
+                    logger.warning(f"⚠️ Docker events stream dropped: {e}")
+            finally:
+                self._events_live = False
+                self._events_stream.close()
+
+            if not self._closed:
+                time.sleep(EVENTS_RETRY_BACKOFF)
+
+    def _apply_event(self, event: dict) -> None:
+        """Update the metadata cache for a single container event."""
+        action = event.get("Action") or event.get("status") or ""
+        container_id = event.get("id") or (event.get("Actor") or {}).get("ID")
+        if not container_id:
+            return
+
+        if action in ("destroy", "die"):
+            # The exec channel's process died with the container
+            self._forget_container(container_id)
+        if action in ("start", "restart"):
+            # A fresh container process can run the exec agent again
+            self._clear_channel_backoff(container_id)
+        if action == "destroy":
+            self._drop_container_info(container_id)
+            return
+
+        with self._info_lock:
+            tracked = container_id in self._container_info
+        if not tracked:
+            # Only containers someone has looked up are cached
+            return
+        if action == "rename":
+            self._drop_container_info(container_id)
+        try:
+            self._inspect_container(container_id)
+        except Exception as e:
+            logger.debug(f"Failed to refresh container {container_id[:12]} after {action}: {e}")
+            self._drop_container_info(container_id)
+
+    def close(self) -> None:
+        """Stop following Docker events and close exec channels."""
+        self._closed = True
+        stream = self._events_stream
+        if stream is not None:
+            stream.close()
+        for container_id in list(self._channels):
+            self._forget_container(container_id)
+
+    def _get_channel(self, container_id: str) -> ExecChannel | None:
+        """
+        Get (or lazily open) the exec channel for a container.
+
+        Returns:
+            ExecChannel, or None if channels are disabled or the agent cannot start
+        """
+        if not settings.workspace_exec_channel_enabled:
+            return None
+
+        channel = self._channels.get(container_id)
+        if channel is not None and not channel.closed:
+            return channel
+
+        with self._channel_lock:
+            channel = self._channels.get(container_id)
+            if channel is not None and not channel.closed:
+                return channel
+
+            if time.monotonic() < self._channel_retry_at.get(container_id, 0.0):
+                return None
+
+            try:
+                channel = ExecChannel.open(self._get_client().api, container_id)
+            except (ExecChannelError, RuntimeError) as e:
+                logger.debug(f"Exec channel unavailable for {container_id[:12]}: {e}")
+                self._channel_retry_at[container_id] = time.monotonic() + CHANNEL_RETRY_BACKOFF
+                self._channels.pop(container_id, None)
+                return None
+
+            self._channel_retry_at.pop(container_id, None)
+            self._channels[container_id] = channel
+            return channel
+
+    def _forget_container(self, container_id: str) -> None:
+        """Close the exec channel and drop cached state for a container."""
+        with self._channel_lock:
+            channel = self._channels.pop(container_id, None)
+            self._channel_retry_at.pop(container_id, None)
+        self._containers.pop(container_id, None)
+        if channel is not None:
+            channel.close()
+
+    def _clear_channel_backoff(self, container_id: str) -> None:
+        """Allow an exec channel to be opened right away after a (re)start."""
+        with self._channel_lock:
+            self._channel_retry_at.pop(container_id, None)
+
+    def channel_request(self, container_id: str, op: str, **params) -> dict | None:
+        """
+        Send a file-system request to the container's exec channel.
+
+        Args:
+            container_id: Container ID or name
+            op: Agent operation ("read_file", "write_file", "list_dir", ...)
+            **params: Operation parameters
+
+        Returns:
+            Response dict, or None if the channel is unavailable and the caller should
+            fall back to shell commands via exec_command
+        """
+        channel = self._get_channel(container_id)
+        if channel is None:
+            return None
+        try:
+            return channel.request(op, **params)
+        except ExecChannelError as e:
+            logger.warning(f"Exec channel {op} failed for {container_id[:12]}: {e}")
+            self._forget_container(container_id)
+            return None
+
     def create_container(
         self,
         name: str,
@@ -57,7 +345,8 @@ class DockerClient:
         image: str = DEFAULT_IMAGE,
         memory_limit: str = DEFAULT_MEMORY_LIMIT,
         cpu_quota: int = DEFAULT_CPU_QUOTA,
-        ports: dict[str, tuple[str, int]] | None = None,
+        ports: dict[str, tuple[str, int | None]] | None = None,
+        read_only_volumes: dict[str, str] | None = None,
     ) -> tuple[str, str]:
         """
         Create a new container with resource limits and optional persistent volume.
@@ -68,7 +357,10 @@ class DockerClient:
             image: Docker image to use
             memory_limit: Memory limit (e.g., "512m")
             cpu_quota: CPU quota (50000 = 0.5 cores)
-            ports: Optional port mappings dict, e.g., {'3000/tcp': ('0.0.0.0', 3000)}
+            ports: Optional port mappings dict, e.g., {'3000/tcp': ('0.0.0.0', 3000)};
+                a host port of None lets Docker pick a free one
+            read_only_volumes: Optional shared volumes to mount read-only, as
+                {volume_name: container_path}
 
         Returns:
             Tuple of (container_id, status)
@@ -83,6 +375,10 @@ class DockerClient:
                 self.create_volume(volume_name)
                 volumes = {volume_name: {"bind": "/workspace", "mode": "rw"}}
                 logger.info(f"Mounting volume {volume_name} to /workspace")
+            for shared_volume, path in (read_only_volumes or {}).items():
+                self.create_volume(shared_volume)
+                volumes = volumes or {}
+                volumes[shared_volume] = {"bind": path, "mode": "ro"}
 
             # Prepare port bindings for high-level API
             # Format: {'container_port/tcp': host_port} e.g., {'3000/tcp': 30001}
@@ -156,20 +452,22 @@ class DockerClient:
             Tuple of (success, is_port_conflict)
         """
         try:
-            client = self._get_client()
-            container = client.containers.get(container_id)
-
             # Check current status
-            container.reload()
-            current_status = container.status
-            logger.info(f"Container {container_id[:12]} current status: {current_status}")
+            info = self.get_container_info(container_id)
+            if info is None:
+                logger.error(f"Container not found: {container_id}")
+                return False, False
+            logger.info(f"Container {container_id[:12]} current status: {info.status}")
 
-            if current_status == "running":
+            if info.status == "running":
                 logger.info(f"Container {container_id[:12]} already running")
                 return True, False
 
             # Start the container
-            container.start()
+            self._get_client().api.start(info.id)
+            self._clear_channel_backoff(container_id)
+            # Refresh now rather than waiting for the start event, so callers see the new state
+            self._inspect_container(container_id)
             logger.info(f"Container started: {container_id}")
             return True, False
         except NotFound:
@@ -205,9 +503,9 @@ class DockerClient:
             True if stopped successfully
         """
         try:
-            client = self._get_client()
-            container = client.containers.get(container_id)
-            container.stop(timeout=timeout)
+            self._forget_container(container_id)
+            self._get_client().api.stop(container_id, timeout=timeout)
+            self._inspect_container(container_id)
             logger.info(f"Container stopped: {container_id}")
             return True
         except NotFound:
@@ -229,9 +527,9 @@ class DockerClient:
             True if removed successfully
         """
         try:
-            client = self._get_client()
-            container = client.containers.get(container_id)
-            container.remove(force=force)
+            self._forget_container(container_id)
+            self._get_client().api.remove_container(container_id, force=force)
+            self._drop_container_info(container_id)
             logger.info(f"Container removed: {container_id}")
             return True
         except NotFound:
@@ -241,6 +539,47 @@ class DockerClient:
             logger.error(f"Failed to remove container {container_id}: {e}")
             return False
 
+    def rename_container(self, container_id: str, name: str) -> bool:
+        """
+        Rename a container (works while it is running).
+
+        Args:
+            container_id: Container ID or name
+            name: New container name
+
+        Returns:
+            True if renamed successfully
+        """
+        try:
+            self._get_client().api.rename(container_id, name)
+            self._drop_container_info(container_id)
+            logger.info(f"Container {container_id[:12]} renamed to {name}")
+            return True
+        except (NotFound, APIError) as e:
+            logger.error(f"Failed to rename container {container_id[:12]} to {name}: {e}")
+            return False
+
+    def list_container_ids(self, name_prefix: str) -> list[str]:
+        """
+        List IDs of all containers (running or not) whose name starts with a prefix.
+
+        Args:
+            name_prefix: Container name prefix, e.g. "gitguide-pool-"
+
+        Returns:
+            List of full container IDs
+        """
+        try:
+            containers = self._get_client().api.containers(all=True, filters={"name": name_prefix})
+        except APIError as e:
+            logger.error(f"Failed to list containers with prefix {name_prefix}: {e}")
+            return []
+        return [
+            container["Id"]
+            for container in containers
+            if any(name.lstrip("/").startswith(name_prefix) for name in container.get("Names", []))
+        ]
+
     def get_container_status(self, container_id: str) -> str:
         """
         Get the current status of a container.
@@ -252,13 +591,8 @@ class DockerClient:
             Status string: "running", "exited", "created", "paused", or "not_found"
         """
         try:
-            client = self._get_client()
-            container = client.containers.get(container_id)
-            # Reload to get fresh status
-            container.reload()
-            return container.status
-        except NotFound:
-            return "not_found"
+            info = self.get_container_info(container_id)
+            return info.status if info is not None else "not_found"
         except APIError as e:
             logger.error(f"Failed to get status for {container_id}: {e}")
             return "error"
@@ -275,17 +609,33 @@ class DockerClient:
             {'3000/tcp': [{'HostIp': '0.0.0.0', 'HostPort': '3000'}]}
         """
         try:
-            client = self._get_client()
-            container = client.containers.get(container_id)
-            container.reload()
-            return container.attrs.get("NetworkSettings", {}).get("Ports", {})
-        except NotFound:
-            logger.warning(f"Container not found: {container_id}")
-            return {}
+            info = self.get_container_info(container_id)
+            if info is None:
+                logger.warning(f"Container not found: {container_id}")
+                return {}
+            return info.ports
         except APIError as e:
             logger.error(f"Failed to get ports for {container_id}: {e}")
             return {}
 
+    def get_container_stats(self, container_id: str) -> dict | None:
+        """
+        Take a single resource usage sample of a running container.
+
+        Args:
+            container_id: Container ID or name
+
+        Returns:
+            Raw Docker stats dict (memory_stats, cpu_stats, ...), or None on failure
+        """
+        try:
+            return self._get_client().api.stats(container_id, stream=False, one_shot=True)
+        except NotFound:
+            return None
+        except APIError as e:
+            logger.error(f"Failed to get stats for {container_id}: {e}")
+            return None
+
     def container_exists(self, container_id: str) -> bool:
         """
         Check if a container exists.
@@ -296,12 +646,7 @@ class DockerClient:
         Returns:
             True if container exists
         """
-        try:
-            client = self._get_client()
-            client.containers.get(container_id)
-            return True
-        except NotFound:
-            return False
+        return self.get_container_info(container_id) is not None
 
     def exec_command(
         self, container_id: str, command: str, workdir: str | None = None, retries: int = 2
@@ -309,6 +654,9 @@ class DockerClient:
         """
         Execute a command inside a running container.
 
+        Uses the container's exec channel when available; otherwise (or if the
+        channel fails before the command is sent) falls back to a one-shot exec.
+
         Args:
             container_id: Container ID or name
             command: Command to execute
@@ -318,21 +666,43 @@ class DockerClient:
         Returns:
             Tuple of (exit_code, output)
         """
+        channel = self._get_channel(container_id)
+        if channel is not None:
+            logger.debug(f"Executing command via channel in {container_id[:12]}: {command[:50]}...")
+            try:
+                result = channel.request(
+                    "exec",
+                    timeout=DEFAULT_EXEC_TIMEOUT + 5,
+                    command=command,
+                    workdir=workdir or "/workspace",
+                    timeout_seconds=DEFAULT_EXEC_TIMEOUT,
+                )
+                if result.get("ok"):
+                    return result.get("exit_code", -1), result.get("output", "")
+                logger.warning(f"Exec channel error in {container_id[:12]}: {result.get('error')}")
+                return -1, result.get("error") or "Unknown error"
+            except ExecChannelError as e:
+                logger.warning(f"Exec channel failed for {container_id[:12]}: {e}")
+                self._forget_container(container_id)
+                if e.request_sent:
+                    # The command may already have run; don't replay it
+                    return -1, str(e)
+
         last_error = None
 
         for attempt in range(retries + 1):
             try:
-                client = self._get_client()
-                container = client.containers.get(container_id)
+                info = self.get_container_info(container_id)
+                if info is None:
+                    self._forget_container(container_id)
+                    logger.error(f"Container not found: {container_id}")
+                    return -1, "Container not found"
 
-                # Reload to get fresh status
-                container.reload()
+                if info.status != "running":
+                    logger.error(f"Container {container_id} is not running (status: {info.status})")
+                    return -1, f"Container is not running (status: {info.status})"
 
-                if container.status != "running":
-                    logger.error(
-                        f"Container {container_id} is not running (status: {container.status})"
-                    )
-                    return -1, f"Container is not running (status: {container.status})"
+                container = self._get_container(container_id)
 
                 logger.debug(f"Executing command in {container_id[:12]}: {command[:50]}...")
 
@@ -352,14 +722,13 @@ class DockerClient:
                 return exec_result.exit_code, output
 
             except NotFound:
+                self._forget_container(container_id)
                 logger.error(f"Container not found: {container_id}")
                 return -1, "Container not found"
             except APIError as e:
                 last_error = str(e)
                 logger.warning(f"Exec attempt {attempt + 1} failed for {container_id}: {e}")
                 if attempt < retries:
-                    import time
-
                     time.sleep(0.1 * (attempt + 1))  # Brief backoff
                     continue
                 logger.error(f"Failed to exec in {container_id} after {retries + 1} attempts: {e}")
@@ -368,8 +737,6 @@ class DockerClient:
                 last_error = str(e)
                 logger.error(f"Unexpected error in exec_command: {e}")
                 if attempt < retries:
-                    import time
-
                     time.sleep(0.1 * (attempt + 1))
                     continue
                 return -1, str(e)
@@ -381,9 +748,7 @@ class DockerClient:
         if self._docker_available is not None:
             return self._docker_available
         try:
-            client = docker.from_env()
-            client.ping()
-            self._docker_available = True
+            self._get_client()
             return True
         except Exception:
             self._docker_available = False
@@ -488,84 +853,6 @@ class DockerClient:
         except NotFound:
             return False
 
-    def is_port_available(self, port: int, host: str = "0.0.0.0") -> bool:
-        """
-        Check if a port is available for binding.
-        Checks both system-level port availability and Docker port bindings.
-
-        Args:
-            port: Port number to check
-            host: Host IP address (default: 0.0.0.0)
-
-        Returns:
-            True if port is available
-        """
-        # Check system-level port availability
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-                s.bind((host, port))
-        except OSError:
-            return False
-
-        # Check if Docker is using this port
-        try:
-            client = self._get_client()
-            containers = client.containers.list(all=True)
-            for container in containers:
-                container.reload()
-                # Check HostConfig.PortBindings (configured ports)
-                host_config_ports = container.attrs.get("HostConfig", {}).get("PortBindings", {})
-                for _container_port, bindings in host_config_ports.items():
-                    if bindings:
-                        for binding in bindings:
-                            if binding.get("HostPort") == str(port):
-                                logger.debug(
-                                    f"Port {port} is bound in HostConfig of container {container.id[:12]}"
-                                )
-                                return False
-
-                # Check NetworkSettings.Ports (actual bound ports)
-                network_ports = container.attrs.get("NetworkSettings", {}).get("Ports", {})
-                for _container_port, bindings in network_ports.items():
-                    if bindings:
-                        for binding in bindings:
-                            if binding.get("HostPort") == str(port):
-                                logger.debug(
-                                    f"Port {port} is bound in NetworkSettings of container {container.id[:12]}"
-                                )
-                                return False
-        except Exception as e:
-            logger.debug(f"Error checking Docker port bindings: {e}")
-            # If we can't check Docker bindings, assume port is available
-            # Docker will fail if it's actually in use
-
-        return True
-
-    def find_available_port(self, start_port: int, end_port: int = None, host: str = "0.0.0.0"):
-        """
-        Find an available port in the given range.
-
-        Args:
-            start_port: Starting port number
-            end_port: Ending port number (default: start_port + 1000)
-            host: Host IP address (default: 0.0.0.0)
-
-        Returns:
-            Available port number or None if none found
-        """
-        if end_port is None:
-            end_port = start_port + 1000
-
-        for port in range(start_port, end_port + 1):
-            if self.is_port_available(port, host):
-                logger.debug(f"Found available port: {port}")
-                return port
-            else:
-                logger.debug(f"Port {port} is not available, trying next...")
-        logger.warning(f"No available port found in range {start_port}-{end_port}")
-        return None
-
     def check_port_conflict_error(self, error: Exception) -> bool:
         """
         Check if an error is due to a port conflict.
@@ -0,0 +1,214 @@
+"""
+Docker Executor Service
+Runs blocking Docker operations for async handlers without blocking the event loop.
+
+The Docker SDK is synchronous, and a container start or `git clone` can take
+seconds to minutes. Calling it from an `async def` handler stalls every other
+request on the worker. Handlers instead `await` operations through this
+executor, which runs them on dedicated thread pools, one per operation class:
+
+- "lifecycle": create/start/stop/remove containers (slow, heavy on the daemon)
+- "exec": commands inside containers (git, file operations)
+- "query": metadata lookups (status, ports, stats)
+
+Each pool's size is the concurrency limit for that class against the Docker host,
+so a burst of container starts queues up instead of overloading the daemon, and
+cannot starve quick status queries. Every operation has a timeout covering queue
+wait and run time, and per-operation metrics are exposed on the health endpoint.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LIFECYCLE = "lifecycle"
+EXEC = "exec"
+QUERY = "query"
+
+
+class DockerOperationTimeout(RuntimeError):
+    """A Docker operation did not complete within its timeout."""
+
+
+@dataclass
+class OperationMetrics:
+    """Counters for one named Docker operation."""
+
+    calls: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    # Seconds from submission to completion (queue wait included)
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_seconds": round(self.total_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_seconds": round(self.max_seconds, 3),
+        }
+
+
+class DockerExecutor:
+    """Bounded, per-class thread pools for Docker operations, with timeouts and metrics."""
+
+    def __init__(
+        self,
+        limits: dict[str, int] | None = None,
+        timeouts: dict[str, float] | None = None,
+    ):
+        """
+        Args:
+            limits: Concurrent operations per class (defaults to settings)
+            timeouts: Default timeout in seconds per class (defaults to settings)
+        """
+        self._limits = limits or {
+            LIFECYCLE: settings.docker_lifecycle_concurrency,
+            EXEC: settings.docker_exec_concurrency,
+            QUERY: settings.docker_query_concurrency,
+        }
+        self._timeouts = timeouts or {
+            LIFECYCLE: settings.docker_lifecycle_timeout_seconds,
+            EXEC: settings.docker_exec_timeout_seconds,
+            QUERY: settings.docker_query_timeout_seconds,
+        }
+        self._pools = {
+            category: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"docker-{category}")
+            for category, limit in self._limits.items()
+        }
+        self._lock = threading.Lock()
+        self._metrics: dict[str, OperationMetrics] = {}
+        self._queued = dict.fromkeys(self._pools, 0)
+        self._running = dict.fromkeys(self._pools, 0)
+
+    async def run(
+        self,
+        category: str,
+        func: Callable[..., T],
+        *args: Any,
+        timeout: float | None = None,
+        op: str | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Run a blocking Docker operation on its class's pool and await the result.
+
+        On timeout, an operation still waiting in the queue is cancelled; one already
+        running can't be interrupted and keeps its slot until it returns.
+
+        Args:
+            category: Operation class ("lifecycle", "exec" or "query")
+            func: Blocking callable
+            *args: Positional arguments for func
+            timeout: Seconds to wait, queue included (defaults to the class timeout)
+            op: Name for metrics (defaults to the callable's name)
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            DockerOperationTimeout: If the operation didn't finish in time
+        """
+        name = op or getattr(func, "__name__", "operation")
+        timeout = self._timeouts[category] if timeout is None else timeout
+        started = time.monotonic()
+        future = self._submit(category, func, args, kwargs)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except TimeoutError:
+            self._record(name, started, timeout=True)
+            logger.warning(f"⚠️ Docker {category} operation {name} timed out after {timeout:.0f}s")
+            raise DockerOperationTimeout(
+                f"Docker operation {name} timed out after {timeout:.0f}s"
+            ) from None
+        except Exception:
+            self._record(name, started, error=True)
+            raise
+        self._record(name, started)
+        return result
+
+    def _submit(self, category: str, func: Callable, args: tuple, kwargs: dict) -> Future:
+        with self._lock:
+            self._queued[category] += 1
+
+        def invoke():
+            with self._lock:
+                self._queued[category] -= 1
+                self._running[category] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running[category] -= 1
+
+        future = self._pools[category].submit(invoke)
+
+        def on_done(done: Future) -> None:
+            # A queued operation cancelled on timeout never ran `invoke`
+            if done.cancelled():
+                with self._lock:
+                    self._queued[category] -= 1
+
+        future.add_done_callback(on_done)
+        return future
+
+    def _record(
+        self, name: str, started: float, error: bool = False, timeout: bool = False
+    ) -> None:
+        elapsed = time.monotonic() - started
+        with self._lock:
+            metrics = self._metrics.setdefault(name, OperationMetrics())
+            metrics.calls += 1
+            metrics.errors += int(error)
+            metrics.timeouts += int(timeout)
+            metrics.total_seconds += elapsed
+            metrics.max_seconds = max(metrics.max_seconds, elapsed)
+
+    def get_metrics(self) -> dict:
+        """Per-class load and per-operation counters."""
+        with self._lock:
+            return {
+                "pools": {
+                    category: {
+                        "limit": self._limits[category],
+                        "running": self._running[category],
+                        "queued": self._queued[category],
+                    }
+                    for category in self._pools
+                },
+                "operations": {name: m.to_dict() for name, m in self._metrics.items()},
+            }
+
+    def shutdown(self) -> None:
+        """Cancel queued operations and release the pools (running ones finish)."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+_docker_executor: DockerExecutor | None = None
+_docker_executor_lock = threading.Lock()
+
+
+def get_docker_executor() -> DockerExecutor:
+    """Get or create the DockerExecutor singleton (thread-safe)."""
+    global _docker_executor
+    if _docker_executor is None:
+        with _docker_executor_lock:
+            if _docker_executor is None:
+                _docker_executor = DockerExecutor()
+    return _docker_executor
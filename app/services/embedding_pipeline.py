@@ -7,6 +7,11 @@ from app.core.supabase_client import get_supabase_client
 from app.services.chunk_storage import store_chunks
 from app.services.embedding_service import get_embedding_service
 from app.services.github_service import fetch_repository_files
+from app.services.index_versions import (
+    activate_index_version,
+    new_index_version,
+    schedule_stale_version_gc,
+)
 from app.services.qdrant_service import COLLECTION_NAME, get_qdrant_service
 from app.utils.text_chunking import chunk_files
 from app.utils.time_estimation import log_time_estimate
@@ -116,11 +121,18 @@ async def run_embedding_pipeline(
         )
 
         # Step 4: store chunks in Supabase
-        logger.info(f"💾 Step 4/7: Storing {len(chunks)} chunks in Supabase")
+        # Chunks and points are written under a new index version; searches keep
+        # using the previous version until it is activated after Step 6.
+        index_version = new_index_version()
+        logger.info(
+            f"💾 Step 4/7: Storing {len(chunks)} chunks in Supabase (index version {index_version})"
+        )
         store_start = time.time()
         # Run storage in thread pool to avoid blocking event loop
         loop = asyncio.get_event_loop()
-        chunk_ids = await loop.run_in_executor(None, store_chunks, project_id, chunks)
+        chunk_ids = await loop.run_in_executor(
+            None, store_chunks, project_id, chunks, index_version
+        )
         store_duration = time.time() - store_start
 
         # Calculate cumulative time
@@ -188,6 +200,7 @@ async def run_embedding_pipeline(
             chunk_ids,
             embeddings,
             metadatas,
+            index_version,
         )
         qdrant_duration = time.time() - qdrant_start
 
@@ -211,6 +224,10 @@ async def run_embedding_pipeline(
             else ""
         )
 
+        # Switch searches to the new version atomically, then collect the old ones
+        await loop.run_in_executor(None, activate_index_version, project_id, index_version)
+        schedule_stale_version_gc(project_id, index_version)
+
         # Step 7: mark project ready
         logger.info(f"✅ Step 7/7: Updating project status to 'ready' for project_id={project_id}")
         supabase.table("projects").update({"status": "ready"}).eq(
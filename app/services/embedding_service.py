@@ -8,7 +8,9 @@ Embedding Service with support for multiple providers:
 
 import logging
 import os
+import threading
 import time
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 from app.config import settings
@@ -18,6 +20,9 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of query embeddings kept by embed_query_cached (LRU)
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 256
+
 # Lazy singleton instance
 _embedding_service_instance = None
 
@@ -53,6 +58,9 @@ class EmbeddingService:
         self.model = None
         self._vertex_ai_client = None
         self._openai_client = None
+        # Query embeddings keyed by (model_id, text)
+        self._query_cache: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._query_cache_lock = threading.Lock()
 
         logger.info(f"🤖 Initializing EmbeddingService with provider: {self.provider}")
 
@@ -329,6 +337,44 @@ class EmbeddingService:
             logger.error(f"Failed to generate embeddings: {e}", exc_info=True)
             raise
 
+    @property
+    def model_id(self) -> str:
+        """Provider and model the embeddings come from, e.g. "openai:text-embedding-3-small"."""
+        if self.provider == "openai":
+            return f"openai:{settings.openai_embedding_model}"
+        return f"{self.provider}:{settings.embedding_model_name}"
+
+    def embed_query_cached(self, text: str) -> list[float]:
+        """
+        Embed a single (typically constant) query, reusing the vector on later calls.
+
+        Vectors are cached per embedding model, so switching providers or models
+        never returns a vector from a different embedding space.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Embedding vector
+        """
+        key = (self.model_id, text)
+        with self._query_cache_lock:
+            embedding = self._query_cache.get(key)
+            if embedding is not None:
+                self._query_cache.move_to_end(key)
+                return embedding
+
+        embeddings = self.embed_texts([text])
+        if not embeddings:
+            raise ValueError("Failed to generate embedding for query")
+        embedding = list(embeddings[0])
+
+        with self._query_cache_lock:
+            self._query_cache[key] = embedding
+            while len(self._query_cache) > QUERY_EMBEDDING_CACHE_MAX_ENTRIES:
+                self._query_cache.popitem(last=False)
+        return embedding
+
     def _embed_vertex_ai(self, texts: list[str]) -> list[list[float]]:
         """Generate embeddings using Vertex AI."""
         embeddings = self._vertex_ai_client.get_embeddings(texts)
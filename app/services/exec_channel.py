@@ -0,0 +1,467 @@
+"""
+Exec Channel
+Long-lived helper process inside a workspace container, driven over a single
+attached docker exec socket.
+
+Every request is a length-prefixed JSON frame tagged with an id, so many callers
+(file tree, editor, git panel) can share one channel concurrently instead of
+paying for a fresh `exec_create` + `exec_start` round trip per operation.
+"""
+
+import json
+import logging
+import socket
+import struct
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the agent to answer its first ping
+CHANNEL_STARTUP_TIMEOUT = 5.0
+# Default seconds to wait for a request (exec requests pass their own timeout)
+CHANNEL_REQUEST_TIMEOUT = 30.0
+# Docker multiplexed stream header: stream type (1 byte), padding (3), size (4, big endian)
+_DOCKER_STREAM_HEADER = struct.Struct(">BxxxI")
+_FRAME_HEADER = struct.Struct(">I")
+_STDOUT_STREAM = 1
+
+# Agent executed inside the container with `python3 -u -c`. Stdlib only: it must
+# run on any workspace image that ships a python3 interpreter.
+AGENT_SOURCE = r"""
+import base64, json, os, stat, struct, subprocess, sys, threading, time
+
+_in = sys.stdin.buffer
+_out = sys.stdout.buffer
+_lock = threading.Lock()
+
+
+def send(message):
+    data = json.dumps(message).encode("utf-8")
+    with _lock:
+        _out.write(struct.pack(">I", len(data)) + data)
+        _out.flush()
+
+
+def read_exact(size):
+    buf = b""
+    while len(buf) < size:
+        chunk = _in.read(size - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+
+def op_ping(req):
+    return {"pid": os.getpid()}
+
+
+def op_exec(req):
+    try:
+        proc = subprocess.run(
+            ["bash", "-c", req["command"]],
+            cwd=req.get("workdir") or "/workspace",
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=req.get("timeout_seconds"),
+        )
+    except subprocess.TimeoutExpired:
+        return {"exit_code": -1, "output": "Command timed out"}
+    return {"exit_code": proc.returncode, "output": proc.stdout.decode("utf-8", "replace")}
+
+
+def op_read_file(req):
+    path = req["path"]
+    if not os.path.isfile(path) or not os.access(path, os.R_OK):
+        return {"ok": False, "error": "not_found"}
+    with open(path, "rb") as f:
+        data = f.read()
+    return {"data": base64.b64encode(data).decode("ascii"), "size": len(data)}
+
+
+def op_write_file(req):
+    path = req["path"]
+    data = base64.b64decode(req.get("data") or "")
+    os.makedirs(os.path.dirname(path) or "/", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return {"size": len(data)}
+
+
+def file_meta(st):
+    return {"size": st.st_size, "mtime": st.st_mtime, "mtime_ns": st.st_mtime_ns}
+
+
+def op_stat_file(req):
+    path = req["path"]
+    if not os.path.isfile(path):
+        return {"ok": False, "error": "not_found"}
+    return file_meta(os.stat(path))
+
+
+def op_read_range(req):
+    path = req["path"]
+    if not os.path.isfile(path) or not os.access(path, os.R_OK):
+        return {"ok": False, "error": "not_found"}
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        f.seek(req.get("offset") or 0)
+        data = f.read(req["length"])
+    return {"data": base64.b64encode(data).decode("ascii"), **file_meta(st)}
+
+
+def op_write_range(req):
+    # Idempotent: replaying the same request leaves the file unchanged
+    path = req["path"]
+    offset = req.get("offset") or 0
+    data = base64.b64decode(req.get("data") or "")
+    os.makedirs(os.path.dirname(path) or "/", exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        if req.get("truncate"):
+            os.ftruncate(fd, offset)
+        os.pwrite(fd, data, offset)
+        os.fsync(fd)
+        st = os.fstat(fd)
+    finally:
+        os.close(fd)
+    return file_meta(st)
+
+
+def describe(path, name, st=None):
+    st = st or os.lstat(path)
+    return {
+        "name": name,
+        "path": path,
+        "is_directory": stat.S_ISDIR(st.st_mode),
+        "size": st.st_size,
+        "permissions": stat.filemode(st.st_mode),
+        "mtime": st.st_mtime,
+    }
+
+
+def op_list_dir(req):
+    path = req["path"]
+    if not os.path.isdir(path):
+        return {"ok": False, "error": "not_found"}
+    entries = []
+    for entry in os.scandir(path):
+        try:
+            entries.append(describe(entry.path, entry.name))
+        except OSError:
+            continue
+    return {"entries": entries}
+
+
+def op_walk_tree(req):
+    # Full listing, or (with "since") only entries whose mtime/ctime is newer than the
+    # cursor plus the current child names of every directory modified since then, so
+    # the caller can also drop deleted entries.
+    root = req["path"]
+    if not os.path.isdir(root):
+        return {"ok": False, "error": "not_found"}
+    ignore = set(req.get("ignore") or ())
+    since = req.get("since")
+    limit = req.get("max_entries") or 0
+    # File timestamps come from a coarse kernel clock that can lag time.time()
+    cursor = time.time() - (req.get("cursor_slack") or 0)
+    entries, children, pruned = [], {}, []
+    truncated = False
+    stack = [(root, os.stat(root).st_mtime)]
+    while stack and not truncated:
+        current, dir_mtime = stack.pop()
+        try:
+            scan = list(os.scandir(current))
+        except OSError:
+            continue
+        if since is not None and dir_mtime > since:
+            children[current] = [entry.name for entry in scan]
+        for entry in scan:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                if entry.name in ignore:
+                    pruned.append(entry.path)
+                else:
+                    stack.append((entry.path, st.st_mtime))
+            if since is not None and max(st.st_mtime, st.st_ctime) <= since:
+                continue
+            if limit and len(entries) >= limit:
+                truncated = True
+                break
+            entries.append(describe(entry.path, entry.name, st))
+    return {
+        "entries": entries,
+        "children": children,
+        "pruned": pruned,
+        "cursor": cursor,
+        "truncated": truncated,
+    }
+
+
+OPS = {
+    "ping": op_ping,
+    "exec": op_exec,
+    "read_file": op_read_file,
+    "write_file": op_write_file,
+    "list_dir": op_list_dir,
+    "walk_tree": op_walk_tree,
+    "stat_file": op_stat_file,
+    "read_range": op_read_range,
+    "write_range": op_write_range,
+}
+
+
+def handle(req):
+    response = {"id": req.get("id"), "ok": True}
+    try:
+        op = OPS.get(req.get("op"))
+        if op is None:
+            raise ValueError("unknown op: %s" % req.get("op"))
+        response.update(op(req))
+    except Exception as e:
+        response["ok"] = False
+        response["error"] = str(e)
+    send(response)
+
+
+def main():
+    while True:
+        header = read_exact(4)
+        if header is None:
+            return
+        body = read_exact(struct.unpack(">I", header)[0])
+        if body is None:
+            return
+        req = json.loads(body.decode("utf-8"))
+        threading.Thread(target=handle, args=(req,), daemon=True).start()
+
+
+main()
+"""
+
+
+class ExecChannelError(RuntimeError):
+    """Raised when the channel is unavailable or a request cannot be completed."""
+
+    def __init__(self, message: str, request_sent: bool = False):
+        super().__init__(message)
+        # True if the request reached the agent (it may have run); callers must not
+        # blindly replay non-idempotent commands in that case.
+        self.request_sent = request_sent
+
+
+class _PendingRequest:
+    __slots__ = ("event", "response")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.response: dict[str, Any] | None = None
+
+
+def encode_frame(message: dict[str, Any]) -> bytes:
+    """Encode a message as a length-prefixed JSON frame."""
+    data = json.dumps(message).encode("utf-8")
+    return _FRAME_HEADER.pack(len(data)) + data
+
+
+class ExecChannel:
+    """
+    Client side of the in-container agent.
+
+    Thread-safe: requests from any thread are written under a lock and matched to
+    responses by id on a dedicated reader thread.
+    """
+
+    def __init__(self, sock: Any, exec_id: str | None = None, multiplexed: bool = True):
+        """
+        Args:
+            sock: Connected raw socket to the agent's stdin/stdout
+            exec_id: Docker exec ID running the agent (for logging)
+            multiplexed: True if stdout arrives in Docker's multiplexed stream format
+                (non-TTY exec); False for a plain byte stream
+        """
+        self._sock = sock
+        self.exec_id = exec_id
+        self._multiplexed = multiplexed
+        self._write_lock = threading.Lock()
+        self._pending: dict[int, _PendingRequest] = {}
+        self._pending_lock = threading.Lock()
+        self._next_id = 0
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @classmethod
+    def open(cls, api_client: Any, container_id: str) -> "ExecChannel":
+        """
+        Start the agent inside a running container and wait for it to answer.
+
+        Args:
+            api_client: Low-level docker APIClient
+            container_id: Container ID or name
+
+        Raises:
+            ExecChannelError: If the agent cannot be started
+        """
+        try:
+            exec_instance = api_client.exec_create(
+                container_id,
+                cmd=["python3", "-u", "-c", AGENT_SOURCE],
+                stdin=True,
+                stdout=True,
+                stderr=False,
+                tty=False,
+                workdir="/workspace",
+            )
+            exec_id = exec_instance["Id"]
+            exec_socket = api_client.exec_start(exec_id, detach=False, tty=False, socket=True)
+        except Exception as e:
+            raise ExecChannelError(f"Failed to start exec channel: {e}") from e
+
+        # On Unix the SocketIO wrapper exposes the real socket as _sock
+        raw_sock = getattr(exec_socket, "_sock", exec_socket)
+        if not hasattr(raw_sock, "recv") or not hasattr(raw_sock, "sendall"):
+            raise ExecChannelError("Exec socket does not support recv/sendall")
+
+        channel = cls(raw_sock, exec_id=exec_id, multiplexed=True)
+        try:
+            channel.request("ping", timeout=CHANNEL_STARTUP_TIMEOUT)
+        except ExecChannelError:
+            channel.close()
+            raise
+        logger.info(f"Exec channel opened for container {container_id[:12]} ({exec_id[:12]})")
+        return channel
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def request(
+        self, op: str, timeout: float = CHANNEL_REQUEST_TIMEOUT, **params: Any
+    ) -> dict[str, Any]:
+        """
+        Send a request to the agent and wait for its response.
+
+        Returns:
+            Response dict with "ok" plus op-specific fields
+
+        Raises:
+            ExecChannelError: If the channel is closed or the request times out
+        """
+        if self._closed:
+            raise ExecChannelError("Exec channel is closed")
+
+        pending = _PendingRequest()
+        with self._pending_lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._pending[request_id] = pending
+
+        frame = encode_frame({"id": request_id, "op": op, **params})
+        try:
+            with self._write_lock:
+                self._sock.sendall(frame)
+        except OSError as e:
+            self._pop_pending(request_id)
+            self.close()
+            raise ExecChannelError(f"Failed to write to exec channel: {e}") from e
+
+        if not pending.event.wait(timeout):
+            self._pop_pending(request_id)
+            raise ExecChannelError(f"Exec channel request '{op}' timed out", request_sent=True)
+        if pending.response is None:
+            raise ExecChannelError("Exec channel closed during request", request_sent=True)
+        return pending.response
+
+    def close(self) -> None:
+        """Close the socket and fail any in-flight requests."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            # shutdown() wakes the reader thread blocked in recv and signals EOF to the agent
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+        try:
+            self._sock.close()
+        except Exception:
+            pass
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for request in pending:
+            request.event.set()
+
+    def _pop_pending(self, request_id: int) -> _PendingRequest | None:
+        with self._pending_lock:
+            return self._pending.pop(request_id, None)
+
+    def _recv_exact(self, size: int) -> bytes | None:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = self._sock.recv(size - len(buf))
+            if not chunk:
+                return None
+            buf.extend(chunk)
+        return bytes(buf)
+
+    def _recv_stdout(self) -> bytes | None:
+        """Read the next chunk of agent stdout, unwrapping Docker stream frames."""
+        if not self._multiplexed:
+            data = self._sock.recv(65536)
+            return data or None
+
+        while True:
+            header = self._recv_exact(_DOCKER_STREAM_HEADER.size)
+            if header is None:
+                return None
+            stream_type, size = _DOCKER_STREAM_HEADER.unpack(header)
+            payload = self._recv_exact(size) if size else b""
+            if payload is None:
+                return None
+            if stream_type == _STDOUT_STREAM:
+                return payload
+            logger.debug(f"Exec channel stream {stream_type}: {payload[:200]!r}")
+
+    def _read_loop(self) -> None:
+        buffer = bytearray()
+        try:
+            while not self._closed:
+                data = self._recv_stdout()
+                if data is None:
+                    break
+                buffer.extend(data)
+
+                while len(buffer) >= _FRAME_HEADER.size:
+                    (size,) = _FRAME_HEADER.unpack_from(buffer)
+                    if len(buffer) < _FRAME_HEADER.size + size:
+                        break
+                    body = bytes(buffer[_FRAME_HEADER.size : _FRAME_HEADER.size + size])
+                    del buffer[: _FRAME_HEADER.size + size]
+                    self._dispatch(body)
+        except OSError as e:
+            if not self._closed:
+                logger.debug(f"Exec channel read error: {e}")
+        finally:
+            self.close()
+
+    def _dispatch(self, body: bytes) -> None:
+        try:
+            response = json.loads(body.decode("utf-8"))
+        except ValueError as e:
+            logger.warning(f"Discarding malformed exec channel frame: {e}")
+            return
+
+        pending = self._pop_pending(response.get("id"))
+        if pending is None:
+            return
+        pending.response = response
+        pending.event.set()
@@ -7,12 +7,28 @@ import base64
 import logging
 import posixpath
 import shlex
-from dataclasses import dataclass
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
 
 from app.services.docker_client import DockerClient, get_docker_client
 
 logger = logging.getLogger(__name__)
 
+# Directories listed but not descended into by list_tree
+DEFAULT_TREE_IGNORE = (".git", "node_modules", "__pycache__", ".venv", ".next", ".cache")
+# Upper bound on entries returned by a single list_tree call
+DEFAULT_TREE_MAX_ENTRIES = 20000
+# Seconds subtracted from tree cursors: file timestamps come from a coarse kernel clock
+# that can lag the wall clock, so an entry changed right after a listing must still
+# compare newer than its cursor (entries may be reported twice, never missed)
+TREE_CURSOR_SLACK = 1.0
+# Bytes moved per ranged read/write request
+FILE_CHUNK_SIZE = 1024 * 1024
+# Bytes per shell fallback write; the base64 text must stay below the kernel's
+# 128 KiB limit on a single command argument
+EXEC_WRITE_CHUNK_SIZE = 48 * 1024
+
 
 @dataclass
 class FileInfo:
@@ -23,6 +39,7 @@ class FileInfo:
     is_directory: bool
     size: int
     permissions: str
+    mtime: float | None = None
 
     def to_dict(self):
         return {
@@ -31,9 +48,40 @@ class FileInfo:
             "is_directory": self.is_directory,
             "size": self.size,
             "permissions": self.permissions,
+            "mtime": self.mtime,
         }
 
 
+@dataclass
+class FileStat:
+    """Size and modification time of a regular file, used for ranges and ETags."""
+
+    path: str
+    size: int
+    mtime: float
+    mtime_ns: int
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.mtime_ns:x}-{self.size:x}"'
+
+
+@dataclass
+class FileTree:
+    """Recursive listing of a directory, or the changes since a previous listing."""
+
+    root: str
+    entries: list[FileInfo]
+    # Pass back as `since` to get only what changed after this listing
+    cursor: float
+    # Incremental listings only: current child names of directories modified since the
+    # cursor, so callers can drop entries that were deleted
+    children: dict[str, list[str]] = field(default_factory=dict)
+    # Ignored directories that were listed but not descended into
+    pruned: list[str] = field(default_factory=list)
+    truncated: bool = False
+
+
 class FileSystemService:
     """Service for file operations inside containers."""
 
@@ -55,14 +103,32 @@ class FileSystemService:
 
         logger.info(f"Listing files in container {container_id[:12]} at path: {safe_path}")
 
+        result = self._docker_client.channel_request(container_id, "list_dir", path=safe_path)
+        if result is not None:
+            if not result.get("ok"):
+                logger.warning(f"Directory not found: {path}")
+                return []
+            files = [
+                FileInfo(
+                    name=entry["name"],
+                    path=entry["path"],
+                    is_directory=entry["is_directory"],
+                    size=entry["size"],
+                    permissions=entry["permissions"],
+                    mtime=entry.get("mtime"),
+                )
+                for entry in result.get("entries", [])
+            ]
+            logger.info(f"Found {len(files)} files in {safe_path}")
+            files.sort(key=lambda f: (not f.is_directory, f.name.lower()))
+            return files
+
         # Use ls with specific format for reliable parsing
         # -A: all except . and ..
-        # -l: long format
+        # -l: long format (exact byte sizes)
         # --time-style=+%s: unix timestamp
         quoted_path = shlex.quote(safe_path)
-        command = (
-            f"ls -Alh --time-style=+%s {quoted_path} 2>/dev/null || echo 'ERROR_DIR_NOT_FOUND'"
-        )
+        command = f"ls -Al --time-style=+%s {quoted_path} 2>/dev/null || echo 'ERROR_DIR_NOT_FOUND'"
 
         exit_code, output = self._docker_client.exec_command(container_id, command)
 
@@ -90,6 +156,181 @@ class FileSystemService:
         files.sort(key=lambda f: (not f.is_directory, f.name.lower()))
         return files
 
+    def list_tree(
+        self,
+        container_id: str,
+        path: str = "/workspace",
+        ignore: Sequence[str] | None = None,
+        since: float | None = None,
+        max_entries: int = DEFAULT_TREE_MAX_ENTRIES,
+    ) -> FileTree | None:
+        """
+        Recursively list a directory in one round trip.
+
+        Args:
+            container_id: Docker container ID
+            path: Root directory to walk (default: /workspace)
+            ignore: Directory names to list but not descend into
+                (default: DEFAULT_TREE_IGNORE)
+            since: Cursor from a previous FileTree; if set, only entries modified
+                after it are returned
+            max_entries: Stop after this many entries (FileTree.truncated is set)
+
+        Returns:
+            FileTree, or None if the directory does not exist or cannot be listed
+        """
+        safe_path = self._sanitize_path(path)
+        ignore = list(DEFAULT_TREE_IGNORE if ignore is None else ignore)
+
+        logger.info(
+            f"Listing tree in container {container_id[:12]} at path: {safe_path}"
+            + (f" (since {since})" if since is not None else "")
+        )
+
+        result = self._docker_client.channel_request(
+            container_id,
+            "walk_tree",
+            path=safe_path,
+            ignore=ignore,
+            since=since,
+            max_entries=max_entries,
+            cursor_slack=TREE_CURSOR_SLACK,
+        )
+        if result is not None:
+            if not result.get("ok"):
+                logger.warning(f"Directory not found: {path}")
+                return None
+            tree = FileTree(
+                root=safe_path,
+                entries=[
+                    FileInfo(
+                        name=entry["name"],
+                        path=entry["path"],
+                        is_directory=entry["is_directory"],
+                        size=entry["size"],
+                        permissions=entry["permissions"],
+                        mtime=entry.get("mtime"),
+                    )
+                    for entry in result.get("entries", [])
+                ],
+                cursor=result["cursor"],
+                children=result.get("children") or {},
+                pruned=result.get("pruned") or [],
+                truncated=bool(result.get("truncated")),
+            )
+        else:
+            tree = self._list_tree_with_find(container_id, safe_path, ignore, since, max_entries)
+            if tree is None:
+                return None
+
+        tree.entries.sort(key=lambda f: f.path)
+        logger.info(f"Found {len(tree.entries)} tree entries in {safe_path}")
+        return tree
+
+    def _list_tree_with_find(
+        self,
+        container_id: str,
+        safe_path: str,
+        ignore: list[str],
+        since: float | None,
+        max_entries: int,
+    ) -> FileTree | None:
+        """Fallback for list_tree when the exec channel is unavailable (GNU find)."""
+        quoted_path = shlex.quote(safe_path)
+        # NUL-terminated records: kind, type, size, mtime, ctime, mode, path.
+        # The first record is the container clock, used as the cursor.
+        fields = "%y\\t%s\\t%T@\\t%C@\\t%M\\t%p\\0"
+        prune = ""
+        if ignore:
+            names = " -o ".join(f"-name {shlex.quote(name)}" for name in ignore)
+            prune = (
+                f"\\( -type d \\( {names} \\) ! -path {quoted_path} "
+                f"-prune -printf 'P\\t{fields}' \\) -o "
+            )
+        command = (
+            f"[ -d {quoted_path} ] || {{ echo 'ERROR_DIR_NOT_FOUND'; exit 0; }}; "
+            "printf '%s\\0' \"$(date +%s.%N)\"; "
+            f"find {quoted_path} {prune}-printf 'E\\t{fields}'"
+        )
+
+        exit_code, output = self._docker_client.exec_command(container_id, command)
+
+        if exit_code == -1:
+            logger.error(f"Docker exec failed for list_tree: {output}")
+            return None
+
+        if "ERROR_DIR_NOT_FOUND" in output:
+            logger.warning(f"Directory not found: {safe_path}")
+            return None
+
+        records = output.split("\0")
+        try:
+            cursor = float(records[0]) - TREE_CURSOR_SLACK
+        except ValueError:
+            logger.error(f"Unexpected list_tree output: {output[:200]}")
+            return None
+
+        entries: list[FileInfo] = []
+        dir_mtimes: dict[str, float] = {}
+        children: dict[str, list[str]] = {}
+        pruned: list[str] = []
+        truncated = False
+        for record in records[1:]:
+            parts = record.split("\t", 6)
+            if len(parts) != 7:
+                continue
+            kind, file_type, size, mtime, ctime, permissions, file_path = parts
+            try:
+                mtime_value = float(mtime)
+                changed_at = max(mtime_value, float(ctime))
+            except ValueError:
+                continue
+
+            is_directory = file_type == "d"
+            if is_directory and kind == "E":
+                dir_mtimes[file_path] = mtime_value
+            if file_path == safe_path:
+                continue
+            if kind == "P":
+                pruned.append(file_path)
+
+            parent, name = posixpath.split(file_path)
+            children.setdefault(parent, []).append(name)
+            if since is not None and changed_at <= since:
+                continue
+            if truncated or (max_entries and len(entries) >= max_entries):
+                truncated = True
+                continue
+            entries.append(
+                FileInfo(
+                    name=name,
+                    path=file_path,
+                    is_directory=is_directory,
+                    size=self._parse_size(size),
+                    permissions=permissions,
+                    mtime=mtime_value,
+                )
+            )
+
+        if since is None:
+            children = {}
+        else:
+            # Only directories modified since the cursor can have lost entries
+            children = {
+                directory: children.get(directory, [])
+                for directory, mtime_value in dir_mtimes.items()
+                if mtime_value > since
+            }
+
+        return FileTree(
+            root=safe_path,
+            entries=entries,
+            cursor=cursor,
+            children=children,
+            pruned=pruned,
+            truncated=truncated,
+        )
+
     def read_file(self, container_id: str, path: str) -> str | None:
         """
         Read file content from container.
@@ -105,6 +346,19 @@ class FileSystemService:
 
         logger.info(f"Reading file in container {container_id[:12]}: {safe_path}")
 
+        result = self._docker_client.channel_request(container_id, "read_file", path=safe_path)
+        if result is not None:
+            if not result.get("ok"):
+                logger.warning(f"File not found or not readable: {path}")
+                return None
+            try:
+                content = base64.b64decode(result.get("data", "")).decode("utf-8")
+                logger.info(f"Successfully read file {safe_path} ({len(content)} chars)")
+                return content
+            except Exception as e:
+                logger.error(f"Failed to decode file content: {e}")
+                return None
+
         quoted_path = shlex.quote(safe_path)
         # Check if file exists and is readable
         check_cmd = f"test -f {quoted_path} && test -r {quoted_path} && echo 'OK' || echo 'ERROR'"
@@ -138,6 +392,191 @@ class FileSystemService:
             logger.error(f"Failed to decode file content: {e}")
             return None
 
+    def stat_file(self, container_id: str, path: str) -> FileStat | None:
+        """
+        Get size and modification time of a regular file.
+
+        Args:
+            container_id: Docker container ID
+            path: File path
+
+        Returns:
+            FileStat, or None if the path is not a regular file
+        """
+        safe_path = self._sanitize_path(path)
+
+        result = self._docker_client.channel_request(container_id, "stat_file", path=safe_path)
+        if result is not None:
+            if not result.get("ok"):
+                return None
+            return FileStat(
+                path=safe_path,
+                size=result["size"],
+                mtime=result["mtime"],
+                mtime_ns=result["mtime_ns"],
+            )
+
+        quoted_path = shlex.quote(safe_path)
+        command = f"find {quoted_path} -maxdepth 0 -type f -printf '%s %T@'"
+        exit_code, output = self._docker_client.exec_command(container_id, command)
+        if exit_code != 0 or not output.strip():
+            return None
+
+        try:
+            size, mtime = output.split()
+            # %T@ prints nanoseconds; Decimal keeps them exact so ETags match the channel's
+            mtime_ns = int(Decimal(mtime) * 1_000_000_000)
+            return FileStat(path=safe_path, size=int(size), mtime=float(mtime), mtime_ns=mtime_ns)
+        except (ValueError, InvalidOperation):
+            logger.error(f"Unexpected stat output for {safe_path}: {output[:200]}")
+            return None
+
+    def read_file_range(
+        self, container_id: str, path: str, offset: int, length: int
+    ) -> bytes | None:
+        """
+        Read up to `length` bytes starting at `offset`.
+
+        Args:
+            container_id: Docker container ID
+            path: File path to read
+            offset: First byte to read
+            length: Maximum number of bytes (keep to about FILE_CHUNK_SIZE)
+
+        Returns:
+            Bytes read (short at end of file), or None if the file cannot be read
+        """
+        safe_path = self._sanitize_path(path)
+
+        result = self._docker_client.channel_request(
+            container_id, "read_range", path=safe_path, offset=offset, length=length
+        )
+        if result is not None:
+            if not result.get("ok"):
+                logger.warning(f"File not found or not readable: {path}")
+                return None
+            return base64.b64decode(result.get("data", ""))
+
+        quoted_path = shlex.quote(safe_path)
+        command = (
+            f"[ -f {quoted_path} ] && [ -r {quoted_path} ] || "
+            "{ echo 'ERROR_FILE_NOT_FOUND'; exit 0; }; "
+            f"dd if={quoted_path} bs={FILE_CHUNK_SIZE} iflag=skip_bytes,count_bytes "
+            f"skip={int(offset)} count={int(length)} status=none | base64 -w0"
+        )
+        exit_code, output = self._docker_client.exec_command(container_id, command)
+
+        if exit_code != 0:
+            logger.error(f"Failed to read range of {path}: exit_code={exit_code}")
+            return None
+
+        if "ERROR_FILE_NOT_FOUND" in output:
+            logger.warning(f"File not found or not readable: {path}")
+            return None
+
+        try:
+            return base64.b64decode(output.strip())
+        except ValueError as e:
+            logger.error(f"Failed to decode file range: {e}")
+            return None
+
+    def iter_file_range(
+        self,
+        container_id: str,
+        path: str,
+        start: int,
+        length: int,
+        chunk_size: int = FILE_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Stream `length` bytes starting at `start`, one chunk per request.
+
+        Stops early if the file is shortened or becomes unreadable while streaming.
+        """
+        offset = start
+        end = start + length
+        while offset < end:
+            chunk = self.read_file_range(container_id, path, offset, min(chunk_size, end - offset))
+            if not chunk:
+                logger.warning(f"File {path} ended at byte {offset}, expected {end}")
+                return
+            yield chunk
+            offset += len(chunk)
+
+    def write_file_range(
+        self,
+        container_id: str,
+        path: str,
+        data: bytes,
+        offset: int = 0,
+        truncate: bool = False,
+    ) -> FileStat | None:
+        """
+        Write bytes at an offset, creating the file and parent directories if needed.
+
+        Args:
+            container_id: Docker container ID
+            path: File path to write
+            data: Bytes to write (keep to about FILE_CHUNK_SIZE)
+            offset: Position of the first byte
+            truncate: If True, cut the file to `offset` bytes before writing
+
+        Returns:
+            FileStat after the write, or None on failure
+        """
+        safe_path = self._sanitize_path(path)
+
+        result = self._docker_client.channel_request(
+            container_id,
+            "write_range",
+            path=safe_path,
+            data=base64.b64encode(data).decode("ascii"),
+            offset=offset,
+            truncate=truncate,
+        )
+        if result is not None:
+            if not result.get("ok"):
+                logger.error(f"Failed to write range of {path}: {result.get('error')}")
+                return None
+            return FileStat(
+                path=safe_path,
+                size=result["size"],
+                mtime=result["mtime"],
+                mtime_ns=result["mtime_ns"],
+            )
+
+        quoted_path = shlex.quote(safe_path)
+        quoted_dirname = shlex.quote(posixpath.dirname(safe_path))
+        if truncate:
+            prepare_cmd = f"mkdir -p {quoted_dirname} && truncate -s {int(offset)} {quoted_path}"
+        else:
+            prepare_cmd = (
+                f"mkdir -p {quoted_dirname} && {{ [ -e {quoted_path} ] || : > {quoted_path}; }}"
+            )
+        exit_code, output = self._docker_client.exec_command(container_id, prepare_cmd)
+        if exit_code != 0:
+            logger.error(
+                f"Failed to prepare {path} for writing: exit_code={exit_code}, output={output}"
+            )
+            return None
+
+        for start in range(0, len(data), EXEC_WRITE_CHUNK_SIZE):
+            piece = base64.b64encode(data[start : start + EXEC_WRITE_CHUNK_SIZE]).decode("ascii")
+            write_cmd = (
+                f"set -o pipefail; printf '%s' '{piece}' | base64 -d | "
+                f"dd of={quoted_path} bs={FILE_CHUNK_SIZE} seek={int(offset) + start} "
+                "oflag=seek_bytes conv=notrunc status=none"
+            )
+            exit_code, output = self._docker_client.exec_command(container_id, write_cmd)
+            if exit_code != 0:
+                logger.error(
+                    f"Failed to write range of {path}: exit_code={exit_code}, output={output[:200]}"
+                )
+                return None
+
+        self._docker_client.exec_command(container_id, "sync")
+        return self.stat_file(container_id, safe_path)
+
     def write_file(self, container_id: str, path: str, content: str) -> bool:
         """
         Write content to a file in the container.
@@ -159,6 +598,16 @@ class FileSystemService:
         # Encode content as base64 to safely handle special characters
         encoded_content = base64.b64encode(content.encode("utf-8")).decode("ascii")
 
+        result = self._docker_client.channel_request(
+            container_id, "write_file", path=safe_path, data=encoded_content
+        )
+        if result is not None:
+            if not result.get("ok"):
+                logger.error(f"Failed to write file {path}: {result.get('error')}")
+                return False
+            logger.info(f"File written successfully: {safe_path}")
+            return True
+
         # Create parent directory if needed, then write using base64 decode pipe to file
         # Split into multiple commands for reliability
         quoted_path = shlex.quote(safe_path)
@@ -404,6 +853,11 @@ class FileSystemService:
         except (ValueError, IndexError):
             size = 0
 
+        try:
+            mtime = float(parts[5])
+        except ValueError:
+            mtime = None
+
         # Name is the last part (may contain spaces, so join from index 6)
         name = " ".join(parts[6:])
 
@@ -423,6 +877,7 @@ class FileSystemService:
             is_directory=is_directory,
             size=size,
             permissions=permissions,
+            mtime=mtime,
         )
 
     def _parse_size(self, size_str: str) -> int:
@@ -24,6 +24,7 @@ from tenacity import (
 )
 
 from app.config import PROJECT_ROOT, settings
+from app.services.llm_telemetry import record_llm_usage, track_llm_call
 from app.services.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
@@ -54,6 +55,16 @@ def get_gemini_service() -> "GeminiService":
     return _gemini_service_instance
 
 
+def _record_vertex_usage(response: Any) -> None:
+    """Attribute a Vertex AI response's token counts to the current LLM call."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        record_llm_usage(
+            getattr(usage, "prompt_token_count", None),
+            getattr(usage, "candidates_token_count", None),
+        )
+
+
 class GeminiService:
     """Google Gemini service for high-quality content generation."""
 
@@ -190,31 +201,33 @@ class GeminiService:
         Returns:
             Generated response string
         """
-        # Acquire rate limit permission
-        await self.rate_limiter.acquire()
-
-        # Additional delay for better rate limit compliance
-        await asyncio.sleep(0.5)
-
-        # Use appropriate method based on authentication type
-        if self.use_service_account:
-            return await self._generate_with_vertex_ai(
-                user_query=user_query,
-                system_prompt=system_prompt,
-                context=context,
-                conversation_history=conversation_history,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-        else:
-            return await self._generate_with_retry(
-                user_query=user_query,
-                system_prompt=system_prompt,
-                context=context,
-                conversation_history=conversation_history,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
+        with track_llm_call("gemini", self.model) as call:
+            # Acquire rate limit permission
+            with call.queued():
+                await self.rate_limiter.acquire()
+
+                # Additional delay for better rate limit compliance
+                await asyncio.sleep(0.5)
+
+            # Use appropriate method based on authentication type
+            if self.use_service_account:
+                return await self._generate_with_vertex_ai(
+                    user_query=user_query,
+                    system_prompt=system_prompt,
+                    context=context,
+                    conversation_history=conversation_history,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+            else:
+                return await self._generate_with_retry(
+                    user_query=user_query,
+                    system_prompt=system_prompt,
+                    context=context,
+                    conversation_history=conversation_history,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
 
     @retry(
         stop=stop_after_attempt(5),  # More attempts for rate limits
@@ -321,6 +334,7 @@ class GeminiService:
 
             duration = time.time() - start_time
             logger.info(f"✅ Gemini (Vertex AI) response generated in {duration:.2f}s")
+            _record_vertex_usage(response)
             logger.debug(
                 f"   📝 Response length: {len(response.text) if hasattr(response, 'text') else 'N/A'} chars"
             )
@@ -456,6 +470,8 @@ class GeminiService:
 
             result = response.json()
             generated_text = result["candidates"][0]["content"]["parts"][0]["text"]
+            usage = result.get("usageMetadata") or {}
+            record_llm_usage(usage.get("promptTokenCount"), usage.get("candidatesTokenCount"))
 
             duration = time.time() - start_time
             logger.debug(f"✅ Gemini response generated in {duration:.2f}s")
@@ -486,19 +502,24 @@ class GeminiService:
                 "usage": dict | None  # Token usage info
             }
         """
-        # Acquire rate limit permission
-        await self.rate_limiter.acquire()
-        await asyncio.sleep(0.5)
-
         # Use Vertex AI for function calling (better support)
         if self.use_service_account:
-            return await self._generate_with_tools_vertex_ai(
-                messages=messages,
-                tools=tools,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
+            with track_llm_call("gemini", self.model) as call:
+                # Acquire rate limit permission
+                with call.queued():
+                    await self.rate_limiter.acquire()
+                    await asyncio.sleep(0.5)
+
+                return await self._generate_with_tools_vertex_ai(
+                    messages=messages,
+                    tools=tools,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
         else:
+            await self.rate_limiter.acquire()
+            await asyncio.sleep(0.5)
+
             # Direct API doesn't support function calling well, use Vertex AI method
             logger.warning(
                 "Function calling requires Vertex AI (service account). Falling back to basic generation."
@@ -650,6 +671,7 @@ class GeminiService:
             )
 
             duration = time.time() - start_time
+            _record_vertex_usage(response)
 
             # Parse response
             content = None
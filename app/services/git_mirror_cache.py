@@ -0,0 +1,165 @@
+"""
+Git Mirror Cache
+Host-side bare mirrors of remote repositories, shared by every workspace clone.
+
+Mirrors live in a Docker volume maintained by a long-running helper container
+(a bare clone of branches and tags once per remote, `git fetch` when stale). Workspace containers
+mount the volume read-only and clone with `--reference-if-able --dissociate`, so
+objects already in the mirror are copied locally instead of downloaded again: init time
+and egress no longer scale with repository history. Dissociating leaves no alternates
+behind, so a workspace repo stays intact when its container is recreated without the
+mirror mount (e.g. after mirrors are disabled).
+
+Mirrors are only ever fetched anonymously, so the shared volume never holds objects
+of private repositories; clones of private repos simply run without a reference.
+Mirrors are never garbage-collected (gc.auto=0) so a clone reading from one never
+races a repack.
+"""
+
+import hashlib
+import logging
+import shlex
+import threading
+import time
+
+from app.config import settings
+from app.services.docker_client import DockerClient, get_docker_client
+
+logger = logging.getLogger(__name__)
+
+MIRROR_VOLUME_NAME = "gitguide-git-mirrors"
+MIRROR_CONTAINER_NAME = "gitguide-git-mirror"
+# Where workspace containers mount the mirror volume (read-only)
+MIRROR_MOUNT_PATH = "/opt/gitguide/mirrors"
+# Seconds after a fetch during which a mirror is used without refreshing
+MIRROR_REFRESH_SECONDS = 300.0
+# Seconds before retrying a remote that could not be mirrored (private or unreachable)
+MIRROR_FAILURE_BACKOFF = 900.0
+# Refs kept in a mirror: branches and tags only, so GitHub's refs/pull/* (every
+# pull request ever opened, including forks' objects) is never downloaded
+MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+class GitMirrorCache:
+    """Maintains bare mirrors in a shared volume through a helper container."""
+
+    def __init__(self, docker_client: DockerClient | None = None):
+        self._docker = docker_client or get_docker_client()
+        self._fetched_at: dict[str, float] = {}
+        self._failed_at: dict[str, float] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._container_lock = threading.Lock()
+
+    @staticmethod
+    def mirror_key(repo_url: str) -> str:
+        """Stable directory name for a remote (credentials and `.git` suffix ignored)."""
+        url = repo_url.strip().rstrip("/")
+        if "://" in url and "@" in url.split("://", 1)[1].split("/", 1)[0]:
+            scheme, rest = url.split("://", 1)
+            url = f"{scheme}://{rest.split('@', 1)[1]}"
+        url = url.removesuffix(".git").lower()
+        return hashlib.sha1(url.encode()).hexdigest()[:20]
+
+    def reference_path(self, repo_url: str) -> str:
+        """Path of a remote's mirror as seen from workspace containers."""
+        return f"{MIRROR_MOUNT_PATH}/{self.mirror_key(repo_url)}.git"
+
+    def ensure_mirror(self, repo_url: str) -> str | None:
+        """
+        Create or refresh the mirror of a remote.
+
+        Args:
+            repo_url: Remote URL without credentials
+
+        Returns:
+            Reference path for workspace clones, or None if the remote can't be
+            mirrored (private, unreachable, or mirrors disabled)
+        """
+        if not settings.workspace_git_mirror_enabled:
+            return None
+
+        key = self.mirror_key(repo_url)
+        with self._locks_lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            now = time.monotonic()
+            if now - self._failed_at.get(key, -MIRROR_FAILURE_BACKOFF) < MIRROR_FAILURE_BACKOFF:
+                return None
+            if now - self._fetched_at.get(key, -MIRROR_REFRESH_SECONDS) < MIRROR_REFRESH_SECONDS:
+                return self.reference_path(repo_url)
+
+            container_id = self._ensure_container()
+            if container_id is None:
+                return None
+
+            started = time.monotonic()
+            exit_code, output = self._docker.exec_command(
+                container_id, self._build_sync_command(key, repo_url)
+            )
+            if exit_code != 0:
+                logger.info(f"Repository not mirrored ({repo_url}): {output.strip()[-200:]}")
+                self._failed_at[key] = time.monotonic()
+                return None
+
+            self._failed_at.pop(key, None)
+            self._fetched_at[key] = time.monotonic()
+            logger.info(
+                f"Mirror {key} synced from {repo_url} in {time.monotonic() - started:.1f}s "
+                f"({output.strip() or 'fetched'})"
+            )
+            return self.reference_path(repo_url)
+
+    @staticmethod
+    def _build_sync_command(key: str, repo_url: str) -> str:
+        """Shell script that clones or fetches a mirror under an exclusive lock."""
+        mirror = f"/workspace/{key}.git"
+        url = shlex.quote(repo_url)
+        refspecs = " ".join(shlex.quote(refspec) for refspec in MIRROR_REFSPECS)
+        return (
+            # Never prompt: a private repo must fail instead of waiting for credentials
+            "export GIT_TERMINAL_PROMPT=0 GIT_ASKPASS=/bin/false; "
+            f"exec 9>/workspace/{key}.lock && flock 9 && "
+            f"if [ -d {mirror} ]; then "
+            f"git -C {mirror} fetch --prune --quiet origin {refspecs} && echo fetched; "
+            "else "
+            f"rm -rf {mirror}.tmp && "
+            f"git clone --bare --quiet {url} {mirror}.tmp && "
+            f"git -C {mirror}.tmp config gc.auto 0 && "
+            f"mv {mirror}.tmp {mirror} && echo cloned; "
+            "fi"
+        )
+
+    def _ensure_container(self) -> str | None:
+        """Get the running helper container that owns the mirror volume, creating it if needed."""
+        with self._container_lock:
+            status = self._docker.get_container_status(MIRROR_CONTAINER_NAME)
+            if status == "running":
+                return MIRROR_CONTAINER_NAME
+            try:
+                if status == "not_found":
+                    # The mirror volume is the helper's /workspace
+                    self._docker.create_container(
+                        name=MIRROR_CONTAINER_NAME, volume_name=MIRROR_VOLUME_NAME
+                    )
+                success, _ = self._docker.start_container(MIRROR_CONTAINER_NAME)
+            except (RuntimeError, ValueError) as e:
+                logger.warning(f"⚠️ Git mirror container unavailable: {e}")
+                return None
+            if not success:
+                logger.warning("⚠️ Git mirror container failed to start")
+                return None
+            return MIRROR_CONTAINER_NAME
+
+
+# Singleton instance
+_git_mirror_cache: GitMirrorCache | None = None
+
+
+def get_git_mirror_cache() -> GitMirrorCache:
+    """Get or create the GitMirrorCache singleton."""
+    global _git_mirror_cache
+    if _git_mirror_cache is None:
+        _git_mirror_cache = GitMirrorCache()
+    return _git_mirror_cache
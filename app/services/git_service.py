@@ -6,12 +6,45 @@ Runs git commands inside Docker workspaces and returns structured results.
 import logging
 import re
 import shlex
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 
+from app.config import settings
 from app.services.docker_client import DockerClient, get_docker_client
+from app.services.git_mirror_cache import GitMirrorCache, get_git_mirror_cache
 
 logger = logging.getLogger(__name__)
 
+# Separator of LOG_GRAPH_FORMAT fields (ASCII unit separator: never part of a
+# subject, author or ref name, unlike "|")
+LOG_FIELD_SEPARATOR = "\x1f"
+# `git log` format with parents and ref names
+LOG_GRAPH_FORMAT = "%H%x1f%P%x1f%an%x1f%ae%x1f%ad%x1f%s%x1f%D"
+
+# Line prefix separating the sections of a git snapshot script's output
+SNAPSHOT_MARKER = "@@GITGUIDE_SNAPSHOT@@"
+# Maximum cached snapshots (one per container and panel view)
+SNAPSHOT_CACHE_MAX_ENTRIES = 256
+# Commit fields returned by git_log (the graph adds parents and branches)
+_LOG_FIELDS = ("sha", "author_name", "author_email", "date", "message")
+
+# (container_id, max_count, show_all, include_remote) -> (fingerprint, history sections)
+_snapshot_cache: OrderedDict[tuple, tuple[str, dict[str, object]]] = OrderedDict()
+_snapshot_cache_lock = threading.Lock()
+
+
+def invalidate_git_snapshot(container_id: str) -> None:
+    """
+    Drop cached git snapshots for a container.
+
+    Snapshots already revalidate against the repository fingerprint; this is for
+    callers that know history changed (e.g. a commit detected in the terminal).
+    """
+    with _snapshot_cache_lock:
+        for key in [k for k in _snapshot_cache if k[0] == container_id]:
+            del _snapshot_cache[key]
+
 
 @dataclass
 class GitCommandResult:
@@ -26,16 +59,38 @@ class GitCommandResult:
 class GitService:
     """Service wrapper for git operations inside workspace containers."""
 
-    def __init__(self, docker_client: DockerClient | None = None):
+    def __init__(
+        self,
+        docker_client: DockerClient | None = None,
+        mirror_cache: GitMirrorCache | None = None,
+    ):
         self._docker = docker_client or get_docker_client()
+        self._mirror_cache = mirror_cache
 
     def clone_repository(
-        self, container_id: str, repo_url: str, token: str | None = None
+        self,
+        container_id: str,
+        repo_url: str,
+        token: str | None = None,
+        depth: int | None = None,
+        filter_spec: str | None = None,
     ) -> dict[str, str]:
         """
         Clone repository into /workspace.
         If workspace is not empty but not a git repository, cleans it before cloning.
 
+        Objects are borrowed from the host-side mirror of the remote when one is
+        available (see git_mirror_cache.py); otherwise `filter_spec` makes a partial
+        clone that fetches file contents on demand.
+
+        Args:
+            container_id: Container ID
+            repo_url: Remote URL
+            token: Optional GitHub token for private repositories
+            depth: History depth (default: settings.workspace_clone_depth; None = full)
+            filter_spec: Partial clone filter, e.g. "blob:none"
+                (default: settings.workspace_clone_filter)
+
         Returns:
             {"status": "cloned" | "already_cloned", "message": str}
         """
@@ -79,11 +134,29 @@ class GitService:
                     "message": f"Failed to backup workspace before cloning: {backup_output}",
                 }
 
+        depth = depth if depth is not None else settings.workspace_clone_depth
+        filter_spec = filter_spec if filter_spec is not None else settings.workspace_clone_filter
+        mirror_cache = self._mirror_cache or get_git_mirror_cache()
+        reference = mirror_cache.ensure_mirror(repo_url)
+
+        clone_options = []
+        if reference:
+            # Skips silently if this container predates the mirror mount; --dissociate
+            # copies the borrowed objects so the repo never depends on the mount
+            clone_options.append(f"--reference-if-able {shlex.quote(reference)} --dissociate")
+        elif filter_spec:
+            clone_options.append(f"--filter={shlex.quote(filter_spec)}")
+        if depth:
+            clone_options.append(f"--depth {int(depth)}")
+
         # Clone into a temporary directory, then move contents to /workspace
         # Git clone doesn't work well with . as target, so we clone to a temp dir first
         temp_dir = "/tmp/git-clone-temp"
         # Clone to temp directory
-        clone_cmd = f"rm -rf {temp_dir} && git clone {shlex.quote(auth_url)} {temp_dir}"
+        clone_cmd = (
+            f"rm -rf {temp_dir} && "
+            f"git clone {' '.join(clone_options)} {shlex.quote(auth_url)} {temp_dir}"
+        )
         exit_code, output = self._exec(container_id, clone_cmd)
         if exit_code != 0:
             return {"status": "error", "message": output}
@@ -108,76 +181,7 @@ class GitService:
         if exit_code != 0:
             return {"success": False, "error": output}
 
-        lines = [line for line in output.splitlines() if line.strip()]
-        branch_info = {}
-        modified: list[str] = []
-        staged: list[str] = []
-        untracked: list[str] = []
-        deleted: list[str] = []
-        conflicts: list[str] = []
-
-        if lines and lines[0].startswith("##"):
-            branch_info = self._parse_branch_info(lines[0])
-            lines = lines[1:]
-
-        for line in lines:
-            if line.startswith("??"):
-                untracked.append(line[3:].strip())
-                continue
-
-            if len(line) < 3:
-                continue
-
-            index_status = line[0]
-            worktree_status = line[1]
-            path = line[3:].strip()
-
-            # Handle conflicts first
-            if index_status in {"U", "A", "D", "M", "R", "C"} and worktree_status in {
-                "U",
-                "A",
-                "D",
-                "M",
-            }:
-                conflicts.append(path)
-                continue
-
-            # Track deleted files separately
-            # " D" = deleted in working tree (unstaged deletion)
-            # "D " = deleted in index (staged deletion)
-            # "DD" = deleted in both (conflict - already handled above)
-            is_deleted = False
-            if worktree_status == "D" and index_status == " ":
-                # Deleted in working tree, not staged
-                deleted.append(path)
-                modified.append(path)  # Also add to modified for backward compatibility
-                is_deleted = True
-            elif index_status == "D" and worktree_status == " ":
-                # Deleted in index (staged)
-                deleted.append(path)
-                staged.append(path)
-                is_deleted = True
-
-            # Track staged changes (non-deleted files)
-            if not is_deleted and index_status != " ":
-                staged.append(path)
-
-            # Track modified changes (non-deleted files)
-            if not is_deleted and worktree_status != " ":
-                modified.append(path)
-
-        return {
-            "success": True,
-            "branch": branch_info.get("branch"),
-            "ahead": branch_info.get("ahead", 0),
-            "behind": branch_info.get("behind", 0),
-            "modified": sorted(set(modified)),
-            "staged": sorted(set(staged)),
-            "untracked": sorted(set(untracked)),
-            "deleted": sorted(set(deleted)),
-            "conflicts": sorted(set(conflicts)),
-            "raw": output,
-        }
+        return self._parse_status_output(output)
 
     def git_diff(
         self,
@@ -570,7 +574,7 @@ class GitService:
             max_count: Maximum number of commits to return
             show_all: If True, show all branches (including remote). If False, only show commits reachable from HEAD.
         """
-        format_spec = "%H%x7C%P%x7C%an%x7C%ae%x7C%ad%x7C%s%x7C%D"
+        format_spec = LOG_GRAPH_FORMAT
         # Use --all only if show_all is True, otherwise just show HEAD (current branch and its history)
         all_flag = "--all" if show_all else "HEAD"
         cmd = (
@@ -581,45 +585,78 @@ class GitService:
         if exit_code != 0:
             return {"success": False, "error": output}
 
-        commits = []
-        branches = {}
-        for line in output.splitlines():
-            parts = line.split("|", 6)
-            if len(parts) < 6:
-                continue
+        return self._parse_log_graph_output(output)
 
-            sha = parts[0]
-            parents = [p.strip() for p in parts[1].split() if p.strip()] if parts[1] else []
-            refs = parts[6] if len(parts) > 6 else ""
+    def git_snapshot(
+        self,
+        container_id: str,
+        max_count: int = 50,
+        show_all: bool = False,
+        include_remote: bool = False,
+    ) -> dict[str, object]:
+        """
+        Collect everything the git panel shows (status, conflicts, branches, log and
+        graph) in a single exec.
 
-            # Parse branch/tag names from refs
-            branch_names = []
-            if refs:
-                # Extract branch names from refs like "HEAD -> main, origin/main, tag: v1.0"
-                import re
+        Status and conflicts are always fresh. Branches and history are only recomputed
+        when the repository fingerprint (mtimes of .git/HEAD, packed-refs and refs/)
+        differs from the cached snapshot's.
 
-                branch_matches = re.findall(r"(?:HEAD -> |origin/)?([^,]+)", refs)
-                branch_names = [
-                    b.strip() for b in branch_matches if b.strip() and not b.startswith("tag:")
-                ]
+        Args:
+            container_id: Container ID
+            max_count: Maximum number of commits for the log and graph
+            show_all: If True, include commits from all branches
+            include_remote: If True, include remote branches in the branch list
 
-            commit_data = {
-                "sha": sha,
-                "parents": parents,
-                "author_name": parts[2],
-                "author_email": parts[3],
-                "date": parts[4],
-                "message": parts[5],
-                "branches": branch_names,
-            }
-            commits.append(commit_data)
+        Returns:
+            {"success": True, "status": {...}, "conflicts": {...}, "branches": {...},
+             "commits": {...}, "graph": {...}, "fingerprint": str, "cached": bool}
+            where each section matches the single-purpose method's result.
+        """
+        key = (container_id, int(max_count), show_all, include_remote)
+        with _snapshot_cache_lock:
+            cached = _snapshot_cache.get(key)
 
-            # Track branch heads
-            for branch in branch_names:
-                if branch not in branches or sha not in [c["sha"] for c in commits]:
-                    branches[branch] = sha
+        cmd = self._build_snapshot_command(
+            max_count, show_all, include_remote, known_fingerprint=cached[0] if cached else None
+        )
+        exit_code, output = self._exec(container_id, cmd)
+        sections, fingerprint = self._split_snapshot_output(output)
 
-        return {"success": True, "commits": commits, "branches": branches}
+        if "status" not in sections:
+            return {"success": False, "error": output or "Failed to read git snapshot"}
+        status_exit, status_output = sections["status"]
+        if status_exit != 0:
+            return {"success": False, "error": status_output}
+
+        status = self._parse_status_output(status_output)
+        conflicts = self._parse_conflicts(status_output)
+
+        if "log" not in sections and cached and fingerprint == cached[0]:
+            history = cached[1]
+            from_cache = True
+        else:
+            history = self._parse_snapshot_history(sections, include_remote)
+            from_cache = False
+            if fingerprint:
+                with _snapshot_cache_lock:
+                    _snapshot_cache[key] = (fingerprint, history)
+                    _snapshot_cache.move_to_end(key)
+                    while len(_snapshot_cache) > SNAPSHOT_CACHE_MAX_ENTRIES:
+                        _snapshot_cache.popitem(last=False)
+
+        return {
+            "success": True,
+            "status": status,
+            "conflicts": {
+                "success": True,
+                "has_conflicts": len(conflicts) > 0,
+                "conflicts": conflicts,
+            },
+            **history,
+            "fingerprint": fingerprint,
+            "cached": from_cache,
+        }
 
     def git_list_branches(
         self, container_id: str, include_remote: bool = False
@@ -634,23 +671,7 @@ class GitService:
         if exit_code != 0:
             return {"success": False, "error": output}
 
-        branches = []
-        current = None
-        for line in output.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith("*"):
-                current = line[1:].strip()
-                branches.append({"name": current, "current": True})
-            else:
-                name = (
-                    line.replace("remotes/", "").replace("origin/", "") if include_remote else line
-                )
-                if name not in [b["name"] for b in branches]:
-                    branches.append({"name": name, "current": False})
-
-        return {"success": True, "branches": branches, "current": current}
+        return self._parse_branch_list_output(output, include_remote)
 
     def git_create_branch(
         self, container_id: str, branch_name: str, start_point: str | None = None
@@ -780,21 +801,7 @@ class GitService:
         status_cmd = "git status --porcelain=v1"
         status_exit, status_output = self._exec(container_id, status_cmd)
 
-        conflicts = []
-        if status_exit == 0:
-            for line in status_output.splitlines():
-                if len(line) >= 2:
-                    index_status = line[0]
-                    worktree_status = line[1]
-                    if index_status in {"U", "A", "D", "M"} and worktree_status in {
-                        "U",
-                        "A",
-                        "D",
-                        "M",
-                    }:
-                        file_path = line[3:].strip()
-                        conflicts.append(file_path)
-
+        conflicts = self._parse_conflicts(status_output) if status_exit == 0 else []
         return {"success": True, "has_conflicts": len(conflicts) > 0, "conflicts": conflicts}
 
     def git_get_conflict_content(self, container_id: str, file_path: str) -> dict[str, str]:
@@ -1103,6 +1110,257 @@ class GitService:
     def _redact_token(repo_url: str) -> str:
         return re.sub(r"(https?://)([^@]+)@", r"\1***@", repo_url)
 
+    @staticmethod
+    def _build_snapshot_command(
+        max_count: int,
+        show_all: bool,
+        include_remote: bool,
+        known_fingerprint: str | None = None,
+    ) -> str:
+        """
+        Build the shell script behind git_snapshot.
+
+        Each section is introduced by a SNAPSHOT_MARKER line and closed by a marker
+        line carrying the command's exit code. Branches and log are skipped when the
+        fingerprint equals known_fingerprint.
+        """
+        branch_cmd = "git branch --list -a" if include_remote else "git branch --list"
+        all_flag = "--all" if show_all else "HEAD"
+        log_cmd = (
+            f"git log {all_flag} --max-count={int(max_count)} "
+            f"--pretty=format:{LOG_GRAPH_FORMAT} --date=iso --decorate"
+        )
+        # Only refs: the index changes with staging (and `git status` refreshes it),
+        # neither of which affects branches or history
+        fingerprint_cmd = (
+            "find .git/HEAD .git/packed-refs .git/refs -printf '%p %T@\\n' "
+            "2>/dev/null | md5sum | cut -c1-32"
+        )
+        return (
+            f"section() {{ printf '\\n%s %s\\n' {SNAPSHOT_MARKER} \"$1\"; }}; "
+            'section status; git status --porcelain=v1 -b 2>&1; section "exit $?"; '
+            f"fp=$({fingerprint_cmd}); "
+            'section "fingerprint $fp"; '
+            f'if [ "$fp" != {shlex.quote(known_fingerprint or "")} ]; then '
+            f'section branches; {branch_cmd} 2>&1; section "exit $?"; '
+            f'section log; {log_cmd} 2>&1; section "exit $?"; '
+            "fi"
+        )
+
+    @staticmethod
+    def _split_snapshot_output(output: str) -> tuple[dict[str, tuple[int, str]], str | None]:
+        """
+        Split git snapshot output into sections.
+
+        Returns:
+            ({section_name: (exit_code, output)}, fingerprint)
+        """
+        sections: dict[str, tuple[int, str]] = {}
+        fingerprint = None
+        current = None
+        lines: list[str] = []
+        for line in output.splitlines():
+            if not line.startswith(SNAPSHOT_MARKER):
+                lines.append(line)
+                continue
+
+            tag = line[len(SNAPSHOT_MARKER) :].strip()
+            if tag.startswith("exit "):
+                if current:
+                    try:
+                        exit_code = int(tag[len("exit ") :])
+                    except ValueError:
+                        exit_code = 1
+                    sections[current] = (exit_code, "\n".join(lines).strip("\n"))
+                current = None
+            elif tag.startswith("fingerprint"):
+                fingerprint = tag[len("fingerprint") :].strip() or None
+            else:
+                current = tag
+            lines = []
+        return sections, fingerprint
+
+    @classmethod
+    def _parse_snapshot_history(
+        cls, sections: dict[str, tuple[int, str]], include_remote: bool
+    ) -> dict[str, object]:
+        """Build the branches/commits/graph parts of a git snapshot."""
+        branch_exit, branch_output = sections.get("branches", (1, "Branch list missing"))
+        if branch_exit == 0:
+            branches = cls._parse_branch_list_output(branch_output, include_remote)
+        else:
+            branches = {"success": False, "error": branch_output}
+
+        log_exit, log_output = sections.get("log", (1, "Commit log missing"))
+        if log_exit != 0:
+            error = {"success": False, "error": log_output}
+            return {"branches": branches, "commits": error, "graph": error}
+
+        graph = cls._parse_log_graph_output(log_output)
+        # The plain commit list is the graph without parents/branch decorations
+        commits = [{field: c[field] for field in _LOG_FIELDS} for c in graph["commits"]]
+        return {
+            "branches": branches,
+            "commits": {"success": True, "commits": commits},
+            "graph": graph,
+        }
+
+    @classmethod
+    def _parse_status_output(cls, output: str) -> dict[str, object]:
+        """Parse `git status --porcelain=v1 -b` output."""
+        lines = [line for line in output.splitlines() if line.strip()]
+        branch_info = {}
+        modified: list[str] = []
+        staged: list[str] = []
+        untracked: list[str] = []
+        deleted: list[str] = []
+        conflicts: list[str] = []
+
+        if lines and lines[0].startswith("##"):
+            branch_info = cls._parse_branch_info(lines[0])
+            lines = lines[1:]
+
+        for line in lines:
+            if line.startswith("??"):
+                untracked.append(line[3:].strip())
+                continue
+
+            if len(line) < 3:
+                continue
+
+            index_status = line[0]
+            worktree_status = line[1]
+            path = line[3:].strip()
+
+            # Handle conflicts first
+            if index_status in {"U", "A", "D", "M", "R", "C"} and worktree_status in {
+                "U",
+                "A",
+                "D",
+                "M",
+            }:
+                conflicts.append(path)
+                continue
+
+            # Track deleted files separately
+            # " D" = deleted in working tree (unstaged deletion)
+            # "D " = deleted in index (staged deletion)
+            # "DD" = deleted in both (conflict - already handled above)
+            is_deleted = False
+            if worktree_status == "D" and index_status == " ":
+                # Deleted in working tree, not staged
+                deleted.append(path)
+                modified.append(path)  # Also add to modified for backward compatibility
+                is_deleted = True
+            elif index_status == "D" and worktree_status == " ":
+                # Deleted in index (staged)
+                deleted.append(path)
+                staged.append(path)
+                is_deleted = True
+
+            # Track staged changes (non-deleted files)
+            if not is_deleted and index_status != " ":
+                staged.append(path)
+
+            # Track modified changes (non-deleted files)
+            if not is_deleted and worktree_status != " ":
+                modified.append(path)
+
+        return {
+            "success": True,
+            "branch": branch_info.get("branch"),
+            "ahead": branch_info.get("ahead", 0),
+            "behind": branch_info.get("behind", 0),
+            "modified": sorted(set(modified)),
+            "staged": sorted(set(staged)),
+            "untracked": sorted(set(untracked)),
+            "deleted": sorted(set(deleted)),
+            "conflicts": sorted(set(conflicts)),
+            "raw": output,
+        }
+
+    @staticmethod
+    def _parse_log_graph_output(output: str) -> dict[str, object]:
+        """Parse `git log` output produced with LOG_GRAPH_FORMAT."""
+        commits = []
+        branches = {}
+        for line in output.splitlines():
+            parts = line.split(LOG_FIELD_SEPARATOR, 6)
+            if len(parts) < 6:
+                continue
+
+            sha = parts[0]
+            parents = [p.strip() for p in parts[1].split() if p.strip()] if parts[1] else []
+            refs = parts[6] if len(parts) > 6 else ""
+
+            # Parse branch/tag names from refs
+            branch_names = []
+            if refs:
+                # Extract branch names from refs like "HEAD -> main, origin/main, tag: v1.0"
+                branch_matches = re.findall(r"(?:HEAD -> |origin/)?([^,]+)", refs)
+                branch_names = [
+                    b.strip() for b in branch_matches if b.strip() and not b.startswith("tag:")
+                ]
+
+            commit_data = {
+                "sha": sha,
+                "parents": parents,
+                "author_name": parts[2],
+                "author_email": parts[3],
+                "date": parts[4],
+                "message": parts[5],
+                "branches": branch_names,
+            }
+            commits.append(commit_data)
+
+            # Track branch heads
+            for branch in branch_names:
+                if branch not in branches or sha not in [c["sha"] for c in commits]:
+                    branches[branch] = sha
+
+        return {"success": True, "commits": commits, "branches": branches}
+
+    @staticmethod
+    def _parse_branch_list_output(output: str, include_remote: bool) -> dict[str, object]:
+        """Parse `git branch --list` output."""
+        branches = []
+        current = None
+        for line in output.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("*"):
+                current = line[1:].strip()
+                branches.append({"name": current, "current": True})
+            else:
+                name = (
+                    line.replace("remotes/", "").replace("origin/", "") if include_remote else line
+                )
+                if name not in [b["name"] for b in branches]:
+                    branches.append({"name": name, "current": False})
+
+        return {"success": True, "branches": branches, "current": current}
+
+    @staticmethod
+    def _parse_conflicts(status_output: str) -> list[str]:
+        """Extract conflicted paths from `git status --porcelain=v1` output."""
+        conflicts = []
+        for line in status_output.splitlines():
+            if line.startswith("##"):
+                continue
+            if len(line) >= 2:
+                index_status = line[0]
+                worktree_status = line[1]
+                if index_status in {"U", "A", "D", "M"} and worktree_status in {
+                    "U",
+                    "A",
+                    "D",
+                    "M",
+                }:
+                    file_path = line[3:].strip()
+                    conflicts.append(file_path)
+        return conflicts
+
     @staticmethod
     def _parse_branch_info(line: str) -> dict[str, object]:
         # Example: "## main...origin/main [ahead 1, behind 2]"
@@ -15,6 +15,7 @@ from tenacity import (
 )
 
 from app.config import settings
+from app.services.llm_telemetry import record_llm_usage, track_llm_call
 from app.services.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
@@ -111,21 +112,23 @@ class GroqService:
             conversation_history: Conversation history
             temperature: LLM temperature (0.0-2.0, None uses default 0.7)
         """
-        # Acquire rate limit permission (includes minimum delay)
-        await self.rate_limiter.acquire()
-
-        # Additional delay for better rate limit compliance
-        # This ensures we don't hit limits even with burst requests
-        await asyncio.sleep(0.5)  # 500ms additional buffer
-
-        # Retry logic with exponential backoff
-        return await self._generate_with_retry(
-            user_query=user_query,
-            system_prompt=system_prompt,
-            context=context,
-            conversation_history=conversation_history,
-            temperature=temperature,
-        )
+        with track_llm_call("groq", self.model) as call:
+            # Acquire rate limit permission (includes minimum delay)
+            with call.queued():
+                await self.rate_limiter.acquire()
+
+                # Additional delay for better rate limit compliance
+                # This ensures we don't hit limits even with burst requests
+                await asyncio.sleep(0.5)  # 500ms additional buffer
+
+            # Retry logic with exponential backoff
+            return await self._generate_with_retry(
+                user_query=user_query,
+                system_prompt=system_prompt,
+                context=context,
+                conversation_history=conversation_history,
+                temperature=temperature,
+            )
 
     @retry(
         stop=stop_after_attempt(3),
@@ -260,6 +263,7 @@ class GroqService:
             # Log usage info if available
             if "usage" in result:
                 usage = result["usage"]
+                record_llm_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
                 logger.debug(
                     f"   Token usage: prompt={usage.get('prompt_tokens', 0)}, "
                     f"completion={usage.get('completion_tokens', 0)}, "
@@ -297,19 +301,21 @@ class GroqService:
                 "usage": dict | None  # Token usage info
             }
         """
-        # Acquire rate limit permission
-        await self.rate_limiter.acquire()
-
-        # Additional delay for rate limit compliance
-        await asyncio.sleep(0.5)
-
-        # Retry logic with exponential backoff
-        return await self._generate_with_tools_retry(
-            messages=messages,
-            tools=tools,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        with track_llm_call("groq", self.model) as call:
+            # Acquire rate limit permission
+            with call.queued():
+                await self.rate_limiter.acquire()
+
+                # Additional delay for rate limit compliance
+                await asyncio.sleep(0.5)
+
+            # Retry logic with exponential backoff
+            return await self._generate_with_tools_retry(
+                messages=messages,
+                tools=tools,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
 
     @retry(
         stop=stop_after_attempt(5),  # More attempts for rate limits
@@ -444,6 +450,7 @@ class GroqService:
 
                 # Log usage info if available
                 if usage:
+                    record_llm_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
                     logger.debug(
                         f"   Token usage: prompt={usage.get('prompt_tokens', 0)}, "
                         f"completion={usage.get('completion_tokens', 0)}, "
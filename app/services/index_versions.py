@@ -0,0 +1,130 @@
+"""
+Versioned project indexes.
+
+Every run of the embedding pipeline writes a project's chunks (Supabase) and
+points (Qdrant) tagged with a new index version. Searches filter on the
+project's active version (projects.index_version). Re-embedding therefore
+never returns a mix of old and new vectors: the switch happens when the
+pipeline activates the new version after its upsert completed.
+
+Superseded versions, and legacy untagged points, are garbage-collected in the
+background after a grace period. Readers that still hold the previous version
+in their cache keep finding its points until then.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from app.core.supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Active versions are cached per process and re-read after this many seconds
+INDEX_VERSION_CACHE_TTL_SECONDS = 30
+# Superseded versions are deleted this long after activation (> cache TTL, so
+# readers in other processes never lose their version mid-request)
+INDEX_GC_GRACE_SECONDS = 120
+
+# project_id -> (active version or None, time read)
+_active_versions: dict[str, tuple[int | None, float]] = {}
+_versions_lock = threading.Lock()
+# Pending garbage collections, kept referenced until they finish
+_gc_tasks: set[asyncio.Task] = set()
+
+
+def new_index_version() -> int:
+    """A new, increasing index version (milliseconds since the epoch)."""
+    return int(time.time() * 1000)
+
+
+def get_active_index_version(project_id: str) -> int | None:
+    """
+    Get the active index version of a project.
+
+    Returns:
+        Active version, or None for projects indexed before versioning (search
+        then matches all of the project's points)
+    """
+    now = time.time()
+    with _versions_lock:
+        cached = _active_versions.get(project_id)
+    if cached is not None and now - cached[1] < INDEX_VERSION_CACHE_TTL_SECONDS:
+        return cached[0]
+
+    version = None
+    try:
+        response = (
+            get_supabase_client()
+            .table("projects")
+            .select("index_version")
+            .eq("project_id", project_id)
+            .execute()
+        )
+        if response.data:
+            version = response.data[0].get("index_version")
+    except Exception as e:
+        logger.debug(f"Could not read index version of project {project_id}: {e}")
+        # Keep serving the last known version rather than unfiltered results
+        return cached[0] if cached is not None else None
+
+    with _versions_lock:
+        _active_versions[project_id] = (version, now)
+    return version
+
+
+def activate_index_version(project_id: str, version: int) -> None:
+    """Make `version` the version searches of a project filter on."""
+    get_supabase_client().table("projects").update({"index_version": version}).eq(
+        "project_id", project_id
+    ).execute()
+    with _versions_lock:
+        _active_versions[project_id] = (version, time.time())
+    logger.info(f"✅ Activated index version {version} for project_id={project_id}")
+
+
+def forget_index_version(project_id: str) -> None:
+    """Drop the cached version of a project (e.g. after it was deleted)."""
+    with _versions_lock:
+        _active_versions.pop(project_id, None)
+
+
+async def collect_stale_versions(
+    project_id: str, version: int, delay: float = INDEX_GC_GRACE_SECONDS
+) -> None:
+    """
+    Delete a project's points and chunks of every version except `version`.
+
+    Args:
+        project_id: Project ID
+        version: Active version to keep
+        delay: Grace period before deleting, in seconds
+    """
+    from app.services.qdrant_service import get_qdrant_service
+
+    await asyncio.sleep(delay)
+    loop = asyncio.get_event_loop()
+    try:
+        await loop.run_in_executor(
+            None, get_qdrant_service().delete_stale_versions, project_id, version
+        )
+        await loop.run_in_executor(None, _delete_stale_chunks, project_id, version)
+        logger.info(f"🗑️  Collected index versions before {version} of project_id={project_id}")
+    except Exception as e:
+        # Left for the next re-index of the project, which collects them too
+        logger.warning(f"⚠️  Failed to collect stale index versions of {project_id}: {e}")
+
+
+def _delete_stale_chunks(project_id: str, version: int) -> None:
+    get_supabase_client().table("project_chunks").delete().eq("project_id", project_id).or_(
+        f"index_version.is.null,index_version.neq.{version}"
+    ).execute()
+
+
+def schedule_stale_version_gc(project_id: str, version: int) -> asyncio.Task:
+    """Run `collect_stale_versions` in the background."""
+    task = asyncio.create_task(collect_stale_versions(project_id, version))
+    _gc_tasks.add(task)
+    task.add_done_callback(_gc_tasks.discard)
+    return task
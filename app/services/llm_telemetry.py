@@ -0,0 +1,308 @@
+"""
+LLM Call Telemetry
+One instrumentation layer for every LLM call (Gemini, Groq, Azure OpenAI and the
+PydanticAI helpers).
+
+Each call records its provider, model, the graph node it ran in, prompt/completion
+tokens, the time spent waiting in the rate limiter and its wall time. Records are
+kept in an in-process ring buffer (recent calls) and aggregated into counters and
+histograms exported in the Prometheus text format (see app/api/llm_telemetry.py).
+
+Usage:
+    with track_llm_call("groq", model) as call:
+        with call.queued():
+            await rate_limiter.acquire()
+        ...
+        record_llm_usage(prompt_tokens, completion_tokens)  # from any nested call
+
+The node is taken from the enclosing `llm_node(...)` scope; roadmap graph nodes
+are wrapped in one by `instrument_node`.
+"""
+
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Recent calls kept for the ring buffer endpoint
+LLM_CALL_BUFFER_SIZE = 500
+# Histogram buckets (seconds) for wall time and rate-limiter queue wait
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+# Node label for calls made outside any llm_node scope
+UNSCOPED_NODE = "unscoped"
+
+
+@dataclass
+class LLMCallRecord:
+    """One LLM call."""
+
+    provider: str
+    model: str
+    node: str
+    started_at: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    queue_wait_ms: float = 0.0
+    wall_ms: float = 0.0
+    success: bool = True
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class NodeUsage:
+    """Token usage and time of all LLM calls inside one llm_node scope."""
+
+    node: str
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    wall_ms: float = 0.0
+
+    @property
+    def token_usage(self) -> dict[str, int]:
+        """Token counts in the evaluation collector's `token_usage` format."""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.prompt_tokens + self.completion_tokens,
+        }
+
+    @property
+    def latency_ms(self) -> int:
+        return int(self.wall_ms)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(LLM_LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(LLM_LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+@dataclass
+class _Series:
+    calls: int = 0
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    wall: _Histogram = field(default_factory=_Histogram)
+    queue_wait: _Histogram = field(default_factory=_Histogram)
+
+
+class LLMTelemetry:
+    """Ring buffer and Prometheus aggregates of LLM calls."""
+
+    def __init__(self, buffer_size: int = LLM_CALL_BUFFER_SIZE):
+        self._calls: deque[LLMCallRecord] = deque(maxlen=buffer_size)
+        self._series: dict[tuple[str, str, str], _Series] = {}
+        self._lock = threading.Lock()
+
+    def record(self, call: LLMCallRecord) -> None:
+        with self._lock:
+            self._calls.append(call)
+            series = self._series.setdefault((call.provider, call.model, call.node), _Series())
+            series.calls += 1
+            series.errors += 0 if call.success else 1
+            series.prompt_tokens += call.prompt_tokens
+            series.completion_tokens += call.completion_tokens
+            series.wall.observe(call.wall_ms / 1000)
+            series.queue_wait.observe(call.queue_wait_ms / 1000)
+
+    def recent_calls(
+        self, limit: int = 100, node: str | None = None, provider: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Most recent calls first, optionally filtered by node/provider."""
+        with self._lock:
+            calls = list(self._calls)
+        matching = [
+            call.to_dict()
+            for call in reversed(calls)
+            if (node is None or call.node == node)
+            and (provider is None or call.provider == provider)
+        ]
+        return matching[:limit]
+
+    def render_prometheus(self) -> str:
+        """All aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            series = sorted(self._series.items())
+            lines = [
+                "# HELP llm_calls_total LLM calls by outcome.",
+                "# TYPE llm_calls_total counter",
+            ]
+            for key, s in series:
+                labels = _labels(key)
+                lines.append(f'llm_calls_total{{{labels},status="ok"}} {s.calls - s.errors}')
+                lines.append(f'llm_calls_total{{{labels},status="error"}} {s.errors}')
+
+            lines += [
+                "# HELP llm_tokens_total Prompt and completion tokens.",
+                "# TYPE llm_tokens_total counter",
+            ]
+            for key, s in series:
+                labels = _labels(key)
+                lines.append(f'llm_tokens_total{{{labels},kind="prompt"}} {s.prompt_tokens}')
+                lines.append(
+                    f'llm_tokens_total{{{labels},kind="completion"}} {s.completion_tokens}'
+                )
+
+            for name, help_text, attr in (
+                ("llm_call_duration_seconds", "Wall time of LLM calls.", "wall"),
+                ("llm_queue_wait_seconds", "Time spent waiting in the rate limiter.", "queue_wait"),
+            ):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for key, s in series:
+                    labels = _labels(key)
+                    hist = getattr(s, attr)
+                    for bound, count in zip(LLM_LATENCY_BUCKETS, hist.counts, strict=True):
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                    lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: tuple[str, str, str]) -> str:
+    provider, model, node = key
+    return f'provider="{_escape(provider)}",model="{_escape(model)}",node="{_escape(node)}"'
+
+
+# Singleton instance
+_telemetry: LLMTelemetry | None = None
+
+
+def get_llm_telemetry() -> LLMTelemetry:
+    """Get or create the process-wide LLM telemetry."""
+    global _telemetry
+    if _telemetry is None:
+        _telemetry = LLMTelemetry()
+    return _telemetry
+
+
+_current_node: ContextVar[NodeUsage | None] = ContextVar("llm_node", default=None)
+_current_call: ContextVar["LLMCallTracker | None"] = ContextVar("llm_call", default=None)
+
+
+class LLMCallTracker:
+    """Handle of an in-flight call; see `track_llm_call`."""
+
+    def __init__(self, record: LLMCallRecord):
+        self.record = record
+
+    @contextmanager
+    def queued(self) -> Iterator[None]:
+        """Measure time spent waiting for the rate limiter."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record.queue_wait_ms += (time.perf_counter() - start) * 1000
+
+    def add_usage(self, prompt_tokens: int | None, completion_tokens: int | None) -> None:
+        self.record.prompt_tokens += prompt_tokens or 0
+        self.record.completion_tokens += completion_tokens or 0
+
+
+@contextmanager
+def track_llm_call(provider: str, model: str) -> Iterator[LLMCallTracker]:
+    """
+    Record one LLM call (including retries made inside the block).
+
+    Args:
+        provider: Provider name (gemini, groq, azure_openai, google-vertex, ...)
+        model: Model or deployment name
+
+    Yields:
+        LLMCallTracker for queue wait and token usage
+    """
+    scope = _current_node.get()
+    tracker = LLMCallTracker(
+        LLMCallRecord(
+            provider=provider,
+            model=model,
+            node=scope.node if scope else UNSCOPED_NODE,
+            started_at=time.time(),
+        )
+    )
+    token = _current_call.set(tracker)
+    start = time.perf_counter()
+    try:
+        yield tracker
+    except BaseException as e:
+        tracker.record.success = False
+        tracker.record.error = type(e).__name__
+        raise
+    finally:
+        _current_call.reset(token)
+        call = tracker.record
+        call.wall_ms = (time.perf_counter() - start) * 1000
+        if scope is not None:
+            scope.calls += 1
+            scope.prompt_tokens += call.prompt_tokens
+            scope.completion_tokens += call.completion_tokens
+            scope.wall_ms += call.wall_ms
+        try:
+            get_llm_telemetry().record(call)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to record LLM call telemetry: {e}")
+
+
+def record_llm_usage(prompt_tokens: int | None, completion_tokens: int | None) -> None:
+    """Attribute token usage to the innermost tracked call (no-op outside one)."""
+    tracker = _current_call.get()
+    if tracker is not None:
+        tracker.add_usage(prompt_tokens, completion_tokens)
+
+
+@contextmanager
+def llm_node(name: str) -> Iterator[NodeUsage]:
+    """
+    Label LLM calls made inside the block with a node name and total their usage.
+
+    Yields:
+        NodeUsage (filled in as calls complete)
+    """
+    usage = NodeUsage(node=name)
+    token = _current_node.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_node.reset(token)
+
+
+def instrument_node[F: Callable[..., Any]](name: str, func: F) -> F:
+    """Wrap an async graph node so its LLM calls are labelled with `name`."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with llm_node(name):
+            return await func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,223 @@
+"""
+Port Lease Registry
+Assigns each workspace a dedicated block of host ports for its published container ports.
+
+Host ports used to be found by bind-probing one port at a time (and scanning every
+container's bindings per probe), or taken from a fixed mapping shared by all
+workspaces, so a second workspace on the host hit "port is already allocated" and
+was recreated on start. Instead, the host port range is split into fixed-size
+blocks and each workspace leases one:
+
+    host_port = range_start + block_index * PORT_BLOCK_SIZE + offset(container_port)
+
+Leases are persisted in the `workspace_port_leases` table (see
+migrations/add_workspace_port_leases.sql), whose primary key on `block_index` and
+unique `workspace_id` make each assignment atomic across processes; an in-memory
+index finds free blocks, and a workspace's own row is re-read before its lease is
+returned, since other processes may have moved or released it. Leases are released
+when the workspace is destroyed.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+
+from supabase import Client
+
+from app.config import settings
+from app.core.supabase_client import get_supabase_client
+from app.services.preview_proxy import PORT_MAPPING
+
+# Import postgrest exception if available
+try:
+    from postgrest.exceptions import APIError as PostgrestAPIError
+except ImportError:
+    PostgrestAPIError = Exception
+
+logger = logging.getLogger(__name__)
+
+LEASE_TABLE = "workspace_port_leases"
+# Host ports reserved per workspace (one per published container port, with headroom)
+PORT_BLOCK_SIZE = 16
+
+
+@dataclass
+class PortLease:
+    """A workspace's block of host ports."""
+
+    workspace_id: str
+    block_index: int
+    base_port: int
+
+    def bindings(self, container_ports: list[int]) -> dict[str, tuple[str, int]]:
+        """Docker port bindings ({"3000/tcp": ("0.0.0.0", host_port)}) for this block."""
+        return {
+            f"{container_port}/tcp": ("0.0.0.0", self.base_port + offset)
+            for offset, container_port in enumerate(container_ports)
+        }
+
+
+def _is_unique_violation(error: Exception) -> bool:
+    message = str(error).lower()
+    return "23505" in message or "duplicate key" in message or "unique constraint" in message
+
+
+class PortLeaseRegistry:
+    """Persistent, atomic assignment of host port blocks to workspaces."""
+
+    def __init__(
+        self,
+        supabase: Client | None = None,
+        container_ports: list[int] | None = None,
+        range_start: int | None = None,
+        block_count: int | None = None,
+    ):
+        """
+        Args:
+            supabase: Supabase client (defaults to the shared client)
+            container_ports: Container ports published by every workspace, in block order
+            range_start: First host port of the leased range (defaults to settings)
+            block_count: Number of blocks in the range (defaults to settings)
+        """
+        self.supabase = supabase or get_supabase_client()
+        self.container_ports = container_ports or list(PORT_MAPPING.keys())
+        if len(self.container_ports) > PORT_BLOCK_SIZE:
+            raise ValueError(
+                f"{len(self.container_ports)} container ports don't fit a "
+                f"{PORT_BLOCK_SIZE}-port block"
+            )
+        self.range_start = range_start or settings.workspace_port_range_start
+        self.block_count = block_count or settings.workspace_port_blocks
+        self._by_workspace: dict[str, PortLease] = {}
+        self._by_block: dict[int, str] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _make_lease(self, workspace_id: str, block_index: int) -> PortLease:
+        return PortLease(
+            workspace_id=workspace_id,
+            block_index=block_index,
+            base_port=self.range_start + block_index * PORT_BLOCK_SIZE,
+        )
+
+    def _load(self) -> None:
+        """(Re)build the in-memory index from the lease table. Caller holds the lock."""
+        result = self.supabase.table(LEASE_TABLE).select("workspace_id, block_index").execute()
+        self._by_workspace.clear()
+        self._by_block.clear()
+        for row in result.data or []:
+            lease = self._make_lease(row["workspace_id"], row["block_index"])
+            self._by_workspace[lease.workspace_id] = lease
+            self._by_block[lease.block_index] = lease.workspace_id
+        self._loaded = True
+        logger.debug(f"Loaded {len(self._by_workspace)} workspace port leases")
+
+    def _refresh(self, workspace_id: str) -> PortLease | None:
+        """
+        Re-read one workspace's lease row into the index. Caller holds the lock.
+
+        Returns:
+            The workspace's current lease, or None if it has none
+        """
+        if not self._loaded:
+            self._load()
+            return self._by_workspace.get(workspace_id)
+
+        result = (
+            self.supabase.table(LEASE_TABLE)
+            .select("workspace_id, block_index")
+            .eq("workspace_id", workspace_id)
+            .execute()
+        )
+        cached = self._by_workspace.pop(workspace_id, None)
+        if cached is not None and self._by_block.get(cached.block_index) == workspace_id:
+            del self._by_block[cached.block_index]
+        if not result.data:
+            return None
+
+        lease = self._make_lease(workspace_id, result.data[0]["block_index"])
+        # The block may be indexed under a workspace that released it elsewhere
+        previous = self._by_block.get(lease.block_index)
+        if previous is not None:
+            self._by_workspace.pop(previous, None)
+        self._by_workspace[workspace_id] = lease
+        self._by_block[lease.block_index] = workspace_id
+        return lease
+
+    def get_lease(self, workspace_id: str) -> PortLease | None:
+        """Current lease of a workspace, or None if it has none."""
+        with self._lock:
+            return self._refresh(workspace_id)
+
+    def lease(self, workspace_id: str, reassign: bool = False) -> PortLease:
+        """
+        Get the workspace's port block, leasing the lowest free one if it has none.
+
+        Args:
+            workspace_id: Workspace UUID
+            reassign: Move the workspace to a different block (its current ports are
+                held by something outside the registry)
+
+        Returns:
+            PortLease
+
+        Raises:
+            RuntimeError: If every block in the range is leased
+        """
+        with self._lock:
+            current = self._refresh(workspace_id)
+            if current is not None and not reassign:
+                return current
+
+            for _attempt in range(3):
+                for block_index in range(self.block_count):
+                    if block_index in self._by_block:
+                        continue
+                    if current is not None and block_index == current.block_index:
+                        continue
+                    try:
+                        self._persist(workspace_id, block_index, move=current is not None)
+                    except PostgrestAPIError as e:
+                        if not _is_unique_violation(e):
+                            raise
+                        # Leased concurrently by another process: refresh and retry
+                        break
+                    lease = self._make_lease(workspace_id, block_index)
+                    if current is not None:
+                        self._by_block.pop(current.block_index, None)
+                    self._by_workspace[workspace_id] = lease
+                    self._by_block[block_index] = workspace_id
+                    logger.info(
+                        f"Leased host ports {lease.base_port}-"
+                        f"{lease.base_port + PORT_BLOCK_SIZE - 1} to workspace {workspace_id}"
+                    )
+                    return lease
+                else:
+                    raise RuntimeError("No free workspace port blocks; destroy unused workspaces")
+
+                self._load()
+                current = self._by_workspace.get(workspace_id)
+                if current is not None and not reassign:
+                    return current
+
+            raise RuntimeError("Failed to lease workspace ports after concurrent updates")
+
+    def port_bindings(self, workspace_id: str, reassign: bool = False) -> dict:
+        """Docker port bindings for the workspace's leased block (see `lease`)."""
+        return self.lease(workspace_id, reassign=reassign).bindings(self.container_ports)
+
+    def _persist(self, workspace_id: str, block_index: int, move: bool) -> None:
+        table = self.supabase.table(LEASE_TABLE)
+        if move:
+            table.update({"block_index": block_index}).eq("workspace_id", workspace_id).execute()
+        else:
+            table.insert({"workspace_id": workspace_id, "block_index": block_index}).execute()
+
+    def release(self, workspace_id: str) -> None:
+        """Return a workspace's port block to the free range."""
+        with self._lock:
+            self.supabase.table(LEASE_TABLE).delete().eq("workspace_id", workspace_id).execute()
+            lease = self._by_workspace.pop(workspace_id, None)
+            if lease is not None:
+                self._by_block.pop(lease.block_index, None)
+                logger.info(f"Released host ports of workspace {workspace_id}")
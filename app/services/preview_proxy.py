@@ -7,11 +7,18 @@ This enables students to preview their web apps:
 - GCP Deployed: Access via /api/preview/{workspace_id}/{port}/path
 """
 
+import asyncio
 import logging
+import time
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any
 
 import httpx
+from fastapi import WebSocket, WebSocketDisconnect
+from websockets.asyncio.client import connect as websocket_connect
+from websockets.exceptions import ConnectionClosed
 
 from app.config import settings
 from app.core.supabase_client import get_supabase_client
@@ -24,8 +31,8 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 # Port mapping configuration
-# Container port -> Host port (for local development)
-# Use ports 30001-30010 to avoid conflicts with frontend (3000) and backend (8000)
+# Container port -> Host port of containers created before per-workspace port leases
+# (see port_lease_registry.py); the keys are the container ports every workspace publishes
 PORT_MAPPING = {
     3000: 30001,  # React/Next.js/Vite dev servers
     5000: 30002,  # Flask default
@@ -42,6 +49,53 @@ PORT_MAPPING = {
 # Default ports to expose on containers
 DEFAULT_CONTAINER_PORTS = list(PORT_MAPPING.keys())
 
+# Seconds a resolved workspace -> container route is reused before re-checking
+PREVIEW_ROUTE_TTL_SECONDS = 30.0
+
+# Hop-by-hop headers never forwarded in either direction
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "transfer-encoding",
+        "te",
+        "trailer",
+        "upgrade",
+        "proxy-authorization",
+        "proxy-authenticate",
+    }
+)
+# WebSocket handshake headers negotiated separately on each leg of the proxy
+WEBSOCKET_HANDSHAKE_HEADERS = frozenset(
+    {
+        "sec-websocket-key",
+        "sec-websocket-version",
+        "sec-websocket-extensions",
+        "sec-websocket-protocol",
+        "sec-websocket-accept",
+    }
+)
+
+
+@dataclass
+class PreviewRoute:
+    """Resolved proxy target for a workspace."""
+
+    workspace_id: str
+    user_id: str
+    container_id: str
+    container_ip: str
+    expires_at: float
+
+
+def _error_body(message: bytes) -> AsyncIterator[bytes]:
+    """Single-chunk body for proxy error responses."""
+
+    async def body() -> AsyncIterator[bytes]:
+        yield message
+
+    return body()
+
 
 class PreviewProxyService:
     """
@@ -65,6 +119,9 @@ class PreviewProxyService:
             timeout=httpx.Timeout(30.0, connect=5.0),
             follow_redirects=True,
         )
+        # Event streams may stay idle indefinitely between events
+        self._event_stream_timeout = httpx.Timeout(30.0, connect=5.0, read=None)
+        self._routes: dict[str, PreviewRoute] = {}
 
     @property
     def workspace_manager(self):
@@ -90,16 +147,13 @@ class PreviewProxyService:
             Container IP address or None if not found
         """
         try:
-            import docker
-
-            client = docker.from_env()
-            container = client.containers.get(container_id)
-            container.reload()
+            container = self.docker_client.get_container_info(container_id)
+            if container is None:
+                logger.warning(f"Container not found: {container_id[:12]}")
+                return None
 
-            # Get IP from bridge network
-            networks = container.attrs.get("NetworkSettings", {}).get("Networks", {})
-            bridge = networks.get("bridge", {})
-            ip = bridge.get("IPAddress")
+            # IP on the bridge network
+            ip = container.ip_address
 
             if ip:
                 logger.debug(f"Container {container_id[:12]} IP: {ip}")
@@ -251,6 +305,53 @@ class PreviewProxyService:
         except Exception as e:
             logger.debug(f"Failed to mark server inactive: {e}")
 
+    def _build_route(self, workspace_id: str) -> PreviewRoute | None:
+        """Look up a workspace and its container IP (blocking: database + Docker)."""
+        workspace = self.workspace_manager.get_workspace(workspace_id)
+        if not workspace or not workspace.container_id:
+            return None
+
+        container_ip = self.get_container_ip(workspace.container_id)
+        if not container_ip:
+            return None
+
+        return PreviewRoute(
+            workspace_id=workspace_id,
+            user_id=workspace.user_id,
+            container_id=workspace.container_id,
+            container_ip=container_ip,
+            expires_at=time.monotonic() + PREVIEW_ROUTE_TTL_SECONDS,
+        )
+
+    async def resolve_route(self, workspace_id: str) -> PreviewRoute | None:
+        """
+        Resolve the container a workspace's preview traffic goes to.
+
+        Routes are cached for PREVIEW_ROUTE_TTL_SECONDS so asset requests during a page
+        load don't each query the database and Docker.
+
+        Args:
+            workspace_id: Workspace UUID
+
+        Returns:
+            PreviewRoute, or None if the workspace doesn't exist or its container is
+            not reachable
+        """
+        route = self._routes.get(workspace_id)
+        if route is not None and route.expires_at > time.monotonic():
+            return route
+
+        route = await asyncio.to_thread(self._build_route, workspace_id)
+        if route is None:
+            self._routes.pop(workspace_id, None)
+        else:
+            self._routes[workspace_id] = route
+        return route
+
+    def invalidate_route(self, workspace_id: str) -> None:
+        """Drop a cached route (e.g. after the container was restarted or removed)."""
+        self._routes.pop(workspace_id, None)
+
     async def proxy_request(
         self,
         workspace_id: str,
@@ -258,10 +359,10 @@ class PreviewProxyService:
         path: str,
         method: str = "GET",
         headers: dict[str, str] | None = None,
-        body: bytes | None = None,
-    ) -> tuple[int, dict[str, str], bytes]:
+        body: bytes | AsyncIterable[bytes] | None = None,
+    ) -> tuple[int, dict[str, str], AsyncIterator[bytes]]:
         """
-        Proxy an HTTP request to a container's dev server.
+        Proxy an HTTP request to a container's dev server, streaming both bodies.
 
         Args:
             workspace_id: Workspace UUID
@@ -269,77 +370,194 @@ class PreviewProxyService:
             path: Request path (e.g., "/api/data")
             method: HTTP method
             headers: Request headers
-            body: Request body
+            body: Request body, as bytes or an async stream of chunks
 
         Returns:
-            Tuple of (status_code, response_headers, response_body)
+            Tuple of (status_code, response_headers, response_body_chunks). The upstream
+            response is released once the body iterator is exhausted or closed.
         """
-        workspace = self.workspace_manager.get_workspace(workspace_id)
-        if not workspace:
-            return 404, {"Content-Type": "application/json"}, b'{"error": "Workspace not found"}'
-
-        if not workspace.container_id:
-            return 404, {"Content-Type": "application/json"}, b'{"error": "No container"}'
-
-        # Get container IP for internal proxying
-        container_ip = self.get_container_ip(workspace.container_id)
-        if not container_ip:
+        route = await self.resolve_route(workspace_id)
+        if route is None:
             return (
                 502,
                 {"Content-Type": "application/json"},
-                b'{"error": "Container not reachable"}',
+                _error_body(b'{"error": "Container not reachable"}'),
             )
 
         # Build target URL
-        target_url = f"http://{container_ip}:{container_port}{path}"
+        target_url = f"http://{route.container_ip}:{container_port}{path}"
         logger.debug(f"Proxying {method} {path} to {target_url}")
 
         # Filter headers (remove hop-by-hop headers)
         proxy_headers = {}
         if headers:
-            skip_headers = {
-                "host",
-                "connection",
-                "keep-alive",
-                "transfer-encoding",
-                "te",
-                "trailer",
-                "upgrade",
-                "proxy-authorization",
-                "proxy-authenticate",
+            proxy_headers = {
+                k: v
+                for k, v in headers.items()
+                if k.lower() not in HOP_BY_HOP_HEADERS and k.lower() != "host"
             }
-            proxy_headers = {k: v for k, v in headers.items() if k.lower() not in skip_headers}
+
+        timeout = httpx.USE_CLIENT_DEFAULT
+        if "text/event-stream" in proxy_headers.get("accept", ""):
+            timeout = self._event_stream_timeout
 
         try:
-            response = await self.http_client.request(
+            request = self.http_client.build_request(
                 method=method,
                 url=target_url,
                 headers=proxy_headers,
                 content=body,
+                timeout=timeout,
             )
-
-            # Filter response headers
-            response_headers = {}
-            skip_response_headers = {"transfer-encoding", "connection", "keep-alive"}
-            for name, value in response.headers.items():
-                if name.lower() not in skip_response_headers:
-                    response_headers[name] = value
-
-            return response.status_code, response_headers, response.content
-
+            response = await self.http_client.send(request, stream=True)
         except httpx.ConnectError:
             logger.warning(f"Connection refused to {target_url} - server may not be running")
+            # The container may have been restarted with a new IP
+            self.invalidate_route(workspace_id)
             return (
                 502,
                 {"Content-Type": "application/json"},
-                b'{"error": "Server not running. Start your dev server first (e.g., npm run dev)"}',
+                _error_body(
+                    b'{"error": "Server not running. Start your dev server first (e.g., npm run dev)"}'
+                ),
             )
         except httpx.TimeoutException:
             logger.warning(f"Timeout connecting to {target_url}")
-            return 504, {"Content-Type": "application/json"}, b'{"error": "Server timeout"}'
+            return (
+                504,
+                {"Content-Type": "application/json"},
+                _error_body(b'{"error": "Server timeout"}'),
+            )
         except Exception as e:
             logger.error(f"Proxy error: {e}")
-            return 500, {"Content-Type": "application/json"}, b'{"error": "Proxy error"}'
+            return (
+                500,
+                {"Content-Type": "application/json"},
+                _error_body(b'{"error": "Proxy error"}'),
+            )
+
+        # Filter response headers; the body is relayed undecoded, so Content-Encoding
+        # and Content-Length still describe it
+        response_headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+        return response.status_code, response_headers, self._iter_response(response)
+
+    async def _iter_response(self, response: httpx.Response) -> AsyncIterator[bytes]:
+        """Relay upstream body chunks as they arrive, then release the connection."""
+        try:
+            async for chunk in response.aiter_raw():
+                yield chunk
+        except httpx.HTTPError as e:
+            logger.warning(f"Preview upstream stream ended early: {e}")
+        finally:
+            await response.aclose()
+
+    async def proxy_websocket(
+        self,
+        websocket: WebSocket,
+        route: PreviewRoute,
+        container_port: int,
+        path: str,
+    ) -> None:
+        """
+        Relay a WebSocket (e.g. Vite/Next.js HMR) between a client and a container.
+
+        The upstream connection is opened first so its negotiated subprotocol can be
+        used to accept the client; messages are then piped in both directions until
+        either side closes.
+
+        Args:
+            websocket: Client WebSocket (not yet accepted)
+            route: Resolved route for the workspace
+            container_port: Port inside the container
+            path: Request path including query string
+        """
+        target_url = f"ws://{route.container_ip}:{container_port}{path}"
+        headers = {
+            k: v
+            for k, v in websocket.headers.items()
+            if k.lower() not in HOP_BY_HOP_HEADERS
+            and k.lower() not in WEBSOCKET_HANDSHAKE_HEADERS
+            and k.lower() != "host"
+        }
+        subprotocols = [
+            protocol.strip()
+            for protocol in websocket.headers.get("sec-websocket-protocol", "").split(",")
+            if protocol.strip()
+        ]
+
+        try:
+            upstream = await websocket_connect(
+                target_url,
+                additional_headers=headers,
+                subprotocols=subprotocols or None,
+                # The client's own User-Agent is forwarded in `headers`
+                user_agent_header=None,
+                proxy=None,
+                open_timeout=5,
+                ping_interval=None,
+                max_size=None,
+                compression=None,
+            )
+        except Exception as e:
+            logger.warning(f"WebSocket upstream {target_url} unavailable: {e}")
+            self.invalidate_route(route.workspace_id)
+            await websocket.close(code=1011)
+            return
+
+        async with upstream:
+            await websocket.accept(subprotocol=upstream.subprotocol)
+            logger.debug(f"Proxying WebSocket {path} to {target_url}")
+
+            async def client_to_upstream():
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        return
+                    if message.get("bytes") is not None:
+                        await upstream.send(message["bytes"])
+                    elif message.get("text") is not None:
+                        await upstream.send(message["text"])
+
+            async def upstream_to_client():
+                async for message in upstream:
+                    if isinstance(message, bytes):
+                        await websocket.send_bytes(message)
+                    else:
+                        await websocket.send_text(message)
+
+            tasks = [
+                asyncio.create_task(client_to_upstream()),
+                asyncio.create_task(upstream_to_client()),
+            ]
+            try:
+                done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error and not isinstance(
+                        error, ConnectionClosed | WebSocketDisconnect | RuntimeError
+                    ):
+                        logger.warning(f"WebSocket proxy error for {path}: {error}")
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Upstream closed first: pass its close code on to the client (1005/1006 are
+        # reserved for reporting and can't be sent)
+        close_code = upstream.close_code
+        if close_code in (None, 1005):
+            close_code = 1000
+        elif close_code == 1006:
+            close_code = 1011
+        try:
+            await websocket.close(code=close_code)
+        except RuntimeError:
+            # Client already disconnected
+            pass
 
     def get_preview_urls(
         self,
@@ -0,0 +1,473 @@
+"""
+Qdrant collection profiles and online migration between them.
+
+All projects share one chunk collection. A profile decides how its vectors are
+stored:
+- default: float32 vectors and HNSW graph in RAM (the original layout)
+- scalar: int8 scalar quantization in RAM, float32 originals and payloads on disk,
+  rescoring on the originals (~4x less RAM for vectors)
+- binary: 1-bit binary quantization in RAM, originals and payloads on disk,
+  oversampled rescoring (~32x less RAM; best with high-dimensional embeddings)
+
+The compact profiles also partition the collection by project: `project_id` gets
+a tenant keyword index and HNSW links are built per project (payload_m) instead of
+one global graph, since every search is filtered to a single project.
+
+`migrate_collection` rebuilds the live collection into a new profile without
+read downtime. It copies all points into a new physical collection, catches up
+on writes made during the copy, pauses writes for a last catch-up, and points
+the COLLECTION_NAME alias at the new collection (see
+scripts/migrate_qdrant_collection.py). The pause is an alias every process can
+see; writers wait in `wait_while_writes_paused` until it is removed.
+
+Catch-ups never rescan whole collections: writers stamp points with `written_at`
+(epoch milliseconds, indexed), so only points written since the previous pass
+are copied, and deletions are found by comparing per-project point counts. App
+processes must run a version that stamps `written_at` before migrating.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from qdrant_client.http.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    KeywordIndexParams,
+    KeywordIndexType,
+    MatchValue,
+    PointStruct,
+    QuantizationSearchParams,
+    Range,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+)
+
+logger = logging.getLogger(__name__)
+
+# Points copied per scroll/upsert batch during migration
+MIGRATION_BATCH_SIZE = 256
+# Alias (name + suffix) whose existence pauses writes to a collection during a migration
+WRITE_PAUSE_ALIAS_SUFFIX = "__writes_paused"
+# Seconds between checks of a write pause, and maximum wait before a write fails
+WRITE_PAUSE_POLL_SECONDS = 1.0
+WRITE_PAUSE_TIMEOUT_SECONDS = 600.0
+# Seconds a writer trusts its last "not paused" check (saves a lookup per write)
+WRITE_PAUSE_CHECK_TTL_SECONDS = 2.0
+# Seconds a migration waits after pausing writes, for writes that checked just before
+# (> WRITE_PAUSE_CHECK_TTL_SECONDS, so every writer has seen the pause)
+WRITE_PAUSE_GRACE_SECONDS = 5.0
+# Catch-ups also re-copy points stamped this long before a pass started (host clock skew)
+CATCH_UP_CLOCK_SKEW_SECONDS = 60
+# Maximum projects compared per catch-up when looking for deleted points
+CATCH_UP_MAX_PROJECTS = 1_000_000
+
+# alias -> time.monotonic() of the last check that found writes not paused
+_unpaused_checked_at: dict[str, float] = {}
+_pause_check_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """Storage layout of the chunk collection."""
+
+    name: str
+    # "none", "scalar" (int8) or "binary" (1 bit per dimension)
+    quantization: str = "none"
+    # Keep float32 originals and payloads on disk (page cache) instead of RAM
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    # Per-project HNSW graphs and a tenant index on project_id
+    tenant_partitioning: bool = False
+    # Quantized candidates fetched per result before rescoring with the originals
+    oversampling: float = 1.0
+
+    def collection_kwargs(self, vector_size: int) -> dict:
+        """Keyword arguments for QdrantClient.create_collection."""
+        if self.tenant_partitioning:
+            # No global graph: every search is filtered to one project
+            hnsw_config = HnswConfigDiff(
+                m=0, payload_m=self.hnsw_m, ef_construct=self.hnsw_ef_construct
+            )
+        else:
+            hnsw_config = HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+        kwargs = {
+            "vectors_config": {
+                "size": vector_size,
+                "distance": "Cosine",
+                "on_disk": self.on_disk_vectors,
+            },
+            "hnsw_config": hnsw_config,
+            "on_disk_payload": self.on_disk_payload,
+        }
+        if self.quantization == "scalar":
+            kwargs["quantization_config"] = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        elif self.quantization == "binary":
+            kwargs["quantization_config"] = BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=True)
+            )
+        return kwargs
+
+    def project_index_schema(self):
+        """Payload index schema of the project_id field."""
+        if self.tenant_partitioning:
+            return KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True)
+        return "keyword"
+
+    def search_params(self) -> SearchParams | None:
+        """Search parameters (rescoring of quantized candidates), None for defaults."""
+        if self.quantization == "none":
+            return None
+        return SearchParams(
+            quantization=QuantizationSearchParams(rescore=True, oversampling=self.oversampling)
+        )
+
+    def ram_bytes_per_vector(self, vector_size: int) -> float:
+        """Approximate vector bytes held in RAM per point (excluding the HNSW graph)."""
+        if self.quantization == "scalar":
+            quantized = vector_size
+        elif self.quantization == "binary":
+            quantized = vector_size / 8
+        else:
+            quantized = 0
+        originals = 0 if self.on_disk_vectors else vector_size * 4
+        return quantized + originals
+
+
+COLLECTION_PROFILES: dict[str, CollectionProfile] = {
+    "default": CollectionProfile(name="default"),
+    "scalar": CollectionProfile(
+        name="scalar",
+        quantization="scalar",
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        tenant_partitioning=True,
+        oversampling=1.5,
+    ),
+    "binary": CollectionProfile(
+        name="binary",
+        quantization="binary",
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        tenant_partitioning=True,
+        oversampling=3.0,
+    ),
+}
+
+
+def get_collection_profile(name: str) -> CollectionProfile:
+    """
+    Look up a collection profile by name.
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    profile = COLLECTION_PROFILES.get(name.lower())
+    if profile is None:
+        raise ValueError(
+            f"Unknown Qdrant collection profile: {name}. "
+            f"Supported: {', '.join(COLLECTION_PROFILES)}"
+        )
+    return profile
+
+
+def resolve_alias(client, alias: str) -> str | None:
+    """Physical collection behind an alias, or None if `alias` is not an alias."""
+    try:
+        aliases = client.get_aliases().aliases
+        for entry in aliases:
+            if entry.alias_name == alias:
+                return entry.collection_name
+    except Exception as e:
+        logger.debug(f"Could not list Qdrant aliases: {e}")
+    return None
+
+
+def create_collection(client, collection_name: str, profile: CollectionProfile, vector_size: int):
+    """Create a collection with the given profile and its payload indexes."""
+    client.create_collection(
+        collection_name=collection_name, **profile.collection_kwargs(vector_size)
+    )
+    ensure_payload_indexes(client, collection_name, profile)
+
+
+def ensure_payload_indexes(client, collection_name: str, profile: CollectionProfile) -> bool:
+    """
+    Create the payload indexes on project_id, index_version and written_at.
+
+    Filtered search and every delete go through the first two; migration
+    catch-ups go through written_at.
+
+    Returns:
+        True if the indexes were created or already existed
+    """
+    ok = True
+    for field_name, field_schema in (
+        ("project_id", profile.project_index_schema()),
+        ("index_version", "integer"),
+        ("written_at", "integer"),
+    ):
+        try:
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+            )
+        except Exception as e:
+            error_msg = str(e).lower()
+            # Index might already exist, which is fine
+            if "already exists" not in error_msg and "duplicate" not in error_msg:
+                logger.warning(f"⚠️  Failed to create/verify index on '{field_name}': {e}")
+                ok = False
+    return ok
+
+
+def wait_while_writes_paused(client, alias: str) -> None:
+    """
+    Block while a migration has paused writes to `alias`.
+
+    Blocks the calling thread: call it from a worker thread, never on the event loop.
+    A check that found writes not paused is trusted for WRITE_PAUSE_CHECK_TTL_SECONDS.
+
+    Raises:
+        RuntimeError: If writes stay paused longer than WRITE_PAUSE_TIMEOUT_SECONDS
+    """
+    with _pause_check_lock:
+        checked_at = _unpaused_checked_at.get(alias)
+    if checked_at is not None and time.monotonic() - checked_at < WRITE_PAUSE_CHECK_TTL_SECONDS:
+        return
+
+    pause_alias = f"{alias}{WRITE_PAUSE_ALIAS_SUFFIX}"
+    deadline = time.monotonic() + WRITE_PAUSE_TIMEOUT_SECONDS
+    while resolve_alias(client, pause_alias) is not None:
+        if time.monotonic() > deadline:
+            raise RuntimeError(
+                f"Writes to '{alias}' paused for over {WRITE_PAUSE_TIMEOUT_SECONDS:.0f}s; "
+                f"if no migration is running, delete the alias '{pause_alias}'"
+            )
+        time.sleep(WRITE_PAUSE_POLL_SECONDS)
+    with _pause_check_lock:
+        _unpaused_checked_at[alias] = time.monotonic()
+
+
+def _set_write_pause(client, alias: str, collection_name: str, paused: bool) -> None:
+    pause_alias = f"{alias}{WRITE_PAUSE_ALIAS_SUFFIX}"
+    if paused:
+        operation = CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=collection_name, alias_name=pause_alias)
+        )
+    else:
+        operation = DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=pause_alias))
+    client.update_collection_aliases(change_aliases_operations=[operation])
+
+
+def _copy_points(client, source: str, target: str) -> None:
+    """Copy every point (vector and payload) from source to target."""
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=source,
+            limit=MIGRATION_BATCH_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            points = [PointStruct(id=r.id, vector=r.vector, payload=r.payload) for r in records]
+            client.upsert(collection_name=target, points=points, wait=True)
+        if offset is None:
+            return
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _copy_written_since(client, source: str, target: str, since_ms: int) -> int:
+    """Copy points stamped with written_at >= since_ms from source to target."""
+    written_filter = Filter(must=[FieldCondition(key="written_at", range=Range(gte=since_ms))])
+    copied = 0
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=source,
+            scroll_filter=written_filter,
+            limit=MIGRATION_BATCH_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            points = [PointStruct(id=r.id, vector=r.vector, payload=r.payload) for r in records]
+            client.upsert(collection_name=target, points=points, wait=True)
+            copied += len(points)
+        if offset is None:
+            return copied
+
+
+def _project_counts(client, collection_name: str) -> dict[str, int]:
+    """Number of points per project_id."""
+    response = client.facet(
+        collection_name=collection_name,
+        key="project_id",
+        limit=CATCH_UP_MAX_PROJECTS,
+        exact=True,
+    )
+    return {hit.value: hit.count for hit in response.hits}
+
+
+def _scan_ids(client, collection_name: str, scroll_filter: Filter) -> set:
+    ids: set = set()
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=MIGRATION_BATCH_SIZE * 4,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+        )
+        ids.update(record.id for record in records)
+        if offset is None:
+            return ids
+
+
+def _remove_deleted(client, source: str, target: str) -> int:
+    """
+    Delete points from target that were deleted from source.
+
+    Called after the written_at copy, so target holds every point of source and
+    only projects with more points in target can have pending deletions; ids are
+    compared for those projects only.
+    """
+    source_counts = _project_counts(client, source)
+    removed = 0
+    for project_id, count in _project_counts(client, target).items():
+        if count <= source_counts.get(project_id, 0):
+            continue
+        project_filter = Filter(
+            must=[FieldCondition(key="project_id", match=MatchValue(value=project_id))]
+        )
+        stale = list(
+            _scan_ids(client, target, project_filter) - _scan_ids(client, source, project_filter)
+        )
+        if stale:
+            client.delete(collection_name=target, points_selector=stale, wait=True)
+            removed += len(stale)
+    return removed
+
+
+def _catch_up(client, source: str, target: str, since_ms: int) -> tuple[int, int]:
+    """
+    Reconcile target with writes made to source since `since_ms`.
+
+    Returns:
+        (points copied, points deleted)
+    """
+    since_ms -= CATCH_UP_CLOCK_SKEW_SECONDS * 1000
+    copied = _copy_written_since(client, source, target, since_ms)
+    return copied, _remove_deleted(client, source, target)
+
+
+def _swap_alias(
+    client, alias: str, source: str, target: str, is_alias: bool, keep_source: bool
+) -> None:
+    if is_alias:
+        client.update_collection_aliases(
+            change_aliases_operations=[
+                DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)),
+                CreateAliasOperation(
+                    create_alias=CreateAlias(collection_name=target, alias_name=alias)
+                ),
+            ]
+        )
+        if not keep_source:
+            client.delete_collection(source)
+    else:
+        # An alias cannot share its name with a collection
+        client.delete_collection(source)
+        client.update_collection_aliases(
+            change_aliases_operations=[
+                CreateAliasOperation(
+                    create_alias=CreateAlias(collection_name=target, alias_name=alias)
+                ),
+            ]
+        )
+
+
+def migrate_collection(
+    client,
+    alias: str,
+    profile: CollectionProfile,
+    keep_source: bool = False,
+) -> str:
+    """
+    Rebuild the collection served under `alias` into a new profile.
+
+    Reads and writes keep going to the current collection while it is copied,
+    and changes made meanwhile are reconciled in a catch-up pass. Writes are then
+    paused (writers wait, see `wait_while_writes_paused`) for a final catch-up
+    and the switch of `alias` to the new collection, so none are lost. Reads are
+    never paused, except that the first migration of a plain collection named
+    `alias` has to drop that collection before the alias can take its name, so
+    reads in that instant may fail; later migrations swap the alias atomically.
+
+    Args:
+        client: Qdrant client
+        alias: Name the application uses (COLLECTION_NAME)
+        profile: Target profile
+        keep_source: Keep the old collection instead of deleting it (only
+            possible when `alias` is already an alias)
+
+    Returns:
+        Name of the new physical collection
+    """
+    source = resolve_alias(client, alias)
+    is_alias = source is not None
+    source = source or alias
+
+    info = client.get_collection(source)
+    vector_size = info.config.params.vectors.size
+    target = f"{alias}_{profile.name}_{int(time.time())}"
+
+    logger.info(f"📦 Migrating '{source}' -> '{target}' (profile: {profile.name})")
+    start = time.time()
+    create_collection(client, target, profile, vector_size)
+
+    copy_started = _now_ms()
+    _copy_points(client, source, target)
+    logger.info(f"   Copied {client.count(target).count} points in {time.time() - start:.1f}s")
+
+    # Catch up on writes made while copying, then once more with writes paused
+    catch_up_started = _now_ms()
+    added, removed = _catch_up(client, source, target, since_ms=copy_started)
+    logger.info(f"   Catch-up: {added} copied, {removed} removed")
+    _set_write_pause(client, alias, target, paused=True)
+    try:
+        time.sleep(WRITE_PAUSE_GRACE_SECONDS)
+        added, removed = _catch_up(client, source, target, since_ms=catch_up_started)
+        logger.info(f"   Final catch-up (writes paused): {added} copied, {removed} removed")
+        _swap_alias(client, alias, source, target, is_alias, keep_source)
+    finally:
+        _set_write_pause(client, alias, target, paused=False)
+
+    logger.info(f"✅ '{alias}' now serves '{target}' ({time.time() - start:.1f}s)")
+    return target
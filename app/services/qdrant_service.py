@@ -1,17 +1,28 @@
 import logging
 import time
 import uuid
+from dataclasses import dataclass
 
 from qdrant_client.http.models import (
     FieldCondition,
     Filter,
     FilterSelector,
+    MatchText,
     MatchValue,
-    PointIdsList,
     PointStruct,
+    QueryRequest,
 )
 
+from app.config import settings
 from app.core.qdrant_client import get_qdrant_client
+from app.services.index_versions import forget_index_version, get_active_index_version
+from app.services.qdrant_collection import (
+    create_collection,
+    ensure_payload_indexes,
+    get_collection_profile,
+    resolve_alias,
+    wait_while_writes_paused,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +31,22 @@ COLLECTION_NAME = "gitguide_chunks"
 # Legacy: 384 for all-MiniLM-L6-v2, 768 for textembedding-gecko, 3072 for gemini-embedding-001
 DEFAULT_VECTOR_SIZE = 384
 
+# Extra hits requested per file_path_prefix query, since prefixes are checked client-side
+PREFIX_FILTER_OVERFETCH = 3
+
+
+@dataclass
+class SearchQuery:
+    """One query vector of a batched search, with optional payload filters."""
+
+    embedding: list[float]
+    limit: int = 5
+    # Only chunks whose file_path starts with this prefix (e.g. "tests/")
+    file_path_prefix: str | None = None
+    # Only chunks of this language (e.g. "python")
+    language: str | None = None
+
+
 # Lazy singleton instance
 _qdrant_service_instance = None
 
@@ -54,6 +81,7 @@ class QdrantService:
         """
         logger.info(f"🔍 Initializing QdrantService for collection: {COLLECTION_NAME}")
         self.client = get_qdrant_client()
+        self.profile = get_collection_profile(settings.qdrant_collection_profile)
         if not skip_collection_check:
             self._ensure_collection()
         logger.info("✅ QdrantService initialized successfully")
@@ -74,26 +102,36 @@ class QdrantService:
             logger.warning(f"⚠️  Failed to detect embedding dimension: {e}, using default")
         return DEFAULT_VECTOR_SIZE
 
+    def _create_collection(self, vector_size: int):
+        """Create COLLECTION_NAME with the configured profile and its payload indexes."""
+        logger.info(f"📦 Creating new Qdrant collection: {COLLECTION_NAME}")
+        logger.debug(f"   Vector size: {vector_size}")
+        logger.debug(f"   Distance metric: Cosine, profile: {self.profile.name}")
+        create_collection(self.client, COLLECTION_NAME, self.profile, vector_size)
+
+    def _recreate_collection(self, vector_size: int):
+        """Drop and recreate the collection (behind the alias, if migrated) with a new dimension."""
+        physical = resolve_alias(self.client, COLLECTION_NAME)
+        self.client.delete_collection(physical or COLLECTION_NAME)
+        logger.info(f"✅ Deleted old collection '{physical or COLLECTION_NAME}'")
+        if physical:
+            create_collection(self.client, physical, self.profile, vector_size)
+        else:
+            self._create_collection(vector_size)
+
     def _ensure_collection(self):
         logger.debug(f"🔍 Checking if collection '{COLLECTION_NAME}' exists")
         collections = self.client.get_collections().collections
         collection_names = [c.name for c in collections]
+        # After a profile migration COLLECTION_NAME is an alias of the physical collection
+        is_alias = resolve_alias(self.client, COLLECTION_NAME) is not None
 
         # Get the correct vector size from embedding service
         vector_size = self._get_embedding_dimension()
 
         collection_created = False
-        if COLLECTION_NAME not in collection_names:
-            logger.info(f"📦 Creating new Qdrant collection: {COLLECTION_NAME}")
-            logger.debug(f"   Vector size: {vector_size}")
-            logger.debug("   Distance metric: Cosine")
-            self.client.create_collection(
-                collection_name=COLLECTION_NAME,
-                vectors_config={
-                    "size": vector_size,
-                    "distance": "Cosine",
-                },
-            )
+        if COLLECTION_NAME not in collection_names and not is_alias:
+            self._create_collection(vector_size)
             logger.info(f"✅ Collection '{COLLECTION_NAME}' created successfully")
             collection_created = True
         else:
@@ -110,20 +148,7 @@ class QdrantService:
                     logger.warning(
                         f"🗑️  Deleting old collection '{COLLECTION_NAME}' to recreate with correct dimension..."
                     )
-                    # Delete the old collection
-                    self.client.delete_collection(COLLECTION_NAME)
-                    logger.info(f"✅ Deleted old collection '{COLLECTION_NAME}'")
-                    # Recreate with correct dimension
-                    logger.info(f"📦 Creating new Qdrant collection: {COLLECTION_NAME}")
-                    logger.debug(f"   Vector size: {vector_size}")
-                    logger.debug("   Distance metric: Cosine")
-                    self.client.create_collection(
-                        collection_name=COLLECTION_NAME,
-                        vectors_config={
-                            "size": vector_size,
-                            "distance": "Cosine",
-                        },
-                    )
+                    self._recreate_collection(vector_size)
                     logger.info(
                         f"✅ Collection '{COLLECTION_NAME}' recreated successfully with {vector_size} dimensions"
                     )
@@ -133,26 +158,12 @@ class QdrantService:
             except Exception as e:
                 logger.warning(f"⚠️  Could not verify collection dimension: {e}")
 
-        # Ensure index exists on project_id field for efficient filtering
+        # Ensure indexes exist on project_id and index_version for efficient filtering
         # This is critical for filter operations (delete, search)
-        try:
-            self.client.create_payload_index(
-                collection_name=COLLECTION_NAME,
-                field_name="project_id",
-                field_schema="keyword",  # Use 'keyword' for exact match filtering
-            )
-            if collection_created:
-                logger.info("✅ Created index on 'project_id' field")
-            else:
-                logger.debug("✅ Index on 'project_id' verified/created")
-        except Exception as e:
-            error_msg = str(e).lower()
-            # Index might already exist, which is fine
-            if "already exists" in error_msg or "duplicate" in error_msg:
-                logger.debug("   Index on 'project_id' already exists (this is fine)")
-            else:
-                logger.warning(f"⚠️  Failed to create/verify index on 'project_id': {e}")
-                # Continue anyway - the code handles missing index gracefully
+        if not collection_created and ensure_payload_indexes(
+            self.client, COLLECTION_NAME, self.profile
+        ):
+            logger.debug("✅ Indexes on 'project_id' and 'index_version' verified/created")
 
     def upsert_embeddings(
         self,
@@ -160,6 +171,7 @@ class QdrantService:
         chunk_ids: list[str],
         embeddings: list[list[float]],
         metadatas: list[dict],
+        index_version: int | None = None,
     ):
         # Issue 4: Handle empty inputs with validation
         if not chunk_ids or not embeddings:
@@ -197,55 +209,20 @@ class QdrantService:
                     f"🗑️  Deleting and recreating collection '{COLLECTION_NAME}' with correct dimension..."
                 )
                 # Delete and recreate collection with correct dimension
-                self.client.delete_collection(COLLECTION_NAME)
-                logger.info(f"✅ Deleted old collection '{COLLECTION_NAME}'")
-                self.client.create_collection(
-                    collection_name=COLLECTION_NAME,
-                    vectors_config={
-                        "size": embedding_dim,
-                        "distance": "Cosine",
-                    },
-                )
+                self._recreate_collection(embedding_dim)
                 logger.info(
                     f"✅ Recreated collection '{COLLECTION_NAME}' with {embedding_dim} dimensions"
                 )
-                # Recreate the index
-                try:
-                    self.client.create_payload_index(
-                        collection_name=COLLECTION_NAME,
-                        field_name="project_id",
-                        field_schema="keyword",
-                    )
-                    logger.info("✅ Recreated index on 'project_id' field")
-                except Exception as idx_err:
-                    error_msg = str(idx_err).lower()
-                    if "already exists" not in error_msg and "duplicate" not in error_msg:
-                        logger.warning(f"⚠️  Failed to recreate index: {idx_err}")
         except Exception as e:
             error_msg = str(e).lower()
             if "not found" in error_msg or "does not exist" in error_msg:
                 # Collection doesn't exist, create it
                 logger.info(f"📦 Collection '{COLLECTION_NAME}' not found, creating it...")
                 embedding_dim = len(embeddings[0]) if embeddings else 0
-                self.client.create_collection(
-                    collection_name=COLLECTION_NAME,
-                    vectors_config={
-                        "size": embedding_dim,
-                        "distance": "Cosine",
-                    },
-                )
+                self._create_collection(embedding_dim)
                 logger.info(
                     f"✅ Created collection '{COLLECTION_NAME}' with {embedding_dim} dimensions"
                 )
-                # Create index
-                try:
-                    self.client.create_payload_index(
-                        collection_name=COLLECTION_NAME,
-                        field_name="project_id",
-                        field_schema="keyword",
-                    )
-                except Exception:
-                    pass  # Index creation is best effort
             else:
                 logger.warning(f"⚠️  Could not verify collection dimension: {e}")
 
@@ -261,6 +238,7 @@ class QdrantService:
 
         points = []
         start_time = time.time()
+        written_at = int(start_time * 1000)
 
         # Issue 1: Validate and convert chunk IDs to proper UUID format
         for i in range(len(chunk_ids)):
@@ -285,21 +263,28 @@ class QdrantService:
                     f"got: {chunk_id} (type: {type(chunk_id).__name__})"
                 ) from e
 
+            payload = {
+                "project_id": project_id,
+                "file_path": metadatas[i]["file_path"],
+                "language": metadatas[i]["language"],
+            }
+            if index_version is not None:
+                payload["index_version"] = index_version
+            # Lets collection migrations copy only points written since their last pass
+            payload["written_at"] = written_at
             points.append(
                 PointStruct(
                     id=point_id,  # Now guaranteed to be UUID string or integer
                     vector=embeddings[i],
-                    payload={
-                        "project_id": project_id,
-                        "file_path": metadatas[i]["file_path"],
-                        "language": metadatas[i]["language"],
-                    },
+                    payload=payload,
                 )
             )
 
         build_duration = time.time() - start_time
         logger.debug(f"   Built {len(points)} PointStruct objects in {build_duration:.3f}s")
 
+        # A collection migration may be finishing; write to the collection it swaps in
+        wait_while_writes_paused(self.client, COLLECTION_NAME)
         upsert_start = time.time()
         try:
             self.client.upsert(
@@ -323,11 +308,12 @@ class QdrantService:
         """
         Delete all points from Qdrant collection that belong to a specific project.
 
-        Uses filter-based deletion (requires index on project_id, which is created automatically).
-        Falls back to scroll + ID-based deletion if filter operations fail.
+        A single delete by the indexed project_id filter, applied by Qdrant in the
+        background (wait=False), so the call returns immediately regardless of the
+        project size.
 
         Returns:
-            Number of points deleted
+            Approximate number of points deleted
         """
         logger.info(
             f"🗑️  Deleting points from Qdrant collection '{COLLECTION_NAME}' for project_id={project_id}"
@@ -343,178 +329,64 @@ class QdrantService:
         )
 
         try:
-            # Method 1: Try filter-based deletion (fast, requires index - which we create automatically)
-            try:
-                # Count points first
-                test_count = self.client.count(
-                    collection_name=COLLECTION_NAME,
-                    count_filter=project_filter,
-                )
-                point_count = test_count.count if hasattr(test_count, "count") else test_count
-
-                if point_count == 0:
-                    logger.info(f"✅ No points found for project_id={project_id}")
-                    return 0
-
-                logger.info(f"   Found {point_count} points to delete")
-                logger.debug("   Attempting filter-based deletion (requires index)")
-
-                delete_start = time.time()
-                self.client.delete(
-                    collection_name=COLLECTION_NAME,
-                    points_selector=FilterSelector(filter=project_filter),
-                )
-                delete_duration = time.time() - delete_start
-
-                # Verify deletion
-                verify_count = self.client.count(
-                    collection_name=COLLECTION_NAME,
-                    count_filter=project_filter,
-                )
-                remaining = verify_count.count if hasattr(verify_count, "count") else verify_count
-
-                if remaining == 0:
-                    logger.info(
-                        f"✅ Successfully deleted {point_count} points using filter in {delete_duration:.2f}s"
-                    )
-                    return point_count
-                else:
-                    logger.warning(
-                        f"⚠️  Filter deletion incomplete: {remaining} points remain, using fallback method"
-                    )
-                    # Fall through to fallback method
-
-            except Exception as filter_error:
-                error_msg = str(filter_error).lower()
-                if "index required" in error_msg or "index" in error_msg:
-                    logger.warning(
-                        "⚠️  Index not available (unexpected - index should be auto-created), using fallback"
-                    )
-                else:
-                    logger.warning(
-                        f"⚠️  Filter-based deletion failed: {filter_error}, using fallback"
-                    )
-
-            # Method 2: Fallback - Scroll with filter and delete by IDs (still efficient with index)
-            logger.debug("   Using fallback: scroll with filter and delete by IDs")
-            all_point_ids = []
-            scroll_limit = 1000
-            offset = None
-
-            while True:
-                try:
-                    scroll_result = self.client.scroll(
-                        collection_name=COLLECTION_NAME,
-                        limit=scroll_limit,
-                        offset=offset,
-                        scroll_filter=project_filter,  # Use filter if index exists, otherwise will fail gracefully
-                        with_payload=False,  # Don't need payload, just IDs
-                        with_vectors=False,
-                    )
-                    points, next_offset = scroll_result
-
-                    if not points:
-                        break
-
-                    batch_ids = [point.id for point in points]
-                    all_point_ids.extend(batch_ids)
-
-                    if next_offset is None:
-                        break
-                    offset = next_offset
-
-                except Exception as scroll_error:
-                    # If scroll with filter fails (no index), fall back to scrolling all and filtering in memory
-                    error_msg = str(scroll_error).lower()
-                    if "index required" in error_msg or "index" in error_msg:
-                        logger.debug(
-                            "   Scroll with filter failed (no index), scrolling all points and filtering in memory"
-                        )
-                        offset = None  # Reset offset
-                        while True:
-                            scroll_result = self.client.scroll(
-                                collection_name=COLLECTION_NAME,
-                                limit=scroll_limit,
-                                offset=offset,
-                                with_payload=True,  # Need payload to filter
-                                with_vectors=False,
-                            )
-                            points, next_offset = scroll_result
-
-                            if not points:
-                                break
-
-                            # Filter in memory
-                            matching_points = [
-                                point
-                                for point in points
-                                if point.payload and point.payload.get("project_id") == project_id
-                            ]
-                            batch_ids = [point.id for point in matching_points]
-                            all_point_ids.extend(batch_ids)
-
-                            if next_offset is None:
-                                break
-                            offset = next_offset
-                    else:
-                        logger.error(f"   ❌ Error during scroll: {scroll_error}", exc_info=True)
-                    break
-
-            if not all_point_ids:
-                logger.info(f"✅ No points found for project_id={project_id}")
-                return 0
-
-            logger.info(f"   Found {len(all_point_ids)} points to delete (fallback method)")
+            wait_while_writes_paused(self.client, COLLECTION_NAME)
+            count_result = self.client.count(
+                collection_name=COLLECTION_NAME,
+                count_filter=project_filter,
+                exact=False,
+            )
+            point_count = count_result.count if hasattr(count_result, "count") else count_result
 
-            # Delete points in batches
-            batch_size = 1000
             delete_start = time.time()
-            deleted_count = 0
-
-            for i in range(0, len(all_point_ids), batch_size):
-                batch = all_point_ids[i : i + batch_size]
-                batch_num = (i // batch_size) + 1
-                total_batches = (len(all_point_ids) + batch_size - 1) // batch_size
-
-                try:
-                    self.client.delete(
-                        collection_name=COLLECTION_NAME,
-                        points_selector=PointIdsList(points=batch),
-                    )
-                    deleted_count += len(batch)
-                except Exception as batch_error:
-                    logger.error(
-                        f"   ❌ Failed to delete batch {batch_num}/{total_batches}: {batch_error}",
-                        exc_info=True,
-                    )
-                    continue
-
-            delete_duration = time.time() - delete_start
+            self.client.delete(
+                collection_name=COLLECTION_NAME,
+                points_selector=FilterSelector(filter=project_filter),
+                wait=False,
+            )
+            forget_index_version(project_id)
             logger.info(
-                f"✅ Successfully deleted {deleted_count} points in {delete_duration:.2f}s (fallback method)"
+                f"✅ Scheduled deletion of ~{point_count} points in {time.time() - delete_start:.2f}s"
             )
-
-            return deleted_count
+            return point_count
 
         except Exception as e:
             logger.error(f"❌ Failed to delete points from Qdrant: {e}", exc_info=True)
             raise
 
+    def delete_stale_versions(self, project_id: str, index_version: int) -> None:
+        """
+        Delete a project's points of every index version except `index_version`.
+
+        Also removes points written before versioning (no index_version payload).
+        """
+        stale_filter = Filter(
+            must=[FieldCondition(key="project_id", match=MatchValue(value=project_id))],
+            must_not=[FieldCondition(key="index_version", match=MatchValue(value=index_version))],
+        )
+        wait_while_writes_paused(self.client, COLLECTION_NAME)
+        self.client.delete(
+            collection_name=COLLECTION_NAME,
+            points_selector=FilterSelector(filter=stale_filter),
+            wait=True,
+        )
+
+    @staticmethod
+    def _project_filter(project_id: str) -> Filter:
+        """Filter on a project and, once it has been re-indexed with versioning, its active version."""
+        must = [FieldCondition(key="project_id", match=MatchValue(value=project_id))]
+        index_version = get_active_index_version(project_id)
+        if index_version is not None:
+            must.append(FieldCondition(key="index_version", match=MatchValue(value=index_version)))
+        return Filter(must=must)
+
     def search(
         self,
         project_id: str,
         query_embedding: list[float],
         limit: int = 5,
     ):
-        # Build filter for project_id
-        query_filter = Filter(
-            must=[
-                FieldCondition(
-                    key="project_id",
-                    match=MatchValue(value=project_id),
-                )
-            ]
-        )
+        # Build filter for project_id (and its active index version)
+        query_filter = self._project_filter(project_id)
 
         # Use search method (compatible with all qdrant-client versions)
         try:
@@ -525,6 +397,7 @@ class QdrantService:
                     query=query_embedding,
                     query_filter=query_filter,
                     limit=limit,
+                    search_params=self.profile.search_params(),
                 )
                 return result.points
         except AttributeError:
@@ -536,6 +409,82 @@ class QdrantService:
             query_vector=query_embedding,
             query_filter=query_filter,
             limit=limit,
+            search_params=self.profile.search_params(),
         )
 
         return result
+
+    @classmethod
+    def _batch_query_filter(cls, project_id: str, query: SearchQuery) -> Filter:
+        must = list(cls._project_filter(project_id).must)
+        if query.language:
+            must.append(FieldCondition(key="language", match=MatchValue(value=query.language)))
+        if query.file_path_prefix:
+            # Substring match narrows server-side; the prefix itself is checked on the hits
+            must.append(
+                FieldCondition(key="file_path", match=MatchText(text=query.file_path_prefix))
+            )
+        return Filter(must=must)
+
+    def search_batch(
+        self,
+        project_id: str,
+        queries: list[SearchQuery],
+        limit: int | None = None,
+    ) -> list:
+        """
+        Run several query vectors against a project in one round trip.
+
+        Args:
+            project_id: Project ID the points belong to
+            queries: Query vectors with their own limit and payload filters
+            limit: Maximum number of merged results (default: no cap)
+
+        Returns:
+            Scored points de-duplicated by id (keeping the best score of any
+            query), ordered by score descending
+        """
+        if not queries:
+            return []
+
+        requests = [
+            QueryRequest(
+                query=query.embedding,
+                filter=self._batch_query_filter(project_id, query),
+                limit=query.limit * (PREFIX_FILTER_OVERFETCH if query.file_path_prefix else 1),
+                params=self.profile.search_params(),
+                with_payload=True,
+            )
+            for query in queries
+        ]
+
+        search_start = time.time()
+        responses = self.client.query_batch_points(
+            collection_name=COLLECTION_NAME, requests=requests
+        )
+        batches = [response.points for response in responses]
+
+        best: dict[str, object] = {}
+        for query, points in zip(queries, batches, strict=True):
+            kept = 0
+            for point in points:
+                if kept >= query.limit:
+                    break
+                if query.file_path_prefix:
+                    file_path = (point.payload or {}).get("file_path", "")
+                    if not file_path.startswith(query.file_path_prefix):
+                        continue
+                kept += 1
+                point_id = str(point.id)
+                if point_id not in best or point.score > best[point_id].score:
+                    best[point_id] = point
+
+        results = sorted(best.values(), key=lambda point: point.score, reverse=True)
+        if limit is not None:
+            results = results[:limit]
+
+        logger.debug(
+            f"🔍 Batched search: {len(queries)} queries -> {len(results)} unique points "
+            f"in {time.time() - search_start:.3f}s"
+        )
+        return results
@@ -3,13 +3,18 @@ import time
 
 from supabase import Client
 
+from app.config import settings
 from app.core.supabase_client import get_supabase_client
 from app.services.embedding_service import get_embedding_service
 from app.services.groq_service import get_groq_service
 from app.services.qdrant_service import get_qdrant_service
+from app.utils.token_budgeting import build_context_from_chunks, select_chunks_by_budget
 
 logger = logging.getLogger(__name__)
 
+# Token budget for retrieved code context in chat answers
+RAG_CONTEXT_TOKEN_BUDGET = 5_000
+
 
 async def generate_rag_response(
     project_id: str,
@@ -151,36 +156,30 @@ async def generate_rag_response(
         f"✅ Retrieved {len(retrieved_chunks)} chunks from Supabase in {supabase_duration:.3f}s"
     )
 
-    # Step 4: Build context string
+    # Step 4: Build context string (best-scoring chunks within the token budget,
+    # without the overlap consecutive chunks of a file share)
     logger.info("📚 Step 4/5: Building context from retrieved chunks")
-    context_parts = []
-    chunks_used = []
-
-    for chunk in retrieved_chunks:
-        file_path = chunk["file_path"]
-        content = chunk["content"]
-        chunk_index = chunk["chunk_index"]
-        language = chunk["language"]
-
-        context_parts.append(
-            f"[File: {file_path} | Chunk {chunk_index} | Language: {language}]\n{content}\n"
-        )
-
-        chunks_used.append(
-            {
-                "chunk_id": chunk["id"],
-                "file_path": file_path,
-                "chunk_index": chunk_index,
-                "language": language,
-                "score": chunk["score"],
-            }
-        )
-
-    context = "\n".join(context_parts)
-    total_context_tokens = sum(chunk["token_count"] for chunk in retrieved_chunks)
+    packed_chunks = select_chunks_by_budget(
+        chunks=retrieved_chunks,
+        token_budget=RAG_CONTEXT_TOKEN_BUDGET,
+        max_chunk_tokens=settings.chunk_size,
+        min_chunks=1,
+    )
+    context = build_context_from_chunks(packed_chunks)
+    chunks_used = [
+        {
+            "chunk_id": chunk["id"],
+            "file_path": chunk["file_path"],
+            "chunk_index": chunk["chunk_index"],
+            "language": chunk["language"],
+            "score": chunk["score"],
+        }
+        for chunk in packed_chunks
+    ]
+    total_context_tokens = sum(chunk["truncated_token_count"] for chunk in packed_chunks)
 
     logger.info(f"✅ Built context ({len(context)} chars, ~{total_context_tokens} tokens)")
-    logger.debug(f"   Files referenced: {len({c['file_path'] for c in retrieved_chunks})}")
+    logger.debug(f"   Files referenced: {len({c['file_path'] for c in packed_chunks})}")
 
     # Step 5: Generate response using Groq API
     logger.info("🤖 Step 5/5: Generating response with Groq API")
@@ -0,0 +1,169 @@
+"""
+Terminal Output Hub
+Per-session scrollback ring buffer shared by every WebSocket attached to a terminal.
+
+Output is stored once in a fixed-size ring; subscribers pull from it by absolute byte
+offset. Memory stays bounded no matter how many clients attach or how slow they are:
+a client that falls behind the retained window is resynchronised with a snapshot of
+the current scrollback instead of queueing output.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Scrollback retained per terminal session
+TERMINAL_SCROLLBACK_BYTES = 256 * 1024
+# Maximum bytes handed to a subscriber per read (one WebSocket message)
+TERMINAL_OUTPUT_MESSAGE_BYTES = 64 * 1024
+
+
+@dataclass
+class TerminalOutputChunk:
+    """Output delivered to a subscriber."""
+
+    data: bytes
+    # Absolute offset just past `data`; reconnect with it to resume without gaps
+    offset: int
+    # True if output was skipped (client too slow or resumed from an expired offset):
+    # the client should clear its screen, `data` starts a snapshot of the scrollback
+    reset: bool = False
+
+
+class TerminalOutputHub:
+    """Fixed-size ring buffer of raw terminal output with any number of subscribers."""
+
+    def __init__(self, capacity: int = TERMINAL_SCROLLBACK_BYTES):
+        self._capacity = capacity
+        self._buffer = bytearray(capacity)
+        # Total bytes ever published; the ring holds [start_offset, end_offset)
+        self._end = 0
+        self._subscribers: set[TerminalOutputSubscriber] = set()
+        self._closed = False
+
+    @property
+    def start_offset(self) -> int:
+        """Absolute offset of the oldest retained byte."""
+        return max(0, self._end - self._capacity)
+
+    @property
+    def end_offset(self) -> int:
+        """Absolute offset just past the newest byte."""
+        return self._end
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, data: bytes) -> None:
+        """Append output and wake subscribers. Must be called from the event loop."""
+        if self._closed or not data:
+            return
+
+        if len(data) >= self._capacity:
+            # Only the newest `capacity` bytes can be retained
+            self._end += len(data) - self._capacity
+            data = data[-self._capacity :]
+
+        position = self._end % self._capacity
+        first = min(len(data), self._capacity - position)
+        self._buffer[position : position + first] = data[:first]
+        self._buffer[: len(data) - first] = data[first:]
+        self._end += len(data)
+
+        for subscriber in self._subscribers:
+            subscriber._wake()
+
+    def read(self, offset: int, max_bytes: int = TERMINAL_OUTPUT_MESSAGE_BYTES) -> bytes:
+        """Read retained output starting at an absolute offset."""
+        offset = max(offset, self.start_offset)
+        size = min(self._end - offset, max_bytes)
+        if size <= 0:
+            return b""
+
+        position = offset % self._capacity
+        first = min(size, self._capacity - position)
+        return bytes(self._buffer[position : position + first]) + bytes(
+            self._buffer[: size - first]
+        )
+
+    def subscribe(self, offset: int | None = None) -> "TerminalOutputSubscriber":
+        """
+        Attach a subscriber.
+
+        Args:
+            offset: Absolute offset to resume from (e.g. the last chunk's offset before
+                a reconnect). None replays all retained scrollback.
+        """
+        if offset is None:
+            position = self.start_offset
+        else:
+            position = min(max(offset, 0), self._end)
+        subscriber = TerminalOutputSubscriber(self, position)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: "TerminalOutputSubscriber") -> None:
+        self._subscribers.discard(subscriber)
+
+    def close(self) -> None:
+        """Stop accepting output; subscribers drain what is retained, then finish."""
+        self._closed = True
+        for subscriber in self._subscribers:
+            subscriber._wake()
+
+
+class TerminalOutputSubscriber:
+    """Read cursor of one client into a TerminalOutputHub."""
+
+    def __init__(self, hub: TerminalOutputHub, position: int):
+        self._hub = hub
+        self._position = position
+        self._event = asyncio.Event()
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    def _wake(self) -> None:
+        self._event.set()
+
+    async def read(
+        self, max_bytes: int = TERMINAL_OUTPUT_MESSAGE_BYTES
+    ) -> TerminalOutputChunk | None:
+        """
+        Wait for the next output chunk.
+
+        Returns:
+            TerminalOutputChunk, or None once the hub is closed and fully read
+        """
+        while True:
+            hub = self._hub
+            reset = False
+            if self._position < hub.start_offset:
+                # Overwritten before this client read it: resend the whole scrollback
+                logger.debug(
+                    f"Terminal subscriber fell behind by {hub.start_offset - self._position} bytes"
+                )
+                self._position = hub.start_offset
+                reset = True
+
+            if self._position < hub.end_offset:
+                data = hub.read(self._position, max_bytes)
+                self._position += len(data)
+                return TerminalOutputChunk(data=data, offset=self._position, reset=reset)
+
+            if hub.closed:
+                return None
+
+            self._event.clear()
+            await self._event.wait()
+
+    def close(self) -> None:
+        self._hub.unsubscribe(self)
@@ -4,6 +4,7 @@ Manages PTY sessions for interactive terminal access in Docker containers.
 """
 
 import asyncio
+import codecs
 import logging
 import re
 import uuid
@@ -14,13 +15,21 @@ from typing import Any
 
 from docker.errors import APIError, NotFound
 
-import docker
 from app.core.supabase_client import get_supabase_client
 from app.services.docker_client import get_docker_client
-from app.services.git_service import GitService
+from app.services.git_service import GitService, invalidate_git_snapshot
+from app.services.terminal_output_hub import TerminalOutputHub, TerminalOutputSubscriber
 
 logger = logging.getLogger(__name__)
 
+# Adaptive read buffer bounds for terminal output: grow while reads fill the buffer
+# (e.g. `npm install` output), shrink back for interactive echo
+TERMINAL_READ_MIN_BYTES = 4096
+TERMINAL_READ_MAX_BYTES = 65536
+# Seconds a terminal keeps running with no attached client, so a reconnect after a
+# network blip resumes the same shell and scrollback
+TERMINAL_DETACH_GRACE_SECONDS = 60.0
+
 
 @dataclass
 class TerminalSession:
@@ -34,6 +43,79 @@ class TerminalSession:
     created_at: datetime
 
 
+class TerminalOutputScanner:
+    """
+    Incremental scanner for commit SHAs and dev server ports in terminal output.
+
+    Each chunk is decoded once and a single combined pattern runs over the new text
+    plus a short carry-over from the previous chunk, so matches split across chunk
+    boundaries are found without rescanning earlier output.
+    """
+
+    # Characters of previous output kept to match across chunk boundaries
+    CARRY_CHARS = 512
+
+    PATTERN = re.compile(
+        "|".join(
+            [
+                # "[branch sha]" from `git commit` output or a git-aware prompt
+                r"\[[^\]\n]+\s+(?P<commit>[a-f0-9]{7,40})\]",
+                # "commit sha (HEAD -> main)" or "commit sha" at end of line (git log/show)
+                r"commit\s+(?P<log_commit>[a-f0-9]{7,40})[ \t\r]*(?:\(HEAD|$)",
+                # "Created commit sha"
+                r"Created\s+commit\s+(?P<created_commit>[a-f0-9]{7,40})",
+                # Dev server URLs and ports
+                r"Local:\s*https?://[^\s:]+:(?P<local_port>\d{2,5})",
+                r"https?://(?:localhost|127\.0\.0\.1|0\.0\.0\.0|\[::\]|::1):(?P<url_port>\d{2,5})",
+                r"(?:listening on|started on|server running at|running at)\s+"
+                r"(?:https?://)?(?:0\.0\.0\.0|127\.0\.0\.1|localhost)?[:\s](?P<listen_port>\d{2,5})",
+                r"port\s+(?P<ready_port>\d{2,5})\s*(?:open|listening|ready)",
+            ]
+        ),
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._carry = ""
+        # Length of the carry prefix already scanned to a conclusion
+        self._scanned = 0
+
+    def feed(self, data: bytes) -> tuple[list[str], set[int]]:
+        """
+        Scan a new chunk of output.
+
+        Returns:
+            (commit SHAs in order of appearance, candidate preview ports)
+        """
+        text = self._carry + self._decoder.decode(data)
+        commits: list[str] = []
+        ports: set[int] = set()
+        concluded = len(text)
+
+        for match in self.PATTERN.finditer(text):
+            if match.end() <= self._scanned:
+                continue
+            if match.end() == len(text):
+                # A SHA, port or line may continue in the next chunk: decide then
+                concluded = match.start()
+                break
+
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind.endswith("commit"):
+                commits.append(value)
+                continue
+            port = int(value)
+            if 1024 <= port <= 65535:
+                ports.add(port)
+
+        carry_start = max(0, len(text) - self.CARRY_CHARS)
+        self._carry = text[carry_start:]
+        self._scanned = max(0, concluded - carry_start)
+        return commits, ports
+
+
 class TerminalService:
     """
     Manages PTY terminal sessions in Docker containers.
@@ -47,27 +129,17 @@ class TerminalService:
         self.docker_client = get_docker_client()
         self.git_service = GitService()
         self.table_name = "terminal_sessions"
-        # Active exec streams: session_id -> (socket, exec_id)
+        # Active exec streams: session_id ->
+        #   {"socket", "exec_id", "session", "write_lock", "hub", "reader_task"}
         self._active_streams: dict[str, Any] = {}
-        # Output buffers for commit detection: session_id -> buffer_string
-        self._output_buffers: dict[str, str] = {}
-        # Maximum buffer size per session (keep last 10KB of output)
-        self._max_buffer_size = 10240
+        # Pending closes of streams with no attached client: session_id -> task
+        self._detach_tasks: dict[str, asyncio.Task] = {}
+        # Incremental commit/preview scanners: session_id -> scanner
+        self._output_scanners: dict[str, TerminalOutputScanner] = {}
         # Track last processed commit SHA per session to avoid duplicate updates
         self._last_processed_commits: dict[str, str] = {}
         # Track announced preview ports per session to avoid duplicate messages
         self._announced_ports: dict[str, set[int]] = {}
-        # Patterns to detect dev server URLs/ports from terminal output
-        self._preview_patterns = [
-            re.compile(r"(?:Local|local):\s*https?://[^\s:]+:(\d{2,5})"),
-            re.compile(r"https?://(?:localhost|127\.0\.0\.1|0\.0\.0\.0|\[::\]|::1):(\d{2,5})"),
-            re.compile(
-                r"(?:listening on|started on|server running at|running at)\s+"
-                r"(?:https?://)?(?:0\.0\.0\.0|127\.0\.0\.1|localhost)?[:\s](\d{2,5})",
-                re.IGNORECASE,
-            ),
-            re.compile(r"port\s+(\d{2,5})\s*(?:open|listening|ready)", re.IGNORECASE),
-        ]
 
     def _row_to_session(self, row: dict) -> TerminalSession:
         """Convert database row to TerminalSession object."""
@@ -98,11 +170,12 @@ class TerminalService:
 
         # Create exec instance with PTY
         try:
-            client = docker.from_env()
-            container = client.containers.get(container_id)
+            container = self.docker_client.get_container_info(container_id)
+            if container is None:
+                raise NotFound(f"No such container: {container_id}")
 
             # Create exec with TTY and interactive mode
-            exec_instance = client.api.exec_create(
+            exec_instance = self.docker_client.api.exec_create(
                 container.id,
                 cmd=["/bin/bash"],
                 stdin=True,
@@ -183,16 +256,15 @@ class TerminalService:
 
         return [self._row_to_session(row) for row in result.data]
 
-    async def start_stream(
-        self, session_id: str, container_id: str, on_output: Callable[[bytes], None]
-    ) -> Any | None:
+    async def start_stream(self, session_id: str, container_id: str) -> Any | None:
         """
         Start the exec stream for a terminal session.
 
+        Output is published to the session's TerminalOutputHub; use attach() to read it.
+
         Args:
             session_id: Session UUID
             container_id: Docker container ID
-            on_output: Callback for output data
 
         Returns:
             Socket object for writing input, or None on failure
@@ -203,11 +275,11 @@ class TerminalService:
             return None
 
         try:
-            client = docker.from_env()
+            api = self.docker_client.api
 
             # Check if exec is still valid and not already running
             try:
-                exec_info = client.api.exec_inspect(session.exec_id)
+                exec_info = api.exec_inspect(session.exec_id)
                 if exec_info.get("Running", False):
                     logger.warning(
                         f"Exec {session.exec_id[:12]} is already running for session {session_id}. "
@@ -258,21 +330,36 @@ class TerminalService:
                     raise
 
             # Start exec with socket connection
-            socket = client.api.exec_start(
+            socket = api.exec_start(
                 session.exec_id,
                 detach=False,
                 tty=True,
                 socket=True,
             )
+            # The reader and write_input both use event-loop socket I/O, which
+            # requires non-blocking mode before either touches the socket
+            sock = self._get_raw_socket(socket)
+            if self._supports_event_loop_io(sock):
+                sock.setblocking(False)
+
+            hub = TerminalOutputHub()
 
             # Store the socket reference
             self._active_streams[session_id] = {
                 "socket": socket,
                 "exec_id": session.exec_id,
+                # Cached descriptor so output handling never queries the database
+                "session": session,
+                # Serializes writes so concurrent inputs never interleave partial sends
+                "write_lock": asyncio.Lock(),
+                # Scrollback shared by every attached client
+                "hub": hub,
             }
 
             # Start reading output in background
-            asyncio.create_task(self._read_output(session_id, socket, on_output))
+            self._active_streams[session_id]["reader_task"] = asyncio.create_task(
+                self._read_output(session_id, socket, hub.publish)
+            )
 
             logger.info(f"Terminal stream started for session {session_id}")
 
@@ -300,12 +387,21 @@ class TerminalService:
             return socket._sock
         return socket
 
+    @staticmethod
+    def _supports_event_loop_io(sock: Any) -> bool:
+        """True for real sockets that can be registered with the event loop (not NpipeSocket)."""
+        return hasattr(sock, "fileno") and hasattr(sock, "setblocking") and hasattr(sock, "recv")
+
     async def _read_output(
         self, session_id: str, socket: Any, on_output: Callable[[bytes], None]
     ) -> None:
         """
         Continuously read output from the exec socket.
 
+        Unix sockets (set non-blocking by start_stream) are awaited on the event loop
+        (no executor threads, no polling); other socket types fall back to reads in
+        the default executor.
+
         Args:
             session_id: Session UUID
             socket: Docker socket object
@@ -313,50 +409,83 @@ class TerminalService:
         """
         try:
             sock = self._get_raw_socket(socket)
-
-            # Only set blocking mode if the socket supports it (not on Windows NpipeSocket)
-            if hasattr(sock, "setblocking"):
-                try:
-                    sock.setblocking(False)
-                except Exception:
-                    pass  # Some socket types don't support non-blocking mode
-
-            while session_id in self._active_streams:
-                try:
-                    # Use asyncio to read from socket in a thread pool
-                    loop = asyncio.get_running_loop()
-                    data = await loop.run_in_executor(
-                        None, lambda s=sock: self._read_socket_data(s)
-                    )
-
-                    if data:
-                        logger.debug(f"Terminal output for {session_id}: {len(data)} bytes")
-                        # Check for commits in terminal output
-                        self._check_for_commit(session_id, data)
-                        # Check for dev server previews in terminal output
-                        self._check_for_preview(session_id, data, on_output)
-                        on_output(data)
-                    else:
-                        # No data, small sleep to prevent busy loop
-                        await asyncio.sleep(0.02)
-
-                except BlockingIOError:
-                    await asyncio.sleep(0.02)
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    if session_id not in self._active_streams:
-                        break
-                    logger.debug(f"Read error: {e}")
-                    await asyncio.sleep(0.05)
+            if self._supports_event_loop_io(sock):
+                await self._read_output_evented(session_id, sock, on_output)
+            else:
+                await self._read_output_polling(session_id, sock, on_output)
 
         except asyncio.CancelledError:
             logger.debug(f"Output reader cancelled for session {session_id}")
         except Exception as e:
             logger.error(f"Output reader error for session {session_id}: {e}")
         finally:
+            stream_info = self._active_streams.get(session_id)
+            if stream_info and stream_info["socket"] is socket:
+                # Attached clients drain the scrollback, then see the stream end
+                stream_info["hub"].close()
             logger.info(f"Output reader stopped for session {session_id}")
 
+    def _handle_output(
+        self, session_id: str, data: bytes, on_output: Callable[[bytes], None]
+    ) -> None:
+        logger.debug(f"Terminal output for {session_id}: {len(data)} bytes")
+        # Check for commits and dev server previews in terminal output
+        self._scan_output(session_id, data, on_output)
+        on_output(data)
+
+    async def _read_output_evented(
+        self, session_id: str, sock: Any, on_output: Callable[[bytes], None]
+    ) -> None:
+        """Read output via loop.sock_recv until EOF or the session is closed."""
+        loop = asyncio.get_running_loop()
+        bufsize = TERMINAL_READ_MIN_BYTES
+
+        while session_id in self._active_streams:
+            try:
+                data = await loop.sock_recv(sock, bufsize)
+            except OSError as e:
+                if session_id in self._active_streams:
+                    logger.debug(f"Read error for session {session_id}: {e}")
+                return
+
+            if not data:
+                logger.info(f"Terminal stream ended for session {session_id}")
+                return
+
+            # Full reads mean more output is queued: read bigger chunks
+            if len(data) == bufsize:
+                bufsize = min(bufsize * 2, TERMINAL_READ_MAX_BYTES)
+            elif len(data) < bufsize // 4:
+                bufsize = max(bufsize // 2, TERMINAL_READ_MIN_BYTES)
+
+            self._handle_output(session_id, data, on_output)
+
+    async def _read_output_polling(
+        self, session_id: str, sock: Any, on_output: Callable[[bytes], None]
+    ) -> None:
+        """Read output in the default executor for sockets the event loop cannot watch."""
+        loop = asyncio.get_running_loop()
+
+        while session_id in self._active_streams:
+            try:
+                data = await loop.run_in_executor(None, lambda s=sock: self._read_socket_data(s))
+
+                if data:
+                    self._handle_output(session_id, data, on_output)
+                else:
+                    # No data, small sleep to prevent busy loop
+                    await asyncio.sleep(0.02)
+
+            except BlockingIOError:
+                await asyncio.sleep(0.02)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                if session_id not in self._active_streams:
+                    break
+                logger.debug(f"Read error: {e}")
+                await asyncio.sleep(0.05)
+
     def _read_socket_data(self, sock: Any) -> bytes | None:
         """Read data from socket with timeout."""
         try:
@@ -376,9 +505,9 @@ class TerminalService:
         except Exception:
             return None
 
-    def write_input(self, session_id: str, data: bytes) -> bool:
+    async def write_input(self, session_id: str, data: bytes) -> bool:
         """
-        Write input data to the terminal.
+        Write input data to the terminal without blocking the event loop.
 
         Args:
             session_id: Session UUID
@@ -389,12 +518,8 @@ class TerminalService:
         """
         stream_info = self._active_streams.get(session_id)
         if not stream_info:
+            # Stream recreation is handled by the WebSocket handler
             logger.warning(f"[WRITE_INPUT] No active stream for session {session_id}")
-            # Try to get session and recreate stream if possible
-            session = self.get_session(session_id)
-            if session:
-                logger.info(f"[WRITE_INPUT] Attempting to recreate stream for session {session_id}")
-                # Note: Stream recreation should be handled by the WebSocket handler
             return False
 
         try:
@@ -405,16 +530,23 @@ class TerminalService:
                 f"[WRITE_INPUT] Writing {len(data)} bytes to session {session_id}: {data[:50]!r}"
             )
 
-            # Use sendall if available (Unix), otherwise use send or write (Windows NpipeSocket)
-            if hasattr(sock, "sendall"):
-                sock.sendall(data)
-            elif hasattr(sock, "send"):
-                sock.send(data)
-            elif hasattr(sock, "write"):
-                sock.write(data)
-            else:
-                logger.error(f"[WRITE_INPUT] Socket has no send method for session {session_id}")
-                return False
+            loop = asyncio.get_running_loop()
+            async with stream_info["write_lock"]:
+                if self._supports_event_loop_io(sock) and hasattr(sock, "sendall"):
+                    await loop.sock_sendall(sock, data)
+                else:
+                    # sendall/send on other sockets, write() on Windows NpipeSocket
+                    send = (
+                        getattr(sock, "sendall", None)
+                        or getattr(sock, "send", None)
+                        or getattr(sock, "write", None)
+                    )
+                    if send is None:
+                        logger.error(
+                            f"[WRITE_INPUT] Socket has no send method for session {session_id}"
+                        )
+                        return False
+                    await loop.run_in_executor(None, send, data)
             logger.debug(f"[WRITE_INPUT] Write successful for session {session_id}")
             return True
         except Exception as e:
@@ -439,8 +571,7 @@ class TerminalService:
             return False
 
         try:
-            client = docker.from_env()
-            client.api.exec_resize(
+            self.docker_client.api.exec_resize(
                 stream_info["exec_id"],
                 height=rows,
                 width=cols,
@@ -451,6 +582,71 @@ class TerminalService:
             logger.error(f"Failed to resize terminal {session_id}: {e}")
             return False
 
+    def attach(self, session_id: str, offset: int | None = None) -> TerminalOutputSubscriber | None:
+        """
+        Attach a client to a running terminal's output.
+
+        Args:
+            session_id: Session UUID
+            offset: Output offset to resume from (last offset the client received);
+                None replays the retained scrollback
+
+        Returns:
+            Subscriber, or None if the session has no running stream
+        """
+        stream_info = self._active_streams.get(session_id)
+        if not stream_info or stream_info["hub"].closed:
+            return None
+
+        detach_task = self._detach_tasks.pop(session_id, None)
+        if detach_task:
+            detach_task.cancel()
+
+        subscriber = stream_info["hub"].subscribe(offset)
+        logger.info(
+            f"Client attached to session {session_id} at offset {subscriber.position} "
+            f"({stream_info['hub'].subscriber_count} attached)"
+        )
+        return subscriber
+
+    def detach(self, session_id: str, subscriber: TerminalOutputSubscriber) -> None:
+        """
+        Detach a client. The last client leaving starts a grace period after which the
+        session is closed unless a client reattaches.
+        """
+        subscriber.close()
+        stream_info = self._active_streams.get(session_id)
+        if not stream_info:
+            return
+
+        hub = stream_info["hub"]
+        if hub.subscriber_count:
+            return
+        if hub.closed:
+            self.close_session(session_id)
+            return
+
+        logger.info(
+            f"Last client detached from session {session_id}; "
+            f"closing in {TERMINAL_DETACH_GRACE_SECONDS:.0f}s unless reattached"
+        )
+        self._detach_tasks[session_id] = asyncio.create_task(self._close_after_grace(session_id))
+
+    def attached_workspace_ids(self) -> set[str]:
+        """Workspaces with at least one client attached to a terminal (thread-safe snapshot)."""
+        return {
+            stream_info["session"].workspace_id
+            for stream_info in list(self._active_streams.values())
+            if stream_info["hub"].subscriber_count
+        }
+
+    async def _close_after_grace(self, session_id: str) -> None:
+        await asyncio.sleep(TERMINAL_DETACH_GRACE_SECONDS)
+        self._detach_tasks.pop(session_id, None)
+        stream_info = self._active_streams.get(session_id)
+        if stream_info and stream_info["hub"].subscriber_count == 0:
+            self.close_session(session_id)
+
     def close_session(self, session_id: str) -> bool:
         """
         Close a terminal session.
@@ -462,16 +658,28 @@ class TerminalService:
             True if closed successfully
         """
         logger.info(f"[CLOSE_SESSION] Closing session: {session_id}")
+        detach_task = self._detach_tasks.pop(session_id, None)
+        if detach_task:
+            detach_task.cancel()
+
         # Remove from active streams
         if session_id in self._active_streams:
             logger.debug(f"[CLOSE_SESSION] Removing from active streams: {session_id}")
+            stream_info = self._active_streams.pop(session_id)
+            stream_info["hub"].close()
+            reader_task = stream_info.get("reader_task")
+            if reader_task:
+                reader_task.cancel()
             try:
-                socket = self._active_streams[session_id]["socket"]
-                sock = self._get_raw_socket(socket)
+                sock = self._get_raw_socket(stream_info["socket"])
+                try:
+                    # Unregister before closing so the loop never selects a dead fd
+                    asyncio.get_running_loop().remove_reader(sock.fileno())
+                except (RuntimeError, AttributeError, ValueError, OSError):
+                    pass
                 sock.close()
             except Exception as e:
                 logger.debug(f"[CLOSE_SESSION] Socket close error (expected): {e}")
-            del self._active_streams[session_id]
         else:
             logger.debug(f"[CLOSE_SESSION] Session not in active streams: {session_id}")
 
@@ -539,99 +747,62 @@ class TerminalService:
         logger.info(f"Deleted {deleted_count} terminal sessions for workspace {workspace_id}")
         return deleted_count
 
-    def _check_for_commit(self, session_id: str, output_data: bytes) -> None:
+    def _get_stream_session(self, session_id: str) -> TerminalSession | None:
+        """Get the session descriptor cached with its stream, falling back to the database."""
+        stream_info = self._active_streams.get(session_id)
+        if stream_info and stream_info.get("session"):
+            return stream_info["session"]
+        return self.get_session(session_id)
+
+    def _scan_output(
+        self, session_id: str, output_data: bytes, on_output: Callable[[bytes], None]
+    ) -> None:
         """
-        Check terminal output for git commit commands and update last_platform_commit.
+        Scan new terminal output for git commits and dev server URLs.
+
+        Commits update last_platform_commit; preview ports are verified and announced.
 
         Args:
             session_id: Terminal session ID
             output_data: Raw terminal output bytes
+            on_output: Callback used to announce preview URLs
         """
         try:
-            # Get session to find workspace_id and container_id
-            session = self.get_session(session_id)
-            if not session:
-                return
+            scanner = self._output_scanners.get(session_id)
+            if scanner is None:
+                scanner = self._output_scanners[session_id] = TerminalOutputScanner()
+            commits, ports = scanner.feed(output_data)
 
-            # Decode output and add to buffer
-            try:
-                output_text = output_data.decode("utf-8", errors="replace")
-            except Exception:
-                return
-
-            # Update buffer for this session
-            if session_id not in self._output_buffers:
-                self._output_buffers[session_id] = ""
-
-            buffer = self._output_buffers[session_id] + output_text
-            # Keep buffer size manageable
-            if len(buffer) > self._max_buffer_size:
-                buffer = buffer[-self._max_buffer_size :]
-            self._output_buffers[session_id] = buffer
-
-            # Check for commit success patterns
-            # Pattern 1: Git prompt format "[branch_name commit_sha]" - e.g., "[main abc1234]"
-            # Pattern 2: "commit abc1234" or "commit abc1234 (HEAD -> main)" from git log/show
-            # Pattern 3: "Created commit abc1234" from git commit output
-            # Pattern 4: "[main abc1234]" at end of line (git prompt)
-            commit_patterns = [
-                (
-                    r"\[([^\]]+)\s+([a-f0-9]{7,40})\]\s*$",
-                    True,
-                ),  # [branch sha] at end of line (git prompt)
-                (r"\[([^\]]+)\s+([a-f0-9]{7,40})\]", False),  # [branch sha] anywhere
-                (
-                    r"commit\s+([a-f0-9]{7,40})\s*(?:\(HEAD|$)",
-                    True,
-                ),  # commit sha followed by HEAD or end
-                (r"Created\s+commit\s+([a-f0-9]{7,40})", True),  # Created commit sha
-            ]
+            if commits:
+                self._handle_commit_detected(session_id, commits[-1])
 
-            for pattern, _require_end in commit_patterns:
-                matches = re.findall(pattern, buffer, re.IGNORECASE | re.MULTILINE)
-                if matches:
-                    # Get the most recent match
-                    if isinstance(matches[-1], tuple):
-                        commit_sha = matches[-1][-1]  # Last element of tuple
-                    else:
-                        commit_sha = matches[-1]
-
-                    # Validate SHA format (should be 7-40 hex characters)
-                    if not re.match(r"^[a-f0-9]{7,40}$", commit_sha, re.IGNORECASE):
-                        continue
-
-                    # Check if we've already processed this commit
-                    if session_id in self._last_processed_commits:
-                        if self._last_processed_commits[session_id] == commit_sha:
-                            continue  # Already processed this commit
-
-                    # Mark as processed
-                    self._last_processed_commits[session_id] = commit_sha
-
-                    # Schedule update with a small delay to ensure commit is complete
-                    asyncio.create_task(
-                        self._update_last_platform_commit_delayed(session.workspace_id, session_id)
-                    )
-                    logger.info(
-                        f"Detected commit {commit_sha[:7]} in terminal output for workspace {session.workspace_id}, will update last_platform_commit"
-                    )
-                    break
+            announced = self._announced_ports.get(session_id, set())
+            for port in ports - announced:
+                asyncio.create_task(self._handle_preview_detected(session_id, port, on_output))
 
         except Exception as e:
-            logger.debug(f"Error checking for commit in terminal output: {e}")
+            logger.debug(f"Error scanning terminal output: {e}")
 
-    def _extract_preview_ports(self, output_text: str) -> set[int]:
-        """Extract candidate ports from output text."""
-        ports: set[int] = set()
-        for pattern in self._preview_patterns:
-            for match in pattern.findall(output_text):
-                try:
-                    port = int(match)
-                except (TypeError, ValueError):
-                    continue
-                if 1024 <= port <= 65535:
-                    ports.add(port)
-        return ports
+    def _handle_commit_detected(self, session_id: str, commit_sha: str) -> None:
+        """Schedule a last_platform_commit update for a commit seen in terminal output."""
+        # Check if we've already processed this commit
+        if self._last_processed_commits.get(session_id) == commit_sha:
+            return
+
+        session = self._get_stream_session(session_id)
+        if not session:
+            return
+
+        # Mark as processed
+        self._last_processed_commits[session_id] = commit_sha
+
+        # Schedule update with a small delay to ensure commit is complete
+        asyncio.create_task(
+            self._update_last_platform_commit_delayed(session.workspace_id, session_id)
+        )
+        logger.info(
+            f"Detected commit {commit_sha[:7]} in terminal output for workspace {session.workspace_id}, will update last_platform_commit"
+        )
 
     def _is_port_listening(self, container_id: str, port: int) -> bool:
         """Check if a port is listening inside the container."""
@@ -647,30 +818,11 @@ class TerminalService:
                 return True
         return False
 
-    def _check_for_preview(
-        self, session_id: str, output_data: bytes, on_output: Callable[[bytes], None]
-    ) -> None:
-        """Check terminal output for dev server URLs and announce preview links."""
-        try:
-            output_text = output_data.decode("utf-8", errors="replace")
-        except Exception:
-            return
-
-        ports = self._extract_preview_ports(output_text)
-        if not ports:
-            return
-
-        for port in ports:
-            announced = self._announced_ports.get(session_id, set())
-            if port in announced:
-                continue
-            asyncio.create_task(self._handle_preview_detected(session_id, port, on_output))
-
     async def _handle_preview_detected(
         self, session_id: str, port: int, on_output: Callable[[bytes], None]
     ) -> None:
         """Verify server port and announce preview URL."""
-        session = self.get_session(session_id)
+        session = self._get_stream_session(session_id)
         if not session:
             return
 
@@ -747,6 +899,9 @@ class TerminalService:
                 )
                 return
 
+            # History changed: the git panel must not serve a cached snapshot
+            invalidate_git_snapshot(workspace.container_id)
+
             # Get current HEAD commit SHA
             rev_result = self.git_service.git_rev_parse(workspace.container_id, "HEAD")
             if not rev_result.get("success"):
@@ -777,9 +932,9 @@ class TerminalService:
             )
 
     def _cleanup_session_buffer(self, session_id: str) -> None:
-        """Clean up output buffer when session is closed."""
-        if session_id in self._output_buffers:
-            del self._output_buffers[session_id]
+        """Clean up output scanning state when session is closed."""
+        if session_id in self._output_scanners:
+            del self._output_scanners[session_id]
         if session_id in self._last_processed_commits:
             del self._last_processed_commits[session_id]
         if session_id in self._announced_ports:
@@ -459,7 +459,7 @@ class VerificationAgent:
         # Try to parse JSON from content
         try:
             verification_result = await parse_llm_json_response_async(
-                content, expected_type="object"
+                content, expected_type="object", model=VerificationResultModel
             )
         except Exception as e:
             logger.error(f"Failed to parse agent response as JSON: {e}")
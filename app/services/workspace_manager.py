@@ -9,9 +9,13 @@ import uuid
 from dataclasses import dataclass
 from datetime import UTC, datetime
 
+from app.config import settings
 from app.core.supabase_client import get_supabase_client
+from app.services.container_pool import ContainerPool
 from app.services.docker_client import DockerClient, get_docker_client
+from app.services.git_mirror_cache import MIRROR_MOUNT_PATH, MIRROR_VOLUME_NAME
 from app.services.git_service import GitService
+from app.services.port_lease_registry import PortLeaseRegistry
 from app.services.preview_proxy import PORT_MAPPING
 
 logger = logging.getLogger(__name__)
@@ -68,6 +72,18 @@ class WorkspaceManager:
         self.supabase = get_supabase_client()
         self.docker: DockerClient = get_docker_client()
         self.table_name = "workspaces"
+        # Host port blocks for workspace containers (pooled ones use Docker-assigned ports)
+        self.port_leases = PortLeaseRegistry(self.supabase, list(PORT_MAPPING.keys()))
+        # Warm containers for create_workspace; started by the workspace service
+        self.pool = ContainerPool(
+            self.docker,
+            container_name_for=self._get_container_name,
+            volume_name_for=self._get_volume_name,
+            container_ports=list(PORT_MAPPING.keys()),
+            size=settings.workspace_pool_size,
+            idle_seconds=settings.workspace_pool_idle_seconds,
+            read_only_volumes=self._get_shared_volumes(),
+        )
 
     def _row_to_workspace(self, row: dict) -> Workspace:
         """Convert database row to Workspace object."""
@@ -85,10 +101,23 @@ class WorkspaceManager:
         """Generate a consistent volume name for a workspace."""
         return f"gitguide-vol-{workspace_id[:8]}"
 
+    def _get_container_name(self, workspace_id: str) -> str:
+        """Generate a consistent container name for a workspace."""
+        return f"gitguide-ws-{workspace_id[:8]}"
+
+    def _get_shared_volumes(self) -> dict[str, str] | None:
+        """Shared volumes mounted read-only into every workspace (git mirror cache)."""
+        if not settings.workspace_git_mirror_enabled:
+            return None
+        return {MIRROR_VOLUME_NAME: MIRROR_MOUNT_PATH}
+
     def create_workspace(self, user_id: str, project_id: str) -> Workspace:
         """
         Create a new workspace with a Docker container and persistent volume.
 
+        Claims a warm container from the pool when one is ready (the workspace adopts
+        its pre-allocated ID and volume); otherwise creates and starts one.
+
         Args:
             user_id: User's UUID
             project_id: Project's UUID
@@ -96,30 +125,39 @@ class WorkspaceManager:
         Returns:
             Created Workspace object
         """
-        workspace_id = str(uuid.uuid4())
-        container_name = f"gitguide-ws-{workspace_id[:8]}"
-        volume_name = self._get_volume_name(workspace_id)
-
-        # Default port mappings for local development
-        # Use ports 30001-30010 to avoid conflicts with common services (3000=frontend, 8000=backend API)
-        # Container ports map to host ports using centralized PORT_MAPPING configuration
-        default_ports = {
-            f"{container_port}/tcp": ("0.0.0.0", host_port)
-            for container_port, host_port in PORT_MAPPING.items()
-        }
+        pooled = self.pool.claim()
+        if pooled is not None:
+            workspace_id = pooled.workspace_id
+            volume_name = pooled.volume_name
+            container_id = pooled.container_id
+            status = "running"
+        else:
+            workspace_id = str(uuid.uuid4())
+            container_name = self._get_container_name(workspace_id)
+            volume_name = self._get_volume_name(workspace_id)
 
-        # Create container with persistent volume and port mappings
-        container_id, status = self.docker.create_container(
-            name=container_name, volume_name=volume_name, ports=default_ports
-        )
+            # Publish container ports on the workspace's leased block of host ports
+            ports = self.port_leases.port_bindings(workspace_id)
 
-        # Start container immediately
-        success, _ = self.docker.start_container(container_id)
-        if not success:
-            logger.warning(
-                f"Container {container_id[:12]} failed to start immediately after creation"
-            )
-        status = self.docker.get_container_status(container_id)
+            # Create container with persistent volume and port mappings
+            try:
+                container_id, status = self.docker.create_container(
+                    name=container_name,
+                    volume_name=volume_name,
+                    ports=ports,
+                    read_only_volumes=self._get_shared_volumes(),
+                )
+            except Exception:
+                self.port_leases.release(workspace_id)
+                raise
+
+            # Start container immediately
+            success, _ = self.docker.start_container(container_id)
+            if not success:
+                logger.warning(
+                    f"Container {container_id[:12]} failed to start immediately after creation"
+                )
+            status = self.docker.get_container_status(container_id)
 
         # Save to database
         now = datetime.now(UTC).isoformat()
@@ -262,57 +300,31 @@ class WorkspaceManager:
         logger.info("[GET_OR_CREATE] No existing workspace, creating new one")
         return self.create_workspace(user_id, project_id)
 
-    def _recreate_container(
-        self, workspace: Workspace, use_available_ports: bool = False
-    ) -> Workspace:
+    def _recreate_container(self, workspace: Workspace, reassign_ports: bool = False) -> Workspace:
         """
         Recreate a container for an orphaned workspace.
         Reuses the existing volume so user files are preserved.
 
         Args:
             workspace: Existing workspace with missing container
-            use_available_ports: If True, find available ports dynamically instead of using PORT_MAPPING
+            reassign_ports: If True, move the workspace to a new block of host ports
+                (its leased ports are held by a process outside the registry)
 
         Returns:
             Updated Workspace object with new container
         """
-        container_name = f"gitguide-ws-{workspace.workspace_id[:8]}"
+        container_name = self._get_container_name(workspace.workspace_id)
         volume_name = self._get_volume_name(workspace.workspace_id)
 
-        # Port mappings for local development
-        if use_available_ports:
-            # Find available ports dynamically
-            logger.info("[RECREATE_CONTAINER] Finding available ports dynamically...")
-            ports = {}
-            base_port = 30001
-            for container_port in PORT_MAPPING.keys():
-                logger.debug(
-                    f"[RECREATE_CONTAINER] Looking for available port starting from {base_port} for container port {container_port}"
-                )
-                available_port = self.docker.find_available_port(base_port, base_port + 100)
-                if available_port:
-                    ports[f"{container_port}/tcp"] = ("0.0.0.0", available_port)
-                    logger.info(
-                        f"[RECREATE_CONTAINER] Mapped container port {container_port} to host port {available_port}"
-                    )
-                    base_port = available_port + 1
-                else:
-                    logger.warning(
-                        f"[RECREATE_CONTAINER] Could not find available port for container port {container_port}, using default {PORT_MAPPING[container_port]}"
-                    )
-                    ports[f"{container_port}/tcp"] = ("0.0.0.0", PORT_MAPPING[container_port])
-                    base_port = PORT_MAPPING[container_port] + 1
-            logger.info(f"[RECREATE_CONTAINER] Using dynamically allocated ports: {ports}")
-        else:
-            # Use default port mappings from PORT_MAPPING configuration
-            ports = {
-                f"{container_port}/tcp": ("0.0.0.0", host_port)
-                for container_port, host_port in PORT_MAPPING.items()
-            }
+        # Publish container ports on the workspace's leased block of host ports
+        ports = self.port_leases.port_bindings(workspace.workspace_id, reassign=reassign_ports)
 
         # Create new container with existing volume (files are preserved) and port mappings
         container_id, status = self.docker.create_container(
-            name=container_name, volume_name=volume_name, ports=ports
+            name=container_name,
+            volume_name=volume_name,
+            ports=ports,
+            read_only_volumes=self._get_shared_volumes(),
         )
 
         # Start container immediately
@@ -376,6 +388,8 @@ class WorkspaceManager:
             self.docker.remove_volume(volume_name)
             logger.info(f"Volume {volume_name} removed")
 
+        self.port_leases.release(workspace_id)
+
         # Delete from database
         self.supabase.table(self.table_name).delete().eq("workspace_id", workspace_id).execute()
 
@@ -548,11 +562,7 @@ class WorkspaceManager:
             if not success and is_port_conflict:
                 logger.warning(
                     f"[START_WORKSPACE] Container start failed for {workspace.container_id[:12]} due to port conflict. "
-                    f"Will recreate with available ports..."
-                )
-                # Recreate container with available port mappings
-                logger.info(
-                    "[START_WORKSPACE] Recreating container with available port mappings..."
+                    f"Will recreate on a new block of host ports..."
                 )
                 try:
                     # Stop and remove old container
@@ -561,8 +571,8 @@ class WorkspaceManager:
                 except Exception:
                     pass  # Container might already be stopped/removed
 
-                # Recreate with available ports
-                updated_workspace = self._recreate_container(workspace, use_available_ports=True)
+                # Recreate on a newly leased port block
+                updated_workspace = self._recreate_container(workspace, reassign_ports=True)
                 if updated_workspace.container_status == "running":
                     logger.info("[START_WORKSPACE] Successfully recreated and started container")
                     return True
@@ -591,9 +601,9 @@ class WorkspaceManager:
                         self.docker.remove_container(workspace.container_id)
                     except Exception:
                         pass
-                # Use available ports if it's a port conflict, otherwise use default ports
+                # Move to a new port block if it's a port conflict, otherwise keep the lease
                 updated_workspace = self._recreate_container(
-                    workspace, use_available_ports=is_port_conflict
+                    workspace, reassign_ports=is_port_conflict
                 )
                 return updated_workspace.container_status == "running"
             except Exception as recreate_error:
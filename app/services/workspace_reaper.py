@@ -0,0 +1,301 @@
+"""
+Workspace Reaper Service
+Hibernates idle workspaces and keeps running containers within host resource budgets.
+
+A background thread periodically:
+- samples memory/CPU of every running workspace container (Docker stats API);
+- hibernates workspaces idle longer than the configured threshold (the container is
+  stopped, the volume is kept; starting the workspace resumes it);
+- if running containers exceed the host memory or CPU budget, hibernates the least
+  recently active workspaces until usage is back within budget.
+
+Workspaces with a terminal client attached are never hibernated.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+
+from app.config import settings
+from app.services.docker_client import DockerClient, get_docker_client
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkspaceUsage:
+    """Resource usage sample of a running workspace container."""
+
+    workspace_id: str
+    container_id: str
+    memory_bytes: int
+    memory_limit_bytes: int
+    # None until two samples are available
+    cpu_cores: float | None
+    last_active_at: datetime
+    sampled_at: datetime
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["last_active_at"] = self.last_active_at.isoformat()
+        data["sampled_at"] = self.sampled_at.isoformat()
+        return data
+
+
+def _memory_bytes(stats: dict) -> tuple[int, int]:
+    """Working-set memory and limit, excluding reclaimable page cache (as `docker stats`)."""
+    memory = stats.get("memory_stats") or {}
+    usage = memory.get("usage") or 0
+    details = memory.get("stats") or {}
+    # cgroup v2 reports inactive_file, cgroup v1 reports cache
+    cache = details.get(
+        "inactive_file", details.get("total_inactive_file", details.get("cache", 0))
+    )
+    return max(usage - (cache or 0), 0), memory.get("limit") or 0
+
+
+def _cpu_counters(stats: dict) -> tuple[int, int, int]:
+    """(container CPU ns, host CPU ns, online CPUs) from a stats sample."""
+    cpu = stats.get("cpu_stats") or {}
+    usage = cpu.get("cpu_usage") or {}
+    online = cpu.get("online_cpus") or len(usage.get("percpu_usage") or []) or 1
+    return usage.get("total_usage") or 0, cpu.get("system_cpu_usage") or 0, online
+
+
+class WorkspaceReaper:
+    """Background scheduler for idle hibernation and resource-budget eviction."""
+
+    def __init__(
+        self,
+        workspace_manager=None,
+        docker_client: DockerClient | None = None,
+        attached_workspace_ids: Callable[[], set[str]] | None = None,
+    ):
+        """
+        Args:
+            workspace_manager: WorkspaceManager (defaults to the singleton, lazily)
+            docker_client: DockerClient (defaults to the singleton)
+            attached_workspace_ids: Returns workspaces with a live terminal client
+                (defaults to the terminal service)
+        """
+        self._workspace_manager = workspace_manager
+        self._docker = docker_client or get_docker_client()
+        self._attached_workspace_ids = attached_workspace_ids
+        self._usage: dict[str, WorkspaceUsage] = {}
+        # container_id -> (container CPU ns, host CPU ns) of the previous sample
+        self._cpu_samples: dict[str, tuple[int, int]] = {}
+        # In-process activity not yet reflected in the database's last_active_at
+        self._activity: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def workspace_manager(self):
+        """Lazy load workspace_manager to avoid circular import."""
+        if self._workspace_manager is None:
+            from app.services.workspace_manager import get_workspace_manager
+
+            self._workspace_manager = get_workspace_manager()
+        return self._workspace_manager
+
+    def _attached(self) -> set[str]:
+        if self._attached_workspace_ids is None:
+            from app.services.terminal_service import get_terminal_service
+
+            self._attached_workspace_ids = get_terminal_service().attached_workspace_ids
+        return self._attached_workspace_ids()
+
+    def record_activity(self, workspace_id: str) -> None:
+        """Mark a workspace as in use (terminal input, preview traffic, ...)."""
+        self._activity[workspace_id] = datetime.now(UTC)
+
+    def get_usage(self, workspace_id: str) -> WorkspaceUsage | None:
+        """Latest usage sample of a workspace, or None if it isn't running."""
+        with self._lock:
+            return self._usage.get(workspace_id)
+
+    def sample_workspace(self, workspace) -> WorkspaceUsage | None:
+        """
+        Sample a single workspace container now.
+
+        Args:
+            workspace: Workspace with a container
+
+        Returns:
+            WorkspaceUsage, or None if the container isn't running
+        """
+        if not workspace.container_id:
+            return None
+        if self._docker.get_container_status(workspace.container_id) != "running":
+            return None
+        stats = self._docker.get_container_stats(workspace.container_id)
+        if not stats:
+            return None
+
+        memory_bytes, memory_limit = _memory_bytes(stats)
+        container_ns, host_ns, online_cpus = _cpu_counters(stats)
+        cpu_cores = None
+        with self._lock:
+            previous = self._cpu_samples.get(workspace.container_id)
+            self._cpu_samples[workspace.container_id] = (container_ns, host_ns)
+        if previous and host_ns > previous[1]:
+            cpu_cores = (container_ns - previous[0]) / (host_ns - previous[1]) * online_cpus
+
+        usage = WorkspaceUsage(
+            workspace_id=workspace.workspace_id,
+            container_id=workspace.container_id,
+            memory_bytes=memory_bytes,
+            memory_limit_bytes=memory_limit,
+            cpu_cores=max(cpu_cores, 0.0) if cpu_cores is not None else None,
+            last_active_at=self._last_active(workspace),
+            sampled_at=datetime.now(UTC),
+        )
+        with self._lock:
+            self._usage[workspace.workspace_id] = usage
+        return usage
+
+    def _last_active(self, workspace) -> datetime:
+        recorded = self._activity.get(workspace.workspace_id)
+        last_active = workspace.last_active_at
+        if last_active.tzinfo is None:
+            last_active = last_active.replace(tzinfo=UTC)
+        return max(last_active, recorded) if recorded else last_active
+
+    def start(self) -> None:
+        """Start the background scheduler."""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="workspace-reaper", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Workspace reaper started (idle: {settings.workspace_idle_hibernate_seconds}s, "
+            f"memory budget: {settings.workspace_memory_budget_mb or 'off'} MB, "
+            f"CPU budget: {settings.workspace_cpu_budget_cores or 'off'} cores)"
+        )
+
+    def stop(self) -> None:
+        """Stop the background scheduler."""
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(settings.workspace_reaper_interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"⚠️ Workspace reaper pass failed: {e}")
+
+    def run_once(self) -> list[str]:
+        """
+        Sample running workspaces, hibernate idle ones, then enforce budgets.
+
+        Returns:
+            IDs of workspaces hibernated in this pass
+        """
+        now = datetime.now(UTC)
+        attached = self._attached()
+        for workspace_id in attached:
+            self.record_activity(workspace_id)
+
+        running: list[WorkspaceUsage] = []
+        for workspace in self.workspace_manager.get_all_workspaces():
+            try:
+                usage = self.sample_workspace(workspace)
+            except Exception as e:
+                logger.debug(f"Failed to sample workspace {workspace.workspace_id}: {e}")
+                continue
+            if usage is None:
+                with self._lock:
+                    self._usage.pop(workspace.workspace_id, None)
+                    if workspace.container_id:
+                        self._cpu_samples.pop(workspace.container_id, None)
+                continue
+            running.append(usage)
+
+        hibernated: list[str] = []
+        idle_limit = settings.workspace_idle_hibernate_seconds
+        if idle_limit > 0:
+            for usage in running:
+                idle_seconds = (now - usage.last_active_at).total_seconds()
+                if usage.workspace_id not in attached and idle_seconds > idle_limit:
+                    logger.info(
+                        f"Hibernating workspace {usage.workspace_id} "
+                        f"(idle {idle_seconds / 60:.0f} min)"
+                    )
+                    if self._hibernate(usage):
+                        hibernated.append(usage.workspace_id)
+
+        running = [usage for usage in running if usage.workspace_id not in hibernated]
+        hibernated.extend(self._enforce_budgets(running, attached))
+        return hibernated
+
+    def _enforce_budgets(self, running: list[WorkspaceUsage], attached: set[str]) -> list[str]:
+        """Hibernate least recently active workspaces until usage fits the budgets."""
+        memory_budget = settings.workspace_memory_budget_mb * 1024 * 1024
+        cpu_budget = settings.workspace_cpu_budget_cores
+        memory_used = sum(usage.memory_bytes for usage in running)
+        cpu_used = sum(usage.cpu_cores or 0.0 for usage in running)
+
+        def over_budget() -> bool:
+            return (memory_budget > 0 and memory_used > memory_budget) or (
+                cpu_budget > 0 and cpu_used > cpu_budget
+            )
+
+        hibernated: list[str] = []
+        candidates = sorted(
+            (usage for usage in running if usage.workspace_id not in attached),
+            key=lambda usage: usage.last_active_at,
+        )
+        for usage in candidates:
+            if not over_budget():
+                break
+            logger.warning(
+                f"⚠️ Workspace containers over budget ({memory_used / 2**20:.0f} MB, "
+                f"{cpu_used:.2f} cores); hibernating least recently active "
+                f"workspace {usage.workspace_id}"
+            )
+            if self._hibernate(usage):
+                hibernated.append(usage.workspace_id)
+                memory_used -= usage.memory_bytes
+                cpu_used -= usage.cpu_cores or 0.0
+
+        if over_budget():
+            logger.warning(
+                "⚠️ Workspace containers still over budget; remaining workspaces are in use"
+            )
+        return hibernated
+
+    def _hibernate(self, usage: WorkspaceUsage) -> bool:
+        """Stop a workspace's container (its volume is kept)."""
+        started = time.monotonic()
+        success = self.workspace_manager.stop_workspace(usage.workspace_id)
+        if success:
+            with self._lock:
+                self._usage.pop(usage.workspace_id, None)
+                self._cpu_samples.pop(usage.container_id, None)
+            self._activity.pop(usage.workspace_id, None)
+            logger.info(
+                f"Workspace {usage.workspace_id} hibernated in {time.monotonic() - started:.1f}s"
+            )
+        else:
+            logger.error(f"❌ Failed to hibernate workspace {usage.workspace_id}")
+        return success
+
+
+# Singleton instance
+_workspace_reaper: WorkspaceReaper | None = None
+
+
+def get_workspace_reaper() -> WorkspaceReaper:
+    """Get or create the WorkspaceReaper singleton."""
+    global _workspace_reaper
+    if _workspace_reaper is None:
+        _workspace_reaper = WorkspaceReaper()
+    return _workspace_reaper
@@ -1,15 +1,19 @@
 """
 Utility functions for parsing JSON responses from LLMs.
-Handles markdown code blocks and malformed JSON.
-Uses JSON sanitizer (GPT-OSS-120b) when main model returns markdown/code instead of JSON.
+Handles markdown code blocks, malformed and truncated JSON in a single tolerant
+pass (see tolerant_json.py), optionally repairing the result against a Pydantic
+model. The JSON sanitizer (GPT-OSS-120b) costs a second rate-limited LLM request
+and is only used when no JSON value can be recovered from the response at all.
 """
 
 import asyncio
-import json
 import logging
 import re
 
+from pydantic import BaseModel, ValidationError
+
 from app.config import settings
+from app.utils.tolerant_json import parse_tolerant, repair_for_model
 
 logger = logging.getLogger(__name__)
 
@@ -27,377 +31,148 @@ def _get_sanitizer():
     return _json_sanitizer()
 
 
-def _is_markdown_or_code(response_text: str) -> bool:
+def _parse_without_llm(
+    response_text: str, expected_type: str, model: type[BaseModel] | None
+) -> dict | list | None:
     """
-    Check if response looks like markdown/code instead of JSON.
-
-    Args:
-        response_text: Raw response text from LLM
+    Tolerant parse plus schema-guided repair.
 
     Returns:
-        True if response appears to be markdown/code
+        Parsed (and, with a model, validated) JSON, or None if nothing usable was found.
+        Truncated output is only returned without a model: model defaults would
+        silently stand in for the fields that were cut off.
     """
-    text_lower = response_text.strip().lower()
-    code_indicators = [
-        text_lower.startswith("python"),
-        text_lower.startswith("javascript"),
-        text_lower.startswith("java"),
-        text_lower.startswith("def "),
-        text_lower.startswith("class "),
-        text_lower.startswith("function "),
-        text_lower.startswith("const "),
-        text_lower.startswith("let "),
-        text_lower.startswith("var "),
-        "def __init__" in text_lower,
-        "function(" in text_lower,
-        text_lower.startswith("```"),  # Markdown code block
-        text_lower.startswith("# "),  # Markdown header
-        text_lower.startswith("## "),  # Markdown header
-        "```" in text_lower and "json" not in text_lower[:50],  # Code block but not JSON
-    ]
-    return any(code_indicators)
-
-
-def parse_llm_json_response(response_text: str, expected_type: str = "object") -> dict | list:
+    result = parse_tolerant(response_text, expected_type)
+    if result is None:
+        return None
+    if not result.complete:
+        if model is not None:
+            logger.warning(f"⚠️  LLM response was truncated, not accepting partial {model.__name__}")
+            return None
+        logger.warning("⚠️  LLM response was truncated, recovered partial JSON")
+
+    if model is None:
+        return result.value
+    try:
+        return _validate(result.value, model)
+    except ValidationError as e:
+        logger.warning(f"⚠️  Parsed JSON does not match {model.__name__}: {e.error_count()} errors")
+        return None
+
+
+def _validate(data: dict | list, model: type[BaseModel]) -> dict:
+    return model.model_validate(repair_for_model(data, model)).model_dump()
+
+
+def _parse_error(response_text: str, expected_type: str) -> ValueError:
+    logger.error("❌ Failed to parse JSON from LLM response")
+    logger.error(f"   Original response: {response_text[:500]}")
+    return ValueError(
+        f"Invalid JSON response from LLM. Expected JSON {expected_type}. "
+        f"Full response preview: {response_text[:500]}"
+    )
+
+
+def _check_response(response_text: str) -> None:
+    if not response_text:
+        raise ValueError("Empty response text")
+    # Nothing for the sanitizer to recover from an empty code block
+    if re.match(r"^\s*```[a-z]*\s*```\s*$", response_text, re.IGNORECASE):
+        raise ValueError(
+            "Empty markdown code block received. LLM returned empty JSON. "
+            "Original response: " + response_text[:500]
+        )
+
+
+def parse_llm_json_response(
+    response_text: str,
+    expected_type: str = "object",
+    model: type[BaseModel] | None = None,
+) -> dict | list:
     """
     Parse JSON from LLM response, handling markdown code blocks and extra text.
-    If response is markdown/code instead of JSON, uses JSON sanitizer (GPT-OSS-120b).
+    Falls back to the JSON sanitizer (GPT-OSS-120b) only when no JSON can be
+    recovered, and only outside a running event loop (use the async version there).
 
     Args:
         response_text: Raw response text from LLM
         expected_type: "object" for dict, "array" for list
+        model: Optional Pydantic model to repair and validate the result against
 
     Returns:
-        Parsed JSON (dict or list)
+        Parsed JSON (dict or list; a model dump if `model` is given)
 
     Raises:
         ValueError: If JSON cannot be parsed
-        json.JSONDecodeError: If JSON is invalid
     """
-    if not response_text:
-        raise ValueError("Empty response text")
+    _check_response(response_text)
 
-    # Check if response looks like markdown/code instead of JSON
-    is_markdown_or_code = _is_markdown_or_code(response_text)
+    parsed = _parse_without_llm(response_text, expected_type, model)
+    if parsed is not None:
+        return parsed
 
-    # If it's markdown/code and sanitizer is enabled, use sanitizer
-    if is_markdown_or_code and settings.groq_sanitizer_enabled:
+    if settings.groq_sanitizer_enabled:
         try:
-            logger.warning(
-                f"⚠️  Detected markdown/code instead of JSON, using sanitizer ({settings.groq_sanitizer_model})..."
-            )
-            logger.debug(f"   Response preview: {response_text[:200]}...")
-
-            sanitizer = _get_sanitizer()
-
-            # Check if we're in async context
+            asyncio.get_running_loop()
+            logger.warning("⚠️  Cannot use async sanitizer in sync context")
+        except RuntimeError:
             try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    # We're in async context, but this is sync function
-                    # Log warning and try basic parsing first
-                    logger.warning(
-                        "⚠️  Cannot use async sanitizer in sync context, attempting basic parsing..."
-                    )
-                    is_markdown_or_code = False  # Fall through to basic parsing
-            except RuntimeError:
-                # No event loop, we can create one
-                parsed = asyncio.run(
-                    sanitizer.sanitize_json(
+                logger.warning(
+                    f"⚠️  No JSON recovered, using sanitizer ({settings.groq_sanitizer_model})..."
+                )
+                sanitized = asyncio.run(
+                    _get_sanitizer().sanitize_json(
                         malformed_response=response_text,
                         expected_type=expected_type,
-                        original_error="Response appears to be markdown/code instead of JSON",
+                        original_error="No JSON value could be recovered from the response",
                     )
                 )
                 logger.info("✅ JSON successfully sanitized by GPT-OSS-120b")
-                return parsed
-        except Exception as sanitizer_error:
-            logger.error(f"❌ JSON sanitization failed: {sanitizer_error}")
-            # Fall through to basic parsing attempt
-
-    # If not markdown/code, or sanitizer failed/disabled, try basic parsing
-
-    # Step 1: Remove markdown code blocks if present (more aggressive)
-    text = response_text.strip()
-
-    # Remove ALL markdown code blocks (not just JSON ones)
-    # This handles cases where LLM includes code examples before JSON
-    text = re.sub(r"```[a-z]*\n.*?```", "", text, flags=re.DOTALL)
-
-    # Also remove inline code blocks
-    text = re.sub(r"`[^`]+`", "", text)
-
-    # Remove any remaining markdown formatting
-    text = re.sub(r"^\*\*.*?\*\*:\s*", "", text, flags=re.MULTILINE)
-
-    # Clean up extra whitespace
-    text = " ".join(text.split())
-
-    # Step 2: Extract JSON object/array from text (improved regex for nested structures)
-    if expected_type == "object":
-        # Find JSON object with proper bracket matching
-        depth = 0
-        start_idx = text.find("{")
-        if start_idx != -1:
-            for i in range(start_idx, len(text)):
-                if text[i] == "{":
-                    depth += 1
-                elif text[i] == "}":
-                    depth -= 1
-                    if depth == 0:
-                        text = text[start_idx : i + 1]
-                        break
-    elif expected_type == "array":
-        # Find JSON array with proper bracket matching
-        depth = 0
-        start_idx = text.find("[")
-        if start_idx != -1:
-            for i in range(start_idx, len(text)):
-                if text[i] == "[":
-                    depth += 1
-                elif text[i] == "]":
-                    depth -= 1
-                    if depth == 0:
-                        text = text[start_idx : i + 1]
-                        break
-
-    # Step 3: Clean up and parse
-    text = text.strip()
-    if not text:
-        raise ValueError("Empty response after parsing. Original response: " + response_text[:500])
-
-    # Step 3: Fix common JSON issues
-    # Fix unescaped newlines in strings
-    text = re.sub(r"(?<!\\)\n", "\\n", text)
-    # Fix unescaped tabs
-    text = re.sub(r"(?<!\\)\t", "\\t", text)
-    # Fix unescaped quotes (but be careful not to break valid JSON)
-    # Only fix quotes that are clearly unescaped within strings
+                return _validate(sanitized, model) if model else sanitized
+            except Exception as sanitizer_error:
+                logger.error(f"❌ JSON sanitization failed: {sanitizer_error}")
 
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError as e:
-        # Try to fix common JSON errors
-        try:
-            # Fix invalid escape sequences
-            # Replace invalid \escape with \\escape
-            text = re.sub(r'\\(?![nrtbf"/\\u])', r"\\\\", text)
-
-            # Try parsing again
-            parsed = json.loads(text)
-            logger.warning("⚠️  Successfully parsed JSON after fixing escape sequences")
-            return parsed
-        except json.JSONDecodeError:
-            # Try one more time with more aggressive cleaning
-            try:
-                if expected_type == "object":
-                    # Remove any leading/trailing non-JSON text
-                    cleaned = re.sub(r"^[^{]*", "", text)
-                    cleaned = re.sub(r"[^}]*$", "", cleaned)
-                else:
-                    cleaned = re.sub(r"^[^\[]*", "", text)
-                    cleaned = re.sub(r"[^\]]*$", "", cleaned)
-
-                if cleaned:
-                    parsed = json.loads(cleaned)
-                    logger.warning("⚠️  Successfully parsed JSON after aggressive cleaning")
-                    return parsed
-                else:
-                    raise ValueError("Could not extract valid JSON from response")
-            except Exception as parse_error:
-                # If basic parsing fails and we haven't tried sanitizer yet, try it now
-                if not is_markdown_or_code and settings.groq_sanitizer_enabled:
-                    try:
-                        logger.warning("⚠️  Basic JSON parsing failed, attempting sanitization...")
-                        sanitizer = _get_sanitizer()
-                        try:
-                            loop = asyncio.get_event_loop()
-                            if loop.is_running():
-                                raise RuntimeError("Cannot use async in sync context")
-                        except RuntimeError:
-                            parsed = asyncio.run(
-                                sanitizer.sanitize_json(
-                                    malformed_response=response_text,
-                                    expected_type=expected_type,
-                                    original_error=str(e),
-                                )
-                            )
-                            logger.info("✅ JSON successfully sanitized by GPT-OSS-120b")
-                            return parsed
-                    except Exception as sanitizer_error:
-                        logger.error(f"❌ JSON sanitization failed: {sanitizer_error}")
-
-                # Final error
-                logger.error(f"❌ Failed to parse JSON: {e}")
-                logger.error(f"   Attempted to parse: {text[:500]}")
-                logger.error(f"   Original response: {response_text[:500]}")
-
-                # Provide more helpful error message
-                if "code instead of JSON" in str(parse_error):
-                    raise parse_error  # Re-raise the code detection error as-is
-                else:
-                    raise ValueError(
-                        f"Invalid JSON response from LLM: {e}. "
-                        f"Expected JSON {expected_type}, but received: {text[:200]}. "
-                        f"Full response preview: {response_text[:500]}"
-                    ) from e
+    raise _parse_error(response_text, expected_type)
 
 
 async def parse_llm_json_response_async(
-    response_text: str, expected_type: str = "object"
+    response_text: str,
+    expected_type: str = "object",
+    model: type[BaseModel] | None = None,
 ) -> dict | list:
     """
     Async version of parse_llm_json_response that can use JSON sanitizer.
-    Only uses sanitizer when response is markdown/code instead of JSON.
+    Only uses the sanitizer when no JSON (matching `model`, if given) can be
+    recovered from the response.
 
     Args:
         response_text: Raw response text from LLM
         expected_type: "object" for dict, "array" for list
+        model: Optional Pydantic model to repair and validate the result against
 
     Returns:
-        Parsed JSON (dict or list)
+        Parsed JSON (dict or list; a model dump if `model` is given)
     """
-    if not response_text:
-        raise ValueError("Empty response text")
+    _check_response(response_text)
 
-    # Check if response looks like markdown/code instead of JSON
-    is_markdown_or_code = _is_markdown_or_code(response_text)
+    parsed = _parse_without_llm(response_text, expected_type, model)
+    if parsed is not None:
+        return parsed
 
-    # If it's markdown/code, use sanitizer immediately
-    if is_markdown_or_code and settings.groq_sanitizer_enabled:
+    if settings.groq_sanitizer_enabled:
         try:
             logger.warning(
-                f"⚠️  Detected markdown/code instead of JSON, using sanitizer ({settings.groq_sanitizer_model})..."
+                f"⚠️  No JSON recovered, using sanitizer ({settings.groq_sanitizer_model})..."
             )
             logger.debug(f"   Response preview: {response_text[:200]}...")
-
-            sanitizer = _get_sanitizer()
-            parsed = await sanitizer.sanitize_json(
+            sanitized = await _get_sanitizer().sanitize_json(
                 malformed_response=response_text,
                 expected_type=expected_type,
-                original_error="Response appears to be markdown/code instead of JSON",
+                original_error="No JSON value could be recovered from the response",
             )
             logger.info("✅ JSON successfully sanitized by GPT-OSS-120b")
-            return parsed
+            return _validate(sanitized, model) if model else sanitized
         except Exception as sanitizer_error:
             logger.error(f"❌ JSON sanitization failed: {sanitizer_error}")
-            # Fall through to basic parsing
-
-    # Try basic parsing (same logic as sync version)
-    text = response_text.strip()
 
-    # Check if response is just an empty markdown code block
-    if re.match(r"^```[a-z]*\s*```\s*$", text, re.IGNORECASE | re.DOTALL):
-        raise ValueError(
-            "Empty markdown code block received. LLM returned empty JSON. "
-            "Original response: " + response_text[:500]
-        )
-
-    # Remove ALL markdown code blocks (not just JSON ones)
-    # But preserve content inside JSON code blocks
-    if "```json" in text.lower() or "```" in text:
-        # Try to extract JSON from markdown code block first
-        json_match = re.search(r"```json\s*\n(.*?)\n```", text, re.DOTALL | re.IGNORECASE)
-        if json_match:
-            text = json_match.group(1).strip()
-        else:
-            # No JSON found in code block, remove all code blocks
-            text = re.sub(r"```[a-z]*\n.*?```", "", text, flags=re.DOTALL)
-    else:
-        # No code blocks, use text as-is
-        pass
-
-    # Also remove inline code blocks (but only if we still have content)
-    if text.strip():
-        text = re.sub(r"`[^`]+`", "", text)
-
-    # Remove any remaining markdown formatting
-    text = re.sub(r"^\*\*.*?\*\*:\s*", "", text, flags=re.MULTILINE)
-
-    # Clean up extra whitespace
-    text = " ".join(text.split())
-
-    # Extract JSON object/array from text
-    if expected_type == "object":
-        depth = 0
-        start_idx = text.find("{")
-        if start_idx != -1:
-            for i in range(start_idx, len(text)):
-                if text[i] == "{":
-                    depth += 1
-                elif text[i] == "}":
-                    depth -= 1
-                    if depth == 0:
-                        text = text[start_idx : i + 1]
-                        break
-    elif expected_type == "array":
-        depth = 0
-        start_idx = text.find("[")
-        if start_idx != -1:
-            for i in range(start_idx, len(text)):
-                if text[i] == "[":
-                    depth += 1
-                elif text[i] == "]":
-                    depth -= 1
-                    if depth == 0:
-                        text = text[start_idx : i + 1]
-                        break
-
-    text = text.strip()
-    if not text:
-        raise ValueError("Empty response after parsing. Original response: " + response_text[:500])
-
-    # Fix common JSON issues
-    text = re.sub(r"(?<!\\)\n", "\\n", text)
-    text = re.sub(r"(?<!\\)\t", "\\t", text)
-
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError as e:
-        # Try to fix common JSON errors
-        try:
-            text = re.sub(r'\\(?![nrtbf"/\\u])', r"\\\\", text)
-            parsed = json.loads(text)
-            logger.warning("⚠️  Successfully parsed JSON after fixing escape sequences")
-            return parsed
-        except json.JSONDecodeError:
-            # Try one more time with more aggressive cleaning
-            try:
-                if expected_type == "object":
-                    cleaned = re.sub(r"^[^{]*", "", text)
-                    cleaned = re.sub(r"[^}]*$", "", cleaned)
-                else:
-                    cleaned = re.sub(r"^[^\[]*", "", text)
-                    cleaned = re.sub(r"[^\]]*$", "", cleaned)
-
-                if cleaned:
-                    parsed = json.loads(cleaned)
-                    logger.warning("⚠️  Successfully parsed JSON after aggressive cleaning")
-                    return parsed
-                else:
-                    raise ValueError("Could not extract valid JSON from response")
-            except Exception:
-                # If basic parsing fails, try sanitizer as fallback
-                if settings.groq_sanitizer_enabled:
-                    try:
-                        logger.warning("⚠️  Basic JSON parsing failed, attempting sanitization...")
-                        sanitizer = _get_sanitizer()
-                        parsed = await sanitizer.sanitize_json(
-                            malformed_response=response_text,
-                            expected_type=expected_type,
-                            original_error=str(e),
-                        )
-                        logger.info("✅ JSON successfully sanitized by GPT-OSS-120b")
-                        return parsed
-                    except Exception as sanitizer_error:
-                        logger.error(f"❌ JSON sanitization failed: {sanitizer_error}")
-
-                # Final error
-                logger.error(f"❌ Failed to parse JSON: {e}")
-                logger.error(f"   Attempted to parse: {text[:500]}")
-                logger.error(f"   Original response: {response_text[:500]}")
-                raise ValueError(
-                    f"Invalid JSON response from LLM: {e}. "
-                    f"Expected JSON {expected_type}, but received: {text[:200]}. "
-                    f"Full response preview: {response_text[:500]}"
-                ) from e
+    raise _parse_error(response_text, expected_type)
@@ -1,25 +1,79 @@
 """
 Token budgeting utilities for LangGraph agent.
-Handles adaptive token budgeting and chunk truncation for analyze_repo node.
+Handles adaptive token budgeting and chunk truncation for analyze_repo node and
+the RAG chat pipeline.
+
+Chunks are tokenized once (token arrays are cached per content) and all
+truncation, overlap and budget arithmetic happens on the token arrays. Selection
+is a 0/1 knapsack maximizing total similarity score under the token budget
+instead of stopping at the first chunk that doesn't fit, and the overlap that
+consecutive chunks of the same file share (see text_chunking.chunk_text) is
+only sent once.
 """
 
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 
 import tiktoken
 
-from app.utils.text_chunking import count_tokens
-
 logger = logging.getLogger(__name__)
 
 # Constants for token budgeting
 ANALYZE_REPO_TOKEN_BUDGET = 6_000  # Total token budget for analyze_repo
 MAX_CHUNK_TOKENS = 500  # Maximum tokens per chunk
 MIN_CHUNKS = 3  # Minimum chunks needed for meaningful analysis
+# Token arrays kept for recently packed chunk contents (LRU)
+TOKEN_CACHE_MAX_ENTRIES = 2048
+# Upper bound on knapsack table cells (items x budget); coarser token units above it
+KNAPSACK_MAX_CELLS = 2_000_000
 
 # Initialize tokenizer once (same encoding as text_chunking.py)
 _tokenizer = tiktoken.get_encoding("cl100k_base")
 logger.debug("🔤 Initialized tiktoken tokenizer for token_budgeting: cl100k_base")
 
+# Bytes that end a "reasonable boundary" for truncation (line, sentence, statement)
+_BOUNDARY_BYTES = (b"\n", b".", b";")
+
+_token_cache: OrderedDict[str, tuple[int, ...]] = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def encode_cached(content: str) -> tuple[int, ...]:
+    """Token array of `content`, tokenized at most once while cached."""
+    key = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    with _token_cache_lock:
+        tokens = _token_cache.get(key)
+        if tokens is not None:
+            _token_cache.move_to_end(key)
+            return tokens
+
+    tokens = tuple(_tokenizer.encode(content))
+    with _token_cache_lock:
+        _token_cache[key] = tokens
+        while len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+            _token_cache.popitem(last=False)
+    return tokens
+
+
+def _truncate_tokens(tokens: tuple[int, ...], max_tokens: int) -> tuple[int, ...]:
+    """
+    Cut a token array to max_tokens, ending at the last token that contains a
+    line/sentence/statement boundary if one lies in the last 30% of the window.
+    """
+    if len(tokens) <= max_tokens:
+        return tokens
+
+    # Don't cut too much - at least 70% of max_tokens
+    min_length = int(max_tokens * 0.7)
+    for end in range(max_tokens, min_length, -1):
+        token_bytes = _tokenizer.decode_single_token_bytes(tokens[end - 1])
+        if any(boundary in token_bytes for boundary in _BOUNDARY_BYTES):
+            return tokens[:end]
+    # Can't find good boundary, use hard truncation
+    return tokens[:max_tokens]
+
 
 def truncate_chunk(content: str, max_tokens: int = MAX_CHUNK_TOKENS) -> str:
     """
@@ -38,49 +92,82 @@ def truncate_chunk(content: str, max_tokens: int = MAX_CHUNK_TOKENS) -> str:
     if not content:
         return content
 
-    # Count tokens
-    tokens_count = count_tokens(content)
-
-    # If within limit, return as-is
-    if tokens_count <= max_tokens:
+    tokens = encode_cached(content)
+    if len(tokens) <= max_tokens:
         return content
+    return _tokenizer.decode(list(_truncate_tokens(tokens, max_tokens)))
+
+
+def _overlap_length(previous: tuple[int, ...], following: tuple[int, ...]) -> int:
+    """Length of the longest suffix of `previous` that is a prefix of `following`."""
+    if not previous or not following:
+        return 0
+    first = following[0]
+    longest = min(len(previous), len(following))
+    for length in range(longest, 0, -1):
+        if previous[-length] == first and previous[-length:] == following[:length]:
+            return length
+    return 0
+
+
+def _knapsack(weights: list[int], values: list[float], capacity: int) -> set[int]:
+    """Indices of the 0/1 knapsack selection maximizing total value within capacity."""
+    if capacity <= 0 or not weights:
+        return set()
+    # Scale token weights down for large inputs to bound the table size
+    unit = max(1, -(-len(weights) * capacity // KNAPSACK_MAX_CELLS))
+    scaled = [-(-w // unit) for w in weights]
+    cap = capacity // unit
+
+    best = [0.0] * (cap + 1)
+    taken = [bytearray(cap + 1) for _ in weights]
+    for i, (weight, value) in enumerate(zip(scaled, values, strict=True)):
+        if value <= 0 or weight > cap:
+            continue
+        for c in range(cap, weight - 1, -1):
+            candidate = best[c - weight] + value
+            if candidate > best[c]:
+                best[c] = candidate
+                taken[i][c] = 1
+
+    selected: set[int] = set()
+    c = cap
+    for i in range(len(weights) - 1, -1, -1):
+        if taken[i][c]:
+            selected.add(i)
+            c -= scaled[i]
+    return selected
+
+
+def _emission_order(candidates: list[dict], chosen: set[int]) -> list[int]:
+    """
+    Order selected candidates by rank, keeping runs of consecutive chunks of the
+    same file together in chunk_index order.
+    """
+    by_position = {}
+    for idx in chosen:
+        chunk = candidates[idx]["chunk"]
+        if isinstance(chunk.get("chunk_index"), int):
+            by_position[(chunk.get("file_path"), chunk["chunk_index"])] = idx
+
+    runs: list[list[int]] = []
+    for idx in sorted(chosen):
+        chunk = candidates[idx]["chunk"]
+        chunk_index = chunk.get("chunk_index")
+        if not isinstance(chunk_index, int):
+            runs.append([idx])
+            continue
+        file_path = chunk.get("file_path")
+        if (file_path, chunk_index - 1) in by_position:
+            # Emitted with the run starting at its predecessor
+            continue
+        run = [idx]
+        while (file_path, chunk_index + len(run)) in by_position:
+            run.append(by_position[(file_path, chunk_index + len(run))])
+        runs.append(run)
 
-    # Need to truncate - use tiktoken for accurate token truncation
-    # Encode to tokens
-    tokens = _tokenizer.encode(content)
-
-    # Truncate to max_tokens
-    truncated_tokens = tokens[:max_tokens]
-
-    # Decode back to text
-    truncated = _tokenizer.decode(truncated_tokens)
-
-    # Try to end at a reasonable boundary (sentence/line/newline)
-    # Don't cut too much - at least 70% of max_tokens
-    min_length = int(max_tokens * 0.7)
-
-    # Find last newline
-    last_newline = truncated.rfind("\n")
-    # Find last period
-    last_period = truncated.rfind(".")
-    # Find last semicolon (code boundary)
-    last_semicolon = truncated.rfind(";")
-
-    # Choose best cutoff point
-    cutoff = max(last_newline, last_period, last_semicolon)
-
-    if cutoff > min_length:
-        truncated = truncated[: cutoff + 1]
-        logger.debug(
-            f"   Truncated chunk at boundary (cutoff: {cutoff}, tokens: {count_tokens(truncated)})"
-        )
-    else:
-        # Can't find good boundary, use hard truncation
-        logger.debug(
-            f"   Hard truncated chunk (no good boundary found, tokens: {count_tokens(truncated)})"
-        )
-
-    return truncated
+    runs.sort(key=min)
+    return [idx for run in runs for idx in run]
 
 
 def select_chunks_by_budget(
@@ -93,75 +180,134 @@ def select_chunks_by_budget(
     Select chunks based on adaptive token budget.
 
     Algorithm:
-    1. Iterate through chunks (assumed to be ranked by similarity)
-    2. Truncate each chunk to max_chunk_tokens
-    3. Add to selection if it fits within budget
-    4. Stop when budget is exceeded (unless below min_chunks)
+    1. Tokenize each chunk once and truncate it to max_chunk_tokens
+    2. Drop duplicate chunks (same file and content)
+    3. Pick the subset with the highest total similarity score that fits the
+       budget (0/1 knapsack; rank order breaks ties when chunks have no score)
+    4. Strip the overlap a selected chunk shares with the selected chunk before
+       it in the same file, then fill the freed budget with the best remaining chunks
+    5. Add top-ranked chunks beyond the budget if fewer than min_chunks were selected
 
     Args:
-        chunks: List of chunk dictionaries with 'content' key
+        chunks: List of chunk dictionaries with 'content' key, ranked by similarity
+            (optional 'score', 'file_path', 'chunk_index')
         token_budget: Total token budget (default: ANALYZE_REPO_TOKEN_BUDGET)
         max_chunk_tokens: Max tokens per chunk (default: MAX_CHUNK_TOKENS)
         min_chunks: Minimum chunks to include even if over budget (default: MIN_CHUNKS)
 
     Returns:
-        List of selected chunks with truncated content
+        List of selected chunks with truncated content, in rank order, except that
+        consecutive chunks of a file follow each other in chunk_index order (placed
+        at the best rank among them), so a chunk whose overlap was stripped always
+        comes right after the chunk holding that overlap
 
     Example:
         chunks = [
-            {'content': '...', 'file_path': 'file1.py', ...},
-            {'content': '...', 'file_path': 'file2.py', ...},
+            {'content': '...', 'file_path': 'file1.py', 'score': 0.82, ...},
+            {'content': '...', 'file_path': 'file2.py', 'score': 0.79, ...},
         ]
         selected = select_chunks_by_budget(chunks)
     """
-    selected_chunks = []
-    current_tokens = 0
-
     logger.debug(
         f"   Selecting chunks with budget: {token_budget} tokens, "
         f"max per chunk: {max_chunk_tokens}, min chunks: {min_chunks}"
     )
 
+    candidates: list[dict] = []
+    seen: set[tuple[str, str]] = set()
     for i, chunk in enumerate(chunks):
-        # Get original content
         original_content = chunk.get("content", "")
         if not original_content:
             logger.warning(f"   Skipping chunk {i}: empty content")
             continue
+        identity = (chunk.get("file_path", ""), original_content)
+        if identity in seen:
+            logger.debug(f"   Skipping chunk {i}: duplicate of a higher-ranked chunk")
+            continue
+        seen.add(identity)
+
+        original_tokens = encode_cached(original_content)
+        candidates.append(
+            {
+                "rank": i,
+                "chunk": chunk,
+                "original_tokens": len(original_tokens),
+                "tokens": _truncate_tokens(original_tokens, max_chunk_tokens),
+            }
+        )
 
-        # Truncate chunk
-        truncated_content = truncate_chunk(original_content, max_chunk_tokens)
-        chunk_tokens = count_tokens(truncated_content)
-
-        # Check if adding this chunk would exceed budget
-        if current_tokens + chunk_tokens > token_budget:
-            # Check if we have minimum chunks
-            if len(selected_chunks) >= min_chunks:
-                logger.debug(
-                    f"   Budget reached after {len(selected_chunks)} chunks "
-                    f"({current_tokens} tokens)"
-                )
+    if not candidates:
+        return []
+
+    scores = [float(c["chunk"].get("score") or 0.0) for c in candidates]
+    if not any(score > 0 for score in scores):
+        # No similarity scores: prefer higher-ranked chunks
+        scores = [1.0 / (c["rank"] + 1) for c in candidates]
+    # Tiny rank bonus so equal scores keep the retrieval order
+    values = [score + 1e-6 / (c["rank"] + 1) for score, c in zip(scores, candidates, strict=True)]
+
+    chosen = _knapsack([len(c["tokens"]) for c in candidates], values, token_budget)
+
+    def _strip_overlaps() -> int:
+        """Trim shared prefixes of consecutive selected chunks; return tokens used."""
+        by_position = {
+            (c["chunk"].get("file_path"), c["chunk"].get("chunk_index")): c
+            for idx, c in enumerate(candidates)
+            if idx in chosen
+        }
+        used = 0
+        for idx in chosen:
+            c = candidates[idx]
+            c["overlap"] = 0
+            chunk_index = c["chunk"].get("chunk_index")
+            if isinstance(chunk_index, int):
+                previous = by_position.get((c["chunk"].get("file_path"), chunk_index - 1))
+                if previous is not None:
+                    c["overlap"] = _overlap_length(previous["tokens"], c["tokens"])
+            used += len(c["tokens"]) - c["overlap"]
+        return used
+
+    current_tokens = _strip_overlaps()
+    # Fill budget freed by overlap removal with the best remaining chunks that fit
+    for idx in sorted(set(range(len(candidates))) - chosen, key=lambda j: -values[j]):
+        weight = len(candidates[idx]["tokens"])
+        if current_tokens + weight <= token_budget:
+            chosen.add(idx)
+            current_tokens = _strip_overlaps()
+
+    if len(chosen) < min_chunks:
+        for idx in range(len(candidates)):
+            if len(chosen) >= min_chunks:
                 break
-            else:
+            if idx not in chosen:
                 # Below minimum, include anyway
+                chosen.add(idx)
                 logger.warning(
                     f"   Budget exceeded but below minimum chunks. "
-                    f"Including chunk {i} anyway (total: {current_tokens + chunk_tokens} tokens)"
+                    f"Including chunk {candidates[idx]['rank']} anyway"
                 )
+        current_tokens = _strip_overlaps()
 
-        # Add to selection
-        selected_chunk = chunk.copy()
-        selected_chunk["content"] = truncated_content
-        selected_chunk["original_token_count"] = count_tokens(original_content)
-        selected_chunk["truncated_token_count"] = chunk_tokens
-        selected_chunk["was_truncated"] = chunk_tokens < count_tokens(original_content)
-
+    selected_chunks = []
+    for idx in _emission_order(candidates, chosen):
+        c = candidates[idx]
+        tokens = c["tokens"][c["overlap"] :]
+        if not tokens:
+            # Entirely contained in the previous chunk of the same file
+            continue
+        was_truncated = len(c["tokens"]) < c["original_tokens"]
+        selected_chunk = c["chunk"].copy()
+        if was_truncated or c["overlap"]:
+            selected_chunk["content"] = _tokenizer.decode(list(tokens))
+        selected_chunk["original_token_count"] = c["original_tokens"]
+        selected_chunk["truncated_token_count"] = len(tokens)
+        selected_chunk["was_truncated"] = was_truncated
         selected_chunks.append(selected_chunk)
-        current_tokens += chunk_tokens
 
         logger.debug(
-            f"   Added chunk {i + 1}/{len(chunks)}: {chunk.get('file_path', 'unknown')} "
-            f"({chunk_tokens} tokens, total: {current_tokens})"
+            f"   Added chunk {c['rank'] + 1}/{len(chunks)}: "
+            f"{c['chunk'].get('file_path', 'unknown')} "
+            f"({len(tokens)} tokens, {c['overlap']} overlapping dropped)"
         )
 
     logger.info(
@@ -198,6 +344,10 @@ def build_context_from_chunks(chunks: list[dict]) -> str:
 
     context = "\n".join(context_parts)
 
-    logger.debug(f"   Built context string ({len(context)} chars, ~{count_tokens(context)} tokens)")
+    # Token counts are known from selection; don't re-tokenize the whole context
+    approx_tokens = sum(
+        chunk.get("truncated_token_count") or chunk.get("token_count") or 0 for chunk in chunks
+    )
+    logger.debug(f"   Built context string ({len(context)} chars, ~{approx_tokens} tokens)")
 
     return context
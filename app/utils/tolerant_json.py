@@ -0,0 +1,424 @@
+"""
+Tolerant JSON parsing for LLM output.
+
+A single-pass recursive-descent parser that accepts the JSON models actually
+produce, not just strict JSON:
+- raw newlines/tabs inside strings and invalid escapes (kept literally);
+- trailing or missing commas, single-quoted strings, unquoted keys, comments;
+- Python literals (True/False/None);
+- truncated output: open strings, arrays and objects are closed at the end of
+  input and an incomplete trailing member is dropped (partial-object recovery).
+
+`repair_for_model` then coerces a parsed value towards a Pydantic model (field
+name variants, wrapper objects, scalar types, case of Literal values, single
+items for lists) so that near-miss outputs validate without another LLM call.
+"""
+
+import re
+import types
+from dataclasses import dataclass
+from typing import Any, Literal, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+# Fenced code blocks: ```lang\n ... ``` (the closing fence may be missing if truncated)
+_FENCE_RE = re.compile(r"```([A-Za-z0-9_+-]*)[^\n]*\n(.*?)(?:```|\Z)", re.DOTALL)
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_LITERALS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "True": True,
+    "False": False,
+    "None": None,
+}
+_NUMBER_RE = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_BARE_WORD_RE = re.compile(r"[A-Za-z_$][\w$-]*")
+
+
+class _SyntaxError(Exception):
+    """Input at the current position is not a JSON value."""
+
+
+# A number or literal that runs into the end of input (possibly cut off mid-token)
+_CUT = object()
+
+
+@dataclass
+class TolerantParseResult:
+    value: dict | list
+    # False if the input ended before the root value was closed
+    complete: bool
+
+
+class _Parser:
+    def __init__(self, text: str, pos: int):
+        self.text = text
+        self.pos = pos
+        self.complete = True
+
+    def _skip_ws(self) -> None:
+        text = self.text
+        while self.pos < len(text):
+            c = text[self.pos]
+            if c in " \t\r\n":
+                self.pos += 1
+            elif text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = len(text) if end == -1 else end + 1
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos + 2)
+                self.pos = len(text) if end == -1 else end + 2
+            else:
+                return
+
+    def _at_end(self) -> bool:
+        self._skip_ws()
+        if self.pos >= len(self.text):
+            self.complete = False
+            return True
+        return False
+
+    def parse_value(self) -> Any:
+        if self._at_end():
+            raise _SyntaxError("unexpected end of input")
+        c = self.text[self.pos]
+        if c == "{":
+            return self._parse_object()
+        if c == "[":
+            return self._parse_array()
+        if c in "\"'":
+            return self._parse_string()
+        match = _NUMBER_RE.match(self.text, self.pos) or _BARE_WORD_RE.match(self.text, self.pos)
+        if match and match.end() == len(self.text):
+            self.pos = match.end()
+            self.complete = False
+            return _CUT
+        if match and match.group() in _LITERALS:
+            self.pos = match.end()
+            return _LITERALS[match.group()]
+        if match and match.re is _NUMBER_RE:
+            self.pos = match.end()
+            number = match.group()
+            return float(number) if any(ch in number for ch in ".eE") else int(number)
+        raise _SyntaxError(f"unexpected character {c!r} at {self.pos}")
+
+    def _parse_string(self) -> str:
+        text = self.text
+        quote = text[self.pos]
+        self.pos += 1
+        parts: list[str] = []
+        start = self.pos
+        while self.pos < len(text):
+            c = text[self.pos]
+            if c == quote:
+                parts.append(text[start : self.pos])
+                self.pos += 1
+                return "".join(parts)
+            if c == "\\" and self.pos + 1 < len(text):
+                parts.append(text[start : self.pos])
+                escaped = text[self.pos + 1]
+                if escaped in _ESCAPES:
+                    parts.append(_ESCAPES[escaped])
+                    self.pos += 2
+                elif escaped == "u" and re.fullmatch(
+                    r"[0-9a-fA-F]{4}", text[self.pos + 2 : self.pos + 6]
+                ):
+                    parts.append(chr(int(text[self.pos + 2 : self.pos + 6], 16)))
+                    self.pos += 6
+                elif escaped == quote:
+                    parts.append(quote)
+                    self.pos += 2
+                else:
+                    # Invalid escape (e.g. a regex or Windows path): keep it literally
+                    parts.append("\\" + escaped)
+                    self.pos += 2
+                start = self.pos
+                continue
+            self.pos += 1
+        # Truncated inside a string: keep what was received
+        parts.append(text[start:])
+        self.complete = False
+        return "".join(parts)
+
+    def _parse_key(self) -> str:
+        if self.text[self.pos] in "\"'":
+            return self._parse_string()
+        match = _BARE_WORD_RE.match(self.text, self.pos)
+        if not match:
+            raise _SyntaxError(f"expected object key at {self.pos}")
+        self.pos = match.end()
+        return match.group()
+
+    def _parse_object(self) -> dict:
+        self.pos += 1
+        result: dict = {}
+        while not self._at_end():
+            c = self.text[self.pos]
+            if c == "}":
+                self.pos += 1
+                return result
+            if c == ",":
+                self.pos += 1
+                continue
+            key = self._parse_key()
+            if self._at_end():
+                break
+            if self.text[self.pos] != ":":
+                raise _SyntaxError(f"expected ':' at {self.pos}")
+            self.pos += 1
+            if self._at_end():
+                break
+            value = self.parse_value()
+            if value is _CUT:
+                # A number/literal cut off at the end may be incomplete: drop the member
+                break
+            result[key] = value
+        return result
+
+    def _parse_array(self) -> list:
+        self.pos += 1
+        result: list = []
+        while not self._at_end():
+            c = self.text[self.pos]
+            if c == "]":
+                self.pos += 1
+                return result
+            if c == ",":
+                self.pos += 1
+                continue
+            value = self.parse_value()
+            if value is _CUT:
+                break
+            result.append(value)
+        return result
+
+
+def _candidate_starts(text: str, opener: str) -> list[int]:
+    """Start positions to try, best first: ```json fences, then unfenced text, then the rest."""
+    fenced_json: list[int] = []
+    other_fences: list[tuple[int, int]] = []
+    for match in _FENCE_RE.finditer(text):
+        if match.group(1).lower() in ("json", "json5", ""):
+            index = text.find(opener, match.start(2), match.end(2))
+            if index != -1:
+                fenced_json.append(index)
+        else:
+            other_fences.append((match.start(), match.end()))
+
+    unfenced: list[int] = []
+    fenced_code: list[int] = []
+    index = text.find(opener)
+    while index != -1:
+        inside = any(start <= index < end for start, end in other_fences)
+        (fenced_code if inside else unfenced).append(index)
+        index = text.find(opener, index + 1)
+
+    seen: set[int] = set()
+    ordered = []
+    for index in fenced_json + unfenced + fenced_code:
+        if index not in seen:
+            seen.add(index)
+            ordered.append(index)
+    return ordered
+
+
+def parse_tolerant(text: str, expected_type: str = "object") -> TolerantParseResult | None:
+    """
+    Extract and parse the first JSON object/array from LLM output.
+
+    Args:
+        text: Raw model output (may include prose, markdown fences, truncation)
+        expected_type: "object" for dict, "array" for list
+
+    Returns:
+        TolerantParseResult, or None if no value of the expected type was found
+    """
+    opener = "{" if expected_type == "object" else "["
+    expected = dict if expected_type == "object" else list
+    for start in _candidate_starts(text, opener):
+        parser = _Parser(text, start)
+        try:
+            value = parser.parse_value()
+        except _SyntaxError:
+            continue
+        if not isinstance(value, expected) or not value:
+            continue
+        # A truncated value runs to the end of input: no later candidate can be complete
+        return TolerantParseResult(value=value, complete=parser.complete)
+    return None
+
+
+class JsonStreamParser:
+    """
+    Incremental parser for streamed model output.
+
+    `feed` tracks string/escape state and bracket depth in O(len(chunk)), so
+    `complete` reports when the root value has been closed without re-scanning;
+    `partial` returns the value received so far (with partial-object recovery).
+    """
+
+    def __init__(self, expected_type: str = "object"):
+        self.expected_type = expected_type
+        self._opener = "{" if expected_type == "object" else "["
+        self._chunks: list[str] = []
+        self._length = 0
+        self._root_start: int | None = None
+        self._depth = 0
+        self._in_string: str | None = None
+        self._escaped = False
+        self.complete = False
+
+    def feed(self, chunk: str) -> None:
+        offset = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        if self.complete:
+            return
+        for i, c in enumerate(chunk):
+            if self._root_start is None:
+                if c == self._opener:
+                    self._root_start = offset + i
+                    self._depth = 1
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == self._in_string:
+                    self._in_string = None
+            elif c in "\"'":
+                self._in_string = c
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+                    return
+
+    @property
+    def text(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def partial(self) -> dict | list | None:
+        """Value received so far, or None before the root value starts."""
+        if self._root_start is None:
+            return None
+        try:
+            return _Parser(self.text, self._root_start).parse_value()
+        except _SyntaxError:
+            return None
+
+
+def _normalize_key(key: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", key.lower())
+
+
+def _coerce(value: Any, annotation: Any) -> Any:
+    """Coerce a parsed value towards a type annotation; leave it unchanged if unsure."""
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin in (Union, types.UnionType):
+        if value is None and type(None) in args:
+            return None
+        options = [arg for arg in args if arg is not type(None)]
+        return _coerce(value, options[0]) if len(options) == 1 else value
+    if origin is Literal:
+        if isinstance(value, str) and value not in args:
+            normalized = value.strip().lower()
+            for option in args:
+                if isinstance(option, str) and option.lower() == normalized:
+                    return option
+        return value
+    if origin is list:
+        if value is None:
+            return []
+        items = value if isinstance(value, list) else [value]
+        return [_coerce(item, args[0]) for item in items] if args else items
+    if origin is dict:
+        if isinstance(value, dict) and len(args) == 2:
+            return {key: _coerce(item, args[1]) for key, item in value.items()}
+        return value
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        if isinstance(value, list) and len(value) == 1 and isinstance(value[0], dict):
+            value = value[0]
+        return _repair_object(value, annotation) if isinstance(value, dict) else value
+    if annotation is bool and isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "yes", "1", "passed", "pass"):
+            return True
+        if lowered in ("false", "no", "0", "failed", "fail"):
+            return False
+    if annotation is int:
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str) and _NUMBER_RE.fullmatch(value.strip()):
+            number = float(value)
+            return int(number) if number.is_integer() else value
+    if annotation is float and isinstance(value, str) and _NUMBER_RE.fullmatch(value.strip()):
+        return float(value)
+    if annotation is str:
+        if isinstance(value, bool | int | float):
+            return str(value)
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return "\n".join(value)
+    return value
+
+
+def _repair_object(data: dict, model: type[BaseModel]) -> dict:
+    fields = model.model_fields
+    by_key = {_normalize_key(name): name for name in fields}
+    for name, field in fields.items():
+        if field.alias:
+            by_key.setdefault(_normalize_key(field.alias), name)
+
+    # {"result": {...}} or {"data": {...}} wrapped around the real object
+    if len(data) == 1 and not any(_normalize_key(key) in by_key for key in data):
+        inner = next(iter(data.values()))
+        if isinstance(inner, dict) and any(_normalize_key(key) in by_key for key in inner):
+            data = inner
+
+    repaired: dict = {}
+    for key, value in data.items():
+        name = by_key.get(_normalize_key(key))
+        if name is None:
+            repaired[key] = value
+            continue
+        field = fields[name]
+        if value is None and not field.is_required():
+            # Let the field's default apply instead of failing on null
+            continue
+        repaired[field.alias or name] = _coerce(value, field.annotation)
+    return repaired
+
+
+def repair_for_model(data: Any, model: type[BaseModel]) -> Any:
+    """
+    Coerce parsed JSON towards a Pydantic model before validation.
+
+    Args:
+        data: Parsed JSON value
+        model: Target model
+
+    Returns:
+        Repaired value (validate it with `model.model_validate`)
+    """
+    if isinstance(data, list):
+        list_fields = [
+            name
+            for name, field in model.model_fields.items()
+            if get_origin(field.annotation) is list
+        ]
+        if len(list_fields) == 1:
+            # A bare array where the model wraps it in its single list field
+            data = {list_fields[0]: data}
+        elif len(data) == 1 and isinstance(data[0], dict):
+            data = data[0]
+    if isinstance(data, dict):
+        return _repair_object(data, model)
+    return data
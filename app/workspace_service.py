@@ -42,9 +42,44 @@ async def lifespan(_app: FastAPI):
     except Exception as e:
         logger.warning(f"⚠️  Service initialization warning: {e}")
 
+    # Keep warm containers ready so new workspaces open instantly
+    try:
+        from app.services.docker_client import get_docker_client
+        from app.services.workspace_manager import get_workspace_manager
+
+        if get_docker_client().is_docker_available():
+            get_workspace_manager().pool.start()
+    except Exception as e:
+        logger.warning(f"⚠️  Workspace container pool not started: {e}")
+
+    # Hibernate idle workspaces and keep running containers within host budgets
+    try:
+        from app.services.workspace_reaper import get_workspace_reaper
+
+        get_workspace_reaper().start()
+    except Exception as e:
+        logger.warning(f"⚠️  Workspace reaper not started: {e}")
+
     yield
 
     # Shutdown services
+    try:
+        from app.services.workspace_manager import get_workspace_manager
+
+        get_workspace_manager().pool.stop()
+        from app.services.workspace_reaper import get_workspace_reaper
+
+        get_workspace_reaper().stop()
+    except Exception as e:
+        logger.warning(f"⚠️  Workspace container pool shutdown warning: {e}")
+
+    try:
+        from app.services.docker_executor import get_docker_executor
+
+        get_docker_executor().shutdown()
+    except Exception as e:
+        logger.warning(f"⚠️  Docker executor shutdown warning: {e}")
+
     try:
         await shutdown_services()
     except Exception as e:
@@ -104,11 +139,14 @@ async def health_check():
     except Exception:
         docker_available = False
 
+    from app.services.docker_executor import get_docker_executor
+
     return {
         "status": "healthy" if docker_available else "degraded",
         "service": "workspaces",
         "environment": settings.environment,
         "docker_available": docker_available,
+        "docker_operations": get_docker_executor().get_metrics(),
     }
 
 
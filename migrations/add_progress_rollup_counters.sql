@@ -0,0 +1,222 @@
+-- Incremental concept/day completion rollups.
+--
+-- complete_task used to re-read every task in the concept and then every concept
+-- in the day (one Supabase round trip per step) to decide whether to auto-complete
+-- the concept and day. These functions write the task/concept row and roll the
+-- completion up in the same transaction, so completing a task is a single RPC
+-- call regardless of day size. The per-user done counters on the progress rows
+-- are recomputed from the done rows on every completion (an indexed count), so
+-- they stay correct when a done task/concept is restarted or completed through
+-- the API's table-by-table fallback. The parent concept/day progress row is
+-- locked before counting, so concurrent completions of its last two children
+-- are serialized and the later one sees the other's done row.
+-- NOTE: Run this in Supabase SQL editor.
+
+ALTER TABLE public.user_concept_progress
+ADD COLUMN IF NOT EXISTS tasks_done_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE public.user_day_progress
+ADD COLUMN IF NOT EXISTS concepts_done_count INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_concept_id ON public.tasks (concept_id);
+CREATE INDEX IF NOT EXISTS idx_concepts_day_id ON public.concepts (day_id);
+
+-- Backfill counters from existing progress rows
+UPDATE public.user_concept_progress ucp
+SET tasks_done_count = sub.done_count
+FROM (
+    SELECT utp.user_id, t.concept_id, COUNT(*) AS done_count
+    FROM public.user_task_progress utp
+    JOIN public.tasks t ON t.task_id = utp.task_id
+    WHERE utp.progress_status = 'done'
+    GROUP BY utp.user_id, t.concept_id
+) sub
+WHERE ucp.user_id = sub.user_id AND ucp.concept_id = sub.concept_id;
+
+UPDATE public.user_day_progress udp
+SET concepts_done_count = sub.done_count
+FROM (
+    SELECT ucp.user_id, c.day_id, COUNT(*) AS done_count
+    FROM public.user_concept_progress ucp
+    JOIN public.concepts c ON c.concept_id = ucp.concept_id
+    WHERE ucp.progress_status = 'done'
+    GROUP BY ucp.user_id, c.day_id
+) sub
+WHERE udp.user_id = sub.user_id AND udp.day_id = sub.day_id;
+
+
+-- Mark a concept done and roll the completion up to its day.
+-- Unlocks the next day when the last concept of a day is completed.
+-- Returns: {"concept_completed", "day_completed", "day_id", "next_day_id"}
+CREATE OR REPLACE FUNCTION record_concept_completion(
+    p_user_id UUID,
+    p_concept_id UUID,
+    p_project_id UUID
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_now TIMESTAMPTZ := NOW();
+    v_day_id UUID;
+    v_previous_status TEXT;
+    v_concepts_done INTEGER;
+    v_concepts_total INTEGER;
+    v_day_status TEXT;
+    v_day_number INTEGER;
+    v_next_day_id UUID;
+BEGIN
+    -- Only roll up into days of this project
+    SELECT c.day_id INTO v_day_id
+    FROM public.concepts c
+    JOIN public.roadmap_days d ON d.day_id = c.day_id
+    WHERE c.concept_id = p_concept_id AND d.project_id = p_project_id;
+
+    SELECT progress_status INTO v_previous_status
+    FROM public.user_concept_progress
+    WHERE user_id = p_user_id AND concept_id = p_concept_id
+    FOR UPDATE;
+
+    INSERT INTO public.user_concept_progress
+        (user_id, concept_id, progress_status, completed_at, updated_at)
+    VALUES (p_user_id, p_concept_id, 'done', v_now, v_now)
+    ON CONFLICT (user_id, concept_id) DO UPDATE
+    SET progress_status = 'done', completed_at = v_now, updated_at = v_now;
+
+    UPDATE public.projects
+    SET user_current_concept_id = p_concept_id
+    WHERE project_id = p_project_id;
+
+    -- Already done: nothing to roll up
+    IF v_previous_status IS NOT DISTINCT FROM 'done' OR v_day_id IS NULL THEN
+        RETURN jsonb_build_object(
+            'concept_completed', v_previous_status IS DISTINCT FROM 'done',
+            'day_completed', FALSE,
+            'day_id', v_day_id,
+            'next_day_id', NULL
+        );
+    END IF;
+
+    -- Lock the day row before counting (see header)
+    INSERT INTO public.user_day_progress (user_id, day_id, progress_status, updated_at)
+    VALUES (p_user_id, v_day_id, 'doing', v_now)
+    ON CONFLICT (user_id, day_id) DO UPDATE SET updated_at = v_now
+    RETURNING progress_status INTO v_day_status;
+
+    SELECT COUNT(*) INTO v_concepts_done
+    FROM public.user_concept_progress ucp
+    JOIN public.concepts c ON c.concept_id = ucp.concept_id
+    WHERE ucp.user_id = p_user_id AND c.day_id = v_day_id AND ucp.progress_status = 'done';
+
+    UPDATE public.user_day_progress
+    SET concepts_done_count = v_concepts_done
+    WHERE user_id = p_user_id AND day_id = v_day_id;
+
+    SELECT COUNT(*) INTO v_concepts_total FROM public.concepts WHERE day_id = v_day_id;
+
+    IF v_concepts_done < v_concepts_total OR v_day_status = 'done' THEN
+        RETURN jsonb_build_object(
+            'concept_completed', TRUE,
+            'day_completed', FALSE,
+            'day_id', v_day_id,
+            'next_day_id', NULL
+        );
+    END IF;
+
+    UPDATE public.user_day_progress
+    SET progress_status = 'done', completed_at = v_now, updated_at = v_now
+    WHERE user_id = p_user_id AND day_id = v_day_id;
+
+    -- Unlock next day
+    SELECT day_number INTO v_day_number FROM public.roadmap_days WHERE day_id = v_day_id;
+
+    SELECT day_id INTO v_next_day_id
+    FROM public.roadmap_days
+    WHERE project_id = p_project_id AND day_number = v_day_number + 1;
+
+    IF v_next_day_id IS NOT NULL THEN
+        INSERT INTO public.user_day_progress (user_id, day_id, progress_status, updated_at)
+        VALUES (p_user_id, v_next_day_id, 'todo', v_now)
+        ON CONFLICT (user_id, day_id) DO UPDATE SET updated_at = v_now;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'concept_completed', TRUE,
+        'day_completed', TRUE,
+        'day_id', v_day_id,
+        'next_day_id', v_next_day_id
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Mark a task done, refresh the concept's done counter and auto-complete the
+-- concept (and day) once content is read and every task is done.
+-- Returns the record_concept_completion result plus "task_completed".
+CREATE OR REPLACE FUNCTION record_task_completion(
+    p_user_id UUID,
+    p_task_id UUID,
+    p_project_id UUID
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_now TIMESTAMPTZ := NOW();
+    v_concept_id UUID;
+    v_previous_status TEXT;
+    v_tasks_done INTEGER;
+    v_tasks_total INTEGER;
+    v_content_read BOOLEAN;
+    v_concept_status TEXT;
+BEGIN
+    SELECT concept_id INTO v_concept_id FROM public.tasks WHERE task_id = p_task_id;
+
+    SELECT progress_status INTO v_previous_status
+    FROM public.user_task_progress
+    WHERE user_id = p_user_id AND task_id = p_task_id
+    FOR UPDATE;
+
+    -- ON CONFLICT: the same task may be submitted twice concurrently
+    INSERT INTO public.user_task_progress
+        (user_id, task_id, progress_status, started_at, completed_at, updated_at)
+    VALUES (p_user_id, p_task_id, 'done', v_now, v_now, v_now)
+    ON CONFLICT (user_id, task_id) DO UPDATE
+    SET progress_status = 'done', completed_at = v_now, updated_at = v_now;
+
+    IF v_previous_status IS NOT DISTINCT FROM 'done' OR v_concept_id IS NULL THEN
+        RETURN jsonb_build_object(
+            'task_completed', v_previous_status IS DISTINCT FROM 'done',
+            'concept_completed', FALSE,
+            'day_completed', FALSE
+        );
+    END IF;
+
+    -- Lock the concept row before counting (see header)
+    INSERT INTO public.user_concept_progress
+        (user_id, concept_id, progress_status, updated_at)
+    VALUES (p_user_id, v_concept_id, 'doing', v_now)
+    ON CONFLICT (user_id, concept_id) DO UPDATE SET updated_at = v_now
+    RETURNING COALESCE(content_read, FALSE), progress_status
+    INTO v_content_read, v_concept_status;
+
+    SELECT COUNT(*) INTO v_tasks_done
+    FROM public.user_task_progress utp
+    JOIN public.tasks t ON t.task_id = utp.task_id
+    WHERE utp.user_id = p_user_id AND t.concept_id = v_concept_id
+        AND utp.progress_status = 'done';
+
+    UPDATE public.user_concept_progress
+    SET tasks_done_count = v_tasks_done
+    WHERE user_id = p_user_id AND concept_id = v_concept_id;
+
+    SELECT COUNT(*) INTO v_tasks_total FROM public.tasks WHERE concept_id = v_concept_id;
+
+    IF v_tasks_done < v_tasks_total OR NOT v_content_read OR v_concept_status = 'done' THEN
+        RETURN jsonb_build_object(
+            'task_completed', TRUE,
+            'concept_completed', FALSE,
+            'day_completed', FALSE
+        );
+    END IF;
+
+    RETURN jsonb_build_object('task_completed', TRUE)
+        || record_concept_completion(p_user_id, v_concept_id, p_project_id);
+END;
+$$ LANGUAGE plpgsql;
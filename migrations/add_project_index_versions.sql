@@ -0,0 +1,18 @@
+-- Index versions of project embeddings (see app/services/index_versions.py).
+--
+-- Each embedding pipeline run tags its chunks (and Qdrant points) with a new
+-- version. projects.index_version is the version searches filter on; it is
+-- switched after the new points are written, and chunks of older versions are
+-- deleted in the background. NULL means the project was indexed before
+-- versioning and all of its chunks are current.
+-- NOTE: Run this in Supabase SQL editor.
+
+ALTER TABLE public.projects
+ADD COLUMN IF NOT EXISTS index_version BIGINT;
+
+ALTER TABLE public.project_chunks
+ADD COLUMN IF NOT EXISTS index_version BIGINT;
+
+-- Garbage collection deletes by (project_id, index_version)
+CREATE INDEX IF NOT EXISTS idx_project_chunks_project_version
+ON public.project_chunks (project_id, index_version);
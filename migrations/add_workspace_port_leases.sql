@@ -0,0 +1,28 @@
+-- Host port blocks leased to workspaces (see app/services/port_lease_registry.py).
+--
+-- Each workspace publishes its dev-server ports on a dedicated block of host ports
+-- instead of bind-probing for free ports. The primary key on block_index and the
+-- unique workspace_id make every lease atomic: a concurrent insert/update of the
+-- same block fails with a unique violation and the caller picks another block.
+-- Rows are deleted when the workspace is destroyed.
+-- NOTE: Run this in Supabase SQL editor.
+
+CREATE TABLE IF NOT EXISTS public.workspace_port_leases (
+    block_index INTEGER PRIMARY KEY CHECK (block_index >= 0),
+    workspace_id UUID NOT NULL UNIQUE,
+    leased_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Release leases of workspaces deleted without going through the API
+CREATE OR REPLACE FUNCTION release_workspace_port_lease()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM public.workspace_port_leases WHERE workspace_id = OLD.workspace_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_release_workspace_port_lease ON public.workspaces;
+CREATE TRIGGER trg_release_workspace_port_lease
+AFTER DELETE ON public.workspaces
+FOR EACH ROW EXECUTE FUNCTION release_workspace_port_lease();
@@ -0,0 +1,82 @@
+"""
+Rebuild the Qdrant chunk collection into a storage profile (see
+app/services/qdrant_collection.py) while the app keeps serving it.
+
+Usage:
+    python scripts/migrate_qdrant_collection.py --profile binary
+    python scripts/migrate_qdrant_collection.py --profile scalar --dry-run
+
+Searches keep working throughout. Writes (indexing and project deletion) are
+paused for the final catch-up and the alias swap: writers wait up to 10 minutes
+(WRITE_PAUSE_TIMEOUT_SECONDS), then fail. If the script is killed in that phase,
+delete the "gitguide_chunks__writes_paused" alias to resume writes. Catch-ups
+copy points by their written_at stamp, so every app process must already run a
+version that sets it.
+
+Set QDRANT_COLLECTION_PROFILE to the same profile afterwards, so collections
+created later (e.g. after an embedding dimension change) use it too.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.qdrant_client import get_qdrant_client
+from app.services.qdrant_collection import (
+    COLLECTION_PROFILES,
+    get_collection_profile,
+    migrate_collection,
+)
+from app.services.qdrant_service import COLLECTION_NAME
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n")[0],
+        epilog=__doc__.split("\n\n")[2],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--profile", required=True, choices=sorted(COLLECTION_PROFILES))
+    parser.add_argument(
+        "--keep-source", action="store_true", help="Keep the old collection after the swap"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only print the estimated vector RAM"
+    )
+    args = parser.parse_args()
+
+    client = get_qdrant_client()
+    profile = get_collection_profile(args.profile)
+    info = client.get_collection(COLLECTION_NAME)
+    vector_size = info.config.params.vectors.size
+    points = info.points_count or 0
+
+    current = COLLECTION_PROFILES["default"].ram_bytes_per_vector(vector_size)
+    target = profile.ram_bytes_per_vector(vector_size)
+    logger.info(f"Collection '{COLLECTION_NAME}': {points} points, {vector_size} dimensions")
+    logger.info(
+        f"Vector RAM: {current * points / 2**20:.1f} MiB (float32 in RAM) -> "
+        f"{target * points / 2**20:.1f} MiB ({args.profile}, {current / target:.0f}x less)"
+    )
+    if args.dry_run:
+        return
+
+    migrate_collection(client, COLLECTION_NAME, profile, keep_source=args.keep_source)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+        logger.info("\n✅ Migration completed!")
+    except Exception as e:
+        logger.error(f"❌ Fatal error during migration: {e}", exc_info=True)
+        sys.exit(1)
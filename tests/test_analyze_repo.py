@@ -0,0 +1,50 @@
+"""
+Tests for repository-overview retrieval in the analyze_repo node.
+"""
+
+from unittest.mock import Mock
+
+from app.agents.nodes import analyze_repo
+
+
+def test_retrieved_chunks_keep_qdrant_rank_order(monkeypatch):
+    embedding_service = Mock()
+    embedding_service.embed_query_cached.return_value = [0.1] * 8
+    monkeypatch.setattr(analyze_repo, "get_embedding_service", lambda: embedding_service)
+
+    hits = []
+    for chunk_id, score in [("c3", 0.9), ("c1", 0.8), ("missing", 0.7), ("c2", 0.6)]:
+        hit = Mock()
+        hit.id = chunk_id
+        hit.score = score
+        hits.append(hit)
+    qdrant_service = Mock()
+    qdrant_service.search.return_value = hits
+    monkeypatch.setattr(analyze_repo, "get_qdrant_service", lambda: qdrant_service)
+
+    chain = Mock()
+    chain.select.return_value = chain
+    chain.in_.return_value = chain
+    chain.execute.return_value = Mock(
+        data=[
+            {
+                "id": chunk_id,
+                "file_path": f"{chunk_id}.py",
+                "chunk_index": 0,
+                "language": "python",
+                "content": "pass",
+                "token_count": 1,
+            }
+            for chunk_id in ("c1", "c2", "c3")
+        ]
+    )
+    supabase = Mock()
+    supabase.table.return_value = chain
+    monkeypatch.setattr(analyze_repo, "get_supabase_client", lambda: supabase)
+
+    chunks = analyze_repo._retrieve_ranked_chunks("proj_1")
+
+    assert [c["id"] for c in chunks] == ["c3", "c1", "c2"]
+    assert [c["score"] for c in chunks] == [0.9, 0.8, 0.6]
+    embedding_service.embed_query_cached.assert_called_once_with(analyze_repo.REPO_OVERVIEW_QUERY)
+    chain.in_.assert_called_once_with("id", ["c3", "c1", "missing", "c2"])
@@ -0,0 +1,81 @@
+"""
+Tests for the warm workspace container pool.
+"""
+
+import itertools
+from unittest.mock import Mock
+
+import pytest
+
+from app.services.container_pool import POOL_CONTAINER_PREFIX, ContainerPool
+
+
+@pytest.fixture
+def docker():
+    client = Mock()
+    ids = itertools.count(1)
+    client.create_container.side_effect = lambda **kwargs: (f"container-{next(ids)}", "created")
+    client.start_container.return_value = (True, False)
+    client.get_container_status.return_value = "running"
+    client.rename_container.return_value = True
+    return client
+
+
+@pytest.fixture
+def pool(docker):
+    return ContainerPool(
+        docker,
+        container_name_for=lambda workspace_id: f"gitguide-ws-{workspace_id[:8]}",
+        volume_name_for=lambda workspace_id: f"gitguide-vol-{workspace_id[:8]}",
+        container_ports=[3000, 5173],
+        size=2,
+        idle_seconds=60,
+    )
+
+
+def test_refill_creates_started_containers_on_dynamic_ports(pool, docker):
+    pool._refill()
+
+    assert pool.ready_count == 2
+    kwargs = docker.create_container.call_args.kwargs
+    assert kwargs["name"].startswith(POOL_CONTAINER_PREFIX)
+    workspace_id = kwargs["name"][len(POOL_CONTAINER_PREFIX) :]
+    assert kwargs["volume_name"] == f"gitguide-vol-{workspace_id[:8]}"
+    assert kwargs["ports"] == {"3000/tcp": ("0.0.0.0", None), "5173/tcp": ("0.0.0.0", None)}
+    assert docker.start_container.call_count == 2
+
+
+def test_claim_renames_container_for_its_workspace(pool, docker):
+    pool._refill()
+
+    entry = pool.claim()
+
+    assert entry.container_id == "container-1"
+    docker.rename_container.assert_called_once_with(
+        "container-1", f"gitguide-ws-{entry.workspace_id[:8]}"
+    )
+    assert entry.volume_name == f"gitguide-vol-{entry.workspace_id[:8]}"
+    assert pool.ready_count == 1
+
+
+def test_claim_skips_dead_containers_and_reports_empty_pool(pool, docker):
+    pool._refill()
+    docker.get_container_status.side_effect = ["exited", "running"]
+
+    assert pool.claim().container_id == "container-2"
+    assert pool.claim() is None
+
+    pool._remove_discarded()
+    docker.remove_container.assert_called_once_with("container-1", force=True)
+
+
+def test_idle_containers_are_evicted(pool, docker):
+    pool._refill()
+    for entry in pool._ready:
+        entry.ready_at -= 120
+
+    pool._evict_idle()
+
+    assert pool.ready_count == 0
+    assert docker.remove_container.call_count == 2
+    assert docker.remove_volume.call_count == 2
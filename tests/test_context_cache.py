@@ -0,0 +1,127 @@
+"""
+Tests for Gemini context caching of per-project prompt prefixes.
+"""
+
+import json
+
+import pytest
+from pydantic import BaseModel
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from app.agents.utils import pydantic_ai_client
+from app.agents.utils.context_cache import ContextCache, ContextPrefix, LocalContextCacheBackend
+
+
+class Tasks(BaseModel):
+    titles: list[str]
+
+
+@pytest.fixture
+def backend():
+    return LocalContextCacheBackend()
+
+
+@pytest.fixture
+def cache(backend):
+    return ContextCache(backend, ttl_seconds=3600, min_chars=10)
+
+
+async def test_prefix_is_cached_once_and_replaced_when_it_changes(cache, backend):
+    prefix = ContextPrefix(key="p1:tasks", text="repo tree " * 10)
+
+    first = await cache.get_or_create("gemini-2.5-flash", "sys", prefix)
+    assert await cache.get_or_create("gemini-2.5-flash", "sys", prefix) == first
+    assert backend.created == 1
+
+    changed = ContextPrefix(key="p1:tasks", text="new repo tree " * 10)
+    second = await cache.get_or_create("gemini-2.5-flash", "sys", changed)
+
+    assert second != first
+    assert backend.deleted == 1
+    assert list(backend.contents) == [second]
+
+
+async def test_small_prefixes_are_not_cached(cache, backend):
+    assert await cache.get_or_create("m", "sys", ContextPrefix(key="p1:tasks", text="tiny")) is None
+    assert backend.created == 0
+
+
+async def test_ttl_is_extended_while_in_use_and_expired_entries_recreated(cache, backend):
+    prefix = ContextPrefix(key="p1:tasks", text="x" * 20)
+    name = await cache.get_or_create("m", "sys", prefix)
+    entry = cache._entries["p1:tasks"]
+
+    entry.handle.expires_at -= 3000  # less than half the TTL left
+    assert await cache.get_or_create("m", "sys", prefix) == name
+    assert entry.handle.expires_at > cache.ttl_seconds / 2
+
+    entry.handle.expires_at = 0
+    assert await cache.get_or_create("m", "sys", prefix) != name
+    assert backend.created == 2
+
+
+async def test_invalidate_project_drops_only_that_project(cache, backend):
+    await cache.get_or_create("m", "sys", ContextPrefix(key="p1:tasks", text="a" * 20))
+    await cache.get_or_create("m", "sys", ContextPrefix(key="p2:tasks", text="b" * 20))
+
+    await cache.invalidate_project("p1")
+
+    assert [c["display_name"] for c in backend.contents.values()] == ["p2:tasks"]
+
+
+async def test_rejected_prefix_is_sent_inline_during_backoff(cache, backend):
+    prefix = ContextPrefix(key="p1:tasks", text="c" * 20)
+    await cache.get_or_create("m", "sys", prefix)
+
+    await cache.invalidate("p1:tasks", backoff=True)
+
+    assert await cache.get_or_create("m", "sys", prefix) is None
+    assert backend.created == 1
+    assert backend.contents == {}
+
+
+async def test_gemini_calls_reference_cached_prefix(monkeypatch, cache, backend):
+    seen = []
+
+    def respond(messages, info: AgentInfo):
+        request = messages[-1]
+        seen.append(
+            {
+                "prompt": request.parts[-1].content,
+                "cached_content": (info.model_settings or {}).get("google_cached_content"),
+                "native": info.model_request_parameters.output_mode == "native",
+            }
+        )
+        payload = {"titles": ["Add a route"]}
+        if info.output_tools:
+            return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, payload)])
+        return ModelResponse(parts=[TextPart(json.dumps(payload))])
+
+    class _Limiter:
+        async def acquire(self):
+            return None
+
+    model = FunctionModel(respond, model_name="gemini-2.5-flash")
+    monkeypatch.setattr(pydantic_ai_client, "_google_model", lambda name: model)
+    monkeypatch.setattr(pydantic_ai_client, "get_rate_limiter", lambda: _Limiter())
+    monkeypatch.setattr(pydantic_ai_client, "get_context_cache", lambda: cache)
+    pydantic_ai_client.clear_agent_registry()
+
+    prefix = ContextPrefix(key="p1:tasks", text="notebook repo context " * 5)
+    for concept in ("routing", "testing"):
+        result = await pydantic_ai_client.run_gemini_structured(
+            user_prompt=f"Concept: {concept}",
+            system_prompt="You are an expert technical educator.",
+            output_type=Tasks,
+            context_prefix=prefix,
+        )
+        assert result == Tasks(titles=["Add a route"])
+
+    assert backend.created == 1
+    [stored] = backend.contents.values()
+    assert stored["system_prompt"] == "You are an expert technical educator."
+    assert stored["text"] == prefix.text
+    assert [call["prompt"] for call in seen] == ["Concept: routing", "Concept: testing"]
+    assert all(call["cached_content"] == "cachedContents/local-1" for call in seen)
+    assert all(call["native"] for call in seen)
@@ -0,0 +1,127 @@
+"""
+Tests for DockerClient's shared client and events-driven container metadata cache.
+"""
+
+import queue
+import time
+from unittest.mock import Mock
+
+import pytest
+from docker.errors import NotFound
+
+from app.config import settings
+from app.services.docker_client import DockerClient
+
+
+class FakeEventStream:
+    """Docker events stream fed from a queue; close() ends iteration."""
+
+    def __init__(self):
+        self.events = queue.Queue()
+
+    def __iter__(self):
+        while (event := self.events.get()) is not None:
+            yield event
+
+    def close(self):
+        self.events.put(None)
+
+
+def inspect_attrs(container_id: str, status: str, ip: str | None = "172.17.0.5") -> dict:
+    return {
+        "Id": container_id,
+        "Name": f"/workspace-{container_id}",
+        "State": {"Status": status},
+        "NetworkSettings": {
+            "Networks": {"bridge": {"IPAddress": ip or ""}},
+            "Ports": {"3000/tcp": [{"HostIp": "0.0.0.0", "HostPort": "30001"}]},
+        },
+    }
+
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def docker_setup():
+    state = {"abc123": "running"}
+    stream = FakeEventStream()
+
+    def inspect_container(container_id):
+        if container_id not in state:
+            raise NotFound("No such container")
+        return inspect_attrs(container_id, state[container_id])
+
+    fake = Mock()
+    fake.api.inspect_container = Mock(side_effect=inspect_container)
+    fake.events.return_value = stream
+
+    client = DockerClient()
+    client._shared_client = fake
+    yield client, fake, stream, state
+    client.close()
+
+
+def test_lookups_are_served_from_cache_while_events_are_live(docker_setup):
+    client, fake, _, _ = docker_setup
+    client._ensure_event_watcher()
+    wait_for(lambda: client._events_live)
+
+    info = client.get_container_info("abc123")
+    assert info.status == "running"
+    assert info.ip_address == "172.17.0.5"
+    assert client.get_container_ports("abc123")["3000/tcp"][0]["HostPort"] == "30001"
+    assert client.get_container_status("abc123") == "running"
+    assert client.container_exists("abc123")
+    assert fake.api.inspect_container.call_count == 1
+
+
+def test_events_update_and_evict_cached_containers(docker_setup):
+    client, fake, stream, state = docker_setup
+    client._ensure_event_watcher()
+    wait_for(lambda: client._events_live)
+    client.get_container_info("abc123")
+
+    state["abc123"] = "exited"
+    stream.events.put({"Type": "container", "Action": "die", "id": "abc123"})
+    wait_for(lambda: client.get_container_status("abc123") == "exited")
+
+    del state["abc123"]
+    stream.events.put({"Type": "container", "Action": "destroy", "id": "abc123"})
+    wait_for(lambda: "abc123" not in client._container_info)
+    assert client.get_container_status("abc123") == "not_found"
+
+
+def test_exec_checks_cached_status_without_reloading(docker_setup, monkeypatch):
+    client, fake, _, _ = docker_setup
+    monkeypatch.setattr(settings, "workspace_exec_channel_enabled", False)
+    client._ensure_event_watcher()
+    wait_for(lambda: client._events_live)
+    container = fake.containers.get.return_value
+    container.exec_run.return_value = Mock(exit_code=0, output=b"ok\n")
+
+    assert client.exec_command("abc123", "echo ok") == (0, "ok\n")
+    assert client.exec_command("abc123", "echo ok") == (0, "ok\n")
+
+    container.reload.assert_not_called()
+    assert fake.api.inspect_container.call_count == 1
+    assert fake.containers.get.call_count == 1
+
+
+def test_start_clears_exec_channel_backoff(docker_setup):
+    client, fake, stream, state = docker_setup
+    client._ensure_event_watcher()
+    wait_for(lambda: client._events_live)
+    client._channel_retry_at["abc123"] = time.monotonic() + 60
+    client._channel_retry_at["def456"] = time.monotonic() + 60
+
+    state["abc123"] = "exited"
+    assert client.start_container("abc123") == (True, False)
+    assert "abc123" not in client._channel_retry_at
+
+    stream.events.put({"Type": "container", "Action": "restart", "id": "def456"})
+    wait_for(lambda: "def456" not in client._channel_retry_at)
@@ -0,0 +1,88 @@
+"""
+Tests for the bounded async executor used for Docker operations.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.docker_executor import (
+    EXEC,
+    LIFECYCLE,
+    QUERY,
+    DockerExecutor,
+    DockerOperationTimeout,
+)
+
+
+@pytest.fixture
+def executor():
+    executor = DockerExecutor(
+        limits={LIFECYCLE: 1, EXEC: 2, QUERY: 2},
+        timeouts={LIFECYCLE: 5.0, EXEC: 5.0, QUERY: 5.0},
+    )
+    yield executor
+    executor.shutdown()
+
+
+async def test_slow_operations_do_not_block_the_event_loop(executor):
+    release = threading.Event()
+    start = asyncio.create_task(executor.run(LIFECYCLE, release.wait, op="start_container"))
+
+    # The loop stays responsive, and other classes aren't held up by the slow start
+    assert await executor.run(QUERY, lambda: "running", op="get_container_status") == "running"
+    assert not start.done()
+
+    release.set()
+    assert await start is True
+    metrics = executor.get_metrics()["operations"]
+    assert metrics["start_container"]["calls"] == 1
+    assert metrics["get_container_status"]["calls"] == 1
+
+
+async def test_concurrency_is_limited_per_class(executor):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def exec_command():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+
+    await asyncio.gather(*(executor.run(EXEC, exec_command) for _ in range(6)))
+
+    assert peak == 2
+    assert executor.get_metrics()["pools"][EXEC] == {"limit": 2, "running": 0, "queued": 0}
+
+
+async def test_timeout_cancels_queued_operations_and_is_recorded(executor):
+    release = threading.Event()
+    ran = threading.Event()
+    busy = asyncio.create_task(executor.run(LIFECYCLE, release.wait))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(DockerOperationTimeout):
+        await executor.run(LIFECYCLE, ran.set, timeout=0.05, op="create_container")
+
+    release.set()
+    await busy
+    assert not ran.is_set()
+    assert executor.get_metrics()["operations"]["create_container"]["timeouts"] == 1
+    assert executor.get_metrics()["pools"][LIFECYCLE]["queued"] == 0
+
+
+async def test_errors_propagate_and_are_counted(executor):
+    def remove_container():
+        raise RuntimeError("daemon unavailable")
+
+    with pytest.raises(RuntimeError, match="daemon unavailable"):
+        await executor.run(LIFECYCLE, remove_container)
+
+    assert executor.get_metrics()["operations"]["remove_container"]["errors"] == 1
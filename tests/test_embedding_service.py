@@ -61,3 +61,25 @@ class TestEmbeddingService:
         # Verify batch_size was used
         call_args = mock_model.encode.call_args
         assert call_args[1]["batch_size"] == 32
+
+    @patch("sentence_transformers.SentenceTransformer")
+    def test_embed_query_cached_embeds_once_per_model(self, mock_transformer_class, monkeypatch):
+        """Test embed_query_cached - constant queries are embedded once per model"""
+        from app.services.embedding_service import EmbeddingService
+
+        mock_model = Mock()
+        mock_model.encode.return_value = np.array([[0.1] * 384])
+        mock_transformer_class.return_value = mock_model
+
+        service = EmbeddingService()
+        first = service.embed_query_cached("What is this project about?")
+        second = service.embed_query_cached("What is this project about?")
+
+        assert first == second
+        assert mock_model.encode.call_count == 1
+
+        monkeypatch.setattr(
+            "app.services.embedding_service.settings.embedding_model_name", "other-model"
+        )
+        service.embed_query_cached("What is this project about?")
+        assert mock_model.encode.call_count == 2
@@ -0,0 +1,159 @@
+"""
+Tests for the persistent exec channel protocol.
+
+The agent runs as a local subprocess wired to a socketpair, standing in for the
+attached docker exec socket.
+"""
+
+import base64
+import json
+import socket
+import struct
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from app.services.exec_channel import (
+    AGENT_SOURCE,
+    ExecChannel,
+    ExecChannelError,
+    encode_frame,
+)
+
+
+@pytest.fixture
+def channel(tmp_path):
+    client_sock, agent_sock = socket.socketpair()
+    proc = subprocess.Popen(
+        [sys.executable, "-u", "-c", AGENT_SOURCE],
+        stdin=agent_sock.fileno(),
+        stdout=agent_sock.fileno(),
+        cwd=tmp_path,
+    )
+    agent_sock.close()
+    chan = ExecChannel(client_sock, multiplexed=False)
+    yield chan
+    chan.close()
+    proc.wait(timeout=5)
+
+
+def test_exec_returns_exit_code_and_output(channel, tmp_path):
+    result = channel.request(
+        "exec", command="echo hello && echo err 1>&2; exit 3", workdir=str(tmp_path)
+    )
+    assert result["ok"] is True
+    assert result["exit_code"] == 3
+    assert "hello" in result["output"]
+    assert "err" in result["output"]
+
+
+def test_write_read_and_list(channel, tmp_path):
+    path = tmp_path / "nested" / "hello.txt"
+    data = base64.b64encode("héllo".encode()).decode("ascii")
+
+    assert channel.request("write_file", path=str(path), data=data)["ok"] is True
+
+    read = channel.request("read_file", path=str(path))
+    assert base64.b64decode(read["data"]).decode("utf-8") == "héllo"
+
+    listing = channel.request("list_dir", path=str(tmp_path / "nested"))
+    assert [(e["name"], e["size"], e["is_directory"]) for e in listing["entries"]] == [
+        ("hello.txt", len("héllo".encode()), False)
+    ]
+
+
+def test_missing_file_reports_not_found(channel, tmp_path):
+    result = channel.request("read_file", path=str(tmp_path / "missing.txt"))
+    assert result["ok"] is False
+    assert result["error"] == "not_found"
+
+
+def test_concurrent_requests_are_multiplexed(channel, tmp_path):
+    results = {}
+
+    def run(i):
+        results[i] = channel.request("exec", command=f"echo {i}", workdir=str(tmp_path))
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert {i: r["output"].strip() for i, r in results.items()} == {i: str(i) for i in range(8)}
+
+
+def test_request_after_close_raises(channel):
+    channel.close()
+    with pytest.raises(ExecChannelError):
+        channel.request("ping")
+
+
+def test_multiplexed_stream_frames_are_unwrapped():
+    client_sock, daemon_sock = socket.socketpair()
+    chan = ExecChannel(client_sock, multiplexed=True)
+
+    def fake_daemon():
+        header = daemon_sock.recv(4)
+        body = daemon_sock.recv(struct.unpack(">I", header)[0])
+        request = json.loads(body)
+        response = encode_frame({"id": request["id"], "ok": True, "pid": 1})
+        # stderr noise followed by the response split across two stdout frames
+        for stream, payload in ((2, b"warning"), (1, response[:3]), (1, response[3:])):
+            daemon_sock.sendall(struct.pack(">BxxxI", stream, len(payload)) + payload)
+
+    thread = threading.Thread(target=fake_daemon)
+    thread.start()
+    try:
+        assert chan.request("ping", timeout=5)["pid"] == 1
+    finally:
+        thread.join()
+        chan.close()
+        daemon_sock.close()
+
+
+def test_walk_tree_prunes_ignored_dirs_and_reports_changes(channel, tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("print(1)")
+    (tmp_path / "src" / "old.py").write_text("")
+    (tmp_path / "node_modules" / "lib").mkdir(parents=True)
+
+    full = channel.request(
+        "walk_tree", path=str(tmp_path), ignore=["node_modules"], cursor_slack=1.0
+    )
+    paths = {e["path"]: e for e in full["entries"]}
+    assert set(paths) == {
+        str(tmp_path / "src"),
+        str(tmp_path / "src" / "app.py"),
+        str(tmp_path / "src" / "old.py"),
+        str(tmp_path / "node_modules"),
+    }
+    assert paths[str(tmp_path / "src" / "app.py")]["size"] == len("print(1)")
+    assert full["pruned"] == [str(tmp_path / "node_modules")]
+    assert full["children"] == {}
+
+    (tmp_path / "src" / "old.py").unlink()
+    changes = channel.request("walk_tree", path=str(tmp_path), since=full["cursor"])
+    # The deletion shows up through the parent directory's current children
+    assert changes["children"][str(tmp_path / "src")] == ["app.py"]
+
+
+def test_ranged_reads_and_writes(channel, tmp_path):
+    path = str(tmp_path / "data.bin")
+
+    def write(data: bytes, offset: int, truncate: bool):
+        encoded = base64.b64encode(data).decode("ascii")
+        return channel.request(
+            "write_range", path=path, data=encoded, offset=offset, truncate=truncate
+        )
+
+    assert write(b"0123456789", 0, True)["size"] == 10
+    assert write(b"ab", 4, False)["size"] == 10
+    written = write(b"XY", 6, True)
+    assert written["size"] == 8
+
+    read = channel.request("read_range", path=path, offset=2, length=100)
+    assert base64.b64decode(read["data"]) == b"23abXY"
+    assert read["mtime_ns"] == channel.request("stat_file", path=path)["mtime_ns"]
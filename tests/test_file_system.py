@@ -0,0 +1,61 @@
+"""
+Tests for FileSystemService recursive listings.
+"""
+
+from app.services.file_system import TREE_CURSOR_SLACK, FileSystemService
+
+
+def _find_output(records: list[tuple]) -> str:
+    lines = ["1700000100.5"]
+    for kind, file_type, size, mtime, path in records:
+        lines.append(f"{kind}\t{file_type}\t{size}\t{mtime}\t{mtime}\t-rw-r--r--\t{path}")
+    return "\0".join(lines) + "\0"
+
+
+class FakeDockerClient:
+    def __init__(self, output: str):
+        self.output = output
+        self.commands: list[str] = []
+
+    def channel_request(self, container_id, op, **params):
+        return None
+
+    def exec_command(self, container_id, command, workdir=None):
+        self.commands.append(command)
+        return 0, self.output
+
+
+RECORDS = [
+    ("E", "d", 4096, 1700000050.0, "/workspace"),
+    ("E", "d", 4096, 1700000090.0, "/workspace/src"),
+    ("E", "f", 1536, 1700000010.0, "/workspace/src/app.py"),
+    ("E", "f", 12, 1700000095.0, "/workspace/src/new file.py"),
+    ("P", "d", 4096, 1700000000.0, "/workspace/node_modules"),
+]
+
+
+def test_list_tree_fallback_returns_exact_sizes_and_cursor():
+    docker_client = FakeDockerClient(_find_output(RECORDS))
+
+    tree = FileSystemService(docker_client).list_tree("container_1")
+
+    assert len(docker_client.commands) == 1
+    assert "-name node_modules" in docker_client.commands[0]
+    assert [(e.path, e.size) for e in tree.entries] == [
+        ("/workspace/node_modules", 4096),
+        ("/workspace/src", 4096),
+        ("/workspace/src/app.py", 1536),
+        ("/workspace/src/new file.py", 12),
+    ]
+    assert tree.cursor == 1700000100.5 - TREE_CURSOR_SLACK
+    assert tree.pruned == ["/workspace/node_modules"]
+    assert tree.children == {}
+
+
+def test_list_tree_fallback_incremental_filters_by_cursor():
+    docker_client = FakeDockerClient(_find_output(RECORDS))
+
+    tree = FileSystemService(docker_client).list_tree("container_1", since=1700000060.0)
+
+    assert [e.path for e in tree.entries] == ["/workspace/src", "/workspace/src/new file.py"]
+    assert tree.children == {"/workspace/src": ["app.py", "new file.py"]}
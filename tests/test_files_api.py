@@ -0,0 +1,127 @@
+"""
+Tests for raw (ranged/chunked) file transfer endpoints.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import files as files_api
+from app.api.files import router as files_router
+from app.core.supabase_client import get_supabase_client
+from app.services.file_system import FileStat, get_file_system_service
+from app.services.workspace_manager import get_workspace_manager
+from app.utils.clerk_auth import verify_clerk_token
+
+
+class FakeFileSystem:
+    def __init__(self, content: bytes = b""):
+        self.content = bytearray(content)
+        self.writes: list[tuple[int, int, bool]] = []
+
+    def _stat(self) -> FileStat:
+        return FileStat(
+            path="/workspace/big.log", size=len(self.content), mtime=1.0, mtime_ns=len(self.writes)
+        )
+
+    def stat_file(self, container_id, path):
+        return self._stat()
+
+    def iter_file_range(self, container_id, path, start, length):
+        yield bytes(self.content[start : start + length])
+
+    def write_file_range(self, container_id, path, data, offset=0, truncate=False):
+        self.writes.append((offset, len(data), truncate))
+        if truncate:
+            del self.content[offset:]
+        self.content[offset : offset + len(data)] = data
+        return self._stat()
+
+
+@pytest.fixture
+def client():
+    async def mock_verify_token(authorization=None):
+        return {"clerk_user_id": "clerk_1"}
+
+    def mock_workspace_manager():
+        manager = Mock()
+        manager.get_workspace.return_value = SimpleNamespace(
+            user_id="user_1", container_id="container_1", container_status="running"
+        )
+        return manager
+
+    app = FastAPI()
+    app.include_router(files_router, prefix="/api/workspaces")
+    app.dependency_overrides[verify_clerk_token] = mock_verify_token
+    app.dependency_overrides[get_workspace_manager] = mock_workspace_manager
+    app.dependency_overrides[get_supabase_client] = lambda: Mock()
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def _user(monkeypatch):
+    monkeypatch.setattr("app.api.files.get_user_id_from_clerk", lambda *_: "user_1")
+
+
+def test_download_range_and_etag(client):
+    fs = FakeFileSystem(b"0123456789")
+    client.app.dependency_overrides[get_file_system_service] = lambda: fs
+    url = "/api/workspaces/ws_1/files/raw?path=big.log"
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.content == b"0123456789"
+    assert full.headers["accept-ranges"] == "bytes"
+    etag = full.headers["etag"]
+
+    partial = client.get(url, headers={"Range": "bytes=-3", "If-Range": etag})
+    assert partial.status_code == 206
+    assert partial.content == b"789"
+    assert partial.headers["content-range"] == "bytes 7-9/10"
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url, headers={"Range": "bytes=20-"}).status_code == 416
+
+    invalid = client.get(url, headers={"Range": "bytes=5-2"})
+    assert invalid.status_code == 200
+    assert invalid.content == b"0123456789"
+
+
+def test_file_access_records_workspace_activity(client, monkeypatch):
+    reaper = Mock()
+    monkeypatch.setattr(files_api, "get_workspace_reaper", lambda: reaper)
+    client.app.dependency_overrides[get_file_system_service] = lambda: FakeFileSystem(b"x")
+
+    assert client.get("/api/workspaces/ws_1/files/raw?path=big.log").status_code == 200
+    reaper.record_activity.assert_called_once_with("ws_1")
+
+
+def test_upload_is_written_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(files_api, "FILE_CHUNK_SIZE", 4)
+    fs = FakeFileSystem(b"old content that is longer")
+    client.app.dependency_overrides[get_file_system_service] = lambda: fs
+
+    response = client.put("/api/workspaces/ws_1/files/raw?path=big.log", content=b"0123456789")
+
+    assert response.status_code == 200
+    assert response.json()["bytes_written"] == 10
+    assert bytes(fs.content) == b"0123456789"
+    # Only the first chunk truncates the existing file
+    assert fs.writes == [(0, 4, True), (4, 4, False), (8, 2, False)]
+
+
+def test_upload_rejects_stale_etag(client):
+    fs = FakeFileSystem(b"abc")
+    client.app.dependency_overrides[get_file_system_service] = lambda: fs
+
+    response = client.put(
+        "/api/workspaces/ws_1/files/raw?path=big.log",
+        content=b"new",
+        headers={"If-Match": '"stale"'},
+    )
+
+    assert response.status_code == 412
+    assert fs.writes == []
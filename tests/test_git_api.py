@@ -10,6 +10,7 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.api.git import router as git_router
+from app.core.supabase_client import get_supabase_client
 from app.services.workspace_manager import get_workspace_manager
 from app.utils.clerk_auth import verify_clerk_token
 
@@ -59,6 +60,29 @@ def test_git_status_success(git_client, monkeypatch):
     assert data["branch"] == "main"
 
 
+def test_git_access_records_workspace_activity(git_client, monkeypatch):
+    async def mock_verify_token(authorization=None):
+        return {"clerk_user_id": "clerk_1"}
+
+    git_client.app.dependency_overrides[verify_clerk_token] = mock_verify_token
+    git_client.app.dependency_overrides[get_workspace_manager] = _mock_workspace_manager
+    git_client.app.dependency_overrides[get_supabase_client] = lambda: Mock()
+    monkeypatch.setattr("app.api.git.get_user_id_from_clerk", lambda *_: "user_1")
+    reaper = Mock()
+    monkeypatch.setattr("app.api.git.get_workspace_reaper", lambda: reaper)
+
+    class DummyGitService:
+        def git_status(self, container_id):
+            return {"success": True, "branch": "main", "ahead": 0, "behind": 0, "modified": []}
+
+    monkeypatch.setattr("app.api.git.GitService", DummyGitService)
+
+    response = git_client.get("/api/git/ws_1/status", headers={"Authorization": "Bearer token"})
+
+    assert response.status_code == 200
+    reaper.record_activity.assert_called_once_with("ws_1")
+
+
 def test_git_pull_uncommitted_conflict(git_client, monkeypatch):
     async def mock_verify_token(authorization=None):
         return {"clerk_user_id": "clerk_1", "name": "Test", "email": "test@example.com"}
@@ -84,3 +108,36 @@ def test_git_pull_uncommitted_conflict(git_client, monkeypatch):
     detail = response.json()["detail"]
     assert "Uncommitted" in detail["message"]
     assert "README.md" in detail["files"]
+
+
+def test_git_snapshot_success(git_client, monkeypatch):
+    async def mock_verify_token(authorization=None):
+        return {"clerk_user_id": "clerk_1"}
+
+    git_client.app.dependency_overrides[verify_clerk_token] = mock_verify_token
+    git_client.app.dependency_overrides[get_workspace_manager] = _mock_workspace_manager
+    git_client.app.dependency_overrides[get_supabase_client] = lambda: Mock()
+
+    monkeypatch.setattr("app.api.git.get_user_id_from_clerk", lambda *_: "user_1")
+
+    class DummyGitService:
+        def git_snapshot(self, container_id, max_count, show_all, include_remote):
+            assert container_id == "container_1"
+            assert (max_count, show_all, include_remote) == (20, True, False)
+            return {
+                "success": True,
+                "status": {"success": True, "branch": "main"},
+                "branches": {"success": True, "branches": [], "current": "main"},
+                "cached": False,
+            }
+
+    monkeypatch.setattr("app.api.git.GitService", DummyGitService)
+
+    response = git_client.get(
+        "/api/git/ws_1/snapshot?max_count=20&show_all=true",
+        headers={"Authorization": "Bearer token"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"]["branch"] == "main"
+    assert data["branches"]["current"] == "main"
@@ -0,0 +1,156 @@
+"""
+Tests for the batched git snapshot and mirror-backed clones in GitService.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from app.services.git_service import (
+    LOG_FIELD_SEPARATOR,
+    SNAPSHOT_MARKER,
+    GitService,
+    invalidate_git_snapshot,
+)
+
+STATUS = "## main...origin/main [ahead 1]\n M app.py\nUU conflict.py\n?? notes.txt"
+BRANCHES = "* main\n  feature"
+LOG = "\n".join(
+    LOG_FIELD_SEPARATOR.join(fields)
+    for fields in (
+        ("abc123", "def456", "Ada", "ada@example.com", "2024-01-02 10:00:00 +0000")
+        + ("Second", "HEAD -> main"),
+        ("def456", "", "Ada", "ada@example.com", "2024-01-01 10:00:00 +0000", "First", ""),
+    )
+)
+
+
+def _snapshot_output(fingerprint: str, with_history: bool) -> str:
+    parts = [
+        f"{SNAPSHOT_MARKER} status",
+        STATUS,
+        f"{SNAPSHOT_MARKER} exit 0",
+        f"{SNAPSHOT_MARKER} fingerprint {fingerprint}",
+    ]
+    if with_history:
+        parts += [
+            f"{SNAPSHOT_MARKER} branches",
+            BRANCHES,
+            f"{SNAPSHOT_MARKER} exit 0",
+            f"{SNAPSHOT_MARKER} log",
+            LOG,
+            f"{SNAPSHOT_MARKER} exit 0",
+        ]
+    return "\n".join(parts) + "\n"
+
+
+class FakeDockerClient:
+    def __init__(self):
+        self.fingerprint = "fp1"
+        self.commands: list[str] = []
+
+    def exec_command(self, container_id, command, workdir=None):
+        self.commands.append(command)
+        # The script only emits history when the fingerprint differs from the cached one
+        with_history = f"!= {self.fingerprint} ]" not in command
+        return 0, _snapshot_output(self.fingerprint, with_history)
+
+
+@pytest.fixture
+def docker_client():
+    invalidate_git_snapshot("container_1")
+    yield FakeDockerClient()
+    invalidate_git_snapshot("container_1")
+
+
+def test_snapshot_parses_all_sections_in_one_exec(docker_client):
+    snapshot = GitService(docker_client).git_snapshot("container_1")
+
+    assert len(docker_client.commands) == 1
+    assert snapshot["success"] is True
+    assert snapshot["status"]["branch"] == "main"
+    assert snapshot["status"]["ahead"] == 1
+    assert snapshot["status"]["untracked"] == ["notes.txt"]
+    assert snapshot["conflicts"]["conflicts"] == ["conflict.py"]
+    assert snapshot["branches"]["current"] == "main"
+    assert [c["message"] for c in snapshot["commits"]["commits"]] == ["Second", "First"]
+    assert "parents" not in snapshot["commits"]["commits"][0]
+    assert snapshot["graph"]["commits"][0]["parents"] == ["def456"]
+    assert snapshot["cached"] is False
+
+
+def test_snapshot_reuses_history_until_fingerprint_changes(docker_client):
+    service = GitService(docker_client)
+    service.git_snapshot("container_1")
+
+    cached = service.git_snapshot("container_1")
+    assert cached["cached"] is True
+    assert cached["branches"]["current"] == "main"
+
+    docker_client.fingerprint = "fp2"
+    assert service.git_snapshot("container_1")["cached"] is False
+
+    invalidate_git_snapshot("container_1")
+    assert service.git_snapshot("container_1")["cached"] is False
+
+
+def test_log_graph_fields_may_contain_pipes():
+    line = LOG_FIELD_SEPARATOR.join(
+        ("abc123", "", "A | B", "ab@example.com", "2024-01-02 10:00:00 +0000")
+        + ("Fix a | b parsing", "HEAD -> main")
+    )
+
+    commit = GitService._parse_log_graph_output(line)["commits"][0]
+
+    assert commit["author_name"] == "A | B"
+    assert commit["message"] == "Fix a | b parsing"
+    assert commit["branches"] == ["main"]
+
+
+def test_snapshot_fingerprint_ignores_the_index():
+    command = GitService._build_snapshot_command(50, False, False)
+
+    assert ".git/refs" in command
+    assert ".git/index" not in command
+
+
+def test_snapshot_reports_status_failure(docker_client):
+    docker_client.exec_command = lambda *_args, **_kwargs: (
+        0,
+        f"{SNAPSHOT_MARKER} status\nfatal: not a git repository\n{SNAPSHOT_MARKER} exit 128\n",
+    )
+
+    snapshot = GitService(docker_client).git_snapshot("container_1")
+
+    assert snapshot == {"success": False, "error": "fatal: not a git repository"}
+
+
+@pytest.mark.parametrize(
+    ("reference", "expected", "unexpected"),
+    [
+        (
+            "/opt/gitguide/mirrors/abc.git",
+            "--reference-if-able /opt/gitguide/mirrors/abc.git --dissociate",
+            "--filter",
+        ),
+        (None, "--filter=blob:none", "--reference"),
+    ],
+)
+def test_clone_borrows_objects_from_mirror_or_falls_back_to_partial_clone(
+    reference, expected, unexpected
+):
+    docker_client = Mock()
+    docker_client.exec_command.side_effect = [(0, "NOT_CLONED"), (0, "EMPTY"), (0, ""), (0, "")]
+    mirror_cache = Mock()
+    mirror_cache.ensure_mirror.return_value = reference
+
+    result = GitService(docker_client, mirror_cache).clone_repository(
+        "container_1", "https://github.com/org/repo.git", token="secret", filter_spec="blob:none"
+    )
+
+    assert result["status"] == "cloned"
+    mirror_cache.ensure_mirror.assert_called_once_with("https://github.com/org/repo.git")
+    clone_cmd = docker_client.exec_command.call_args_list[2].args[1]
+    assert expected in clone_cmd
+    assert unexpected not in clone_cmd
+    assert "secret@github.com/org/repo.git" in clone_cmd
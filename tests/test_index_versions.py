@@ -0,0 +1,89 @@
+"""
+Tests for versioned project re-indexing.
+"""
+
+import uuid
+from unittest.mock import Mock
+
+from qdrant_client import QdrantClient
+
+from app.services import index_versions
+from app.services.qdrant_collection import create_collection, get_collection_profile
+from app.services.qdrant_service import COLLECTION_NAME, QdrantService
+
+
+def _service_with_local_qdrant(monkeypatch) -> QdrantService:
+    client = QdrantClient(location=":memory:")
+    create_collection(client, COLLECTION_NAME, get_collection_profile("default"), vector_size=4)
+    monkeypatch.setattr("app.services.qdrant_service.get_qdrant_client", lambda: client)
+    return QdrantService(skip_collection_check=True)
+
+
+def _index(service: QdrantService, project_id: str, version: int | None, count: int) -> None:
+    service.upsert_embeddings(
+        project_id,
+        [str(uuid.uuid4()) for _ in range(count)],
+        [[1.0, 0.5, i / 10, 0.1] for i in range(count)],
+        [{"file_path": f"f{i}.py", "language": "python"} for i in range(count)],
+        index_version=version,
+    )
+
+
+def test_search_only_sees_the_active_version_until_stale_ones_are_collected(monkeypatch):
+    service = _service_with_local_qdrant(monkeypatch)
+    active = {}
+    monkeypatch.setattr(
+        "app.services.qdrant_service.get_active_index_version", lambda pid: active.get(pid)
+    )
+    _index(service, "p1", None, 3)  # indexed before versioning
+    _index(service, "p1", 2, 2)
+    _index(service, "p2", None, 1)
+
+    # Legacy projects match all of their points
+    assert len(service.search("p1", [1.0, 0.5, 0.1, 0.1], limit=10)) == 5
+
+    active["p1"] = 2
+    assert len(service.search("p1", [1.0, 0.5, 0.1, 0.1], limit=10)) == 2
+
+    service.delete_stale_versions("p1", 2)
+    active.clear()
+    assert len(service.search("p1", [1.0, 0.5, 0.1, 0.1], limit=10)) == 2
+    assert len(service.search("p2", [1.0, 0.5, 0.1, 0.1], limit=10)) == 1
+
+
+def test_active_version_is_cached_and_kept_when_supabase_fails(monkeypatch):
+    monkeypatch.setattr(index_versions, "_active_versions", {})
+    supabase = Mock()
+    chain = supabase.table.return_value
+    chain.select.return_value = chain
+    chain.update.return_value = chain
+    chain.eq.return_value = chain
+    chain.execute.return_value = Mock(data=[{"index_version": 7}])
+    monkeypatch.setattr(index_versions, "get_supabase_client", lambda: supabase)
+
+    assert index_versions.get_active_index_version("p1") == 7
+    assert index_versions.get_active_index_version("p1") == 7
+    assert chain.select.call_count == 1
+
+    index_versions.activate_index_version("p1", 9)
+    chain.update.assert_called_once_with({"index_version": 9})
+
+    monkeypatch.setattr(index_versions, "INDEX_VERSION_CACHE_TTL_SECONDS", 0)
+    chain.execute.side_effect = RuntimeError("connection reset")
+    assert index_versions.get_active_index_version("p1") == 9
+
+
+async def test_stale_version_gc_deletes_points_and_chunks(monkeypatch):
+    qdrant_service = Mock()
+    monkeypatch.setattr("app.services.qdrant_service.get_qdrant_service", lambda: qdrant_service)
+    supabase = Mock()
+    chain = supabase.table.return_value
+    chain.delete.return_value = chain
+    chain.eq.return_value = chain
+    chain.or_.return_value = chain
+    monkeypatch.setattr(index_versions, "get_supabase_client", lambda: supabase)
+
+    await index_versions.collect_stale_versions("p1", 9, delay=0)
+
+    qdrant_service.delete_stale_versions.assert_called_once_with("p1", 9)
+    chain.or_.assert_called_once_with("index_version.is.null,index_version.neq.9")
@@ -0,0 +1,78 @@
+"""
+Tests for LLM call telemetry (node scopes, ring buffer, Prometheus export).
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.llm_telemetry import (
+    get_llm_telemetry,
+    instrument_node,
+    llm_node,
+    record_llm_usage,
+    track_llm_call,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_telemetry():
+    get_llm_telemetry().reset()
+    yield
+    get_llm_telemetry().reset()
+
+
+async def _fake_llm_call(provider: str, prompt_tokens: int, completion_tokens: int):
+    with track_llm_call(provider, "model-a") as call:
+        with call.queued():
+            await asyncio.sleep(0.01)
+        # Usage is reported from nested (e.g. retry-decorated) calls
+        await asyncio.to_thread(record_llm_usage, prompt_tokens, completion_tokens)
+        return "ok"
+
+
+async def test_calls_are_labelled_with_node_and_totalled_per_scope():
+    with llm_node("plan_curriculum") as usage:
+        await _fake_llm_call("gemini", 100, 20)
+        await _fake_llm_call("gemini", 50, 10)
+    await _fake_llm_call("groq", 1, 1)
+
+    assert usage.calls == 2
+    assert usage.token_usage == {
+        "prompt_tokens": 150,
+        "completion_tokens": 30,
+        "total_tokens": 180,
+    }
+
+    [latest, *older] = get_llm_telemetry().recent_calls()
+    assert latest["node"] == "unscoped"
+    assert [call["node"] for call in older] == ["plan_curriculum", "plan_curriculum"]
+    assert older[0]["queue_wait_ms"] >= 10
+    assert older[0]["wall_ms"] >= older[0]["queue_wait_ms"]
+
+
+async def test_instrumented_node_records_failures():
+    async def analyze(state):
+        with track_llm_call("gemini", "model-a"):
+            raise ValueError("quota")
+
+    with pytest.raises(ValueError):
+        await instrument_node("analyze_repo", analyze)({})
+
+    [call] = get_llm_telemetry().recent_calls(node="analyze_repo")
+    assert call["success"] is False
+    assert call["error"] == "ValueError"
+
+
+async def test_prometheus_export():
+    with llm_node("generate_tasks"):
+        await _fake_llm_call("groq", 7, 3)
+
+    text = get_llm_telemetry().render_prometheus()
+    labels = 'provider="groq",model="model-a",node="generate_tasks"'
+
+    assert f'llm_calls_total{{{labels},status="ok"}} 1' in text
+    assert f'llm_tokens_total{{{labels},kind="prompt"}} 7' in text
+    assert f'llm_tokens_total{{{labels},kind="completion"}} 3' in text
+    assert f'llm_queue_wait_seconds_bucket{{{labels},le="+Inf"}} 1' in text
+    assert f"llm_call_duration_seconds_count{{{labels}}} 1" in text
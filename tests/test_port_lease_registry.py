@@ -0,0 +1,144 @@
+"""
+Tests for per-workspace host port block leases.
+"""
+
+import pytest
+
+from app.services.port_lease_registry import (
+    PORT_BLOCK_SIZE,
+    PortLeaseRegistry,
+    PostgrestAPIError,
+)
+
+
+class FakeQuery:
+    def __init__(self, table: "FakeLeaseTable", op: str, values: dict | None = None):
+        self.table = table
+        self.op = op
+        self.values = values
+        self.filters: dict = {}
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        return self.table.run(self)
+
+
+class FakeLeaseTable:
+    """In-memory stand-in for workspace_port_leases with its unique constraints."""
+
+    def __init__(self):
+        self.rows: list[dict] = []
+        # Rows inserted by "another process" right before our next write
+        self.interleaved: list[dict] = []
+
+    def select(self, _columns):
+        return FakeQuery(self, "select")
+
+    def insert(self, values):
+        return FakeQuery(self, "insert", values)
+
+    def update(self, values):
+        return FakeQuery(self, "update", values)
+
+    def delete(self):
+        return FakeQuery(self, "delete")
+
+    def _matches(self, row, filters):
+        return all(row[key] == value for key, value in filters.items())
+
+    def _check_unique(self, row, ignore=None):
+        for other in self.rows:
+            if other is ignore:
+                continue
+            if other["block_index"] == row["block_index"] or (
+                other["workspace_id"] == row["workspace_id"]
+            ):
+                raise PostgrestAPIError({"message": "duplicate key value", "code": "23505"})
+
+    def run(self, query):
+        if query.op == "select":
+            rows = [dict(row) for row in self.rows if self._matches(row, query.filters)]
+            return type("Result", (), {"data": rows})()
+        if query.op in ("insert", "update") and self.interleaved:
+            self.rows.extend(self.interleaved)
+            self.interleaved = []
+        if query.op == "insert":
+            self._check_unique(query.values)
+            self.rows.append(dict(query.values))
+        elif query.op == "update":
+            for row in [r for r in self.rows if self._matches(r, query.filters)]:
+                self._check_unique({**row, **query.values}, ignore=row)
+                row.update(query.values)
+        elif query.op == "delete":
+            self.rows = [r for r in self.rows if not self._matches(r, query.filters)]
+        return type("Result", (), {"data": []})()
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.leases = FakeLeaseTable()
+
+    def table(self, _name):
+        return self.leases
+
+
+@pytest.fixture
+def supabase():
+    return FakeSupabase()
+
+
+@pytest.fixture
+def registry(supabase):
+    return PortLeaseRegistry(supabase, [3000, 5173], range_start=20000, block_count=3)
+
+
+def test_workspaces_get_distinct_blocks_and_keep_them(registry):
+    first = registry.port_bindings("ws-1")
+    second = registry.port_bindings("ws-2")
+
+    assert first == {"3000/tcp": ("0.0.0.0", 20000), "5173/tcp": ("0.0.0.0", 20001)}
+    assert second["3000/tcp"] == ("0.0.0.0", 20000 + PORT_BLOCK_SIZE)
+    assert registry.port_bindings("ws-1") == first
+
+
+def test_leases_persist_and_released_blocks_are_reused(registry, supabase):
+    registry.lease("ws-1")
+    registry.lease("ws-2")
+    registry.release("ws-1")
+
+    restarted = PortLeaseRegistry(supabase, [3000, 5173], range_start=20000, block_count=3)
+    assert restarted.get_lease("ws-2").block_index == 1
+    assert restarted.lease("ws-3").block_index == 0
+
+
+def test_concurrently_taken_block_is_skipped(registry, supabase):
+    registry.lease("ws-1")
+    supabase.leases.interleaved.append({"workspace_id": "other", "block_index": 1})
+
+    assert registry.lease("ws-2").block_index == 2
+
+
+def test_reassign_moves_to_another_block_and_range_exhaustion_raises(registry):
+    assert registry.lease("ws-1").block_index == 0
+    assert registry.lease("ws-1", reassign=True).block_index == 1
+    registry.lease("ws-2")
+    registry.lease("ws-3")
+
+    with pytest.raises(RuntimeError, match="No free workspace port blocks"):
+        registry.lease("ws-4")
+
+
+def test_leases_changed_by_another_process_are_reread(registry, supabase):
+    registry.lease("ws-1")
+    other = PortLeaseRegistry(supabase, [3000, 5173], range_start=20000, block_count=3)
+
+    assert other.lease("ws-1", reassign=True).block_index == 1
+    assert registry.lease("ws-1").block_index == 1
+
+    other.release("ws-1")
+    assert other.lease("ws-2").block_index == 0
+    assert registry.get_lease("ws-1") is None
+    assert registry.lease("ws-1").block_index == 1
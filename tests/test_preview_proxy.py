@@ -0,0 +1,116 @@
+"""
+Tests for PreviewProxyService streaming, route caching and WebSocket pass-through.
+"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import httpx
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.testclient import TestClient
+from websockets.asyncio.server import serve
+
+from app.services import preview_proxy as preview_module
+from app.services.preview_proxy import PreviewProxyService, PreviewRoute
+
+
+@pytest.fixture
+def proxy(monkeypatch):
+    monkeypatch.setattr(preview_module, "get_supabase_client", Mock)
+    monkeypatch.setattr(preview_module, "get_docker_client", Mock)
+    service = PreviewProxyService()
+    service._workspace_manager = Mock()
+    service._workspace_manager.get_workspace.return_value = SimpleNamespace(
+        user_id="user-1", container_id="container-1"
+    )
+    service.docker_client.get_container_info.return_value = SimpleNamespace(ip_address="127.0.0.1")
+    return service
+
+
+async def test_response_is_streamed_and_route_is_cached(proxy):
+    chunks_sent = []
+
+    async def upstream_body():
+        for chunk in (b"first,", b"second,", b"third"):
+            chunks_sent.append(chunk)
+            yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url == "http://127.0.0.1:3000/bundle.js?v=1"
+        assert request.headers["host"] == "127.0.0.1:3000"
+        return httpx.Response(
+            200, headers={"Content-Type": "text/javascript"}, content=upstream_body()
+        )
+
+    proxy.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    status, headers, body = await proxy.proxy_request(
+        "ws-1", 3000, "/bundle.js?v=1", headers={"Host": "gitguide", "Accept": "*/*"}
+    )
+    assert status == 200
+    assert headers["content-type"] == "text/javascript"
+    # Nothing is read from upstream until the client pulls the body
+    assert chunks_sent == []
+    assert [chunk async for chunk in body] == [b"first,", b"second,", b"third"]
+
+    await proxy.proxy_request("ws-1", 3000, "/bundle.js?v=1")
+    assert proxy.workspace_manager.get_workspace.call_count == 1
+
+
+async def test_connection_refused_invalidates_route(proxy):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    proxy.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    status, _, body = await proxy.proxy_request("ws-1", 3000, "/")
+    assert status == 502
+    assert b"Server not running" in b"".join([chunk async for chunk in body])
+    assert "ws-1" not in proxy._routes
+
+
+def test_websocket_messages_and_subprotocol_are_relayed(proxy):
+    ready = threading.Event()
+    stop = None
+    upstream = {}
+
+    async def echo(connection):
+        upstream["path"] = connection.request.path
+        async for message in connection:
+            await connection.send(message)
+
+    async def run_server():
+        nonlocal stop
+        stop = asyncio.Event()
+        async with serve(echo, "127.0.0.1", 0, subprotocols=["vite-hmr"]) as server:
+            upstream["port"] = server.sockets[0].getsockname()[1]
+            ready.set()
+            await stop.wait()
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_until_complete, args=(run_server(),))
+    thread.start()
+    ready.wait(5)
+
+    app = FastAPI()
+
+    @app.websocket("/hmr")
+    async def hmr(websocket: WebSocket):
+        route = PreviewRoute("ws-1", "user-1", "container-1", "127.0.0.1", 0.0)
+        await proxy.proxy_websocket(websocket, route, upstream["port"], "/?token=abc")
+
+    try:
+        with TestClient(app).websocket_connect("/hmr", subprotocols=["vite-hmr"]) as ws:
+            assert ws.accepted_subprotocol == "vite-hmr"
+            ws.send_text('{"type":"ping"}')
+            assert ws.receive_text() == '{"type":"ping"}'
+            ws.send_bytes(b"\x00\x01")
+            assert ws.receive_bytes() == b"\x00\x01"
+        assert upstream["path"] == "/?token=abc"
+    finally:
+        loop.call_soon_threadsafe(stop.set)
+        thread.join(5)
+        loop.close()
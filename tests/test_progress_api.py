@@ -0,0 +1,104 @@
+"""
+Tests for progress rollup helpers in the Progress API.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.api.progress import _record_completion_rollup, complete_task, start_task
+
+
+def _table(rows):
+    chain = Mock()
+    for method in ("select", "eq", "update", "insert", "upsert"):
+        getattr(chain, method).return_value = chain
+    chain.execute.return_value = Mock(data=rows)
+    return chain
+
+
+def test_record_completion_rollup_returns_rpc_result():
+    supabase = Mock()
+    supabase.rpc.return_value.execute.return_value = Mock(
+        data={"task_completed": True, "concept_completed": True, "day_completed": False}
+    )
+
+    rollup = _record_completion_rollup(
+        supabase,
+        "record_task_completion",
+        {"p_user_id": "user_1", "p_task_id": "task_1", "p_project_id": "proj_1"},
+    )
+
+    assert rollup["concept_completed"] is True
+    assert rollup["day_completed"] is False
+    supabase.rpc.assert_called_once_with(
+        "record_task_completion",
+        {"p_user_id": "user_1", "p_task_id": "task_1", "p_project_id": "proj_1"},
+    )
+    # Single round trip: no table reads for the cascade
+    supabase.table.assert_not_called()
+
+
+def test_record_completion_rollup_falls_back_when_function_missing():
+    supabase = Mock()
+    supabase.rpc.return_value.execute.side_effect = APIError(
+        {"code": "PGRST202", "message": "Could not find the function public.record_task_completion"}
+    )
+
+    rollup = _record_completion_rollup(supabase, "record_task_completion", {})
+
+    assert rollup is None
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        APIError({"code": "P0001", "message": "constraint violated inside function"}),
+        TimeoutError("read timed out"),
+    ],
+)
+def test_record_completion_rollup_reraises_real_failures(error):
+    supabase = Mock()
+    supabase.rpc.return_value.execute.side_effect = error
+
+    with pytest.raises(type(error)):
+        _record_completion_rollup(supabase, "record_task_completion", {})
+
+
+def test_record_completion_rollup_handles_non_dict_payload():
+    supabase = Mock()
+    supabase.rpc.return_value.execute.return_value = Mock(data=None)
+
+    assert _record_completion_rollup(supabase, "record_concept_completion", {}) == {}
+
+
+async def test_restarted_done_task_is_recompleted_through_the_rollup():
+    tables = {
+        "User": _table([{"id": "user_1"}]),
+        "user_task_progress": _table([{"id": 1}]),
+        "tasks": _table([{"task_id": "task_1", "concept_id": "c1", "task_type": "coding"}]),
+        "concepts": _table([{"concept_id": "c1", "day_id": "d1"}]),
+        "roadmap_days": _table([{"project_id": "proj_1"}]),
+    }
+    supabase = Mock()
+    supabase.table.side_effect = lambda name: tables[name]
+    # The function recounts the concept's done tasks, so re-completing counts once
+    supabase.rpc.return_value.execute.return_value = Mock(
+        data={"task_completed": True, "concept_completed": False, "day_completed": False}
+    )
+    user_info = {"clerk_user_id": "clerk_1"}
+
+    await start_task("proj_1", "task_1", user_info=user_info, supabase=supabase)
+
+    assert tables["user_task_progress"].update.call_args.args[0]["progress_status"] == "doing"
+
+    result = await complete_task(
+        "proj_1", "task_1", request=None, user_info=user_info, supabase=supabase
+    )
+
+    assert result == {"success": True}
+    supabase.rpc.assert_called_once_with(
+        "record_task_completion",
+        {"p_user_id": "user_1", "p_task_id": "task_1", "p_project_id": "proj_1"},
+    )
@@ -0,0 +1,150 @@
+"""
+Tests for the PydanticAI agent registry and per-agent stats.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.models.test import TestModel
+
+from app.agents.utils import pydantic_ai_client
+from app.agents.utils.pydantic_ai_client import (
+    clear_agent_registry,
+    get_agent,
+    get_agent_stats,
+    run_gemini_structured,
+    run_groq_structured,
+)
+
+
+class Summary(BaseModel):
+    title: str
+
+
+@pytest.fixture(autouse=True)
+def _clear_registry():
+    clear_agent_registry()
+    yield
+    clear_agent_registry()
+
+
+@pytest.fixture
+def no_rate_limit(monkeypatch):
+    class _Limiter:
+        async def acquire(self):
+            return None
+
+    monkeypatch.setattr(pydantic_ai_client, "get_rate_limiter", lambda: _Limiter())
+
+
+def test_agents_are_reused_per_configuration():
+    model = TestModel()
+
+    key, agent = get_agent(model, system_prompt="p", output_type=Summary)
+    same_key, same_agent = get_agent(model, system_prompt="p", output_type=Summary)
+    _, other = get_agent(
+        model, system_prompt="p", output_type=Summary, model_settings={"temperature": 0.2}
+    )
+
+    assert same_key == key
+    assert same_agent is agent
+    assert other is not agent
+    assert get_agent(model, system_prompt="q", output_type=Summary)[1] is not agent
+
+
+async def test_runs_record_latency_and_token_usage(monkeypatch):
+    model = TestModel(custom_output_args={"title": "Intro"})
+    monkeypatch.setattr(pydantic_ai_client, "_groq_model", lambda: model)
+
+    for _ in range(2):
+        result = await run_groq_structured(
+            user_prompt="summarize", system_prompt="You summarize.", output_type=Summary
+        )
+        assert result == Summary(title="Intro")
+
+    [stats] = get_agent_stats()
+    assert stats["output_type"] == "Summary"
+    assert stats["calls"] == 2
+    assert stats["errors"] == 0
+    assert stats["requests"] == 2
+    assert stats["input_tokens"] > 0
+    assert stats["output_tokens"] > 0
+
+
+async def test_usage_failure_is_raised_and_counted_as_error(monkeypatch):
+    model = TestModel(custom_output_args={"title": "Intro"})
+    monkeypatch.setattr(pydantic_ai_client, "_groq_model", lambda: model)
+    real_get_agent = pydantic_ai_client.get_agent
+
+    def broken_usage():
+        raise RuntimeError("usage unavailable")
+
+    def get_agent_with_broken_usage(*args, **kwargs):
+        key, agent = real_get_agent(*args, **kwargs)
+
+        async def run(_prompt):
+            return SimpleNamespace(output=Summary(title="Intro"), usage=broken_usage)
+
+        monkeypatch.setattr(agent, "run", run)
+        return key, agent
+
+    monkeypatch.setattr(pydantic_ai_client, "get_agent", get_agent_with_broken_usage)
+
+    with pytest.raises(RuntimeError, match="usage unavailable"):
+        await run_groq_structured(
+            user_prompt="summarize", system_prompt="You summarize.", output_type=Summary
+        )
+
+    [stats] = get_agent_stats()
+    assert stats["calls"] == 1
+    assert stats["errors"] == 1
+    assert stats["requests"] == 0
+
+
+async def test_gemini_quota_fallback_uses_cached_stable_model(monkeypatch, no_rate_limit):
+    primary = TestModel(model_name="gemini-2.0-flash-exp")
+    fallback = TestModel(model_name="gemini-2.5-flash", custom_output_args={"title": "fallback"})
+    models = {"gemini-2.0-flash-exp": primary, "gemini-2.5-flash": fallback}
+    monkeypatch.setattr(pydantic_ai_client.settings, "gemini_model", "gemini-2.0-flash-exp")
+    monkeypatch.setattr(pydantic_ai_client, "_google_model", lambda name: models[name])
+
+    async def quota_exhausted(self, user_prompt):
+        raise ModelHTTPError(429, "gemini-2.0-flash-exp")
+
+    real_run = pydantic_ai_client.Agent.run
+
+    async def run(self, user_prompt, **kwargs):
+        if self.model is primary:
+            return await quota_exhausted(self, user_prompt)
+        return await real_run(self, user_prompt, **kwargs)
+
+    monkeypatch.setattr(pydantic_ai_client.Agent, "run", run)
+
+    result = await run_gemini_structured(user_prompt="x", system_prompt="s", output_type=Summary)
+
+    assert result.title == "fallback"
+    calls = {stats["errors"]: stats["calls"] for stats in get_agent_stats()}
+    assert calls == {1: 1, 0: 1}
+
+
+def test_google_provider_falls_back_to_api_key_when_vertex_fails(monkeypatch):
+    created = []
+
+    def provider(**kwargs):
+        if kwargs.get("vertexai"):
+            raise RuntimeError("default credentials not found")
+        created.append(kwargs)
+        return SimpleNamespace(**kwargs)
+
+    monkeypatch.setattr(pydantic_ai_client, "GoogleProvider", provider)
+    monkeypatch.setattr(pydantic_ai_client.settings, "gcp_project_id", "proj")
+    monkeypatch.setattr(pydantic_ai_client.settings, "gemini_api_key", "key")
+    pydantic_ai_client._google_provider.cache_clear()
+    try:
+        assert pydantic_ai_client._google_provider().api_key == "key"
+        assert pydantic_ai_client._google_provider().api_key == "key"
+        assert created == [{"api_key": "key"}]
+    finally:
+        pydantic_ai_client._google_provider.cache_clear()
@@ -0,0 +1,139 @@
+"""
+Tests for Qdrant collection profiles and online migration.
+"""
+
+import uuid
+
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import BinaryQuantization, PointStruct, ScalarQuantization
+
+from app.services import qdrant_collection
+from app.services.qdrant_collection import (
+    WRITE_PAUSE_ALIAS_SUFFIX,
+    create_collection,
+    get_collection_profile,
+    migrate_collection,
+    resolve_alias,
+    wait_while_writes_paused,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_pause_grace(monkeypatch):
+    monkeypatch.setattr(qdrant_collection, "WRITE_PAUSE_GRACE_SECONDS", 0)
+    monkeypatch.setattr(qdrant_collection, "_unpaused_checked_at", {})
+
+
+def _point(point_id, i: float, payload: dict) -> PointStruct:
+    return PointStruct(id=point_id, vector=[1.0, i, 0.5, 0.1], payload=payload)
+
+
+def test_profiles_configure_quantization_and_partitioning():
+    default = get_collection_profile("default")
+    scalar = get_collection_profile("scalar").collection_kwargs(768)
+    binary = get_collection_profile("binary")
+
+    assert "quantization_config" not in default.collection_kwargs(768)
+    assert default.search_params() is None
+    assert isinstance(scalar["quantization_config"], ScalarQuantization)
+    assert scalar["vectors_config"]["on_disk"] and scalar["on_disk_payload"]
+    assert scalar["hnsw_config"].m == 0 and scalar["hnsw_config"].payload_m == 16
+    assert isinstance(binary.collection_kwargs(768)["quantization_config"], BinaryQuantization)
+    assert binary.search_params().quantization.rescore
+    ratio = default.ram_bytes_per_vector(3072) / binary.ram_bytes_per_vector(3072)
+    assert ratio == 32
+
+    with pytest.raises(ValueError, match="Unknown Qdrant collection profile"):
+        get_collection_profile("huge")
+
+
+def test_migration_rebuilds_collection_behind_alias():
+    client = QdrantClient(location=":memory:")
+    create_collection(client, "chunks", get_collection_profile("default"), vector_size=4)
+    ids = [str(uuid.uuid4()) for _ in range(300)]
+    client.upsert(
+        collection_name="chunks",
+        points=[
+            PointStruct(id=point_id, vector=[1.0, i, 0.5, 0.1], payload={"project_id": "p1"})
+            for i, point_id in enumerate(ids)
+        ],
+    )
+
+    first = migrate_collection(client, "chunks", get_collection_profile("scalar"))
+
+    assert resolve_alias(client, "chunks") == first
+    assert client.count("chunks").count == 300
+    record = client.retrieve("chunks", ids=[ids[7]], with_vectors=True)[0]
+    assert record.payload == {"project_id": "p1"}
+
+    # Later migrations swap the alias and drop the previous collection
+    second = migrate_collection(client, "chunks", get_collection_profile("binary"))
+
+    assert second != first
+    assert resolve_alias(client, "chunks") == second
+    assert first not in {c.name for c in client.get_collections().collections}
+    assert client.count("chunks").count == 300
+
+
+def test_migration_catches_up_on_writes_and_pauses_writes_for_the_swap(monkeypatch):
+    client = QdrantClient(location=":memory:")
+    create_collection(client, "chunks", get_collection_profile("default"), vector_size=4)
+    ids = [str(uuid.uuid4()) for _ in range(5)]
+    client.upsert(
+        collection_name="chunks",
+        points=[_point(point_id, i, {"project_id": "p1"}) for i, point_id in enumerate(ids)],
+    )
+    added = str(uuid.uuid4())
+    copy_points = qdrant_collection._copy_points
+
+    def copy_then_write(client, source, target):
+        copy_points(client, source, target)
+        # Writes landing after the copy: an in-place update, an insert and a delete
+        written_at = qdrant_collection._now_ms()
+        client.upsert(
+            collection_name=source,
+            points=[
+                _point(
+                    ids[0], 9.0, {"project_id": "p1", "index_version": 2, "written_at": written_at}
+                ),
+                _point(added, 1.0, {"project_id": "p1", "written_at": written_at}),
+            ],
+        )
+        client.delete(collection_name=source, points_selector=[ids[1]])
+
+    paused_during_swap = []
+    swap_alias = qdrant_collection._swap_alias
+
+    def record_pause(client, *args):
+        paused_during_swap.append(resolve_alias(client, f"chunks{WRITE_PAUSE_ALIAS_SUFFIX}"))
+        swap_alias(client, *args)
+
+    monkeypatch.setattr(qdrant_collection, "_copy_points", copy_then_write)
+    monkeypatch.setattr(qdrant_collection, "_swap_alias", record_pause)
+
+    target = migrate_collection(client, "chunks", get_collection_profile("scalar"))
+
+    assert paused_during_swap == [target]
+    assert resolve_alias(client, f"chunks{WRITE_PAUSE_ALIAS_SUFFIX}") is None
+    assert client.count("chunks").count == 5
+    updated = client.retrieve("chunks", ids=[ids[0]], with_vectors=True)[0]
+    assert updated.payload["index_version"] == 2
+    assert client.retrieve("chunks", ids=[added]) and not client.retrieve("chunks", ids=[ids[1]])
+
+
+def test_writers_cache_the_pause_check_then_wait_and_time_out(monkeypatch):
+    client = QdrantClient(location=":memory:")
+    create_collection(client, "chunks", get_collection_profile("default"), vector_size=4)
+    wait_while_writes_paused(client, "chunks")
+    qdrant_collection._set_write_pause(client, "chunks", "chunks", paused=True)
+
+    # Within the TTL the previous "not paused" check is trusted
+    wait_while_writes_paused(client, "chunks")
+
+    monkeypatch.setattr(qdrant_collection, "WRITE_PAUSE_CHECK_TTL_SECONDS", 0)
+    monkeypatch.setattr(qdrant_collection, "WRITE_PAUSE_TIMEOUT_SECONDS", 0)
+    monkeypatch.setattr(qdrant_collection, "WRITE_PAUSE_POLL_SECONDS", 0)
+
+    with pytest.raises(RuntimeError, match="paused"):
+        wait_while_writes_paused(client, "chunks")
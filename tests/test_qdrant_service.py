@@ -101,28 +101,22 @@ class TestQdrantService:
         assert mock_qdrant_client.delete.called or mock_qdrant_client.count.called
         assert result == 5
 
-    def test_delete_points_by_project_id_scroll_method(self, mock_qdrant_client):
-        """Test delete_points_by_project_id - using scroll method"""
+    def test_delete_points_by_project_id_is_one_filter_delete(self, mock_qdrant_client):
+        """Test delete_points_by_project_id - no scrolling, Qdrant applies it in the background"""
+        from qdrant_client.http.models import FilterSelector
+
         from app.services.qdrant_service import QdrantService
 
-        # Setup
-        mock_qdrant_client.get_collections.return_value.collections = []
         service = QdrantService()
+        mock_qdrant_client.count.return_value = Mock(count=5)
 
-        # Mock: filter operations fail (no index)
-        mock_qdrant_client.count.side_effect = Exception("Index required")
-
-        # Mock: scroll returns points
-        mock_point = Mock()
-        mock_point.id = "point_1"
-        mock_point.payload = {"project_id": "project_123"}
-        mock_qdrant_client.scroll.return_value = ([mock_point], None)
-
-        project_id = "project_123"
-        service.delete_points_by_project_id(project_id)
+        service.delete_points_by_project_id("project_123")
 
-        # Verify scroll was called
-        assert mock_qdrant_client.scroll.called
+        mock_qdrant_client.scroll.assert_not_called()
+        mock_qdrant_client.delete.assert_called_once()
+        call_args = mock_qdrant_client.delete.call_args[1]
+        assert isinstance(call_args["points_selector"], FilterSelector)
+        assert call_args["wait"] is False
 
     def test_search_success(self, mock_qdrant_client):
         """Test search - successful search"""
@@ -152,3 +146,42 @@ class TestQdrantService:
         assert call_args[1]["limit"] == 5
         assert call_args[1]["query"] == query_embedding
         assert len(result) == 1
+
+    def test_search_batch_merges_queries_in_one_request(self, mock_qdrant_client):
+        """Test search_batch - one batched call, de-duplicated and filtered results"""
+        from app.services.qdrant_service import QdrantService, SearchQuery
+
+        service = QdrantService()
+
+        def point(point_id, score, file_path):
+            result = Mock()
+            result.id = point_id
+            result.score = score
+            result.payload = {"file_path": file_path}
+            return result
+
+        mock_qdrant_client.query_batch_points.return_value = [
+            Mock(points=[point("a", 0.7, "src/app.py"), point("b", 0.6, "src/db.py")]),
+            Mock(
+                points=[
+                    point("c", 0.95, "src/tests/test_x.py"),
+                    point("a", 0.9, "tests/test_app.py"),
+                    point("d", 0.5, "tests/test_db.py"),
+                ]
+            ),
+        ]
+
+        results = service.search_batch(
+            "project_123",
+            [
+                SearchQuery(embedding=[0.1] * 384, limit=2, language="python"),
+                SearchQuery(embedding=[0.2] * 384, limit=1, file_path_prefix="tests/"),
+            ],
+        )
+
+        mock_qdrant_client.query_batch_points.assert_called_once()
+        requests = mock_qdrant_client.query_batch_points.call_args[1]["requests"]
+        assert [len(r.filter.must) for r in requests] == [2, 2]
+        assert requests[1].limit == 3  # prefix queries over-fetch
+        # "c" only contains the prefix; "a" is kept once with its best score
+        assert [(r.id, r.score) for r in results] == [("a", 0.9), ("b", 0.6)]
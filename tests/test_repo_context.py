@@ -9,9 +9,41 @@ import pytest
 from app.agents.utils.repo_context import (
     _detect_test_structure,
     build_notebook_repo_context_for_task_generation,
+    clear_repo_context_cache,
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_repo_context_cache()
+    yield
+    clear_repo_context_cache()
+
+
+def _response(json_data=None, text="", status_code=200):
+    resp = Mock()
+    resp.status_code = status_code
+    resp.json.return_value = json_data
+    resp.text = text
+    resp.raise_for_status = Mock()
+    return resp
+
+
+def _mock_github(mock_client_class, responses: dict):
+    """Route GET requests by URL suffix; returns the AsyncMock client."""
+    mock_client = AsyncMock()
+    mock_client_class.return_value.__aenter__.return_value = mock_client
+
+    async def get(url, headers=None):
+        for suffix, response in responses.items():
+            if url.split("?")[0].endswith(suffix):
+                return response if isinstance(response, Mock) else response()
+        raise AssertionError(f"Unexpected request: {url}")
+
+    mock_client.get = AsyncMock(side_effect=get)
+    return mock_client
+
+
 class TestRepoContext:
     """Test Repository Context Builder functionality."""
 
@@ -91,8 +123,12 @@ class TestRepoContext:
             mock_blob_resp.json.return_value = mock_blob_data
             mock_blob_resp.raise_for_status = Mock()
 
+            mock_head_resp = Mock()
+            mock_head_resp.text = "abc123"
+            mock_head_resp.raise_for_status = Mock()
+
             mock_client.get = AsyncMock(
-                side_effect=[mock_repo_resp, mock_tree_resp, mock_blob_resp]
+                side_effect=[mock_repo_resp, mock_head_resp, mock_tree_resp, mock_blob_resp]
             )
 
             result = await build_notebook_repo_context_for_task_generation(
@@ -128,3 +164,50 @@ class TestRepoContext:
             # Should return minimal context
             assert "repo_structure" in result
             assert "existing_test_structure" in result
+
+    @pytest.mark.asyncio
+    async def test_build_notebook_repo_context_cached_per_head_sha(self):
+        """Repeated calls reuse the context until the branch head moves."""
+        head = {"sha": "sha-1"}
+        blob = {"encoding": "base64", "content": "W3B5dGVzdF0="}  # [pytest]
+
+        with (
+            patch("httpx.AsyncClient") as mock_client_class,
+            patch("app.agents.utils.repo_context.HEAD_CHECK_TTL_SECONDS", 0),
+        ):
+            client = _mock_github(
+                mock_client_class,
+                {
+                    "/repos/user/repo": _response({"default_branch": "main"}),
+                    "/commits/main": lambda: _response(text=head["sha"]),
+                    "/git/trees/sha-1": _response(
+                        {"tree": [{"type": "blob", "path": "pytest.ini", "sha": "b1"}]}
+                    ),
+                    "/git/trees/sha-2": _response(
+                        {"tree": [{"type": "blob", "path": "pytest.ini", "sha": "b1"}]}
+                    ),
+                    "/git/blobs/b1": _response(blob),
+                },
+            )
+
+            async def build():
+                return await build_notebook_repo_context_for_task_generation(
+                    project_id="test-project",
+                    concept_metadata={},
+                    user_repo_url="https://github.com/user/repo",
+                )
+
+            first = await build()
+            second = await build()
+            urls = [call.args[0] for call in client.get.call_args_list]
+            assert sum("/git/trees/" in url for url in urls) == 1
+            assert sum("/git/blobs/" in url for url in urls) == 1
+            assert second == first
+            assert first["existing_test_structure"]["framework"] == "pytest"
+
+            head["sha"] = "sha-2"
+            await build()
+            urls = [call.args[0] for call in client.get.call_args_list]
+            assert any("/git/trees/sha-2" in url for url in urls)
+            # The default branch is resolved once
+            assert sum(url.endswith("/repos/user/repo") for url in urls) == 1
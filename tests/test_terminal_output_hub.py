@@ -0,0 +1,61 @@
+"""
+Tests for the terminal scrollback ring buffer and its subscribers.
+"""
+
+import asyncio
+
+from app.services.terminal_output_hub import TerminalOutputHub
+
+
+async def test_subscribers_share_output_and_resume_from_offset():
+    hub = TerminalOutputHub(capacity=64)
+    first = hub.subscribe()
+    hub.publish(b"hello ")
+
+    chunk = await first.read()
+    assert (chunk.data, chunk.offset, chunk.reset) == (b"hello ", 6, False)
+
+    # A reconnecting client resumes from the last offset it saw
+    hub.publish(b"world")
+    second = hub.subscribe(offset=chunk.offset)
+    assert (await second.read()).data == b"world"
+    assert (await first.read()).data == b"world"
+
+
+async def test_ring_wraps_and_new_subscriber_replays_retained_scrollback():
+    hub = TerminalOutputHub(capacity=8)
+    hub.publish(b"0123456")
+    hub.publish(b"789ab")
+
+    assert (hub.start_offset, hub.end_offset) == (4, 12)
+    chunk = await hub.subscribe().read()
+    assert chunk.data == b"456789ab"
+    assert chunk.offset == 12
+
+
+async def test_slow_subscriber_is_resynced_with_a_snapshot():
+    hub = TerminalOutputHub(capacity=8)
+    slow = hub.subscribe()
+    for _ in range(5):
+        hub.publish(b"abcd")
+
+    chunk = await slow.read()
+    # Output it never read was overwritten: no unbounded queue, just the scrollback
+    assert chunk.reset is True
+    assert chunk.data == b"abcdabcd"
+    assert chunk.offset == hub.end_offset
+
+
+async def test_read_waits_for_output_and_ends_when_closed():
+    hub = TerminalOutputHub(capacity=16)
+    subscriber = hub.subscribe()
+
+    pending = asyncio.create_task(subscriber.read())
+    await asyncio.sleep(0)
+    assert not pending.done()
+
+    hub.publish(b"$ ")
+    assert (await pending).data == b"$ "
+
+    hub.close()
+    assert await subscriber.read() is None
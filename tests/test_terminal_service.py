@@ -0,0 +1,173 @@
+"""
+Tests for TerminalService stream I/O.
+"""
+
+import asyncio
+import socket
+from unittest.mock import Mock
+
+import pytest
+
+from app.services import terminal_service as terminal_module
+from app.services.terminal_output_hub import TerminalOutputHub
+from app.services.terminal_service import (
+    TERMINAL_READ_MIN_BYTES,
+    TerminalOutputScanner,
+    TerminalService,
+    TerminalSession,
+)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(terminal_module, "get_supabase_client", Mock)
+    monkeypatch.setattr(terminal_module, "get_docker_client", Mock)
+    monkeypatch.setattr(terminal_module, "GitService", Mock)
+    terminal = TerminalService()
+    terminal._scan_output = Mock()
+    return terminal
+
+
+async def test_output_is_read_on_the_event_loop_until_eof(service):
+    exec_sock, container_sock = socket.socketpair()
+    exec_sock.setblocking(False)
+    service._active_streams["s1"] = {
+        "socket": exec_sock,
+        "exec_id": "exec_1",
+        "write_lock": asyncio.Lock(),
+        "hub": TerminalOutputHub(),
+    }
+    received: list[bytes] = []
+
+    reader = asyncio.create_task(service._read_output("s1", exec_sock, received.append))
+    container_sock.sendall(b"$ ")
+    await asyncio.sleep(0.05)
+    # A burst larger than the initial buffer arrives over several reads
+    container_sock.sendall(b"x" * (TERMINAL_READ_MIN_BYTES * 8))
+    container_sock.close()
+    await asyncio.wait_for(reader, timeout=2)
+
+    assert received[0] == b"$ "
+    assert b"".join(received) == b"$ " + b"x" * (TERMINAL_READ_MIN_BYTES * 8)
+    assert max(len(chunk) for chunk in received) > TERMINAL_READ_MIN_BYTES
+    # EOF closes the session's output hub so attached clients finish
+    assert service._active_streams["s1"]["hub"].closed
+    exec_sock.close()
+
+
+async def test_write_input_sends_without_blocking(service):
+    exec_sock, container_sock = socket.socketpair()
+    exec_sock.setblocking(False)
+    service._active_streams["s1"] = {
+        "socket": exec_sock,
+        "exec_id": "exec_1",
+        "write_lock": asyncio.Lock(),
+    }
+
+    assert await service.write_input("s1", b"ls\n") is True
+    assert container_sock.recv(16) == b"ls\n"
+    assert await service.write_input("missing", b"ls\n") is False
+
+    exec_sock.close()
+    container_sock.close()
+
+
+async def test_started_stream_accepts_input_before_the_reader_runs(service):
+    exec_sock, container_sock = socket.socketpair()
+    service.get_session = Mock(
+        return_value=TerminalSession(
+            session_id="s1",
+            workspace_id="ws_1",
+            exec_id="exec_1",
+            name="Terminal",
+            is_active=True,
+            created_at=None,
+        )
+    )
+    service.docker_client.api.exec_inspect.return_value = {"Running": False}
+    service.docker_client.api.exec_start.return_value = exec_sock
+
+    async def idle_reader(*_args):
+        await asyncio.Event().wait()
+
+    # The reader never touches the socket: start_stream alone must prepare it
+    service._read_output = idle_reader
+    assert await service.start_stream("s1", "container_1") is exec_sock
+    assert exec_sock.getblocking() is False
+    assert await service.write_input("s1", b"ls\n") is True
+    assert container_sock.recv(16) == b"ls\n"
+
+    service._active_streams.pop("s1")["reader_task"].cancel()
+    exec_sock.close()
+    container_sock.close()
+
+
+def test_scanner_finds_matches_split_across_chunks():
+    scanner = TerminalOutputScanner()
+    output = (
+        "[main 3f9c2ab] Add login form\r\n 1 file changed\r\n"
+        "  VITE ready\r\n  \u279c  Local:   http://localhost:5173/\r\n$ "
+    ).encode()
+
+    commits: list[str] = []
+    ports: set[int] = set()
+    # Byte-at-a-time also splits the multi-byte arrow character
+    for i in range(len(output)):
+        found_commits, found_ports = scanner.feed(output[i : i + 1])
+        commits += found_commits
+        ports |= found_ports
+
+    assert commits == ["3f9c2ab"]
+    assert ports == {5173}
+
+
+def test_scanner_does_not_report_matches_twice():
+    scanner = TerminalOutputScanner()
+
+    assert scanner.feed(b"Server running at http://localhost:3000\r\n") == ([], {3000})
+    assert scanner.feed(b"GET / 200\r\n") == ([], set())
+    assert scanner.feed(b"commit 0123456789abcdef (HEAD -> main)\r\n") == (
+        ["0123456789abcdef"],
+        set(),
+    )
+
+
+def test_commit_detection_uses_cached_session(service, monkeypatch):
+    service.get_session = Mock()
+    session = TerminalSession(
+        session_id="s1",
+        workspace_id="ws_1",
+        exec_id="exec_1",
+        name="Terminal",
+        is_active=True,
+        created_at=None,
+    )
+    service._active_streams["s1"] = {"socket": None, "exec_id": "exec_1", "session": session}
+    scheduled = []
+    monkeypatch.setattr(terminal_module.asyncio, "create_task", scheduled.append)
+    service._update_last_platform_commit_delayed = Mock(return_value="update")
+
+    TerminalService._scan_output(service, "s1", b"[main abc1234] msg\r\n", Mock())
+    TerminalService._scan_output(service, "s1", b"[main abc1234] msg again\r\n", Mock())
+
+    assert scheduled == ["update"]
+    service._update_last_platform_commit_delayed.assert_called_once_with("ws_1", "s1")
+    service.get_session.assert_not_called()
+
+
+async def test_last_detach_closes_session_after_grace_unless_reattached(service, monkeypatch):
+    monkeypatch.setattr(terminal_module, "TERMINAL_DETACH_GRACE_SECONDS", 0.05)
+    service.close_session = Mock()
+    hub = TerminalOutputHub()
+    service._active_streams["s1"] = {"socket": None, "exec_id": "exec_1", "hub": hub}
+
+    first = service.attach("s1")
+    service.detach("s1", first)
+    # Reconnect within the grace period keeps the shell alive
+    second = service.attach("s1", offset=0)
+    await asyncio.sleep(0.1)
+    service.close_session.assert_not_called()
+
+    service.detach("s1", second)
+    await asyncio.sleep(0.1)
+    service.close_session.assert_called_once_with("s1")
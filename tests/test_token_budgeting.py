@@ -0,0 +1,119 @@
+"""
+Tests for token-budgeted chunk packing.
+"""
+
+import pytest
+
+from app.utils import token_budgeting
+from app.utils.token_budgeting import (
+    build_context_from_chunks,
+    select_chunks_by_budget,
+    truncate_chunk,
+)
+
+
+def _text(tokens: int, word: str = " hello") -> str:
+    # " hello" (and the other words used here) encode to one token each
+    return word * tokens
+
+
+@pytest.fixture
+def encode_calls(monkeypatch):
+    calls = []
+    real = token_budgeting._tokenizer
+
+    class CountingTokenizer:
+        def encode(self, text):
+            calls.append(text)
+            return real.encode(text)
+
+        def __getattr__(self, name):
+            return getattr(real, name)
+
+    token_budgeting._token_cache.clear()
+    monkeypatch.setattr(token_budgeting, "_tokenizer", CountingTokenizer())
+    return calls
+
+
+def test_selection_maximizes_score_instead_of_stopping_at_first_misfit(encode_calls):
+    chunks = [
+        {"id": "a", "file_path": "a.py", "content": _text(300), "score": 0.9},
+        {"id": "b", "file_path": "b.py", "content": _text(300, " world"), "score": 0.85},
+        {"id": "c", "file_path": "c.py", "content": _text(100, " apple"), "score": 0.8},
+        {"id": "d", "file_path": "d.py", "content": _text(100, " table"), "score": 0.8},
+    ]
+
+    selected = select_chunks_by_budget(chunks, token_budget=500, max_chunk_tokens=500, min_chunks=1)
+
+    assert [c["id"] for c in selected] == ["a", "c", "d"]
+    assert sum(c["truncated_token_count"] for c in selected) == 500
+    # Every chunk was tokenized exactly once
+    assert len(encode_calls) == 4
+
+
+def test_overlap_between_consecutive_chunks_of_a_file_is_sent_once():
+    text = "".join(f"line {i}\n" for i in range(200))
+    tokens = token_budgeting._tokenizer.encode(text)
+    first = token_budgeting._tokenizer.decode(tokens[:300])
+    second = token_budgeting._tokenizer.decode(tokens[200:500])
+    chunks = [
+        {"file_path": "m.py", "chunk_index": 0, "content": first, "score": 0.9},
+        {"file_path": "m.py", "chunk_index": 1, "content": second, "score": 0.8},
+    ]
+
+    selected = select_chunks_by_budget(chunks, token_budget=1000, max_chunk_tokens=500)
+
+    assert len(selected) == 2
+    assert selected[1]["truncated_token_count"] == 200
+    context = build_context_from_chunks(selected)
+    assert context.count("line 80\n") == 1
+
+
+def test_consecutive_chunks_of_a_file_are_emitted_in_file_order():
+    text = "".join(f"line {i}\n" for i in range(300))
+    tokens = token_budgeting._tokenizer.encode(text)
+    windows = [tokens[0:300], tokens[200:500], tokens[400:700]]
+    chunks = [
+        {
+            "file_path": "x.py",
+            "chunk_index": index,
+            "content": token_budgeting._tokenizer.decode(windows[index]),
+            "score": score,
+        }
+        for index, score in ((2, 0.9), (0, 0.8), (1, 0.7))
+    ]
+    chunks.insert(1, {"file_path": "y.py", "chunk_index": 0, "content": _text(50), "score": 0.85})
+
+    selected = select_chunks_by_budget(chunks, token_budget=2000, max_chunk_tokens=500)
+
+    assert [(c["file_path"], c["chunk_index"]) for c in selected] == [
+        ("x.py", 0),
+        ("x.py", 1),
+        ("x.py", 2),
+        ("y.py", 0),
+    ]
+    context = build_context_from_chunks(selected)
+    assert context.index("line 0\n") < context.index("line 100\n") < context.index("line 170\n")
+    assert context.count("line 60\n") == context.count("line 110\n") == 1
+
+
+def test_min_chunks_and_duplicates():
+    chunks = [
+        {"file_path": "a.py", "content": _text(400), "score": 0.9},
+        {"file_path": "a.py", "content": _text(400), "score": 0.9},
+        {"file_path": "b.py", "content": _text(400, " world"), "score": 0.5},
+    ]
+
+    selected = select_chunks_by_budget(chunks, token_budget=100, max_chunk_tokens=500, min_chunks=2)
+
+    assert [c["file_path"] for c in selected] == ["a.py", "b.py"]
+
+
+def test_truncate_chunk_prefers_line_boundaries():
+    content = "".join(f"value_{i} = {i}\n" for i in range(100))
+
+    truncated = truncate_chunk(content, max_tokens=50)
+
+    assert truncated.endswith("\n")
+    assert len(token_budgeting._tokenizer.encode(truncated)) <= 50
+    assert truncate_chunk("short", max_tokens=50) == "short"
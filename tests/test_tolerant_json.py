@@ -0,0 +1,111 @@
+"""
+Tests for tolerant LLM JSON parsing and schema-guided repair.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.agents.pydantic_models import ConceptBundleModel, TasksBundleModel
+from app.utils.json_parser import parse_llm_json_response, parse_llm_json_response_async
+from app.utils.tolerant_json import JsonStreamParser, parse_tolerant, repair_for_model
+
+
+def test_parses_json_after_code_blocks_and_prose():
+    text = (
+        "Here is an example:\n```python\ndef f():\n    return {'x': 1}\n```\n"
+        'And the result:\n```json\n{"summary": "ok", "items": [1, 2,],}\n```'
+    )
+
+    result = parse_tolerant(text)
+
+    assert result.complete
+    assert result.value == {"summary": "ok", "items": [1, 2]}
+
+
+def test_tolerates_raw_newlines_invalid_escapes_and_python_literals():
+    text = '{\'passed\': True, "feedback": "line 1\nline 2 \\d+", note: None}'
+
+    assert parse_tolerant(text).value == {
+        "passed": True,
+        "feedback": "line 1\nline 2 \\d+",
+        "note": None,
+    }
+
+
+def test_recovers_partial_object_from_truncated_output():
+    text = '{"content": "# Intro\\nSome text", "estimated_minutes": 2'
+
+    result = parse_tolerant(text)
+
+    assert not result.complete
+    # The number may have been cut off mid-token, so the member is dropped
+    assert result.value == {"content": "# Intro\nSome text"}
+
+
+def test_stream_parser_reports_completion_incrementally():
+    parser = JsonStreamParser()
+    for chunk in ['Sure: {"tasks": [{"title": "A', '"}, {"title": "B"}', "]} trailing"]:
+        assert not parser.complete
+        parser.feed(chunk)
+
+    assert parser.complete
+    assert parser.partial() == {"tasks": [{"title": "A"}, {"title": "B"}]}
+
+
+def test_repair_for_model_fixes_near_miss_outputs():
+    data = [
+        {
+            "orderIndex": "1",
+            "Title": "Write a test",
+            "description": "...",
+            "difficulty": "Medium",
+            "hints": "Use pytest",
+            "solution": None,
+        }
+    ]
+
+    bundle = TasksBundleModel.model_validate(repair_for_model(data, TasksBundleModel))
+
+    task = bundle.tasks[0]
+    assert task.order_index == 1
+    assert task.difficulty == "medium"
+    assert task.hints == ["Use pytest"]
+
+
+async def test_sanitizer_is_only_used_when_nothing_can_be_recovered():
+    sanitizer = AsyncMock()
+    sanitizer.sanitize_json.return_value = {"content": "x", "summary": "y"}
+
+    with patch("app.utils.json_parser._get_sanitizer", return_value=sanitizer):
+        parsed = await parse_llm_json_response_async(
+            '```json\n{"result": {"content": "x", "summary": "y", "estimated_minutes": "20"}}\n```',
+            model=ConceptBundleModel,
+        )
+        assert parsed["estimated_minutes"] == 20
+        sanitizer.sanitize_json.assert_not_called()
+
+        await parse_llm_json_response_async("## Content\nNo JSON here at all")
+        sanitizer.sanitize_json.assert_awaited_once()
+
+
+def test_sync_parser_raises_value_error_without_json(monkeypatch):
+    monkeypatch.setattr("app.utils.json_parser.settings.groq_sanitizer_enabled", False)
+
+    with pytest.raises(ValueError, match="Invalid JSON response"):
+        parse_llm_json_response("no json", expected_type="array")
+
+
+async def test_truncated_output_is_not_validated_against_a_model():
+    from app.services.verification_agent import VerificationResultModel
+
+    sanitizer = AsyncMock()
+    sanitizer.sanitize_json.return_value = {"passed": False, "overall_feedback": "retry"}
+
+    with patch("app.utils.json_parser._get_sanitizer", return_value=sanitizer):
+        parsed = await parse_llm_json_response_async(
+            '{"passed": true, "overall_feedback": "Good but', model=VerificationResultModel
+        )
+
+    sanitizer.sanitize_json.assert_awaited_once()
+    assert parsed["passed"] is False
@@ -0,0 +1,101 @@
+"""
+Tests for idle workspace hibernation and resource-budget eviction.
+"""
+
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from app.config import settings
+from app.services.workspace_reaper import WorkspaceReaper
+
+
+def make_workspace(workspace_id: str, idle_minutes: float):
+    return SimpleNamespace(
+        workspace_id=workspace_id,
+        container_id=f"container-{workspace_id}",
+        last_active_at=datetime.now(UTC) - timedelta(minutes=idle_minutes),
+    )
+
+
+def stats(memory_mb: int, cpu_ns: int = 0, system_ns: int = 0) -> dict:
+    return {
+        "memory_stats": {
+            "usage": (memory_mb + 10) * 2**20,
+            "limit": 512 * 2**20,
+            "stats": {"inactive_file": 10 * 2**20},
+        },
+        "cpu_stats": {
+            "cpu_usage": {"total_usage": cpu_ns},
+            "system_cpu_usage": system_ns,
+            "online_cpus": 4,
+        },
+    }
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    monkeypatch.setattr(settings, "workspace_idle_hibernate_seconds", 3600)
+    monkeypatch.setattr(settings, "workspace_memory_budget_mb", 0)
+    monkeypatch.setattr(settings, "workspace_cpu_budget_cores", 0.0)
+    manager = Mock()
+    manager.stop_workspace.return_value = True
+    docker = Mock()
+    docker.get_container_status.return_value = "running"
+    docker.get_container_stats.return_value = stats(100)
+    attached: set[str] = set()
+    reaper = WorkspaceReaper(manager, docker, attached_workspace_ids=lambda: attached)
+    return reaper, manager, docker, attached
+
+
+def test_idle_workspaces_are_hibernated_unless_attached(setup):
+    reaper, manager, _, attached = setup
+    manager.get_all_workspaces.return_value = [
+        make_workspace("idle", 120),
+        make_workspace("attached", 120),
+        make_workspace("recent", 5),
+    ]
+    attached.add("attached")
+
+    assert reaper.run_once() == ["idle"]
+    manager.stop_workspace.assert_called_once_with("idle")
+
+
+def test_recorded_activity_defers_hibernation(setup):
+    reaper, manager, _, _ = setup
+    manager.get_all_workspaces.return_value = [make_workspace("ws", 120)]
+
+    reaper.record_activity("ws")
+
+    assert reaper.run_once() == []
+
+
+def test_memory_budget_evicts_least_recently_active_first(setup, monkeypatch):
+    reaper, manager, _, _ = setup
+    monkeypatch.setattr(settings, "workspace_memory_budget_mb", 250)
+    manager.get_all_workspaces.return_value = [
+        make_workspace("newest", 1),
+        make_workspace("oldest", 30),
+        make_workspace("middle", 10),
+    ]
+
+    # 3 x 100 MB against a 250 MB budget: one hibernation is enough
+    assert reaper.run_once() == ["oldest"]
+
+
+def test_usage_reports_working_set_and_cpu_between_samples(setup):
+    reaper, _, docker, _ = setup
+    workspace = make_workspace("ws", 0)
+
+    docker.get_container_stats.return_value = stats(200, cpu_ns=1_000, system_ns=10_000)
+    first = reaper.sample_workspace(workspace)
+    docker.get_container_stats.return_value = stats(200, cpu_ns=3_000, system_ns=18_000)
+    second = reaper.sample_workspace(workspace)
+
+    assert first.memory_bytes == 200 * 2**20
+    assert first.cpu_cores is None
+    # 2000ns of 8000ns host time across 4 CPUs = 1 core
+    assert second.cpu_cores == pytest.approx(1.0)
+    assert reaper.get_usage("ws") is second